@@ -0,0 +1,64 @@
+"""
+Request Auth Context
+--------------------
+Verifies a request's bearer token at most once and shares the result
+between RateLimitMiddleware and the RBAC dependencies.
+
+The outcome is stored on `request.state.auth` as (token, claims), with
+claims None when verification failed. request.state is backed by the
+ASGI scope, so a later layer that sees the same token reuses the
+outcome instead of checking the HS256 signature again. It is keyed on
+the token itself, so a different token (e.g. in a test calling the
+dependency directly) is always verified afresh.
+
+OWASP API2 (Broken Authentication): nothing is trusted without a
+successful verify_token(); only the result is reused.
+"""
+
+from typing import Any, Optional, Tuple
+
+from fastapi.security.utils import get_authorization_scheme_param
+
+from app.auth.jwt_utils import verify_token
+
+
+def bearer_token(request: Any) -> Optional[str]:
+    """Token from "Authorization: Bearer <token>", else None."""
+    # Parsed exactly as HTTPBearer does, so both layers see the same token
+    scheme, token = get_authorization_scheme_param(request.headers.get("Authorization"))
+    if scheme.lower() != "bearer" or not token:
+        return None
+    return token
+
+
+def cached_claims(request: Any, token: str) -> Tuple[bool, Optional[dict]]:
+    """
+    (found, claims) for `token` if this request already verified it;
+    claims is None when that verification failed.
+    """
+    state = getattr(request, "state", None)
+    outcome = getattr(state, "auth", None) if state is not None else None
+    if outcome is None or outcome[0] != token:
+        return False, None
+    return True, outcome[1]
+
+
+def remember_claims(request: Any, token: str, claims: Optional[dict]) -> None:
+    state = getattr(request, "state", None)
+    if state is not None:
+        state.auth = (token, claims)
+
+
+def request_claims(request: Any) -> Optional[dict]:
+    """Verified claims for the request's bearer token, or None."""
+    token = bearer_token(request)
+    if token is None:
+        return None
+    found, claims = cached_claims(request, token)
+    if not found:
+        try:
+            claims = verify_token(token)
+        except ValueError:
+            claims = None
+        remember_claims(request, token, claims)
+    return claims
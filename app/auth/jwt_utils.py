@@ -4,10 +4,23 @@ JWT Utility Module
 Handles creation and verification of JSON Web Tokens.
 Built following OWASP recommendations for signing,
 expiration enforcement, and algorithm safety.
+
+Verified-token cache: machine clients send the same bearer token on
+every call, so the payloads of recently verified tokens are kept in a
+small LRU keyed by the token's SHA-256 digest (the raw token is never
+stored). A cached entry is served only until the token's own "exp"
+claim, so expiry is enforced exactly as by a fresh decode. Tokens that
+fail verification are never cached. JWT_VERIFY_CACHE_SIZE sets the
+capacity (default 1024, 0 disables).
 """
 
+import hashlib
 import os
+import threading
+import time
+from collections import OrderedDict
 from datetime import datetime, timedelta, timezone
+from typing import Optional, Tuple
 
 from jose import jwt, JWTError
 from fastapi import Depends, HTTPException, status
@@ -19,6 +32,64 @@ ACCESS_TOKEN_EXPIRE_MINUTES = 30
 security = HTTPBearer(auto_error=True)
 
 
+class VerifiedTokenCache:
+    """Bounded LRU of token digest -> (payload, exp)."""
+
+    def __init__(self, max_entries: int = 1024):
+        self.max_entries = max(0, max_entries)
+        self._entries: "OrderedDict[bytes, Tuple[dict, float]]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    @staticmethod
+    def _digest(token: str) -> bytes:
+        return hashlib.sha256(token.encode("utf-8")).digest()
+
+    def get(self, token: str, now: Optional[float] = None) -> Optional[dict]:
+        if not self.max_entries:
+            return None
+        now = time.time() if now is None else now
+        digest = self._digest(token)
+        with self._lock:
+            entry = self._entries.get(digest)
+            if entry is None or entry[1] <= now:
+                if entry is not None:
+                    del self._entries[digest]
+                self.misses += 1
+                return None
+            self._entries.move_to_end(digest)
+            self.hits += 1
+            # Callers may annotate the payload; never hand out the cached dict
+            return dict(entry[0])
+
+    def put(self, token: str, payload: dict) -> None:
+        exp = payload.get("exp")
+        if not self.max_entries or not isinstance(exp, (int, float)):
+            return
+        digest = self._digest(token)
+        with self._lock:
+            self._entries[digest] = (dict(payload), float(exp))
+            self._entries.move_to_end(digest)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self) -> dict:
+        return {
+            "entries": len(self._entries),
+            "max_entries": self.max_entries,
+            "hits": self.hits,
+            "misses": self.misses,
+        }
+
+
+verified_tokens = VerifiedTokenCache(int(os.getenv("JWT_VERIFY_CACHE_SIZE", "1024")))
+
+
 def create_access_token(data: dict) -> str:
     """
     Create a JWT access token embedding a user payload.
@@ -55,6 +126,10 @@ def verify_token(token: str) -> dict:
     Verify a JWT access token and return its decoded payload.
     Raises JWTError for invalid or expired tokens.
     """
+    cached = verified_tokens.get(token)
+    if cached is not None:
+        return cached
+
     try:
         payload = jwt.decode(token, SECRET_KEY, algorithms=[ALGORITHM])
 
@@ -65,6 +140,7 @@ def verify_token(token: str) -> dict:
         if "role" not in payload:
             raise ValueError("JWT missing role claim required for RBAC")
 
+        verified_tokens.put(token, payload)
         return payload
 
     except JWTError:
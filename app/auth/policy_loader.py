@@ -5,41 +5,182 @@ Loads RBAC policy configuration from policy.yaml.
 
 This module allows the API gateway to dynamically read roles
 and permissions defined in the policy file.
+
+The file is compiled once into a CompiledPolicy: a frozenset of
+permissions per role, the set of roles holding the admin override,
+per-role rate limits, and the DLP scan-tier prefixes pre-sorted longest
+first. Each RBAC check is then a set lookup instead of a walk over the
+YAML dict.
+
+Hot reload: get_policy() stats the file at most every
+POLICY_RELOAD_INTERVAL seconds. When its mtime or size changes, the file
+is re-read and compiled, and the module-level reference is swapped in one
+assignment, so concurrent requests see either the old policy or the new
+one, never a mix. A reload that fails (bad YAML, file briefly missing
+mid-deploy) keeps serving the previous policy and logs an error. Only the
+first load raises.
+
+Environment variables
+---------------------
+POLICY_PATH            — policy file (default docs/threat-modeling/policy.yaml
+                         under the repository root, independent of the CWD)
+POLICY_RELOAD_INTERVAL — seconds between mtime checks, 0 = check every call
+                         (default 2)
 """
 
-import yaml
+import logging
+import os
+import threading
+import time
+from dataclasses import dataclass
 from pathlib import Path
+from types import MappingProxyType
+from typing import Any, Mapping, Optional, Tuple
+
+import yaml
+
+logger = logging.getLogger("cyberoracle")
 
 # Path to the YAML policy file
-POLICY_PATH = Path("docs/threat-modeling/policy.yaml")
+POLICY_PATH = Path(
+    os.getenv(
+        "POLICY_PATH",
+        Path(__file__).resolve().parents[2]
+        / "docs"
+        / "threat-modeling"
+        / "policy.yaml",
+    )
+)
+
+POLICY_RELOAD_INTERVAL = float(os.getenv("POLICY_RELOAD_INTERVAL", "2"))
+
+# Permission that grants every other permission
+ADMIN_OVERRIDE = "access_all_endpoints"
+
+
+@dataclass(frozen=True)
+class CompiledPolicy:
+    raw: Mapping[str, Any]
+    role_permissions: Mapping[str, frozenset]
+    # Roles holding ADMIN_OVERRIDE
+    override_roles: frozenset
+    rate_limits: Mapping[str, int]
+    rate_window: Optional[int]
+    rate_limiting_enabled: bool
+    dlp_rules: Mapping[str, Any]
+    scan_tier_default: str
+    # (prefix, tier), longest prefix first
+    scan_tier_prefixes: Tuple[Tuple[str, str], ...]
+
+    def permissions(self, role: Optional[str]) -> frozenset:
+        return self.role_permissions.get(role, frozenset())
+
+    def allows(self, role: Optional[str], permission: str) -> bool:
+        return role in self.override_roles or permission in self.permissions(role)
+
+    def scan_tier(self, endpoint: Optional[str] = None) -> str:
+        """Tier for the longest scan_tiers prefix matching `endpoint`."""
+        if endpoint:
+            for prefix, tier in self.scan_tier_prefixes:
+                if endpoint == prefix or endpoint.startswith(prefix.rstrip("/") + "/"):
+                    return tier
+        return self.scan_tier_default
+
+
+def compile_policy(raw: Optional[Mapping[str, Any]]) -> CompiledPolicy:
+    """Build the lookup structures for a parsed policy.yaml."""
+    raw = raw or {}
+
+    role_permissions = {
+        role: frozenset((data or {}).get("permissions") or [])
+        for role, data in (raw.get("roles") or {}).items()
+    }
+
+    rate = raw.get("rate_limiting") or {}
+    window = rate.get("window_seconds")
 
-# Cache the policy to avoid reading the file on every request
-_policy_cache = None
+    dlp = raw.get("dlp_rules") or {}
+    tiers = dlp.get("scan_tiers") or {}
+    prefixes = sorted(
+        (tiers.get("endpoints") or {}).items(), key=lambda item: -len(item[0])
+    )
+
+    return CompiledPolicy(
+        raw=raw,
+        role_permissions=MappingProxyType(role_permissions),
+        override_roles=frozenset(
+            role for role, perms in role_permissions.items() if ADMIN_OVERRIDE in perms
+        ),
+        rate_limits=MappingProxyType(
+            {
+                role: int(limit)
+                for role, limit in (rate.get("requests_per_minute") or {}).items()
+            }
+        ),
+        rate_window=int(window) if window else None,
+        rate_limiting_enabled=bool(rate.get("enabled", True)),
+        dlp_rules=dlp,
+        scan_tier_default=tiers.get("default", "full"),
+        scan_tier_prefixes=tuple(prefixes),
+    )
+
+
+# Current compiled policy and the (mtime, size) it was built from
+_compiled: Optional[CompiledPolicy] = None
+_signature: Optional[Tuple[float, int]] = None
+_checked_at = 0.0
+_reload_lock = threading.Lock()
+
+
+def _stat_signature() -> Tuple[float, int]:
+    st = os.stat(POLICY_PATH)
+    return st.st_mtime, st.st_size
+
+
+def _reload() -> None:
+    global _compiled, _signature
+    signature = _stat_signature()
+    if _compiled is not None and signature == _signature:
+        return
+    with open(POLICY_PATH, "r") as f:
+        compiled = compile_policy(yaml.safe_load(f))
+    if _compiled is not None:
+        logger.info(f"Reloaded policy from {POLICY_PATH}")
+    # Single reference assignment: readers never see a half-built policy
+    _compiled, _signature = compiled, signature
+
+
+def get_policy() -> CompiledPolicy:
+    """The compiled policy, reloaded if policy.yaml changed on disk."""
+    global _checked_at
+
+    now = time.monotonic()
+    if _compiled is not None and now - _checked_at < POLICY_RELOAD_INTERVAL:
+        return _compiled
+
+    with _reload_lock:
+        if _compiled is not None and now - _checked_at < POLICY_RELOAD_INTERVAL:
+            return _compiled
+        try:
+            _reload()
+        except (OSError, yaml.YAMLError) as exc:
+            if _compiled is None:
+                raise
+            logger.error(f"Policy reload failed, keeping previous policy: {exc}")
+        _checked_at = now
+    return _compiled
 
 
 def load_policy():
     """
-    Load the YAML policy file and cache it.
+    Return the parsed policy file (reloaded when it changes).
     """
-    global _policy_cache
-
-    if _policy_cache is None:
-        with open(POLICY_PATH, "r") as f:
-            _policy_cache = yaml.safe_load(f)
-
-    return _policy_cache
+    return get_policy().raw
 
 
-def get_role_permissions(role: str):
+def get_role_permissions(role: str) -> frozenset:
     """
     Return the permissions assigned to a role
     based on the loaded policy file.
     """
-
-    policy = load_policy()
-
-    roles = policy.get("roles", {})
-
-    role_data = roles.get(role, {})
-
-    return role_data.get("permissions", [])
+    return get_policy().permissions(role)
@@ -20,26 +20,60 @@ defined in docs/threat-modeling/policy.yaml:
     - "developer"
     - "auditor"
 
+The token is verified once per request: a result already recorded by
+RateLimitMiddleware (app/auth/auth_context.py) is reused, and verify_token
+serves hot tokens from its verified-token cache.
+
 Error codes
 -----------
 401  No / invalid Authorization header (missing or malformed JWT)
 403  Valid token but role not in allowed list
 """
 
-from fastapi import Depends, HTTPException, status
+from fastapi import Depends, HTTPException, Request, status
 from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
+from app.auth.auth_context import cached_claims, remember_claims
 from app.auth.jwt_utils import verify_token
-from app.auth.policy_loader import get_role_permissions
+from app.auth.policy_loader import get_policy
 
 # HTTPBearer extracts "Authorization: Bearer <token>" from the request
 _bearer = HTTPBearer(auto_error=False)
 
 
+def _authenticate(
+    request: Request | None, credentials: HTTPAuthorizationCredentials | None
+) -> dict:
+    """Verified JWT payload for the request, or HTTP 401."""
+    if credentials is None:
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="Authentication required. Provide a Bearer token.",
+            headers={"WWW-Authenticate": "Bearer"},
+        )
+
+    token = credentials.credentials
+    found, payload = cached_claims(request, token)
+    if not found:
+        try:
+            payload = verify_token(token)
+        except ValueError:
+            payload = None
+        remember_claims(request, token, payload)
+
+    if payload is None:
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="Invalid or expired token.",
+            headers={"WWW-Authenticate": "Bearer"},
+        )
+    return payload
+
+
 def require_roles(*allowed_roles: str):
     """
     Dependency factory.  Returns a FastAPI dependency that:
       1. Reads the Bearer token from the Authorization header.
-      2. Decodes and verifies the JWT.
+      2. Decodes and verifies the JWT (reusing this request's result).
       3. Checks the "role" claim against `allowed_roles`.
       4. Returns the decoded payload on success.
       5. Raises HTTP 401 / 403 on failure.
@@ -51,23 +85,10 @@ def require_roles(*allowed_roles: str):
     """
 
     async def _enforce(
+        request: Request = None,
         credentials: HTTPAuthorizationCredentials = Depends(_bearer),
     ) -> dict:
-        if credentials is None:
-            raise HTTPException(
-                status_code=status.HTTP_401_UNAUTHORIZED,
-                detail="Authentication required. Provide a Bearer token.",
-                headers={"WWW-Authenticate": "Bearer"},
-            )
-
-        try:
-            payload = verify_token(credentials.credentials)
-        except ValueError:
-            raise HTTPException(
-                status_code=status.HTTP_401_UNAUTHORIZED,
-                detail="Invalid or expired token.",
-                headers={"WWW-Authenticate": "Bearer"},
-            )
+        payload = _authenticate(request, credentials)
 
         role = payload.get("role", "")
         if role not in allowed_roles:
@@ -99,48 +120,21 @@ def require_permission(permission: str):
     """
 
     async def _enforce(
+        request: Request = None,
         credentials: HTTPAuthorizationCredentials = Depends(_bearer),
     ) -> dict:
 
         # ------------------------------------------------------------------
-        # 1. Ensure a token is provided
-        # ------------------------------------------------------------------
-        if credentials is None:
-            raise HTTPException(
-                status_code=status.HTTP_401_UNAUTHORIZED,
-                detail="Authentication required. Provide a Bearer token.",
-                headers={"WWW-Authenticate": "Bearer"},
-            )
-
-        # ------------------------------------------------------------------
-        # 2. Verify JWT
+        # 1-2. Ensure a token is provided and verify it (once per request)
         # ------------------------------------------------------------------
-        try:
-            payload = verify_token(credentials.credentials)
-        except ValueError:
-            raise HTTPException(
-                status_code=status.HTTP_401_UNAUTHORIZED,
-                detail="Invalid or expired token.",
-                headers={"WWW-Authenticate": "Bearer"},
-            )
+        payload = _authenticate(request, credentials)
 
         role = payload.get("role")
 
         # ------------------------------------------------------------------
-        # 3. Load permissions for the role from policy.yaml
-        # ------------------------------------------------------------------
-        permissions = get_role_permissions(role)
-
-        # ------------------------------------------------------------------
-        # 4. Admin override
-        # ------------------------------------------------------------------
-        if "access_all_endpoints" in permissions:
-            return payload
-
-        # ------------------------------------------------------------------
-        # 5. Enforce permission
+        # 3. Check the compiled policy.yaml (admin override included)
         # ------------------------------------------------------------------
-        if permission not in permissions:
+        if not get_policy().allows(role, permission):
             raise HTTPException(
                 status_code=status.HTTP_403_FORBIDDEN,
                 detail=f"Permission '{permission}' denied for role '{role}'",
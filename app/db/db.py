@@ -1,9 +1,12 @@
 import os
+from sqlalchemy.engine import make_url
 from sqlalchemy.ext.asyncio import create_async_engine, AsyncSession, async_sessionmaker
 from sqlalchemy.orm import declarative_base
 from sqlalchemy.pool import NullPool
 from dotenv import load_dotenv
 
+from app.db.pool import InstrumentedAsyncPool
+
 # Load environment variables from .env file
 load_dotenv()
 
@@ -14,14 +17,62 @@ DATABASE_URL = os.getenv("DATABASE_URL")
 if not DATABASE_URL:
     raise ValueError("DATABASE_URL is not set in environment variables.")
 
-# Use NullPool for tests to avoid race conditions (concurrent operations)
-# For production, consider using AsyncPool with proper sizing
-engine = create_async_engine(
-    DATABASE_URL,
-    echo=True,
-    echo_pool=os.getenv("PYTEST") == "1",  # Echo pool only in tests
-    poolclass=NullPool,  # Prevents connection reuse race conditions
-)
+
+def _env_bool(name: str, default: str) -> bool:
+    return os.getenv(name, default).lower() == "true"
+
+
+def engine_options() -> dict:
+    """
+    Engine keyword arguments from the environment.
+
+    Pooling (ignored under PYTEST=1, where NullPool avoids sharing
+    connections across the per-test event loops):
+        DB_POOL_SIZE                    — persistent connections (default 10)
+        DB_MAX_OVERFLOW                 — extra connections under burst (default 20)
+        DB_POOL_TIMEOUT                 — seconds to wait for a free connection (default 30)
+        DB_POOL_RECYCLE                 — reconnect after N seconds (default 1800)
+        DB_POOL_PRE_PING                — test connections on checkout (default true)
+
+    asyncpg (postgresql+asyncpg URLs only):
+        DB_STATEMENT_TIMEOUT_MS         — server-side statement_timeout, 0 = off
+                                          (default 30000)
+        DB_STATEMENT_CACHE_SIZE         — prepared statements cached per
+                                          connection; 0 for PgBouncer in
+                                          transaction mode (default 100)
+
+    DB_ECHO=true logs every SQL statement (default false).
+    """
+    options = {"echo": _env_bool("DB_ECHO", "false")}
+
+    if os.getenv("PYTEST") == "1":
+        # Prevents connection reuse race conditions between test event loops
+        options["poolclass"] = NullPool
+    else:
+        options.update(
+            poolclass=InstrumentedAsyncPool,
+            pool_size=int(os.getenv("DB_POOL_SIZE", "10")),
+            max_overflow=int(os.getenv("DB_MAX_OVERFLOW", "20")),
+            pool_timeout=float(os.getenv("DB_POOL_TIMEOUT", "30")),
+            pool_recycle=int(os.getenv("DB_POOL_RECYCLE", "1800")),
+            pool_pre_ping=_env_bool("DB_POOL_PRE_PING", "true"),
+        )
+
+    if make_url(DATABASE_URL).get_driver_name() == "asyncpg":
+        connect_args = {
+            "statement_cache_size": int(os.getenv("DB_STATEMENT_CACHE_SIZE", "100"))
+        }
+        statement_timeout = int(os.getenv("DB_STATEMENT_TIMEOUT_MS", "30000"))
+        if statement_timeout > 0:
+            connect_args["server_settings"] = {
+                "statement_timeout": str(statement_timeout)
+            }
+        options["connect_args"] = connect_args
+
+    return options
+
+
+engine = create_async_engine(DATABASE_URL, **engine_options())
 
 # Create async session factory for database operations
 AsyncSessionLocal = async_sessionmaker(
@@ -1,20 +1,19 @@
 """
 Database Initialization Script
 ------------------------------
-Creates database tables from SQLAlchemy models.
+Creates or upgrades the database schema by applying the Alembic
+migrations (same as `alembic upgrade head`).
 
 Required because the project uses AsyncEngine (asyncpg).
 """
 
 import asyncio
 
-from app.db.db import engine, Base
+from app.db.migrations import run_migrations
 
 
 async def init_db():
-    async with engine.begin() as conn:
-        # Run table creation
-        await conn.run_sync(Base.metadata.create_all)
+    await run_migrations()
 
 
 if __name__ == "__main__":  # pragma: no cover
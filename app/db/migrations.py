@@ -0,0 +1,70 @@
+# app/db/migrations.py
+"""
+Schema Migrations
+-----------------
+Applies the Alembic migrations in migrations/ (alembic.ini at the
+project root) to DATABASE_URL. Replaces Base.metadata.create_all, which
+never altered or indexed tables that already existed.
+
+Used by the application lifespan (DB_MIGRATE_ON_STARTUP, default true)
+and app/db/init_db.py. The upgrade runs under a PostgreSQL advisory lock
+so several replicas starting together apply each revision once, and with
+statement_timeout disabled because CREATE INDEX CONCURRENTLY on a large
+logs table can take longer than the request timeout.
+
+CLI equivalent: `alembic upgrade head`.
+"""
+
+import os
+from typing import Any, Optional
+
+from alembic import command
+from alembic.config import Config
+from sqlalchemy import text
+
+from app.db.db import engine
+
+PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.dirname(__file__)))
+ALEMBIC_INI = os.path.join(PROJECT_ROOT, "alembic.ini")
+
+# Arbitrary application-wide key for pg_advisory_lock
+MIGRATION_LOCK_ID = 0x43794F72
+
+MIGRATE_ON_STARTUP = os.getenv("DB_MIGRATE_ON_STARTUP", "true").lower() == "true"
+
+
+def alembic_config(connection: Optional[Any] = None) -> Config:
+    """Alembic config for this project, optionally bound to `connection`."""
+    cfg = Config(ALEMBIC_INI)
+    # Keep the application's logging setup instead of alembic.ini's
+    cfg.attributes["configure_logger"] = False
+    if connection is not None:
+        cfg.attributes["connection"] = connection
+    return cfg
+
+
+def _upgrade(connection: Any, revision: str) -> None:
+    command.upgrade(alembic_config(connection), revision)
+
+
+async def run_migrations(revision: str = "head") -> None:
+    """Upgrade the database to `revision`."""
+    async with engine.connect() as conn:
+        is_postgres = conn.dialect.name == "postgresql"
+        if is_postgres:
+            await conn.execute(text("SET statement_timeout = 0"))
+            await conn.execute(
+                text("SELECT pg_advisory_lock(:id)"), {"id": MIGRATION_LOCK_ID}
+            )
+            # Session-level lock survives the commit; Alembic then manages
+            # its own transactions (and autocommit blocks) on this connection.
+            await conn.commit()
+        try:
+            await conn.run_sync(_upgrade, revision)
+            await conn.commit()
+        finally:
+            if is_postgres:
+                await conn.execute(
+                    text("SELECT pg_advisory_unlock(:id)"), {"id": MIGRATION_LOCK_ID}
+                )
+                await conn.commit()
@@ -0,0 +1,104 @@
+# app/db/pool.py
+"""
+Instrumented Connection Pool
+----------------------------
+AsyncAdaptedQueuePool subclass that records how long each checkout waits
+for a connection and how often a checkout times out because the pool
+(pool_size + max_overflow) is exhausted.
+
+Checkout latency near zero means connections are being reused; a rising
+average or any timeouts mean the pool is saturated and DB_POOL_SIZE /
+DB_MAX_OVERFLOW should be raised (or queries made cheaper).
+
+Served on /api/metrics/db-pool via pool_stats().
+"""
+
+import threading
+import time
+from typing import Dict, Optional
+
+from sqlalchemy import exc
+from sqlalchemy.pool import AsyncAdaptedQueuePool, Pool
+
+
+class CheckoutStats:
+    """Running checkout-latency counters for one pool."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.checkouts = 0
+        self.timeouts = 0
+        self.total_wait_s = 0.0
+        self.max_wait_s = 0.0
+
+    def record(self, wait_s: float, timed_out: bool = False) -> None:
+        with self._lock:
+            if timed_out:
+                self.timeouts += 1
+                return
+            self.checkouts += 1
+            self.total_wait_s += wait_s
+            self.max_wait_s = max(self.max_wait_s, wait_s)
+
+    def snapshot(self) -> Dict[str, object]:
+        with self._lock:
+            avg = self.total_wait_s / self.checkouts if self.checkouts else 0.0
+            return {
+                "checkouts": self.checkouts,
+                "checkout_timeouts": self.timeouts,
+                "checkout_avg_ms": round(avg * 1000, 3),
+                "checkout_max_ms": round(self.max_wait_s * 1000, 3),
+            }
+
+
+class InstrumentedAsyncPool(AsyncAdaptedQueuePool):
+    """AsyncAdaptedQueuePool that times every connection checkout."""
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.checkout_stats = CheckoutStats()
+
+    def _do_get(self):
+        start = time.perf_counter()
+        try:
+            conn = super()._do_get()
+        except exc.TimeoutError:
+            self.checkout_stats.record(time.perf_counter() - start, timed_out=True)
+            raise
+        self.checkout_stats.record(time.perf_counter() - start)
+        return conn
+
+    def recreate(self):
+        # Keep counters across dispose()/recreate so metrics stay cumulative
+        pool = super().recreate()
+        pool.checkout_stats = self.checkout_stats
+        return pool
+
+
+def pool_stats(pool: Pool) -> Dict[str, object]:
+    """
+    Current occupancy and checkout latency of `pool`. `saturation` is the
+    share of the maximum connection count (pool_size + max_overflow)
+    currently checked out.
+    """
+    stats: Dict[str, object] = {"pool_class": type(pool).__name__}
+    checkout_stats: Optional[CheckoutStats] = getattr(pool, "checkout_stats", None)
+    if not isinstance(pool, AsyncAdaptedQueuePool):
+        # NullPool (pytest): nothing is pooled
+        return stats
+
+    capacity = pool.size() + max(pool._max_overflow, 0)
+    checked_out = pool.checkedout()
+    stats.update(
+        {
+            "pool_size": pool.size(),
+            "max_overflow": pool._max_overflow,
+            "checked_out": checked_out,
+            "checked_in": pool.checkedin(),
+            "overflow": max(pool.overflow(), 0),
+            "saturation": round(checked_out / capacity, 3) if capacity else 0.0,
+        }
+    )
+    if checkout_stats is not None:
+        stats.update(checkout_stats.snapshot())
+    return stats
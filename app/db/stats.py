@@ -0,0 +1,85 @@
+# app/db/stats.py
+"""
+Conditional Count Queries
+-------------------------
+Builds one aggregate SELECT that returns several counts over the same
+table, so a dashboard endpoint costs one round trip and one scan instead
+of a separate COUNT(*) query per number it shows.
+
+Each named count becomes a `COUNT(*) FILTER (WHERE ...)` column:
+
+    counts = await (
+        ConditionalCounts(LogEntry, LogEntry.created_at >= since)
+        .count("total")
+        .count("blocked", LogEntry.policy_decision == "block")
+        .count("high_risk", LogEntry.risk_score >= 0.7)
+        .fetch(session)
+    )
+    # {"total": 120, "blocked": 4, "high_risk": 2}
+
+`where` bounds the scan for every count (use it for the conditions they
+all share, e.g. the time window); per-count conditions are ANDed with it.
+
+Over pre-aggregated tables pass `measure`, the column holding each row's
+count, and every column becomes `COALESCE(SUM(measure) FILTER (...), 0)`:
+
+    ConditionalCounts(LogRollup, window, measure=LogRollup.count)
+        .count("high_risk", measure=LogRollup.high_risk_count)
+"""
+
+from typing import Any, Dict, List, Optional, Tuple
+
+from sqlalchemy import and_, func, select
+from sqlalchemy.sql import ColumnElement, Select
+
+
+class ConditionalCounts:
+    """Builder for a single-row, multi-count aggregate query."""
+
+    def __init__(
+        self,
+        source: Any,
+        where: Optional[ColumnElement] = None,
+        measure: Optional[ColumnElement] = None,
+    ):
+        self._source = source
+        self._where = where
+        self._measure = measure
+        self._counts: List[
+            Tuple[str, Tuple[ColumnElement, ...], Optional[ColumnElement]]
+        ] = []
+
+    def count(
+        self,
+        name: str,
+        *conditions: ColumnElement,
+        measure: Optional[ColumnElement] = None,
+    ) -> "ConditionalCounts":
+        """
+        Add a count of rows matching all `conditions` (all rows if none).
+        `measure` overrides the builder's measure column for this count.
+        """
+        self._counts.append((name, conditions, measure))
+        return self
+
+    def statement(self) -> Select:
+        columns = []
+        for name, conditions, measure in self._counts:
+            measure = measure if measure is not None else self._measure
+            column = func.count() if measure is None else func.sum(measure)
+            if conditions:
+                column = column.filter(and_(*conditions))
+            if measure is not None:
+                column = func.coalesce(column, 0)
+            columns.append(column.label(name))
+
+        stmt = select(*columns).select_from(self._source)
+        if self._where is not None:
+            stmt = stmt.where(self._where)
+        return stmt
+
+    async def fetch(self, session: Any) -> Dict[str, int]:
+        """Execute on `session` and return {name: count}."""
+        result = await session.execute(self.statement())
+        row = result.mappings().one()
+        return {name: int(row[name] or 0) for name, _, _ in self._counts}
@@ -1,10 +1,14 @@
+import asyncio
+import logging
 from contextlib import asynccontextmanager
 
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import JSONResponse
 
-# Database models and async engine
-from app.db.db import Base, engine
+# Async engine and schema migrations
+from app.db.db import AsyncSessionLocal, engine
+from app.db.migrations import MIGRATE_ON_STARTUP, run_migrations
 
 # Security middleware
 from app.middleware.dlp_filter import DLPFilterMiddleware
@@ -19,27 +23,80 @@ from app.routes.logs import router as logs_router
 from app.routes.metrics import router as metrics_router
 from app.routes.reports import router as reports_router
 
+# DLP worker pool
+from app.services.dlp_executor import WARMUP_ENABLED, DlpExecutorError, dlp_executor
+
+# logs table partition maintenance
+from app.services.log_partitions import ensure_partitions
+
+# Thread pool for integrity-hash verification of audit reads
+from app.services.log_integrity import integrity_verifier
+
+# Hash-chained hourly Merkle roots over the audit log
+from app.services.log_merkle import MERKLE_ENABLED, seal_loop
+
+# Batched background audit-log writer
+from app.services.log_writer import LOG_WRITER_ENABLED, log_writer
+
 # Global secure exception handler
-from app.utils.exception_handler import secure_exception_handler
+from app.utils.exception_handler import (
+    dlp_unavailable_handler,
+    secure_exception_handler,
+)
+
+logger = logging.getLogger("cyberoracle")
 
 
 # ------------------------------------------------
 # Application Lifespan
 # ------------------------------------------------
 # Runs on application startup and shutdown.
-# Used here to ensure database tables are created
-# before the API begins serving requests.
+# Used here to apply pending schema migrations and
+# create upcoming logs partitions before the API
+# begins serving requests, to load
+# the Presidio/spaCy engines in the background, to
+# run (and on shutdown drain) the audit-log writer, and
+# to seal closed hours of logs into the Merkle chain.
 @asynccontextmanager
 async def lifespan(app: FastAPI):
-    async with engine.begin() as conn:
-        # Create database tables if they do not exist
-        await conn.run_sync(Base.metadata.create_all)
+    if MIGRATE_ON_STARTUP:
+        # Create/upgrade tables and indexes (alembic upgrade head)
+        await run_migrations()
+
+    # Keep the next LOG_PARTITION_PREMAKE logs partitions ready. Not fatal:
+    # rows fall into the default partition until they exist.
+    try:
+        async with AsyncSessionLocal() as session:
+            await ensure_partitions(session)
+            await session.commit()
+    except Exception as exc:
+        logger.error(f"logs partition maintenance failed: {type(exc).__name__}: {exc}")
+
+    # Load DLP models without blocking startup; /health/ready
+    # reports 503 until they are in memory.
+    warmup = asyncio.create_task(dlp_executor.warm_up(analyze=WARMUP_ENABLED))
+
+    if LOG_WRITER_ENABLED:
+        log_writer.start()
+
+    # Seal each closed hour of audit logs into the Merkle chain
+    sealer = asyncio.create_task(seal_loop()) if MERKLE_ENABLED else None
 
     yield
 
-    # Optional shutdown logic
-    # Example:
-    # await engine.dispose()
+    warmup.cancel()
+    if sealer is not None:
+        sealer.cancel()
+
+    # Flush queued audit-log entries before the process exits
+    await log_writer.stop()
+
+    # Stop DLP worker processes/threads and integrity verification threads
+    dlp_executor.shutdown()
+    integrity_verifier.shutdown()
+
+    # Close pooled database connections
+    await engine.dispose()
 
 
 # ------------------------------------------------
@@ -80,19 +137,39 @@ app.add_middleware(
 # to API clients while still being logged securely.
 app.add_exception_handler(Exception, secure_exception_handler)
 
+# DLP pool saturated or scan timed out → 503 + Retry-After (fail closed)
+app.add_exception_handler(DlpExecutorError, dlp_unavailable_handler)
+
 
 # ------------------------------------------------
-# Health Check Endpoint
+# Health Check Endpoints
 # ------------------------------------------------
-# Used by:
-# - monitoring systems
-# - container orchestration
-# - uptime checks
+# Liveness (/health, /health/live): the process is up and serving.
+# Used by monitoring systems, uptime checks and the k8s livenessProbe.
 @app.get("/health")
+@app.get("/health/live")
 async def health():
     return {"status": "OK", "service": "CyberOracle API"}
 
 
+# Readiness (/health/ready): DLP models are loaded, so the pod can take
+# traffic. Used by the k8s readinessProbe to keep cold pods out of the
+# Service during startup and HPA scale-out.
+@app.get("/health/ready")
+async def readiness():
+    if dlp_executor.ready:
+        return {"status": "ready", "service": "CyberOracle API"}
+
+    return JSONResponse(
+        status_code=503,
+        content={
+            "status": "failed" if dlp_executor.warmup_error else "loading",
+            "service": "CyberOracle API",
+            "error": dlp_executor.warmup_error,
+        },
+    )
+
+
 # ------------------------------------------------
 # Router Registration
 # ------------------------------------------------
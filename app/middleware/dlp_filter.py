@@ -9,75 +9,331 @@ main application or database layer.
 
 This version uses the central Presidio-based DLP engine plus custom patterns
 from app.middleware.dlp_presidio, and triggers a single alert per request.
+
+Every string field is analyzed exactly once. The resulting DlpScanResult
+objects are stored on request.state.dlp_scan_results (keyed by the text
+forwarded downstream; when several fields redact to the same text, the
+most severe scan is kept) so route handlers such as /ai/query can reuse
+them instead of running the analyzer again.
+
+The scan tier (full / tiered / pattern) is resolved per request path from
+dlp_rules.scan_tiers in policy.yaml.
+
+Pure ASGI (no BaseHTTPMiddleware task/queue per request):
+- Only bodies FastAPI would parse as JSON (application/json, */*+json, or
+  no Content-Type) are buffered; multipart uploads and other types stream
+  straight through untouched.
+- Bodies over DLP_MAX_BODY_BYTES are rejected with 413, before reading
+  when Content-Length is declared, otherwise as soon as the limit is hit.
+- Parsing uses orjson when installed. Anything it rejects that the stdlib
+  accepts (NaN, integers beyond 64 bits) is re-parsed with json, so such
+  bodies cannot slip past the scan.
+- Clean bodies are forwarded byte-for-byte. When something is redacted,
+  only the affected JSON string tokens are rewritten in the original
+  bytes; keys, formatting and all other values are left as they were.
+
+Environment variables
+---------------------
+DLP_MAX_BODY_BYTES — largest JSON body scanned (default 1 MiB)
 """
 
 import json
-from typing import Any, Set
+import os
+import re
+from typing import Any, Dict, List, Optional, Set, Tuple
 
-from starlette.middleware.base import BaseHTTPMiddleware
-from starlette.requests import Request
+from starlette.datastructures import Headers
+from starlette.responses import JSONResponse
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
 
-from app.middleware.dlp_presidio import presidio_scan
+try:
+    import orjson
+except ImportError:  # optional speed-up
+    orjson = None
+
+from app.services import dlp_engine
+from app.services.dlp_engine import DlpScanResult, ScanMode
+from app.services.dlp_executor import DlpExecutorError, dlp_executor
 from app.utils.alert_manager import send_alert
 
 
-def _sanitize_value(value: Any, detected_entities: Set[str]) -> Any:
-    """
-    Recursively sanitize a value:
-    - If it's a string, run presidio_scan(alert=False) and collect entities.
-    - If it's a dict or list, walk through and sanitize nested values.
-    - Otherwise, return as-is.
-    """
+def _collect_strings(value: Any, out: List[str]) -> None:
+    """Append every string leaf of a JSON value to `out`, depth-first."""
     if isinstance(value, str):
-        redacted_text, entities = presidio_scan(value, alert=False)
-        detected_entities.update(entities)
-        return redacted_text
+        out.append(value)
+    elif isinstance(value, dict):
+        for v in value.values():
+            _collect_strings(v, out)
+    elif isinstance(value, list):
+        for item in value:
+            _collect_strings(item, out)
+
+
+def _apply_scans(value: Any, scans: Dict[str, DlpScanResult]) -> Any:
+    """Rebuild a JSON value with each string leaf replaced by its redaction."""
+    if isinstance(value, str):
+        return scans[value].redacted_text
 
     if isinstance(value, dict):
-        return {k: _sanitize_value(v, detected_entities) for k, v in value.items()}
+        return {k: _apply_scans(v, scans) for k, v in value.items()}
 
     if isinstance(value, list):
-        return [_sanitize_value(item, detected_entities) for item in value]
+        return [_apply_scans(item, scans) for item in value]
 
     return value
 
 
-class DLPFilterMiddleware(BaseHTTPMiddleware):
+def _sanitize_value(
+    value: Any,
+    detected_entities: Set[str],
+    scan_results: Optional[Dict[str, DlpScanResult]] = None,
+    mode: Optional[ScanMode] = None,
+) -> Any:
+    """
+    Sanitize a value:
+    - Collect every string leaf (dicts and lists are walked recursively).
+    - Scan all distinct strings in one batched analyzer pass.
+    - Rebuild the value with redacted strings; other types pass through.
+
+    When `scan_results` is given, each string's scan is recorded under
+    its redacted text so it can be looked up again downstream. Texts
+    that redact to the same value keep the most severe scan.
+    `mode` selects the scan tier (None uses the policy default).
+    """
+    leaves: List[str] = []
+    _collect_strings(value, leaves)
+    unique = list(dict.fromkeys(leaves))
+
+    scans = dict(zip(unique, dlp_engine.analyze_many(unique, mode=mode)))
+    for scan in scans.values():
+        detected_entities.update(scan.entities)
+        if scan_results is not None:
+            key = scan.redacted_text
+            scan_results[key] = dlp_engine.more_severe(scan_results.get(key), scan)
+
+    return _apply_scans(value, scans)
+
+
+def _sanitize_body(
+    body: Any, mode: Optional[ScanMode] = None
+) -> Tuple[Any, Set[str], Dict[str, DlpScanResult]]:
+    """
+    Pure wrapper around _sanitize_value that returns everything it collects,
+    so the whole body walk can run inside the DLP executor (including in a
+    separate worker process, where argument mutation would be lost).
+    """
+    detected_entities: Set[str] = set()
+    scan_results: Dict[str, DlpScanResult] = {}
+    sanitized = _sanitize_value(body, detected_entities, scan_results, mode)
+    return sanitized, detected_entities, scan_results
+
+
+DLP_MAX_BODY_BYTES = int(os.getenv("DLP_MAX_BODY_BYTES", str(1024 * 1024)))
+
+_SCANNED_METHODS = {"POST", "PUT", "PATCH"}
+
+# A JSON string token. In a valid document every '"' outside a string
+# opens one, so scanning left to right visits each token exactly once.
+_STRING_TOKEN = re.compile(rb'"(?:[^"\\]|\\.)*"')
+_KEY_FOLLOWS = re.compile(rb"\s*:")
+
+
+def _parse_json(raw: bytes) -> Any:
+    """Parsed body, or None when it is empty or not JSON."""
+    if not raw:
+        return None
+    if orjson is not None:
+        try:
+            return orjson.loads(raw)
+        except orjson.JSONDecodeError:
+            pass
+    try:
+        return json.loads(raw)
+    except ValueError:
+        return None
+
+
+class _BodyTooLarge(Exception):
+    pass
+
+
+def _is_json(content_type: Optional[str]) -> bool:
+    """Same rule FastAPI uses to decide whether to parse a body as JSON."""
+    if not content_type:
+        return True
+    media = content_type.split(";", 1)[0].strip().lower()
+    return media == "application/json" or (
+        media.startswith("application/") and media.endswith("+json")
+    )
+
+
+def _changed_strings(original: Any, sanitized: Any, out: Dict[str, str]) -> None:
+    """Map each string leaf that redaction changed to its replacement."""
+    if isinstance(original, str):
+        if original != sanitized:
+            out[original] = sanitized
+    elif isinstance(original, dict):
+        for key, value in original.items():
+            _changed_strings(value, sanitized[key], out)
+    elif isinstance(original, list):
+        for value, new in zip(original, sanitized):
+            _changed_strings(value, new, out)
+
+
+def _rewrite_strings(raw: bytes, replacements: Dict[str, str]) -> bytes:
+    """
+    Replace string values (never object keys) found in `replacements`
+    inside the original JSON bytes, leaving everything else untouched.
+    """
+    parts: List[bytes] = []
+    last = 0
+    for match in _STRING_TOKEN.finditer(raw):
+        if _KEY_FOLLOWS.match(raw, match.end()):
+            continue
+        value = json.loads(match.group())
+        if value in replacements:
+            parts.append(raw[last : match.start()])
+            parts.append(json.dumps(replacements[value]).encode("utf-8"))
+            last = match.end()
+    if not parts:
+        return raw
+    parts.append(raw[last:])
+    return b"".join(parts)
+
+
+def _replay(body: bytes, extra: List[Message], receive: Receive) -> Receive:
+    """receive() that yields the buffered body once, then defers to the client."""
+    pending: List[Message] = [
+        {"type": "http.request", "body": body, "more_body": False}
+    ] + extra
+
+    async def replay() -> Message:
+        if pending:
+            return pending.pop(0)
+        return await receive()
+
+    return replay
+
+
+def _set_state(
+    scope: Scope,
+    detected_entities: Set[str],
+    scan_results: Dict[str, DlpScanResult],
+) -> None:
+    """DLP metadata for route handlers (request.state is scope["state"])."""
+    state = scope.setdefault("state", {})
+    state["dlp_scan_results"] = scan_results
+    state["dlp_detected"] = bool(detected_entities)
+    state["dlp_entities"] = list(detected_entities) if detected_entities else []
+    state["dlp_redacted"] = bool(detected_entities)
+    state["dlp_policy_decision"] = "redact" if detected_entities else "allow"
+    state["dlp_risk_score"] = 0.8 if detected_entities else 0.0
+    state["dlp_severity"] = "high" if detected_entities else "low"
+
+
+class DLPFilterMiddleware:
     """
     Custom FastAPI middleware that scans and redacts sensitive data from
     incoming request bodies before they are processed by router handlers.
     """
 
-    async def dispatch(self, request: Request, call_next):
+    def __init__(self, app: ASGIApp, max_body_bytes: Optional[int] = None):
+        self.app = app
+        self.max_body_bytes = (
+            DLP_MAX_BODY_BYTES if max_body_bytes is None else max_body_bytes
+        )
+
+    async def _read_body(self, receive: Receive) -> Tuple[bytes, List[Message]]:
+        """Buffer the body up to the limit; also returns any non-body messages."""
+        chunks: List[bytes] = []
+        size = 0
+        extra: List[Message] = []
+        while True:
+            message = await receive()
+            if message["type"] != "http.request":
+                extra.append(message)  # e.g. http.disconnect
+                break
+            chunk = message.get("body", b"")
+            size += len(chunk)
+            if size > self.max_body_bytes:
+                raise _BodyTooLarge()
+            chunks.append(chunk)
+            if not message.get("more_body", False):
+                break
+        return b"".join(chunks), extra
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
         # ✅ IMPORTANT: allow CORS preflight to pass through untouched
-        if request.method == "OPTIONS":
-            return await call_next(request)
+        if scope["type"] != "http" or scope["method"] == "OPTIONS":
+            await self.app(scope, receive, send)
+            return
 
         detected_entities: Set[str] = set()
+        scan_results: Dict[str, DlpScanResult] = {}
 
-        # Target only data-carrying methods
-        if request.method in {"POST", "PUT", "PATCH"}:
-            try:
-                body = await request.json()
-            except Exception:
-                body = None
+        headers = Headers(scope=scope)
+        # Target only data-carrying methods with a JSON body
+        if scope["method"] not in _SCANNED_METHODS or not _is_json(
+            headers.get("content-type")
+        ):
+            _set_state(scope, detected_entities, scan_results)
+            await self.app(scope, receive, send)
+            return
 
-            if isinstance(body, dict):
-                sanitized_body = _sanitize_value(body, detected_entities)
+        declared = headers.get("content-length")
+        try:
+            if declared and declared.isdigit() and int(declared) > self.max_body_bytes:
+                raise _BodyTooLarge()
+            raw, extra = await self._read_body(receive)
+        except _BodyTooLarge:
+            response = JSONResponse(
+                status_code=413,
+                content={
+                    "detail": f"Request body exceeds {self.max_body_bytes} bytes."
+                },
+            )
+            await response(scope, receive, send)
+            return
 
-                # If anything was actually detected and redacted, replace request body
-                if detected_entities:
-                    request._body = json.dumps(sanitized_body).encode("utf-8")
+        body = _parse_json(raw)
 
-        # Store DLP metadata on request.state
-        request.state.dlp_detected = bool(detected_entities)
-        request.state.dlp_entities = (
-            list(detected_entities) if detected_entities else []
-        )
-        request.state.dlp_redacted = bool(detected_entities)
-        request.state.dlp_policy_decision = "redact" if detected_entities else "allow"
-        request.state.dlp_risk_score = 0.8 if detected_entities else 0.0
-        request.state.dlp_severity = "high" if detected_entities else "low"
+        if isinstance(body, dict):
+            try:
+                sanitized_body, detected_entities, scan_results = (
+                    await dlp_executor.run(
+                        _sanitize_body,
+                        body,
+                        dlp_engine.scan_mode_for(scope["path"]),
+                    )
+                )
+            except DlpExecutorError:
+                # Fail closed: never forward a body we could not scan
+                response = JSONResponse(
+                    status_code=503,
+                    content={"detail": "DLP scanner is busy. Please retry shortly."},
+                    headers={"Retry-After": "1"},
+                )
+                await response(scope, receive, send)
+                return
+
+            # If anything was actually detected and redacted, rewrite only
+            # the string values that changed
+            if detected_entities:
+                replacements: Dict[str, str] = {}
+                _changed_strings(body, sanitized_body, replacements)
+                rewritten = _rewrite_strings(raw, replacements)
+                # Fail safe (e.g. a non-UTF-8 encoding the token scan cannot
+                # see into): never forward bytes that differ from the
+                # sanitized body
+                if _parse_json(rewritten) != sanitized_body:
+                    rewritten = json.dumps(sanitized_body).encode("utf-8")
+                raw = rewritten
+                scope = dict(scope)
+                scope["headers"] = [
+                    (k, v) for k, v in scope["headers"] if k != b"content-length"
+                ] + [(b"content-length", str(len(raw)).encode("latin-1"))]
+
+        _set_state(scope, detected_entities, scan_results)
 
         # If any entities were detected anywhere in the request, send one alert
         if detected_entities:
@@ -91,5 +347,4 @@ class DLPFilterMiddleware(BaseHTTPMiddleware):
                 source="dlp_middleware",
             )
 
-        response = await call_next(request)
-        return response
+        await self.app(scope, _replay(raw, extra, receive), send)
@@ -3,16 +3,41 @@ CyberOracle DLP Module — Microsoft Presidio Integration
 --------------------------------------------------------
 Detects and redacts sensitive data (SSN, credit card, email, API key)
 and triggers real-time Discord alerts when found.
+
+The spaCy model, its enabled pipeline components and the entity set come
+from the active DLP engine profile (app.services.dlp_profiles).
+
+The analyzer loads a spaCy model, which takes seconds and hundreds of MB,
+so nothing is built at import time. load_engines() builds the engines
+(from the FastAPI lifespan or a DLP worker initializer) and the first
+get_analyzer() call builds them on demand if that has not happened yet.
 """
 
-from presidio_analyzer import AnalyzerEngine, PatternRecognizer, Pattern
+import hashlib
+import logging
+import os
+import threading
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+import spacy
+from presidio_analyzer import (
+    AnalyzerEngine,
+    BatchAnalyzerEngine,
+    PatternRecognizer,
+    Pattern,
+    RecognizerResult,
+)
+from presidio_analyzer.nlp_engine import NlpArtifacts, SpacyNlpEngine
 from presidio_anonymizer import AnonymizerEngine
+from app.services.dlp_cache import dlp_cache
+from app.services.dlp_profiles import DlpEngineProfile, resolve_profile
 from app.utils.alert_manager import send_alert
 
 # ---------------------------------------------------------------------
 # Target entity types for MVP phase (restricted scope)
 # ---------------------------------------------------------------------
-TARGET_ENTITIES = [
+ALL_ENTITIES = [
     "US_SOCIAL_SECURITY_NUMBER",
     "GENERIC_SSN",
     "CREDIT_CARD",
@@ -31,6 +56,23 @@ TARGET_ENTITIES = [
     "NRP",
 ]
 
+
+def profile_entities(profile: DlpEngineProfile) -> List[str]:
+    """Entity set analyzed under `profile`."""
+    if profile.entities:
+        return list(profile.entities)
+    return [e for e in ALL_ENTITIES if e not in profile.exclude]
+
+
+# Active engine profile (DLP_ENGINE_PROFILE / policy.yaml)
+ENGINE_PROFILE = resolve_profile()
+TARGET_ENTITIES = profile_entities(ENGINE_PROFILE)
+
+# Entities only the spaCy NER model produces. Everything else comes from
+# pattern / checksum recognizers that work on raw text and tokens.
+NER_ENTITIES = frozenset({"PERSON", "LOCATION", "NRP", "DATE_TIME"})
+PATTERN_ENTITIES = [e for e in TARGET_ENTITIES if e not in NER_ENTITIES]
+
 # ---------------------------------------------------------------------
 # Custom recognizers for higher accuracy
 # ---------------------------------------------------------------------
@@ -95,16 +137,289 @@ bank_recognizer = PatternRecognizer(
     context=["bank", "account", "routing", "acct", "payroll"],
 )
 
+CUSTOM_RECOGNIZERS = [
+    api_key_recognizer,
+    ssn_recognizer,
+    phone_recognizer,
+    ip_recognizer,
+    bank_recognizer,
+]
+
 # ---------------------------------------------------------------------
-# Initialize engines
+# Lazy engine initialization
 # ---------------------------------------------------------------------
-analyzer = AnalyzerEngine()
-analyzer.registry.add_recognizer(api_key_recognizer)
-analyzer.registry.add_recognizer(ssn_recognizer)
-analyzer.registry.add_recognizer(phone_recognizer)
-analyzer.registry.add_recognizer(ip_recognizer)
-analyzer.registry.add_recognizer(bank_recognizer)
-anonymizer = AnonymizerEngine()
+logger = logging.getLogger("cyberoracle")
+
+# Text used to page in model weights/vectors and regex caches
+WARMUP_TEXT = "John Smith from Denver called 555-123-4567 on Monday about his card."
+
+
+class ProfileSpacyNlpEngine(SpacyNlpEngine):
+    """
+    SpacyNlpEngine that loads the profile's model with the listed pipeline
+    components disabled. When the lemmatizer is off, lower-cased token
+    text stands in for lemmas so context-word scoring keeps working.
+
+    Loading is Presidio's own load() (model validation, GPU selection);
+    only the model name comes from the profile. A model that is not
+    installed raises OSError instead of being downloaded at runtime, so
+    warm-up fails and /health/ready reports it.
+    """
+
+    def __init__(self, profile: DlpEngineProfile):
+        super().__init__(models=[{"lang_code": "en", "model_name": profile.model}])
+        self.disable = list(profile.disable)
+
+    def load(self) -> None:
+        super().load()
+        for nlp in self.nlp.values():
+            for name in self.disable:
+                if name in nlp.pipe_names:
+                    nlp.disable_pipe(name)
+
+    @staticmethod
+    def _download_spacy_model_if_needed(model_name: str) -> None:
+        if not (spacy.util.is_package(model_name) or Path(model_name).exists()):
+            raise OSError(
+                f"spaCy model '{model_name}' is not installed; "
+                f"install it with: python -m spacy download {model_name}"
+            )
+
+    def _doc_to_nlp_artifact(self, doc, language: str) -> NlpArtifacts:
+        artifacts = super()._doc_to_nlp_artifact(doc, language)
+        if "lemmatizer" in self.disable:
+            artifacts.lemmas = [token.lemma_ or token.lower_ for token in doc]
+        return artifacts
+
+
+def build_analyzer(profile: DlpEngineProfile) -> AnalyzerEngine:
+    """AnalyzerEngine for `profile`, with the custom recognizers registered."""
+    analyzer = AnalyzerEngine(nlp_engine=ProfileSpacyNlpEngine(profile))
+    for recognizer in CUSTOM_RECOGNIZERS:
+        analyzer.registry.add_recognizer(recognizer)
+    return analyzer
+
+
+_engines: Dict[str, Any] = {}
+_engine_lock = threading.Lock()
+_warmed = False
+
+
+def load_engines(warm_up: bool = False) -> None:
+    """
+    Build the analyzer, anonymizer and batch analyzer once per process.
+    With warm_up=True, also run one throwaway analysis so the first real
+    request does not pay for lazy model/vector loading.
+    Safe to call from several threads; later calls are no-ops.
+    """
+    global _warmed
+
+    with _engine_lock:
+        if not _engines:
+            analyzer = build_analyzer(ENGINE_PROFILE)
+            _engines["analyzer"] = analyzer
+            _engines["anonymizer"] = AnonymizerEngine()
+            # Batch front-end: runs spaCy's nlp.pipe over many texts in one pass
+            _engines["batch_analyzer"] = BatchAnalyzerEngine(analyzer_engine=analyzer)
+            logger.info(
+                f"Presidio engines loaded (profile={ENGINE_PROFILE.name}, "
+                f"model={ENGINE_PROFILE.model})"
+            )
+
+        if warm_up and not _warmed:
+            results = _engines["analyzer"].analyze(
+                text=WARMUP_TEXT, entities=TARGET_ENTITIES, language="en"
+            )
+            _engines["anonymizer"].anonymize(text=WARMUP_TEXT, analyzer_results=results)
+            _warmed = True
+            logger.info("Presidio engines warmed up")
+
+
+def engines_loaded() -> bool:
+    return bool(_engines)
+
+
+def get_analyzer() -> AnalyzerEngine:
+    if not _engines:
+        load_engines()
+    return _engines["analyzer"]
+
+
+def get_anonymizer() -> AnonymizerEngine:
+    if not _engines:
+        load_engines()
+    return _engines["anonymizer"]
+
+
+def get_batch_analyzer() -> BatchAnalyzerEngine:
+    if not _engines:
+        load_engines()
+    return _engines["batch_analyzer"]
+
+
+def __getattr__(name: str) -> Any:
+    # Keep `from app.middleware.dlp_presidio import analyzer` working
+    # without building the engines at import time.
+    getters = {
+        "analyzer": get_analyzer,
+        "anonymizer": get_anonymizer,
+        "batch_analyzer": get_batch_analyzer,
+    }
+    if name in getters:
+        return getters[name]()
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+
+SCORE_THRESHOLD = 0.3
+
+# Texts per nlp.pipe batch
+BATCH_SIZE = int(os.getenv("DLP_BATCH_SIZE", "32"))
+
+
+def _recognizer_version() -> str:
+    """
+    Fingerprint of the active profile (model, disabled components, entity
+    set), custom patterns and threshold.
+    Cached results are bound to it, so changing recognizers invalidates them.
+    """
+    parts = [
+        ENGINE_PROFILE.model,
+        ",".join(ENGINE_PROFILE.disable),
+        ",".join(TARGET_ENTITIES),
+        str(SCORE_THRESHOLD),
+    ]
+    for recognizer in CUSTOM_RECOGNIZERS:
+        parts.extend(p.regex for p in recognizer.patterns)
+    return hashlib.sha256("|".join(parts).encode("utf-8")).hexdigest()[:16]
+
+
+RECOGNIZER_VERSION = _recognizer_version()
+# Pattern-tier results differ from full results, so they are cached apart
+PATTERN_VERSION = RECOGNIZER_VERSION + ":pattern"
+
+
+def _cached_results(
+    text: str, version: str = RECOGNIZER_VERSION
+) -> Optional[List[RecognizerResult]]:
+    cached = dlp_cache.get(text, version)
+    if cached is None:
+        return None
+    return [
+        RecognizerResult(entity_type=etype, start=start, end=end, score=score)
+        for etype, start, end, score in cached
+    ]
+
+
+def _store_results(
+    text: str, results: List[RecognizerResult], version: str = RECOGNIZER_VERSION
+) -> None:
+    dlp_cache.put(
+        text,
+        version,
+        tuple((r.entity_type, r.start, r.end, r.score) for r in results),
+    )
+
+
+def analyze_text(text: str) -> List[RecognizerResult]:
+    """
+    Run the analyzer over `text`, consulting the DLP result cache first.
+    Only digests and spans are cached — never the text itself.
+    """
+    cached = _cached_results(text)
+    if cached is not None:
+        return cached
+
+    results = get_analyzer().analyze(
+        text=text,
+        entities=TARGET_ENTITIES,
+        language="en",
+        score_threshold=SCORE_THRESHOLD,
+    )
+    _store_results(text, results)
+    return results
+
+
+def _tokenizer_artifacts(text: str) -> Optional[NlpArtifacts]:
+    """
+    NLP artifacts from the spaCy tokenizer alone (no tagger, parser or NER).
+    Pattern recognizers only need tokens and lemmas for context words;
+    lower-cased token text stands in for lemmas.
+    """
+    analyzer = get_analyzer()
+    models = getattr(analyzer.nlp_engine, "nlp", None)
+    model = models.get("en") if isinstance(models, dict) else None
+    if model is None:
+        return None
+
+    doc = model.make_doc(text)
+    return NlpArtifacts(
+        entities=[],
+        tokens=doc,
+        tokens_indices=[token.idx for token in doc],
+        lemmas=[token.lower_ for token in doc],
+        nlp_engine=analyzer.nlp_engine,
+        language="en",
+    )
+
+
+def analyze_patterns(text: str) -> List[RecognizerResult]:
+    """
+    Pattern-tier analysis: every non-NER recognizer, without running the
+    spaCy pipeline. Used when the DLP pre-screen finds nothing that the
+    NER entities (PERSON, LOCATION, NRP, DATE_TIME) could match.
+    """
+    if not text:
+        return []
+
+    cached = _cached_results(text, PATTERN_VERSION)
+    if cached is not None:
+        return cached
+
+    results = get_analyzer().analyze(
+        text=text,
+        entities=PATTERN_ENTITIES,
+        language="en",
+        score_threshold=SCORE_THRESHOLD,
+        nlp_artifacts=_tokenizer_artifacts(text),
+    )
+    _store_results(text, results, PATTERN_VERSION)
+    return results
+
+
+def analyze_texts(texts: List[str]) -> List[List[RecognizerResult]]:
+    """
+    Batch counterpart of analyze_text().
+
+    Cache hits and empty strings are answered directly; the remaining
+    distinct texts go through BatchAnalyzerEngine (spaCy nlp.pipe) in a
+    single pass. Results are returned in input order.
+    """
+    out: List[List[RecognizerResult]] = [[] for _ in texts]
+    pending: Dict[str, List[int]] = {}
+
+    for i, text in enumerate(texts):
+        if not text:
+            continue
+        cached = _cached_results(text)
+        if cached is not None:
+            out[i] = cached
+        else:
+            pending.setdefault(text, []).append(i)
+
+    if pending:
+        batch = get_batch_analyzer().analyze_iterator(
+            list(pending),
+            language="en",
+            batch_size=BATCH_SIZE,
+            entities=TARGET_ENTITIES,
+            score_threshold=SCORE_THRESHOLD,
+        )
+        for text, results in zip(pending, batch):
+            _store_results(text, results)
+            for i in pending[text]:
+                out[i] = list(results)
+
+    return out
 
 
 def presidio_scan(text: str, alert: bool = True):
@@ -114,9 +429,7 @@ def presidio_scan(text: str, alert: bool = True):
     Returns:
         anonymized_text (str), entities (List[str])
     """
-    results = analyzer.analyze(
-        text=text, entities=TARGET_ENTITIES, language="en", score_threshold=0.3
-    )
+    results = analyze_text(text)
 
     if results and alert:
         entity_types = sorted({r.entity_type for r in results})
@@ -126,5 +439,5 @@ def presidio_scan(text: str, alert: bool = True):
             source="presidio_dlp",
         )
 
-    anonymized = anonymizer.anonymize(text=text, analyzer_results=results)
+    anonymized = get_anonymizer().anonymize(text=text, analyzer_results=results)
     return anonymized.text, [r.entity_type for r in results]
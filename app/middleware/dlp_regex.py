@@ -16,9 +16,10 @@ OWASP API Security:
 - All patterns validated against real-world PII formats.
 """
 
-import re
 from typing import List, Dict, Tuple
 
+from app.utils.pattern_engine import build_engine
+
 # ---------------------------------------------------------------------------
 # Regex patterns — validated against real-world PII formats
 # ---------------------------------------------------------------------------
@@ -70,6 +71,9 @@ REGEX_PATTERNS: Dict[str, str] = {
     "aws_secret": r"(?i)aws[_-]?secret[_-]?(?:access[_-]?)?key[\s:=]+[A-Za-z0-9/+=]{40}",
 }
 
+# All patterns compiled once into a single-pass alternation
+REGEX_ENGINE = build_engine(REGEX_PATTERNS, placeholder="<{}>")
+
 
 def scan_text(text: str) -> Tuple[str, List[str]]:
     """
@@ -90,16 +94,8 @@ def scan_text(text: str) -> Tuple[str, List[str]]:
     if not text:
         return text, []
 
-    detected: List[str] = []
-    sanitized = text
-
-    for name, pattern in REGEX_PATTERNS.items():
-        matches = re.findall(pattern, sanitized)
-        if matches:
-            detected.append(name)
-            sanitized = re.sub(pattern, f"<{name.upper()}>", sanitized)
-
-    return sanitized, detected
+    result = REGEX_ENGINE.scan(text)
+    return result.redacted_text, result.detected
 
 
 # ---------------------------------------------------------------------------
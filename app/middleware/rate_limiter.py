@@ -1,24 +1,35 @@
 """
 Rate Limiting Middleware
 ------------------------
-Implements per-IP, per-role sliding window rate limiting.
+Implements per-IP, per-role rate limiting with a constant-memory GCRA
+bucket per client (app/services/rate_limit.py), kept in process memory
+or in a shared Redis store so limits hold across workers and replicas.
 
-Roles and limits are driven by policy.yaml:
+Roles and limits are driven by policy.yaml (rate_limiting section, read
+from the hot-reloaded compiled policy on every request)
 (OWASP API Security Top 10 – API4: Unrestricted Resource Consumption).
 Falls back to a conservative default for unauthenticated requests.
 
 Monitoring/health endpoints are exempt from rate limiting to prevent
-dashboard polling from consuming the user's request budget.
+dashboard polling from consuming the user's request budget. The middleware
+is raw ASGI, so an exempt request costs a set lookup on the scope and
+nothing else; the 429 body is serialized once per (limit, window).
+scripts/rate_limit_benchmark.py measures the per-request overhead.
 """
 
 import asyncio
+import functools
+import json
+import math
 import os
-import time
 
+import yaml
 from fastapi import Request
-from fastapi.responses import JSONResponse
-from jose import jwt, JWTError
-from starlette.middleware.base import BaseHTTPMiddleware
+from starlette.types import ASGIApp, Receive, Scope, Send
+
+from app.auth.auth_context import request_claims
+from app.auth.policy_loader import get_policy
+from app.services.rate_limit import rate_limit_store
 
 # ---------------------------------------------------------------------------
 # Endpoints exempt from rate limiting
@@ -27,6 +38,8 @@ from starlette.middleware.base import BaseHTTPMiddleware
 # ---------------------------------------------------------------------------
 EXEMPT_PATHS = {
     "/health",
+    "/health/live",
+    "/health/ready",
     "/auth/login",
     "/auth/me",
     "/api/metrics/summary",
@@ -40,7 +53,8 @@ EXEMPT_PATHS = {
     "/api/settings/overview",
 }
 
-# Role-based limits (requests per window) — mirrors policy.yaml
+# Role-based limits (requests per window), used only when policy.yaml
+# cannot be read; rate_limiting.requests_per_minute takes precedence
 ROLE_LIMITS: dict[str, int] = {
     "admin": 5,
     "developer": 5,
@@ -57,85 +71,123 @@ PROD_TIME_WINDOW = 60
 TEST_RATE_LIMIT = 5
 TEST_TIME_WINDOW = 60
 
-# In-memory store: key → list of request timestamps
-requests_log: dict[str, list[float]] = {}
-
-SECRET_KEY = os.getenv("JWT_SECRET_KEY", "dev_only_secret_change_in_prod")
-ALGORITHM = "HS256"
+# Bucket store: key → GCRA state (memory or Redis, see RATE_LIMIT_BACKEND).
+# Kept under its historical name; tests clear() it between cases.
+requests_log = rate_limit_store
 
 
 def _get_role_from_request(request: Request) -> str | None:
     """Extract role from JWT Bearer token if present. Returns None if absent or invalid."""
-    auth = request.headers.get("Authorization", "")
-    if not auth.startswith("Bearer "):
-        return None
-    token = auth.split(" ", 1)[1]
-    try:
-        payload = jwt.decode(token, SECRET_KEY, algorithms=[ALGORITHM])
-        return payload.get("role")
-    except JWTError:
-        return None
-
+    # Verified once per request; the RBAC dependencies reuse the result
+    claims = request_claims(request)
+    return claims.get("role") if claims else None
 
-class RateLimitMiddleware(BaseHTTPMiddleware):
-    async def dispatch(self, request: Request, call_next):
 
+def _limits_for(role: str | None) -> tuple[int | None, int]:
+    """(limit, window) for a role; limit None when policy disables limiting."""
+    try:
+        policy = get_policy()
+    except (OSError, yaml.YAMLError):
+        limit = ROLE_LIMITS.get(role, DEFAULT_LIMIT) if role else DEFAULT_LIMIT
+        return limit, PROD_TIME_WINDOW
+    if not policy.rate_limiting_enabled:
+        return None, PROD_TIME_WINDOW
+    limit = policy.rate_limits.get(role, DEFAULT_LIMIT) if role else DEFAULT_LIMIT
+    return limit, policy.rate_window or PROD_TIME_WINDOW
+
+
+@functools.lru_cache(maxsize=64)
+def _limited_body(rate_limit: int, time_window: int) -> bytes:
+    """Pre-serialized 429 body for one (limit, window) pair."""
+    return json.dumps(
+        {"detail": (f"Rate limit exceeded ({rate_limit} requests per {time_window}s)")}
+    ).encode("utf-8")
+
+
+async def _send_limited(
+    send: Send, rate_limit: int, time_window: int, retry_after: float
+) -> None:
+    body = _limited_body(rate_limit, time_window)
+    await send(
+        {
+            "type": "http.response.start",
+            "status": 429,
+            "headers": [
+                (b"content-type", b"application/json"),
+                (b"content-length", str(len(body)).encode("latin-1")),
+                (b"retry-after", str(max(1, math.ceil(retry_after))).encode("latin-1")),
+            ],
+        }
+    )
+    await send({"type": "http.response.body", "body": body})
+
+
+class RateLimitMiddleware:
+    """
+    Pure ASGI middleware: exempt paths and CORS preflight are passed
+    through on the raw scope, before a Request is built or any
+    per-request task or stream wrapping is set up.
+    """
+
+    def __init__(self, app: ASGIApp):
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
         # ------------------------------------------------------------------
         # Exempt dashboard polling and health check endpoints
         # ------------------------------------------------------------------
-        if request.url.path in EXEMPT_PATHS:
-            return await call_next(request)
+        if (
+            scope["type"] != "http"
+            or scope["path"] in EXEMPT_PATHS
+            or scope["method"] == "OPTIONS"
+        ):
+            await self.app(scope, receive, send)
+            return
 
         test_mode = os.getenv("PYTEST") == "1"
 
         # Allow tests to opt OUT of rate limiting entirely
         if test_mode and os.getenv("DISABLE_RATE_LIMIT_TEST") == "1":
-            return await call_next(request)
+            await self.app(scope, receive, send)
+            return
 
         # Resolve limits for this request
+        request = Request(scope)
+        role = _get_role_from_request(request)
         if test_mode:
             rate_limit = TEST_RATE_LIMIT
             time_window = TEST_TIME_WINDOW
         else:
-            role = _get_role_from_request(request)
-            rate_limit = ROLE_LIMITS.get(role, DEFAULT_LIMIT) if role else DEFAULT_LIMIT
-            time_window = PROD_TIME_WINDOW
+            rate_limit, time_window = _limits_for(role)
+            if rate_limit is None:
+                await self.app(scope, receive, send)
+                return
 
         # Build a tracking key: IP + role so roles don't share buckets
-        role_tag = _get_role_from_request(request) or "anon"
-        client_ip = request.client.host if request.client else "unknown"
+        role_tag = role or "anon"
+        client = scope.get("client")
+        client_ip = client[0] if client else "unknown"
         bucket_key = f"{client_ip}:{role_tag}"
 
-        now = time.time()
-        history = requests_log.setdefault(bucket_key, [])
-        history = [t for t in history if now - t < time_window]
+        result = await requests_log.hit(bucket_key, rate_limit, time_window)
 
-        if len(history) >= rate_limit:
+        if not result.allowed:
             from app.utils.logger import log_request
 
+            path = scope["path"]
             asyncio.create_task(
                 log_request(
-                    endpoint=request.url.path,
-                    method=request.method,
+                    endpoint=path,
+                    method=scope["method"],
                     status_code=429,
                     event_type="rate_limit_exceeded",
                     severity="medium",
                     risk_score=0.5,
                     source="rate_limiter",
-                    message=f"Rate limit exceeded for {bucket_key} on {request.url.path}",
+                    message=f"Rate limit exceeded for {bucket_key} on {path}",
                 )
             )
-            return JSONResponse(
-                status_code=429,
-                content={
-                    "detail": (
-                        f"Rate limit exceeded "
-                        f"({rate_limit} requests per {time_window}s)"
-                    )
-                },
-            )
-
-        history.append(now)
-        requests_log[bucket_key] = history
+            await _send_limited(send, rate_limit, time_window, result.retry_after)
+            return
 
-        return await call_next(request)
+        await self.app(scope, receive, send)
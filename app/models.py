@@ -1,4 +1,14 @@
-from sqlalchemy import Column, Integer, String, Text, DateTime, Float
+from sqlalchemy import (
+    Column,
+    DateTime,
+    Float,
+    Index,
+    Integer,
+    String,
+    Text,
+    UniqueConstraint,
+    text,
+)
 from datetime import datetime
 from app.db.db import Base
 
@@ -34,6 +44,33 @@ class User(Base):
 class LogEntry(Base):
     __tablename__ = "logs"  # Table name in PostgreSQL
 
+    # Query-shaped indexes (created by migrations/versions/0002_logs_indexes.py).
+    # Composite indexes put the equality column first and created_at second,
+    # so one index serves "col = X AND created_at >= since" as well as
+    # "col = X ORDER BY created_at DESC". Partial indexes cover the hot
+    # security filters; BRIN keeps wide created_at range scans cheap.
+    __table_args__ = (
+        # Keyset pagination of /logs/list (migrations/versions/0004_*)
+        Index("ix_logs_created_at_id", "created_at", "id"),
+        Index("ix_logs_created_at_brin", "created_at", postgresql_using="brin"),
+        Index("ix_logs_endpoint_created_at", "endpoint", "created_at"),
+        Index("ix_logs_source_created_at", "source", "created_at"),
+        Index("ix_logs_event_type_created_at", "event_type", "created_at"),
+        Index("ix_logs_severity_created_at", "severity", "created_at"),
+        Index("ix_logs_policy_decision_created_at", "policy_decision", "created_at"),
+        Index(
+            "ix_logs_high_risk_created_at",
+            "created_at",
+            postgresql_where=text("risk_score >= 0.7"),
+        ),
+        Index(
+            "ix_logs_auth_failures_created_at",
+            "created_at",
+            "source",
+            postgresql_where=text("status_code IN (401, 403)"),
+        ),
+    )
+
     # Unique ID for each log entry
     id = Column(Integer, primary_key=True, index=True)
 
@@ -49,18 +86,25 @@ class LogEntry(Base):
     # Optional message or request body (may be Fernet-encrypted if DB_ENCRYPTION_ENABLED=true)
     message = Column(Text, nullable=True)
 
-    # Timestamp when the log was created (UTC)
-    created_at = Column(DateTime, default=datetime.utcnow)
+    # Timestamp when the log was created (UTC). Partition key of `logs`
+    # (migrations/versions/0003_partition_logs.py), hence NOT NULL; the
+    # database primary key is (id, created_at), id alone stays unique.
+    created_at = Column(
+        DateTime,
+        nullable=False,
+        default=datetime.utcnow,
+        server_default=text("timezone('utc', now())"),
+    )
 
     # Structured event classification (e.g. "ai_query", "ai_query_blocked", "dlp_alert")
-    event_type = Column(String(50), nullable=True, index=True)
+    event_type = Column(String(50), nullable=True)
 
     frameworks = Column(String, nullable=True)
 
     decision = Column(String, nullable=True)
 
     # Coarse severity level derived from risk_score: "low", "medium", "high"
-    severity = Column(String(20), nullable=True, index=True)
+    severity = Column(String(20), nullable=True)
 
     # Continuous risk score in [0.0, 1.0] produced by the DLP engine
     risk_score = Column(Float, nullable=True)
@@ -69,9 +113,80 @@ class LogEntry(Base):
     source = Column(String(100), nullable=True)
 
     # DLP policy outcome: "allow", "redact", or "block"
-    policy_decision = Column(String(20), nullable=True, index=True)
+    policy_decision = Column(String(20), nullable=True)
 
     # SHA-256 hash of core log fields for tamper-evidence detection.
     # If any field is modified after storage, this hash will no longer match.
     # (OWASP-ASVS 9.5: Log integrity protection)
     integrity_hash = Column(String(64), nullable=True, index=False)
+
+    # Version of the encryption key `message` is encrypted with (e.g. "v2"),
+    # NULL for plaintext. Lets key rotation find rows still under a retired
+    # key (scripts/key_rotation.py).
+    key_id = Column(String(32), nullable=True)
+
+
+# Pre-aggregated log counters for dashboards and reports.
+# One row per (granularity, bucket, endpoint, event_type, policy_decision,
+# severity, source), incremented as log entries are written so dashboard
+# queries read a few hundred rollup rows instead of scanning `logs`.
+# Maintained by app/services/log_rollups.py.
+class LogRollup(Base):
+    __tablename__ = "log_rollups"
+    __table_args__ = (
+        UniqueConstraint(
+            "granularity",
+            "bucket_start",
+            "endpoint",
+            "event_type",
+            "policy_decision",
+            "severity",
+            "source",
+            name="uq_log_rollups_bucket_dims",
+        ),
+    )
+
+    id = Column(Integer, primary_key=True)
+
+    # "minute" or "hour"
+    granularity = Column(String(6), nullable=False)
+
+    # Start of the bucket (UTC, truncated to the minute or hour)
+    bucket_start = Column(DateTime, nullable=False, index=True)
+
+    # Dimensions copied from LogEntry. A missing value is stored as ""
+    # so the unique constraint (and upserts against it) treat it as a key.
+    endpoint = Column(String(100), nullable=False, default="")
+    event_type = Column(String(50), nullable=False, default="")
+    policy_decision = Column(String(20), nullable=False, default="")
+    severity = Column(String(20), nullable=False, default="")
+    source = Column(String(100), nullable=False, default="")
+
+    # Log entries in this bucket with these dimensions
+    count = Column(Integer, nullable=False, default=0)
+
+    # Of those, entries with risk_score >= 0.7
+    high_risk_count = Column(Integer, nullable=False, default=0)
+
+
+# Sealed Merkle root of one hour of log entries (hash-chained audit trail).
+# Each row commits to every entry in [bucket_start, bucket_start + 1h) and,
+# through chain_hash, to every earlier sealed hour, so deleted, inserted or
+# modified entries and removed hours are detectable without rehashing the
+# whole table. Maintained by app/services/log_merkle.py.
+class LogMerkleRoot(Base):
+    __tablename__ = "log_merkle_roots"
+
+    # Start of the sealed hour (UTC)
+    bucket_start = Column(DateTime, primary_key=True)
+
+    # Log entries in the hour when it was sealed
+    leaf_count = Column(Integer, nullable=False)
+
+    # Hex Merkle root over the hour's entries, ordered by (created_at, id)
+    root = Column(String(64), nullable=False)
+
+    # sha256(previous chain_hash | bucket_start | leaf_count | root)
+    chain_hash = Column(String(64), nullable=False)
+
+    sealed_at = Column(DateTime, nullable=False, default=datetime.utcnow)
@@ -10,6 +10,7 @@ from pydantic import BaseModel, Field
 
 from app.services import dlp_engine
 from app.services.dlp_engine import PolicyDecision
+from app.services.dlp_executor import dlp_executor
 from app.utils.logger import log_request, mask_sensitive
 
 # RBAC permission enforcement
@@ -166,8 +167,20 @@ async def ai_query(
     # ------------------------------------------------------------------
     # 2) INPUT DLP
     # ------------------------------------------------------------------
-    input_redacted_text, input_findings = dlp_engine.scan_text(req.prompt)
-    input_decision = dlp_engine.decide(input_findings)
+    # Reuse the DLP middleware's analysis of this prompt when available so
+    # the analyzer runs once per request instead of twice.
+    # Prompt and model output are scanned at this endpoint's tier.
+    scan_mode = dlp_engine.scan_mode_for(request.url.path)
+    input_scan = dlp_engine.get_request_scan(request, req.prompt)
+    if input_scan is not None:
+        input_redacted_text = input_scan.redacted_text
+        input_findings = input_scan.findings
+        input_decision = input_scan.decision
+    else:
+        input_redacted_text, input_findings = await dlp_executor.run(
+            dlp_engine.scan_text, req.prompt, scan_mode
+        )
+        input_decision = dlp_engine.decide(input_findings)
 
     input_rules = [f.type for f in input_findings]
     input_risk = input_decision.risk_score
@@ -273,7 +286,9 @@ async def ai_query(
     # ------------------------------------------------------------------
     # 4) OUTPUT DLP
     # ------------------------------------------------------------------
-    output_redacted_text, output_findings = dlp_engine.scan_text(raw_output)
+    output_redacted_text, output_findings = await dlp_executor.run(
+        dlp_engine.scan_text, raw_output, scan_mode
+    )
     output_decision = dlp_engine.decide(output_findings)
 
     output_rules = [f.type for f in output_findings]
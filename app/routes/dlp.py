@@ -12,6 +12,7 @@ from pydantic import BaseModel, field_validator
 from app.auth.rbac import require_roles
 from app.middleware.dlp_presidio import presidio_scan
 from app.services.compliance_engine import evaluate_compliance
+from app.services.dlp_executor import dlp_executor
 from app.utils.logger import log_request
 
 router = APIRouter()
@@ -48,7 +49,7 @@ async def scan_text(
     Auditors cannot trigger DLP scans.
     OWASP API1: Broken Object Level Authorization
     """
-    redacted, entities = presidio_scan(payload.text)
+    redacted, entities = await dlp_executor.run(presidio_scan, payload.text)
     compliance = evaluate_compliance(payload.text, entities)
 
     print(
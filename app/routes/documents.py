@@ -18,10 +18,11 @@ import re
 
 from fastapi import APIRouter, Depends, File, HTTPException, UploadFile
 from pydantic import BaseModel
-from typing import List
+from typing import Any, Dict, List, Optional, Tuple
 
 from app.auth.rbac import require_roles
-from app.middleware.dlp_regex import REGEX_PATTERNS, scan_text
+from app.middleware.dlp_regex import REGEX_ENGINE
+from app.services.dlp_executor import dlp_executor
 from app.utils.logger import log_request
 
 router = APIRouter(prefix="/api/documents", tags=["Documents"])
@@ -29,6 +30,11 @@ router = APIRouter(prefix="/api/documents", tags=["Documents"])
 ALLOWED_EXTENSIONS = {".pdf", ".docx"}
 MAX_FILE_SIZE_MB = 10
 
+# Documents longer than this are analyzed in overlapping windows
+# (spaCy's default max_length is 1,000,000 characters)
+DOC_SCAN_CHUNK_CHARS = int(os.getenv("DOC_SCAN_CHUNK_CHARS", "100000"))
+DOC_SCAN_CHUNK_OVERLAP = int(os.getenv("DOC_SCAN_CHUNK_OVERLAP", "200"))
+
 # Filename sanitization pattern — allow only safe characters
 # OWASP API3: Prevents path traversal via malicious filenames
 SAFE_FILENAME_PATTERN = re.compile(r"[^\w\s\-\.]")
@@ -83,26 +89,37 @@ def _extract_text_docx(content: bytes) -> str:
     return "\n".join(para.text for para in doc.paragraphs if para.text.strip())
 
 
-def _count_findings(text: str) -> List[RedactionFinding]:
+def _count_findings(
+    text: str,
+    nlp_results: Optional[List[Any]] = None,
+    regex_counts: Optional[Dict[str, int]] = None,
+) -> List[RedactionFinding]:
     """
     Count findings from both regex and Presidio (NLP) scanners.
     Regex catches SSN/credit card/email/API keys.
     Presidio catches PERSON, PHONE_NUMBER, and contextual entities.
+
+    `nlp_results` and `regex_counts` let the caller pass results it
+    already computed; otherwise both scanners are run over `text`.
     """
     from collections import Counter
-    from app.middleware.dlp_presidio import analyzer, TARGET_ENTITIES
 
     counts: Counter = Counter()
 
-    # Regex-based findings
-    for name, pattern in REGEX_PATTERNS.items():
-        matches = re.findall(pattern, text)
-        if matches:
-            counts[name.upper()] += len(matches)
+    # Regex-based findings (single pass over all patterns)
+    if regex_counts is None:
+        regex_counts = REGEX_ENGINE.counts(text)
+    for name, count in regex_counts.items():
+        counts[name.upper()] += count
 
     # Presidio NLP-based findings
-    results = analyzer.analyze(text=text, entities=TARGET_ENTITIES, language="en")
-    for r in results:
+    if nlp_results is None:
+        from app.middleware.dlp_presidio import TARGET_ENTITIES, get_analyzer
+
+        nlp_results = get_analyzer().analyze(
+            text=text, entities=TARGET_ENTITIES, language="en"
+        )
+    for r in nlp_results:
         entity = r.entity_type
         if entity not in counts:
             counts[entity] += 1
@@ -111,6 +128,85 @@ def _count_findings(text: str) -> List[RedactionFinding]:
     return sorted(findings, key=lambda f: f.count, reverse=True)
 
 
+def _scan_windows(text: str, max_chars: int, overlap: int) -> List[Tuple[int, int]]:
+    """
+    (start, end) windows covering `text` for the analyzer.
+
+    A text up to `max_chars` is one window (a single whole-document pass).
+    Longer texts are cut at paragraph breaks (else line breaks, else
+    spaces) into pieces of at most `max_chars`, and each window extends
+    `overlap` characters into its neighbours so an entity or a context
+    word sitting on a boundary is seen whole by at least one window.
+    """
+    if len(text) <= max_chars:
+        return [(0, len(text))]
+
+    windows: List[Tuple[int, int]] = []
+    start = 0
+    while start < len(text):
+        end = min(start + max_chars, len(text))
+        if end < len(text):
+            for sep in ("\n\n", "\n", " "):
+                cut = text.rfind(sep, start + 1, end)
+                if cut > start:
+                    end = cut
+                    break
+        windows.append((max(0, start - overlap), min(len(text), end + overlap)))
+        start = end
+    return windows
+
+
+def _scan_document(raw_text: str) -> Tuple[str, List[RedactionFinding]]:
+    """
+    DLP scan — regex first, then Presidio for advanced NLP entities.
+    Module-level so it can run inside the DLP executor's worker pool.
+
+    The regex-redacted text (for redaction) and the raw text (for finding
+    counts) go through one batched analyzer pass. Documents up to
+    DOC_SCAN_CHUNK_CHARS are analyzed whole, so entities and context
+    words that span line breaks are still detected. Longer documents are
+    split into overlapping windows (see _scan_windows) to stay under
+    spaCy's max_length. Window results are mapped back to document
+    offsets, de-duplicated, and anonymized in one pass over the full text.
+    """
+    from presidio_analyzer import RecognizerResult
+
+    from app.middleware.dlp_presidio import get_anonymizer
+    from app.services import dlp_engine
+
+    regex_scan = REGEX_ENGINE.scan(raw_text)
+    regex_redacted = regex_scan.redacted_text
+
+    texts = (regex_redacted, raw_text)
+    windows = [
+        _scan_windows(text, DOC_SCAN_CHUNK_CHARS, DOC_SCAN_CHUNK_OVERLAP)
+        for text in texts
+    ]
+    scans = dlp_engine.analyze_many(
+        [text[a:b] for text, spans in zip(texts, windows) for a, b in spans],
+        mode=dlp_engine.scan_mode_for("/api/documents/sanitize"),
+    )
+
+    merged: List[List[Any]] = []
+    pos = 0
+    for spans in windows:
+        seen: Dict[Tuple[str, int, int], Any] = {}
+        for (offset, _), scan in zip(spans, scans[pos : pos + len(spans)]):
+            for r in scan.analyzer_results:
+                key = (r.entity_type, r.start + offset, r.end + offset)
+                if key not in seen or r.score > seen[key].score:
+                    seen[key] = RecognizerResult(r.entity_type, *key[1:], r.score)
+        merged.append(list(seen.values()))
+        pos += len(spans)
+
+    redacted_text = (
+        get_anonymizer().anonymize(text=regex_redacted, analyzer_results=merged[0]).text
+        if merged[0]
+        else regex_redacted
+    )
+    return redacted_text, _count_findings(raw_text, merged[1], regex_scan.counts)
+
+
 @router.post("/sanitize", response_model=SanitizeResponse)
 async def sanitize_document(
     file: UploadFile = File(...),
@@ -179,12 +275,8 @@ async def sanitize_document(
             ),
         )
 
-    # DLP scan — regex first, then Presidio for advanced NLP entities
-    from app.middleware.dlp_presidio import presidio_scan
-
-    regex_redacted, _ = scan_text(raw_text)
-    redacted_text, _ = presidio_scan(regex_redacted, alert=False)
-    findings = _count_findings(raw_text)
+    # DLP scan runs in the executor so large documents don't block the loop
+    redacted_text, findings = await dlp_executor.run(_scan_document, raw_text)
     total_redactions = sum(f.count for f in findings)
 
     # Audit log
@@ -8,24 +8,109 @@ Security Notes (OWASP-ASVS 9.2):
 - Always mask values BEFORE storing or logging.
 - Query parameters validated against allowlists to prevent injection.
 - Integrity hashes verified on read to detect tampered entries.
+- Hash-chained hourly Merkle roots detect deleted or inserted entries.
 """
 
-from typing import Optional, Literal
+import asyncio
+import csv
+import io
+import json
+import os
+import zlib
+from typing import Any, AsyncIterator, List, Literal, Optional
 
-from fastapi import APIRouter, Depends, Query, Request
-from fastapi.responses import JSONResponse
-from sqlalchemy import select
+from fastapi import APIRouter, Depends, HTTPException, Query, Request
+from fastapi.responses import JSONResponse, StreamingResponse
+from sqlalchemy import Select, select, tuple_
 
 from app.db.db import AsyncSessionLocal
 from app.models import LogEntry
 from app.schemas.log_schema import LogIngest
-from app.utils.db_encryption import decrypt_value
-from app.utils.logger import compute_log_hash, log_request, mask_sensitive, secure_log
+from app.utils.alert_manager import send_alert
+from app.utils.date_range import date_range, parse_date
+from app.services.log_integrity import integrity_verifier
+from app.services.log_merkle import prove_entry, verify_range
+from app.utils.logger import log_request, mask_sensitive, secure_log
+from app.utils.pagination import decode_cursor, encode_cursor
 
 from app.auth.rbac import require_roles, require_permission
 
 router = APIRouter()
 
+# Deepest offset /logs/list accepts; use `cursor` to page further
+LOG_LIST_MAX_OFFSET = int(os.getenv("LOG_LIST_MAX_OFFSET", "1000"))
+
+# Rows fetched per server-side cursor round trip by /logs/export
+LOG_EXPORT_CHUNK_SIZE = int(os.getenv("LOG_EXPORT_CHUNK_SIZE", "500"))
+
+# Allowlist validation — only accepted values pass through
+# OWASP API3: Prevents injection via free-text query parameters
+SeverityFilter = Optional[Literal["low", "medium", "high"]]
+EventTypeFilter = Optional[
+    Literal[
+        "ai_query",
+        "ai_query_blocked",
+        "dlp_alert",
+        "document_sanitize",
+        "ai_query_model_error",
+    ]
+]
+DecisionFilter = Optional[Literal["allow", "redact", "block"]]
+
+EXPORT_FIELDS = (
+    "id",
+    "created_at",
+    "endpoint",
+    "method",
+    "status_code",
+    "event_type",
+    "severity",
+    "risk_score",
+    "source",
+    "policy_decision",
+    "message",
+    "integrity_verified",
+)
+EXPORT_MEDIA_TYPES = {"ndjson": "application/x-ndjson", "csv": "text/csv"}
+
+
+def _serialize_entry(e: Any, message: Optional[str], verified: Optional[bool]) -> dict:
+    """
+    API representation of a log entry (a LogEntry or a row of its
+    columns) with its decrypted message and integrity verdict from
+    app/services/log_integrity.py.
+    """
+    return {
+        "id": e.id,
+        "endpoint": e.endpoint,
+        "method": e.method,
+        "status_code": e.status_code,
+        "event_type": e.event_type,
+        "severity": e.severity,
+        "risk_score": e.risk_score,
+        "source": e.source,
+        "policy_decision": e.policy_decision,
+        "message": message,
+        "created_at": e.created_at.isoformat() + "Z" if e.created_at else None,
+        # None = pre-dates integrity hashing, True = verified, False = TAMPERED
+        "integrity_verified": verified,
+    }
+
+
+def _apply_filters(
+    query: Select,
+    severity: SeverityFilter,
+    event_type: EventTypeFilter,
+    policy_decision: DecisionFilter,
+) -> Select:
+    if severity:
+        query = query.where(LogEntry.severity == severity)
+    if event_type:
+        query = query.where(LogEntry.event_type == event_type)
+    if policy_decision:
+        query = query.where(LogEntry.policy_decision == policy_decision)
+    return query
+
 
 @router.get("/")
 async def get_logs(_: dict = Depends(require_permission("view_all_logs"))):
@@ -36,94 +121,305 @@ async def get_logs(_: dict = Depends(require_permission("view_all_logs"))):
 async def list_logs(
     _user: dict = Depends(require_permission("view_all_logs")),
     limit: int = Query(default=50, ge=1, le=200),
-    offset: int = Query(default=0, ge=0),
-    # Allowlist validation — only accepted values pass through
-    # OWASP API3: Prevents injection via free-text query parameters
-    severity: Optional[Literal["low", "medium", "high"]] = Query(default=None),
-    event_type: Optional[
-        Literal[
-            "ai_query",
-            "ai_query_blocked",
-            "dlp_alert",
-            "document_sanitize",
-            "ai_query_model_error",
-        ]
-    ] = Query(default=None),
-    policy_decision: Optional[Literal["allow", "redact", "block"]] = Query(
-        default=None
-    ),
+    cursor: Optional[str] = Query(default=None),
+    offset: int = Query(default=0, ge=0, le=LOG_LIST_MAX_OFFSET),
+    severity: SeverityFilter = Query(default=None),
+    event_type: EventTypeFilter = Query(default=None),
+    policy_decision: DecisionFilter = Query(default=None),
 ):
     """
     Paginated log retrieval for the Audit Log panel.
 
     - Decrypts message field at read time if encryption is active.
     - Verifies integrity_hash on each entry and flags tampered records.
+    - Keyset pagination: pass the previous response's `next_cursor` as
+      `cursor` to get the next page. Served by the (created_at, id) index,
+      so deep pages cost the same as the first one.
 
     Query params
     ------------
     limit          : records per page (1-200, default 50)
-    offset         : records to skip (for pagination)
+    cursor         : opaque position from `next_cursor` (null on the last page)
+    offset         : records to skip; legacy paging, capped at
+                     LOG_LIST_MAX_OFFSET and not combinable with `cursor`
     severity       : filter by "low" | "medium" | "high"
     event_type     : filter by allowed event type values only
     policy_decision: filter by "allow" | "redact" | "block"
     """
+    after = None
+    if cursor is not None:
+        if offset:
+            raise HTTPException(
+                status_code=400, detail="Use either cursor or offset, not both."
+            )
+        try:
+            after = decode_cursor(cursor)
+        except ValueError:
+            raise HTTPException(status_code=400, detail="Invalid cursor.")
+
     async with AsyncSessionLocal() as session:
-        query = select(LogEntry).order_by(LogEntry.created_at.desc())
+        # id breaks ties between entries written in the same microsecond
+        query = select(LogEntry).order_by(
+            LogEntry.created_at.desc(), LogEntry.id.desc()
+        )
+        if after is not None:
+            query = query.where(tuple_(LogEntry.created_at, LogEntry.id) < after)
 
-        if severity:
-            query = query.where(LogEntry.severity == severity)
-        if event_type:
-            query = query.where(LogEntry.event_type == event_type)
-        if policy_decision:
-            query = query.where(LogEntry.policy_decision == policy_decision)
+        query = _apply_filters(query, severity, event_type, policy_decision)
 
-        query = query.offset(offset).limit(limit)
+        if offset:
+            query = query.offset(offset)
+        # One extra row tells whether another page exists
+        query = query.limit(limit + 1)
         result = await session.execute(query)
         entries = result.scalars().all()
 
-    logs = []
-    for e in entries:
-        # Decrypt message at read time if encryption is active
-        decrypted_message = decrypt_value(e.message) if e.message else None
-
-        # Verify integrity hash to detect tampered entries (OWASP-ASVS 9.5)
-        tampered = False
-        if e.integrity_hash:
-            expected_hash = compute_log_hash(
-                endpoint=e.endpoint,
-                method=e.method,
-                status_code=e.status_code,
-                message=decrypted_message,
-                event_type=e.event_type,
-            )
-            tampered = expected_hash != e.integrity_hash
-
-        logs.append(
-            {
-                "id": e.id,
-                "endpoint": e.endpoint,
-                "method": e.method,
-                "status_code": e.status_code,
-                "event_type": e.event_type,
-                "severity": e.severity,
-                "risk_score": e.risk_score,
-                "source": e.source,
-                "policy_decision": e.policy_decision,
-                "message": decrypted_message,
-                "created_at": e.created_at.isoformat() + "Z" if e.created_at else None,
-                # None = pre-dates integrity hashing, True = verified, False = TAMPERED
-                "integrity_verified": (not tampered) if e.integrity_hash else None,
-            }
-        )
+    has_more = len(entries) > limit
+    entries = entries[:limit]
+    next_cursor = (
+        encode_cursor(entries[-1].created_at, entries[-1].id) if has_more else None
+    )
+
+    # Decrypt + verify integrity hashes (OWASP-ASVS 9.5) off the event loop
+    verdicts = await integrity_verifier.verify(entries)
+    logs = [_serialize_entry(e, *verdict) for e, verdict in zip(entries, verdicts)]
 
     return {
         "logs": logs,
         "count": len(logs),
         "offset": offset,
         "limit": limit,
+        "next_cursor": next_cursor,
     }
 
 
+async def _export_chunks(query: Select) -> AsyncIterator[List[dict]]:
+    """
+    Serialized rows of `query` in chunks of LOG_EXPORT_CHUNK_SIZE, read
+    through a server-side cursor so memory stays flat for any range.
+    Plain column rows (not ORM objects) keep the session's identity map
+    out of the way. The session holds one pooled connection until the
+    stream ends.
+    """
+    async with AsyncSessionLocal() as session:
+        result = await session.stream(
+            query.execution_options(yield_per=LOG_EXPORT_CHUNK_SIZE)
+        )
+        async for rows in result.partitions():
+            verdicts = await integrity_verifier.verify(rows)
+            yield [_serialize_entry(r, *v) for r, v in zip(rows, verdicts)]
+
+
+def _format_chunk(rows: List[dict], fmt: str) -> str:
+    if fmt == "ndjson":
+        return "".join(json.dumps(row, separators=(",", ":")) + "\n" for row in rows)
+    buffer = io.StringIO()
+    writer = csv.DictWriter(buffer, fieldnames=EXPORT_FIELDS, lineterminator="\n")
+    writer.writerows(rows)
+    return buffer.getvalue()
+
+
+async def _encode_export(
+    chunks: AsyncIterator[List[dict]], fmt: str, compress: bool
+) -> AsyncIterator[bytes]:
+    gz = zlib.compressobj(wbits=31) if compress else None  # 31 = gzip container
+
+    def encode(text: str) -> bytes:
+        data = text.encode()
+        return gz.compress(data) if gz else data
+
+    if fmt == "csv":
+        yield encode(",".join(EXPORT_FIELDS) + "\n")
+    async for rows in chunks:
+        data = encode(_format_chunk(rows, fmt))
+        if data:
+            yield data
+    if gz:
+        yield gz.flush()
+
+
+@router.get("/export")
+async def export_logs(
+    user: dict = Depends(require_permission("view_all_logs")),
+    start_date: Optional[str] = Query(
+        default=None,
+        description="ISO date string (YYYY-MM-DD). Defaults to 7 days ago.",
+        max_length=10,
+    ),
+    end_date: Optional[str] = Query(
+        default=None,
+        description="ISO date string (YYYY-MM-DD). Defaults to today.",
+        max_length=10,
+    ),
+    format: Literal["ndjson", "csv"] = Query(default="ndjson"),
+    gzip: bool = Query(default=False),
+    severity: SeverityFilter = Query(default=None),
+    event_type: EventTypeFilter = Query(default=None),
+    policy_decision: DecisionFilter = Query(default=None),
+):
+    """
+    Stream every log entry in a date range as NDJSON or CSV, oldest first.
+
+    Same date semantics as /api/reports/summary (end_date includes its
+    whole day) and the same filters as /logs/list. Rows are fetched,
+    decrypted and integrity-checked in chunks and written to the response
+    as they are produced, so memory use does not depend on the range
+    size. `gzip=true` returns a .gz file.
+
+    Bulk export is itself recorded in the application log (OWASP-ASVS 7.1).
+    """
+    since, until = date_range(start_date, end_date)
+
+    columns = [column.label(column.name) for column in LogEntry.__table__.columns]
+    query = (
+        select(*columns)
+        .where(LogEntry.created_at >= since, LogEntry.created_at <= until)
+        .order_by(LogEntry.created_at, LogEntry.id)
+    )
+    query = _apply_filters(query, severity, event_type, policy_decision)
+
+    secure_log(
+        f"Audit log export by {user.get('sub')}: {since:%Y-%m-%d} to "
+        f"{until:%Y-%m-%d}, format={format}"
+    )
+
+    filename = f"cyberoracle-logs-{since:%Y%m%d}-{until:%Y%m%d}.{format}"
+    media_type = EXPORT_MEDIA_TYPES[format]
+    if gzip:
+        filename += ".gz"
+        media_type = "application/gzip"
+
+    return StreamingResponse(
+        _encode_export(_export_chunks(query), format, gzip),
+        media_type=media_type,
+        headers={"Content-Disposition": f'attachment; filename="{filename}"'},
+    )
+
+
+async def _verify_stream(since, until) -> AsyncIterator[bytes]:
+    async with AsyncSessionLocal() as session:
+        async for event in integrity_verifier.verify_all(session, since, until):
+            yield (json.dumps(event, separators=(",", ":")) + "\n").encode()
+
+    summary = integrity_verifier.last_run
+    if summary and summary["tampered"]:
+        await asyncio.to_thread(
+            send_alert,
+            message=(
+                f"Log integrity audit found {summary['tampered']} tampered "
+                f"entries out of {summary['checked']} checked."
+            ),
+            severity="critical",
+            source="log_integrity",
+        )
+
+
+@router.get("/verify")
+async def verify_logs(
+    user: dict = Depends(require_roles("admin", "auditor")),
+    start_date: Optional[str] = Query(
+        default=None,
+        description="ISO date string (YYYY-MM-DD). Omit to start at the oldest entry.",
+        max_length=10,
+    ),
+    end_date: Optional[str] = Query(
+        default=None,
+        description="ISO date string (YYYY-MM-DD). Omit to include the newest entry.",
+        max_length=10,
+    ),
+):
+    """
+    Full-table integrity audit (OWASP-ASVS 9.5): re-verifies every entry's
+    integrity_hash in the date range (the whole table by default) and
+    streams NDJSON progress — one "progress" line per chunk with the IDs
+    found tampered in it, then a "summary" line with the totals and every
+    tampered ID. Tampering raises a critical alert.
+    """
+    since = parse_date(start_date, None)
+    until = parse_date(end_date, None)
+    if until is not None:
+        # Include the full end day
+        until = until.replace(hour=23, minute=59, second=59)
+
+    secure_log(
+        f"Log integrity audit by {user.get('sub')}: "
+        f"{start_date or 'start'} to {end_date or 'now'}"
+    )
+    return StreamingResponse(
+        _verify_stream(since, until), media_type=EXPORT_MEDIA_TYPES["ndjson"]
+    )
+
+
+@router.get("/merkle/verify")
+async def verify_merkle(
+    user: dict = Depends(require_roles("admin", "auditor")),
+    start_date: Optional[str] = Query(
+        default=None,
+        description="ISO date string (YYYY-MM-DD). Omit to start at the first sealed hour.",
+        max_length=10,
+    ),
+    end_date: Optional[str] = Query(
+        default=None,
+        description="ISO date string (YYYY-MM-DD). Omit to include the last sealed hour.",
+        max_length=10,
+    ),
+    deep: bool = Query(
+        default=False, description="Also recompute each hour's root from its rows"
+    ),
+):
+    """
+    Range integrity check against the hash-chained hourly Merkle roots
+    (OWASP-ASVS 9.5). Fast mode checks the chain and per-hour entry counts,
+    detecting removed roots and deleted or inserted entries without hashing
+    any rows; deep=true also rehashes the rows to detect modified entries.
+    Any problem raises a critical alert.
+    """
+    since = parse_date(start_date, None)
+    until = parse_date(end_date, None)
+    if until is not None:
+        until = until.replace(hour=23, minute=59, second=59)
+
+    secure_log(
+        f"Log Merkle verification by {user.get('sub')}: "
+        f"{start_date or 'start'} to {end_date or 'now'} (deep={deep})"
+    )
+    async with AsyncSessionLocal() as session:
+        result = await verify_range(session, since, until, deep=deep)
+
+    if not result["intact"]:
+        await asyncio.to_thread(
+            send_alert,
+            message=(
+                f"Log Merkle verification found {len(result['problems'])} "
+                f"problem(s) across {result['buckets']} sealed hours."
+            ),
+            severity="critical",
+            source="log_integrity",
+        )
+    return result
+
+
+@router.get("/merkle/proof/{entry_id}")
+async def merkle_proof(
+    entry_id: int,
+    _user: dict = Depends(require_roles("admin", "auditor")),
+):
+    """
+    Inclusion proof for one entry: its leaf hash, the sibling path to its
+    hour's Merkle root and the chain link, verifiable offline with
+    app.services.log_merkle.verify_inclusion().
+    """
+    async with AsyncSessionLocal() as session:
+        proof = await prove_entry(session, entry_id)
+    if proof is None:
+        raise HTTPException(status_code=404, detail="Log entry not found")
+    if not proof["sealed"]:
+        raise HTTPException(
+            status_code=409, detail="The entry's hour has not been sealed yet"
+        )
+    return proof
+
+
 @router.post("/")
 async def create_log(
     request: Request,
@@ -2,15 +2,32 @@
 
 import os
 
-from fastapi import APIRouter, Depends, Query
-from sqlalchemy import select, func, and_
+from typing import Optional
+
+from fastapi import APIRouter, Depends, HTTPException, Query
+from sqlalchemy import and_, select
 from datetime import datetime, timedelta
 
 from app.auth.rbac import require_roles
-from app.auth.policy_loader import load_policy
-from app.db.db import AsyncSessionLocal
-from app.models import LogEntry
-from app.utils.db_encryption import is_encryption_enabled, get_key_id, decrypt_value
+from app.auth.policy_loader import get_policy
+from app.db.db import AsyncSessionLocal, engine
+from app.db.pool import pool_stats
+from app.db.stats import ConditionalCounts
+from app.models import LogEntry, LogRollup
+from app.services import dlp_engine
+from app.services.dlp_cache import dlp_cache, merge_stats as merge_cache_stats
+from app.services.dlp_executor import dlp_executor
+from app.services.log_integrity import integrity_verifier
+from app.services.log_rollups import rollup_window, truncate
+from app.services.log_writer import log_writer
+from app.services.rate_limit import rate_limit_store
+from app.utils.db_encryption import (
+    decrypt_cache_info,
+    decrypt_value,
+    get_key_id,
+    is_encryption_enabled,
+    previous_key_ids,
+)
 
 router = APIRouter(prefix="/api", tags=["metrics"])
 
@@ -20,52 +37,33 @@ async def get_metrics_summary(
     _user: dict = Depends(require_roles("admin", "developer", "auditor")),
 ):
     """
-    Real-time dashboard metrics sourced from the logs table.
+    Real-time dashboard metrics sourced from the log rollups.
     Counts are scoped to the past 24 hours.
     """
     since = datetime.utcnow() - timedelta(hours=24)
 
-    async with AsyncSessionLocal() as session:
-        # Total requests in the past 24h — Secure Chat + Document Sanitizer
-        r_total = await session.execute(
-            select(func.count()).where(
-                and_(
-                    LogEntry.endpoint.in_(["/ai/query", "/api/documents/sanitize"]),
-                    LogEntry.created_at >= since,
-                )
-            )
+    query = (
+        ConditionalCounts(LogRollup, rollup_window(since), measure=LogRollup.count)
+        # Total requests — Secure Chat + Document Sanitizer
+        .count(
+            "total_prompts",
+            LogRollup.endpoint.in_(["/ai/query", "/api/documents/sanitize"]),
         )
-        total_prompts = r_total.scalar() or 0
-
         # DLP blocked — policy_decision='block' from any source
-        r_blocked = await session.execute(
-            select(func.count()).where(
-                and_(
-                    LogEntry.policy_decision == "block",
-                    LogEntry.created_at >= since,
-                )
-            )
-        )
-        blocked = r_blocked.scalar() or 0
-
+        .count("blocked", LogRollup.policy_decision == "block")
         # Redacted outputs
-        r_redacted = await session.execute(
-            select(func.count()).where(
-                and_(
-                    LogEntry.policy_decision == "redact",
-                    LogEntry.created_at >= since,
-                )
-            )
-        )
-        redacted = r_redacted.scalar() or 0
-
+        .count("redacted", LogRollup.policy_decision == "redact")
         # High-risk events (risk_score >= 0.7)
-        r_high = await session.execute(
-            select(func.count()).where(
-                and_(LogEntry.risk_score >= 0.7, LogEntry.created_at >= since)
-            )
-        )
-        high_risk = r_high.scalar() or 0
+        .count("high_risk", measure=LogRollup.high_risk_count)
+    )
+
+    async with AsyncSessionLocal() as session:
+        counts = await query.fetch(session)
+
+    total_prompts = counts["total_prompts"]
+    blocked = counts["blocked"]
+    redacted = counts["redacted"]
+    high_risk = counts["high_risk"]
 
     return {
         "total_prompts_24h": total_prompts,
@@ -76,12 +74,184 @@ async def get_metrics_summary(
     }
 
 
+# Longest window served at minute granularity (360 buckets)
+TIMELINE_MAX_MINUTE_HOURS = 6
+
+
+@router.get("/metrics/timeline")
+async def get_metrics_timeline(
+    window_hours: int = Query(
+        default=24, ge=1, le=168, description="Timeline window in hours (1–168)"
+    ),
+    granularity: Optional[str] = Query(
+        default=None,
+        pattern="^(minute|hour)$",
+        description="Bucket size; defaults to minute for windows up to 6 hours",
+    ),
+    _user: dict = Depends(require_roles("admin", "developer", "auditor")),
+):
+    """
+    Request, block, redact and high-risk counts per time bucket, read from
+    the log rollups. Buckets without activity are returned as zeros so the
+    dashboard can chart the series directly.
+    """
+    if granularity is None:
+        granularity = "minute" if window_hours <= TIMELINE_MAX_MINUTE_HOURS else "hour"
+    elif granularity == "minute" and window_hours > TIMELINE_MAX_MINUTE_HOURS:
+        raise HTTPException(
+            status_code=422,
+            detail=(
+                "Minute granularity is limited to "
+                f"{TIMELINE_MAX_MINUTE_HOURS} hour windows"
+            ),
+        )
+
+    now = datetime.utcnow()
+    step = timedelta(minutes=1) if granularity == "minute" else timedelta(hours=1)
+    first = truncate(now - timedelta(hours=window_hours), granularity) + step
+    last = truncate(now, granularity)
+
+    stmt = (
+        ConditionalCounts(
+            LogRollup,
+            and_(
+                LogRollup.granularity == granularity,
+                LogRollup.bucket_start >= first,
+            ),
+            measure=LogRollup.count,
+        )
+        .count("total")
+        .count("blocked", LogRollup.policy_decision == "block")
+        .count("redacted", LogRollup.policy_decision == "redact")
+        .count("high_risk", measure=LogRollup.high_risk_count)
+        .statement()
+        .add_columns(LogRollup.bucket_start)
+        .group_by(LogRollup.bucket_start)
+    )
+
+    async with AsyncSessionLocal() as session:
+        result = await session.execute(stmt)
+        rows = {row["bucket_start"]: row for row in result.mappings().all()}
+
+    buckets = []
+    bucket = first
+    while bucket <= last:
+        row = rows.get(bucket, {})
+        buckets.append(
+            {
+                "bucket": bucket.isoformat() + "Z",
+                "total": int(row.get("total", 0)),
+                "blocked": int(row.get("blocked", 0)),
+                "redacted": int(row.get("redacted", 0)),
+                "high_risk": int(row.get("high_risk", 0)),
+            }
+        )
+        bucket += step
+
+    return {
+        "window_hours": window_hours,
+        "granularity": granularity,
+        "buckets": buckets,
+    }
+
+
+@router.get("/metrics/dlp-cache")
+async def get_dlp_cache_metrics(
+    _user: dict = Depends(require_roles("admin", "developer", "auditor")),
+):
+    """
+    Hit / miss / eviction counters for the DLP result cache.
+
+    With the process executor each DLP worker has its own cache, so the
+    counters are summed over this process and every worker that has run
+    a job ("scope": "workers"); otherwise they are this process's own.
+    Counts reset when a worker restarts.
+    """
+    workers = dlp_executor.worker_stats("dlp_cache")
+    if workers is None:
+        return {**dlp_cache.stats(), "scope": "process"}
+    return {**merge_cache_stats([dlp_cache.stats(), *workers]), "scope": "workers"}
+
+
+@router.get("/metrics/dlp-executor")
+async def get_dlp_executor_metrics(
+    _user: dict = Depends(require_roles("admin", "developer", "auditor")),
+):
+    """
+    DLP worker pool saturation: in-flight jobs, capacity, completed and
+    failed jobs, rejections (HTTP 503 backpressure) and per-job timeouts
+    for this worker process.
+    """
+    return dlp_executor.stats()
+
+
+@router.get("/metrics/log-writer")
+async def get_log_writer_metrics(
+    _user: dict = Depends(require_roles("admin", "developer", "auditor")),
+):
+    """
+    Audit-log writer health: queue depth and high-watermark, rows written
+    per batch, flush latency, and entries dropped or written inline because
+    the queue was full.
+    """
+    return log_writer.stats()
+
+
+@router.get("/metrics/db-pool")
+async def get_db_pool_metrics(
+    _user: dict = Depends(require_roles("admin", "developer", "auditor")),
+):
+    """
+    Database connection pool occupancy (checked out / overflow / saturation)
+    and checkout wait time for this worker process.
+    """
+    return pool_stats(engine.pool)
+
+
+@router.get("/metrics/rate-limit")
+async def get_rate_limit_metrics(
+    _user: dict = Depends(require_roles("admin", "developer", "auditor")),
+):
+    """
+    Rate limit store: backend in use, tracked client buckets and evictions
+    (in-process store), and Redis errors that fell back to per-replica
+    limits.
+    """
+    return rate_limit_store.stats()
+
+
+@router.get("/metrics/dlp-tiers")
+async def get_dlp_tier_metrics(
+    _user: dict = Depends(require_roles("admin", "developer", "auditor")),
+):
+    """
+    Tiered DLP scanning: how often the pre-screen let text skip spaCy NER,
+    and run / hit counts for the pattern and NER tiers.
+
+    With the process executor the scans run in the DLP workers, so the
+    counters are summed over this process and every worker that has run
+    a job ("scope": "workers"); otherwise they are this process's own.
+    """
+    workers = dlp_executor.worker_stats("dlp_tiers")
+    if workers is None:
+        return {**dlp_engine.tier_stats(), "scope": "process"}
+    return {
+        **dlp_engine.merge_tier_stats([dlp_engine.tier_stats(), *workers]),
+        "scope": "workers",
+    }
+
+
 @router.get("/compliance/status")
 async def get_compliance_status(
     _user: dict = Depends(require_roles("admin", "developer", "auditor")),
 ):
     """
-    Compliance scores computed from real activity in the logs table.
+    Compliance scores computed from real activity, read from the hourly
+    log rollups.
+
+    The counts are all-time. Entries from before the rollups existed are
+    backfilled by migration 0007, and hour buckets outlive log retention,
+    so entries whose raw partitions were dropped still count here.
 
     Two data sources:
       - Secure Chat  (/ai/query)              → HIPAA framework
@@ -103,42 +273,40 @@ async def get_compliance_status(
         # 0/0 → 0.0 (no data yet, not vacuously "100% compliant")
         return round(allowed / total, 4) if total > 0 else 0.0
 
+    query = (
+        ConditionalCounts(
+            LogRollup,
+            and_(
+                # Hour buckets are complete up to the latest write
+                LogRollup.granularity == "hour",
+                LogRollup.endpoint.in_(["/ai/query", "/api/documents/sanitize"]),
+            ),
+            measure=LogRollup.count,
+        )
+        # ── Secure Chat (/ai/query) ────────────────────────────────────────
+        .count("chat_total", LogRollup.endpoint == "/ai/query")
+        .count(
+            "chat_allowed",
+            LogRollup.endpoint == "/ai/query",
+            LogRollup.policy_decision == "allow",
+        )
+        # ── Document Sanitizer (/api/documents/sanitize) ───────────────────
+        .count("doc_total", LogRollup.endpoint == "/api/documents/sanitize")
+        .count(
+            "doc_allowed",
+            LogRollup.endpoint == "/api/documents/sanitize",
+            LogRollup.policy_decision == "allow",
+        )
+    )
+
     chat_total = chat_allowed = doc_total = doc_allowed = 0
     try:
         async with AsyncSessionLocal() as session:
-            # ── Secure Chat (/ai/query) ────────────────────────────────────
-            r_chat_total = await session.execute(
-                select(func.count()).where(LogEntry.endpoint == "/ai/query")
-            )
-            chat_total = r_chat_total.scalar() or 0
-
-            r_chat_allowed = await session.execute(
-                select(func.count()).where(
-                    and_(
-                        LogEntry.endpoint == "/ai/query",
-                        LogEntry.policy_decision == "allow",
-                    )
-                )
-            )
-            chat_allowed = r_chat_allowed.scalar() or 0
-
-            # ── Document Sanitizer (/api/documents/sanitize) ───────────────
-            r_doc_total = await session.execute(
-                select(func.count()).where(
-                    LogEntry.endpoint == "/api/documents/sanitize"
-                )
-            )
-            doc_total = r_doc_total.scalar() or 0
-
-            r_doc_allowed = await session.execute(
-                select(func.count()).where(
-                    and_(
-                        LogEntry.endpoint == "/api/documents/sanitize",
-                        LogEntry.policy_decision == "allow",
-                    )
-                )
-            )
-            doc_allowed = r_doc_allowed.scalar() or 0
+            counts = await query.fetch(session)
+        chat_total = counts["chat_total"]
+        chat_allowed = counts["chat_allowed"]
+        doc_total = counts["doc_total"]
+        doc_allowed = counts["doc_allowed"]
     except Exception:
         # DB unavailable (e.g. CI environment without a running database).
         # Return zero counts so the endpoint still responds 200.
@@ -209,7 +377,7 @@ async def get_recent_alerts(
             "id": str(entry.id),
             "type": entry.event_type or "Security Event",
             "severity": entry.severity or "high",
-            "message": (decrypt_value(entry.message) or "")[:200],
+            "message": (decrypt_value(entry.message, entry.key_id) or "")[:200],
             "timestamp": entry.created_at.isoformat() + "Z" if entry.created_at else "",
         }
         for entry in entries
@@ -242,9 +410,9 @@ async def get_settings_overview(
     DLP rules, rate limits, compliance frameworks, integration status,
     and encryption state. Used by the Settings tab.
     """
-    policy = load_policy()
+    policy = get_policy()
 
-    dlp = policy.get("dlp_rules", {})
+    dlp = policy.dlp_rules
     raw_patterns = dlp.get("patterns", {})
     rules = [
         {
@@ -255,10 +423,9 @@ async def get_settings_overview(
         for name, meta in raw_patterns.items()
     ]
 
-    rl = policy.get("rate_limiting", {})
-    rpm = rl.get("requests_per_minute", {})
+    rpm = policy.rate_limits
 
-    compliance = policy.get("compliance", {})
+    compliance = policy.raw.get("compliance", {})
 
     return {
         "dlp": {
@@ -268,8 +435,8 @@ async def get_settings_overview(
             "rules": rules,
         },
         "rate_limits": {
-            "enabled": rl.get("enabled", False),
-            "window_seconds": rl.get("window_seconds", 60),
+            "enabled": policy.rate_limiting_enabled,
+            "window_seconds": policy.rate_window or 60,
             "per_role": {
                 "admin": rpm.get("admin", 0),
                 "developer": rpm.get("developer", 0),
@@ -308,6 +475,7 @@ async def get_encryption_status(
         "encryption_enabled": enabled,
         "algorithm": "Fernet (AES-128-CBC + HMAC-SHA256)" if enabled else "none",
         "key_id": get_key_id() if enabled else None,
+        "retired_key_ids": previous_key_ids() if enabled else [],
         "encrypted_fields": ["logs.message"] if enabled else [],
         "data_at_rest": enabled,
         "data_in_transit": True,
@@ -366,62 +534,43 @@ async def get_iscm_status(
     since_1h = now - timedelta(hours=1)
     since_24h = now - timedelta(hours=24)
 
-    async with AsyncSessionLocal() as session:
+    query = (
+        ConditionalCounts(LogEntry)
         # ── Compliance: overall allow ratio across all logged endpoints ──────
-        total_all = (
-            await session.execute(select(func.count()).select_from(LogEntry))
-        ).scalar() or 0
-
-        total_allowed = (
-            await session.execute(
-                select(func.count()).where(LogEntry.policy_decision == "allow")
-            )
-        ).scalar() or 0
-
+        .count("total_all")
+        .count("total_allowed", LogEntry.policy_decision == "allow")
         # ── Threat indicators (last 1 hour) ──────────────────────────────────
-        high_risk_1h = (
-            await session.execute(
-                select(func.count()).where(
-                    and_(LogEntry.risk_score >= 0.7, LogEntry.created_at >= since_1h)
-                )
-            )
-        ).scalar() or 0
-
-        blocked_1h = (
-            await session.execute(
-                select(func.count()).where(
-                    and_(
-                        LogEntry.policy_decision == "block",
-                        LogEntry.created_at >= since_1h,
-                    )
-                )
-            )
-        ).scalar() or 0
-
+        .count(
+            "high_risk_1h",
+            LogEntry.risk_score >= 0.7,
+            LogEntry.created_at >= since_1h,
+        )
+        .count(
+            "blocked_1h",
+            LogEntry.policy_decision == "block",
+            LogEntry.created_at >= since_1h,
+        )
         # ── Log integrity: entries that have an integrity_hash set ────────────
-        total_with_hash = (
-            await session.execute(
-                select(func.count()).where(LogEntry.integrity_hash.isnot(None))
-            )
-        ).scalar() or 0
-
+        .count("total_with_hash", LogEntry.integrity_hash.isnot(None))
         # ── Activity (last 24 h) ─────────────────────────────────────────────
-        total_24h = (
-            await session.execute(
-                select(func.count()).where(LogEntry.created_at >= since_24h)
-            )
-        ).scalar() or 0
-
-        promotions_24h = (
-            await session.execute(
-                select(func.count()).where(
-                    and_(
-                        LogEntry.event_type == "log_promoted",
-                        LogEntry.created_at >= since_24h,
-                    )
-                )
-            )
-        ).scalar() or 0
+        .count("total_24h", LogEntry.created_at >= since_24h)
+        .count(
+            "promotions_24h",
+            LogEntry.event_type == "log_promoted",
+            LogEntry.created_at >= since_24h,
+        )
+    )
+
+    async with AsyncSessionLocal() as session:
+        counts = await query.fetch(session)
+
+    total_all = counts["total_all"]
+    total_allowed = counts["total_allowed"]
+    high_risk_1h = counts["high_risk_1h"]
+    blocked_1h = counts["blocked_1h"]
+    total_with_hash = counts["total_with_hash"]
+    total_24h = counts["total_24h"]
+    promotions_24h = counts["promotions_24h"]
 
     compliance_score = round(total_allowed / total_all, 4) if total_all > 0 else 0.0
     integrity_coverage = round(total_with_hash / total_all, 4) if total_all > 0 else 1.0
@@ -459,6 +608,7 @@ async def get_iscm_status(
             "total_entries": total_all,
             "integrity_hashed": total_with_hash,
             "coverage": integrity_coverage,
+            "last_verification": integrity_verifier.last_run,
         },
         "activity_24h": {
             "total_requests": total_24h,
@@ -467,6 +617,7 @@ async def get_iscm_status(
         "data_protection": {
             "encryption_at_rest": encryption_on,
             "encryption_in_transit": True,
+            "decrypt_cache": decrypt_cache_info() if encryption_on else None,
         },
         "alert_channels": {
             "discord": bool(os.getenv("DISCORD_WEBHOOK_URL", "").strip()),
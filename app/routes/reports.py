@@ -6,11 +6,10 @@ Provides aggregated summary data for the Reports panel.
 Aggregates LogEntry rows within a caller-supplied date range and
 returns counts + breakdowns suitable for display and CSV export.
 
-Input validation applied to date parameters to prevent injection.
+Date parameters are validated by app/utils/date_range.py.
 OWASP API3: Broken Object Property Level Authorization
 """
 
-import re
 from datetime import datetime, timedelta
 from typing import Optional
 
@@ -19,33 +18,16 @@ from sqlalchemy import select, func, and_
 
 from app.auth.rbac import require_roles
 from app.db.db import AsyncSessionLocal
-from app.models import LogEntry
+from app.db.stats import ConditionalCounts
+from app.models import LogEntry, LogRollup
+from app.services.log_rollups import rollup_window
 from app.services.threat_detector import detect_threats
 from app.utils.alert_manager import send_alert
+from app.utils.date_range import date_range
 from app.utils.db_encryption import is_encryption_enabled
 
 router = APIRouter(prefix="/api", tags=["reports"])
 
-# Strict date format: YYYY-MM-DD only
-# OWASP API3: Prevents injection via malformed date parameters
-DATE_PATTERN = re.compile(r"^\d{4}-\d{2}-\d{2}$")
-
-
-def _parse_date(date_str: Optional[str], default: datetime) -> datetime:
-    """
-    Parse and validate a date string in YYYY-MM-DD format.
-    Returns default if input is None, empty, or malformed.
-    Strict regex check applied before strptime to prevent injection.
-    """
-    if not date_str:
-        return default
-    if not DATE_PATTERN.match(date_str):
-        return default
-    try:
-        return datetime.strptime(date_str, "%Y-%m-%d")
-    except ValueError:
-        return default
-
 
 @router.get("/reports/summary")
 async def get_reports_summary(
@@ -62,7 +44,8 @@ async def get_reports_summary(
     _user: dict = Depends(require_roles("admin", "developer", "auditor")),
 ):
     """
-    Aggregated log statistics for the requested date range.
+    Aggregated log statistics for the requested date range, read from the
+    log rollups (see app/services/log_rollups.py).
 
     Returns
     -------
@@ -74,60 +57,30 @@ async def get_reports_summary(
     - top 5 endpoints by request volume
     - date range actually used
     """
-    since = _parse_date(start_date, datetime.utcnow() - timedelta(days=7))
-    until = _parse_date(end_date, datetime.utcnow())
-
-    # Include the full end day
-    if end_date and DATE_PATTERN.match(end_date):
-        until = until.replace(hour=23, minute=59, second=59)
+    since, until = date_range(start_date, end_date)
+    window = rollup_window(since, until)
+    total_rows = func.sum(LogRollup.count)
+
+    counts_query = (
+        ConditionalCounts(LogRollup, window, measure=LogRollup.count)
+        .count("total")
+        .count("blocked", LogRollup.policy_decision == "block")
+        .count("redacted", LogRollup.policy_decision == "redact")
+        .count("allowed", LogRollup.policy_decision == "allow")
+        .count("high", LogRollup.severity == "high")
+        .count("medium", LogRollup.severity == "medium")
+        .count("low", LogRollup.severity == "low")
+    )
 
     async with AsyncSessionLocal() as session:
-        base_filter = and_(LogEntry.created_at >= since, LogEntry.created_at <= until)
-
-        r_total = await session.execute(select(func.count()).where(base_filter))
-        total = r_total.scalar() or 0
-
-        r_blocked = await session.execute(
-            select(func.count()).where(
-                and_(base_filter, LogEntry.policy_decision == "block")
-            )
-        )
-        blocked = r_blocked.scalar() or 0
-
-        r_redacted = await session.execute(
-            select(func.count()).where(
-                and_(base_filter, LogEntry.policy_decision == "redact")
-            )
-        )
-        redacted = r_redacted.scalar() or 0
-
-        r_allowed = await session.execute(
-            select(func.count()).where(
-                and_(base_filter, LogEntry.policy_decision == "allow")
-            )
-        )
-        allowed = r_allowed.scalar() or 0
-
-        r_high = await session.execute(
-            select(func.count()).where(and_(base_filter, LogEntry.severity == "high"))
-        )
-        high = r_high.scalar() or 0
-
-        r_medium = await session.execute(
-            select(func.count()).where(and_(base_filter, LogEntry.severity == "medium"))
-        )
-        medium = r_medium.scalar() or 0
-
-        r_low = await session.execute(
-            select(func.count()).where(and_(base_filter, LogEntry.severity == "low"))
-        )
-        low = r_low.scalar() or 0
+        counts = await counts_query.fetch(session)
 
+        # Rollups store a missing dimension as ""
         r_event_types = await session.execute(
-            select(LogEntry.event_type, func.count().label("cnt"))
-            .where(and_(base_filter, LogEntry.event_type.isnot(None)))
-            .group_by(LogEntry.event_type)
-            .order_by(func.count().desc())
+            select(LogRollup.event_type, total_rows.label("cnt"))
+            .where(and_(window, LogRollup.event_type != ""))
+            .group_by(LogRollup.event_type)
+            .order_by(total_rows.desc())
             .limit(10)
         )
         event_type_breakdown = [
@@ -135,20 +88,20 @@ async def get_reports_summary(
         ]
 
         r_decisions = await session.execute(
-            select(LogEntry.policy_decision, func.count().label("cnt"))
-            .where(and_(base_filter, LogEntry.policy_decision.isnot(None)))
-            .group_by(LogEntry.policy_decision)
-            .order_by(func.count().desc())
+            select(LogRollup.policy_decision, total_rows.label("cnt"))
+            .where(and_(window, LogRollup.policy_decision != ""))
+            .group_by(LogRollup.policy_decision)
+            .order_by(total_rows.desc())
         )
         decision_breakdown = [
             {"decision": row[0], "count": row[1]} for row in r_decisions.fetchall()
         ]
 
         r_endpoints = await session.execute(
-            select(LogEntry.endpoint, func.count().label("cnt"))
-            .where(base_filter)
-            .group_by(LogEntry.endpoint)
-            .order_by(func.count().desc())
+            select(LogRollup.endpoint, total_rows.label("cnt"))
+            .where(window)
+            .group_by(LogRollup.endpoint)
+            .order_by(total_rows.desc())
             .limit(5)
         )
         top_endpoints = [
@@ -160,16 +113,16 @@ async def get_reports_summary(
             "start": since.strftime("%Y-%m-%d"),
             "end": until.strftime("%Y-%m-%d"),
         },
-        "total_requests": total,
+        "total_requests": counts["total"],
         "policy_decisions": {
-            "blocked": blocked,
-            "redacted": redacted,
-            "allowed": allowed,
+            "blocked": counts["blocked"],
+            "redacted": counts["redacted"],
+            "allowed": counts["allowed"],
         },
         "severity": {
-            "high": high,
-            "medium": medium,
-            "low": low,
+            "high": counts["high"],
+            "medium": counts["medium"],
+            "low": counts["low"],
         },
         "event_type_breakdown": event_type_breakdown,
         "decision_breakdown": decision_breakdown,
@@ -237,42 +190,29 @@ async def get_db_audit(
     """
     since_24h = datetime.utcnow() - timedelta(hours=24)
 
-    async with AsyncSessionLocal() as session:
-        total = (
-            await session.execute(select(func.count()).select_from(LogEntry))
-        ).scalar() or 0
-
-        severity_breakdown: dict[str, int] = {}
-        for level in ("low", "medium", "high"):
-            severity_breakdown[level] = (
-                await session.execute(
-                    select(func.count()).where(LogEntry.severity == level)
-                )
-            ).scalar() or 0
+    levels = ("low", "medium", "high")
+    decisions = ("allow", "redact", "block")
+
+    query = ConditionalCounts(LogEntry).count("total")
+    for level in levels:
+        query.count(f"severity_{level}", LogEntry.severity == level)
+    for decision in decisions:
+        query.count(
+            f"decision_{decision}",
+            LogEntry.policy_decision == decision,
+            LogEntry.created_at >= since_24h,
+        )
+    query.count(
+        "high_risk_24h", LogEntry.risk_score >= 0.7, LogEntry.created_at >= since_24h
+    )
 
-        decision_breakdown: dict[str, int] = {}
-        for decision in ("allow", "redact", "block"):
-            decision_breakdown[decision] = (
-                await session.execute(
-                    select(func.count()).where(
-                        and_(
-                            LogEntry.policy_decision == decision,
-                            LogEntry.created_at >= since_24h,
-                        )
-                    )
-                )
-            ).scalar() or 0
+    async with AsyncSessionLocal() as session:
+        counts = await query.fetch(session)
 
-        high_risk_24h = (
-            await session.execute(
-                select(func.count()).where(
-                    and_(
-                        LogEntry.risk_score >= 0.7,
-                        LogEntry.created_at >= since_24h,
-                    )
-                )
-            )
-        ).scalar() or 0
+    total = counts["total"]
+    severity_breakdown = {level: counts[f"severity_{level}"] for level in levels}
+    decision_breakdown = {d: counts[f"decision_{d}"] for d in decisions}
+    high_risk_24h = counts["high_risk_24h"]
 
     encryption_on = is_encryption_enabled()
 
@@ -0,0 +1,190 @@
+# app/services/dlp_cache.py
+"""
+DLP Result Cache
+----------------
+Bounded, content-addressed cache in front of the Presidio analyzer.
+
+Prompts repeat heavily (canned system prompts, client retries, red-team
+replays), and re-running spaCy NER on identical text is wasted CPU.
+
+Compliance notes:
+- Keys are HMAC-SHA256 digests of (recognizer version, text); the raw
+  text is never stored.
+- Values are analyzer spans only: (entity_type, start, end, score).
+  Callers still hold the text and re-run the (cheap) anonymizer on a hit.
+
+Eviction: least-recently-used once the byte budget is exceeded, plus
+a TTL so entries never outlive a recognizer/policy change for long.
+
+Environment variables
+---------------------
+DLP_CACHE_ENABLED      — "false" disables the cache (default "true")
+DLP_CACHE_MAX_BYTES    — approximate memory budget (default 8 MiB)
+DLP_CACHE_TTL_SECONDS  — entry lifetime in seconds (default 300)
+DLP_CACHE_HMAC_KEY     — HMAC key; a random per-process key if unset
+"""
+
+import hashlib
+import hmac
+import os
+import secrets
+import threading
+import time
+from collections import OrderedDict
+from typing import Dict, List, Optional, Tuple
+
+# (entity_type, start, end, score)
+CachedSpan = Tuple[str, int, int, float]
+
+# Rough per-entry overhead (digest key, OrderedDict node, tuple headers)
+# and per-span cost used for the byte budget.
+_ENTRY_OVERHEAD_BYTES = 160
+_SPAN_BYTES = 120
+
+
+class DlpResultCache:
+    """
+    Thread-safe LRU + TTL cache mapping text digests to analyzer spans.
+
+    Size is bounded by an approximate byte budget rather than an entry
+    count, because a long document can carry hundreds of spans.
+    """
+
+    def __init__(
+        self,
+        max_bytes: int = 8 * 1024 * 1024,
+        ttl_s: float = 300.0,
+        hmac_key: Optional[bytes] = None,
+        enabled: bool = True,
+    ):
+        self.max_bytes = max_bytes
+        self.ttl_s = ttl_s
+        self.enabled = enabled
+        self._key = hmac_key or secrets.token_bytes(32)
+        self._lock = threading.Lock()
+        # digest -> (expires_at, size_bytes, spans); order = recency
+        self._entries: OrderedDict = OrderedDict()
+        self._bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+
+    def digest(self, text: str, version: str) -> str:
+        """HMAC-SHA256 of the text, bound to the active recognizer version."""
+        msg = version.encode("utf-8") + b"\x00" + text.encode("utf-8")
+        return hmac.new(self._key, msg, hashlib.sha256).hexdigest()
+
+    def get(self, text: str, version: str) -> Optional[Tuple[CachedSpan, ...]]:
+        """Return cached spans for `text`, or None on a miss / expired entry."""
+        if not self.enabled:
+            return None
+
+        key = self.digest(text, version)
+        now = time.monotonic()
+
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self.misses += 1
+                return None
+
+            expires_at, size, spans = entry
+            if expires_at <= now:
+                del self._entries[key]
+                self._bytes -= size
+                self.expirations += 1
+                self.misses += 1
+                return None
+
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return spans
+
+    def put(self, text: str, version: str, spans: Tuple[CachedSpan, ...]) -> None:
+        """Store spans for `text`, evicting least-recently-used entries."""
+        if not self.enabled:
+            return
+
+        key = self.digest(text, version)
+        size = _ENTRY_OVERHEAD_BYTES + _SPAN_BYTES * len(spans)
+        if size > self.max_bytes:
+            return
+
+        with self._lock:
+            old = self._entries.pop(key, None)
+            if old is not None:
+                self._bytes -= old[1]
+
+            self._entries[key] = (time.monotonic() + self.ttl_s, size, tuple(spans))
+            self._bytes += size
+
+            while self._bytes > self.max_bytes and self._entries:
+                _, (_, evicted_size, _) = self._entries.popitem(last=False)
+                self._bytes -= evicted_size
+                self.evictions += 1
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+            self._bytes = 0
+
+    def stats(self) -> Dict[str, object]:
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "enabled": self.enabled,
+                "entries": len(self._entries),
+                "bytes": self._bytes,
+                "max_bytes": self.max_bytes,
+                "ttl_seconds": self.ttl_s,
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "expirations": self.expirations,
+                "hit_rate": round(self.hits / lookups, 4) if lookups else 0.0,
+            }
+
+
+# Counters that add up across processes; max_bytes sums to the total budget
+_SUMMED_STATS = (
+    "entries",
+    "bytes",
+    "max_bytes",
+    "hits",
+    "misses",
+    "evictions",
+    "expirations",
+)
+
+
+def merge_stats(snapshots: List[Dict[str, object]]) -> Dict[str, object]:
+    """
+    Combine stats() from several processes (each DLP executor worker has
+    its own cache) into one view, with hit_rate recomputed from the sums.
+    """
+    merged: Dict[str, object] = {
+        key: sum(int(snap.get(key, 0)) for snap in snapshots) for key in _SUMMED_STATS
+    }
+    lookups = merged["hits"] + merged["misses"]
+    merged.update(
+        enabled=any(snap.get("enabled") for snap in snapshots),
+        ttl_seconds=snapshots[0].get("ttl_seconds") if snapshots else None,
+        hit_rate=round(merged["hits"] / lookups, 4) if lookups else 0.0,
+        processes=len(snapshots),
+    )
+    return merged
+
+
+def _from_env() -> DlpResultCache:
+    key = os.getenv("DLP_CACHE_HMAC_KEY")
+    return DlpResultCache(
+        max_bytes=int(os.getenv("DLP_CACHE_MAX_BYTES", str(8 * 1024 * 1024))),
+        ttl_s=float(os.getenv("DLP_CACHE_TTL_SECONDS", "300")),
+        hmac_key=key.encode("utf-8") if key else None,
+        enabled=os.getenv("DLP_CACHE_ENABLED", "true").lower() == "true",
+    )
+
+
+# Process-wide cache shared by dlp_presidio.presidio_scan and dlp_engine
+dlp_cache = _from_env()
@@ -9,17 +9,44 @@ This is used by:
 - /ai/query (input + output scanning)
 - /api/scan (if you add one later)
 - any other internal services that need DLP.
+
+Scan tiers
+----------
+spaCy NER is by far the most expensive recognizer, and most prompts hold
+no PII at all. Each scan runs in one of three modes:
+
+- "full"    — always run the whole analyzer, NER included.
+- "tiered"  — a cheap pre-screen (structured regexes plus digit, "@",
+              keyword and proper-noun signals) decides whether the NER
+              entities (PERSON, LOCATION, NRP, DATE_TIME) can be present.
+              Clean text only gets the pattern tier.
+- "pattern" — never run NER.
+
+The mode is configured per endpoint under dlp_rules.scan_tiers in
+policy.yaml; tier_stats() reports how often each tier ran and hit.
 """
 
 from __future__ import annotations
 
 import re
+import threading
 from collections import Counter
-from dataclasses import dataclass
+from dataclasses import dataclass, field
 from enum import Enum
-from typing import List, Dict, Any, Tuple
-
-from app.middleware.dlp_presidio import analyzer, anonymizer, TARGET_ENTITIES
+from typing import List, Dict, Any, Optional, Tuple
+
+import yaml
+from presidio_analyzer import RecognizerResult
+
+from app.auth.policy_loader import get_policy
+from app.middleware.dlp_presidio import (
+    NER_ENTITIES,
+    analyze_patterns,
+    analyze_text,
+    analyze_texts,
+    get_anonymizer,
+)
+from app.middleware.dlp_regex import REGEX_ENGINE
 from app.policies.compliance_policies import COMPLIANCE_POLICIES
 
 
@@ -29,6 +56,12 @@ class PolicyDecision(str, Enum):
     BLOCK = "block"
 
 
+class ScanMode(str, Enum):
+    FULL = "full"
+    TIERED = "tiered"
+    PATTERN = "pattern"
+
+
 @dataclass
 class DlpFinding:
     type: str
@@ -43,6 +76,31 @@ class DlpDecision:
     findings: List[DlpFinding]
 
 
+@dataclass
+class DlpScanResult:
+    """
+    Outcome of a single analyzer pass over one piece of text.
+
+    The DLP middleware builds one of these per string field and stores
+    them on request.state so route handlers can reuse the analysis
+    instead of running Presidio a second time on the same input.
+    """
+
+    redacted_text: str
+    findings: List[DlpFinding]
+    decision: DlpDecision
+    analyzer_results: List[RecognizerResult] = field(default_factory=list)
+
+    @property
+    def spans(self) -> List[Tuple[str, int, int]]:
+        """(entity_type, start, end) offsets into the original text."""
+        return [(r.entity_type, r.start, r.end) for r in self.analyzer_results]
+
+    @property
+    def entities(self) -> List[str]:
+        return [r.entity_type for r in self.analyzer_results]
+
+
 def _severity_for_entity(entity_type: str) -> int:
     """
     Map Presidio entity types to a coarse severity level.
@@ -67,7 +125,271 @@ def _severity_for_entity(entity_type: str) -> int:
     return 1
 
 
-def scan_text(text: str) -> Tuple[str, List[DlpFinding]]:
+# ---------------------------------------------------------------------
+# Pre-screen: can the NER entities possibly be present?
+# ---------------------------------------------------------------------
+
+# Words spaCy tags as DATE/TIME or that signal personal context,
+# even when written in lower case.
+_NER_KEYWORDS = re.compile(
+    r"\b(?:today|tonight|tomorrow|yesterday|morning|afternoon|evening|night"
+    r"|noon|midnight|weekend|week|month|year|decade|century|ago"
+    r"|monday|tuesday|wednesday|thursday|friday|saturday|sunday"
+    r"|january|february|march|april|june|july|august|september|october"
+    r"|november|december|birthday|born|name|address|street|lives"
+    r"|citizen|nationality|religion|christian|muslim|jewish|catholic|hindu"
+    r"|buddhist|democrats?|republicans?)s?\b",
+    re.IGNORECASE,
+)
+
+# Capitalised tokens are proper-noun candidates (names, places, groups)
+_CAPITALISED = re.compile(r"(?<![\w'])[A-Z][\w'-]*")
+_SENTENCE_PUNCT = frozenset(".!?:;\"'([")
+
+# Capitalised only because they start a sentence; never entities themselves
+_SENTENCE_STARTERS = frozenset("""
+    a about after all also an and any are as at be before but by can could
+    did do does for from give had has have he hello help her here hi his how
+    i if i'm in is it it's its just let let's list make may me my no not of
+    ok okay on or our please she should show so some tell thank thanks that
+    the their then there these they this those to use was we what when where
+    which who why will with would yes you your
+    explain write summarize summarise describe create generate translate
+    compare find check review fix convert rewrite draft suggest provide
+    """.split())
+
+
+def _starts_sentence(text: str, pos: int) -> bool:
+    i = pos - 1
+    while i >= 0 and text[i].isspace():
+        if text[i] == "\n":
+            return True
+        i -= 1
+    return i < 0 or text[i] in _SENTENCE_PUNCT
+
+
+def prescreen(text: str) -> str:
+    """
+    Cheap check for anything the NER entities could match.
+
+    Returns the first signal found ("at_sign", "digit", "keyword",
+    "proper_noun" or "structured"), or "" when the text is clean and
+    the NER tier can be skipped.
+    """
+    if "@" in text:
+        return "at_sign"
+    if any(ch.isdigit() for ch in text):
+        return "digit"
+    if _NER_KEYWORDS.search(text):
+        return "keyword"
+
+    for match in _CAPITALISED.finditer(text):
+        word = match.group(0)
+        if word == "I" or word.startswith("I'"):
+            continue
+        if _starts_sentence(text, match.start()) and word.lower() in _SENTENCE_STARTERS:
+            continue
+        return "proper_noun"
+
+    if REGEX_ENGINE.spans(text):
+        return "structured"
+    return ""
+
+
+class _TierStats:
+    """Thread-safe counters for the pre-screen, pattern and NER tiers."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.reset()
+
+    def reset(self) -> None:
+        with self._lock:
+            self.prescreened = 0
+            self.reasons: Counter = Counter()
+            self.runs: Counter = Counter()
+            self.hits: Counter = Counter()
+
+    def record_prescreen(self, reason: str) -> None:
+        with self._lock:
+            self.prescreened += 1
+            self.reasons[reason or "clean"] += 1
+
+    def record_scan(self, tier: str, results: List[RecognizerResult]) -> None:
+        with self._lock:
+            self.runs[tier] += 1
+            if tier == "ner":
+                hit = any(r.entity_type in NER_ENTITIES for r in results)
+            else:
+                hit = bool(results)
+            if hit:
+                self.hits[tier] += 1
+
+    def snapshot(self) -> Dict[str, Any]:
+        with self._lock:
+            return _tier_snapshot(self.prescreened, self.reasons, self.runs, self.hits)
+
+
+def _tier_snapshot(
+    prescreened: int, reasons: Counter, runs: Counter, hits: Counter
+) -> Dict[str, Any]:
+    clean = reasons.get("clean", 0)
+    tiers = {
+        tier: {
+            "runs": runs[tier],
+            "hits": hits[tier],
+            "hit_rate": round(hits[tier] / runs[tier], 4) if runs[tier] else 0.0,
+        }
+        for tier in ("pattern", "ner")
+    }
+    return {
+        "prescreen": {
+            "checked": prescreened,
+            "clean": clean,
+            "skip_rate": round(clean / prescreened, 4) if prescreened else 0.0,
+            "reasons": dict(reasons),
+        },
+        **tiers,
+    }
+
+
+_tier_stats = _TierStats()
+
+
+def tier_stats() -> Dict[str, Any]:
+    """Per-tier run and hit counts for this process."""
+    return _tier_stats.snapshot()
+
+
+def merge_tier_stats(snapshots: List[Dict[str, Any]]) -> Dict[str, Any]:
+    """
+    Combine tier_stats() from several processes (the DLP executor workers)
+    into one view, with the rates recomputed from the summed counts.
+    """
+    reasons: Counter = Counter()
+    runs: Counter = Counter()
+    hits: Counter = Counter()
+    prescreened = 0
+    for snap in snapshots:
+        prescreened += snap["prescreen"]["checked"]
+        reasons.update(snap["prescreen"]["reasons"])
+        for tier in ("pattern", "ner"):
+            runs[tier] += snap[tier]["runs"]
+            hits[tier] += snap[tier]["hits"]
+    return {
+        **_tier_snapshot(prescreened, reasons, runs, hits),
+        "processes": len(snapshots),
+    }
+
+
+def scan_mode_for(endpoint: Optional[str] = None) -> ScanMode:
+    """
+    Resolve the scan mode for an endpoint from dlp_rules.scan_tiers in
+    policy.yaml (longest matching path prefix, else the default).
+    Falls back to FULL when the policy cannot be read, so a missing file
+    never silently lowers recall.
+    """
+    try:
+        mode = get_policy().scan_tier(endpoint)
+    except (OSError, yaml.YAMLError):
+        return ScanMode.FULL
+
+    try:
+        return ScanMode(mode)
+    except ValueError:
+        return ScanMode.FULL
+
+
+def _tiered_results(
+    texts: List[str], mode: Optional[ScanMode]
+) -> List[List[RecognizerResult]]:
+    """Analyzer results per text, running NER only where the mode needs it."""
+    mode = ScanMode(mode) if mode else scan_mode_for()
+
+    needs_ner = []
+    for text in texts:
+        if not text:
+            needs_ner.append(False)
+        elif mode == ScanMode.FULL:
+            needs_ner.append(True)
+        elif mode == ScanMode.PATTERN:
+            needs_ner.append(False)
+        else:
+            reason = prescreen(text)
+            _tier_stats.record_prescreen(reason)
+            needs_ner.append(bool(reason))
+
+    out: List[List[RecognizerResult]] = [[] for _ in texts]
+    ner_idx = [i for i, flag in enumerate(needs_ner) if flag]
+    if len(ner_idx) == 1:
+        out[ner_idx[0]] = analyze_text(texts[ner_idx[0]])
+    elif ner_idx:
+        for i, results in zip(ner_idx, analyze_texts([texts[i] for i in ner_idx])):
+            out[i] = results
+    for i in ner_idx:
+        _tier_stats.record_scan("ner", out[i])
+
+    for i, text in enumerate(texts):
+        if text and not needs_ner[i]:
+            out[i] = analyze_patterns(text)
+            _tier_stats.record_scan("pattern", out[i])
+
+    return out
+
+
+def _findings_from_results(results: List[RecognizerResult]) -> List[DlpFinding]:
+    counts = Counter(r.entity_type for r in results)
+    return [
+        DlpFinding(type=etype, count=cnt, severity=_severity_for_entity(etype))
+        for etype, cnt in counts.items()
+    ]
+
+
+def _build_scan(text: str, results: List[RecognizerResult]) -> DlpScanResult:
+    if not text:
+        return DlpScanResult(redacted_text=text, findings=[], decision=decide([]))
+
+    findings = _findings_from_results(results)
+    anonymized = get_anonymizer().anonymize(text=text, analyzer_results=results)
+
+    return DlpScanResult(
+        redacted_text=anonymized.text,
+        findings=findings,
+        decision=decide(findings),
+        analyzer_results=list(results),
+    )
+
+
+def analyze(text: str, mode: Optional[ScanMode] = None) -> DlpScanResult:
+    """
+    Run one analyzer + anonymizer pass and return the full scan result
+    (analyzer results, redacted text, findings and policy decision).
+
+    `mode` selects the scan tier; None uses the policy default.
+    """
+    if not text:
+        return _build_scan(text, [])
+
+    return _build_scan(text, _tiered_results([text], mode)[0])
+
+
+def analyze_many(
+    texts: List[str], mode: Optional[ScanMode] = None
+) -> List[DlpScanResult]:
+    """
+    Batched analyze(): all texts that need NER share one nlp.pipe pass
+    instead of one analyzer call each. Results are returned in input order.
+    """
+    texts = list(texts)
+    return [
+        _build_scan(text, results)
+        for text, results in zip(texts, _tiered_results(texts, mode))
+    ]
+
+
+def scan_text(
+    text: str, mode: Optional[ScanMode] = None
+) -> Tuple[str, List[DlpFinding]]:
     """
     Analyze + anonymize the text.
 
@@ -78,23 +400,55 @@ def scan_text(text: str) -> Tuple[str, List[DlpFinding]]:
     if not text:
         return text, []
 
-    results = analyzer.analyze(
-        text=text,
-        entities=TARGET_ENTITIES,
-        language="en",
-        score_threshold=0.3,
-    )
+    result = analyze(text, mode)
+    return result.redacted_text, result.findings
 
-    entities = [r.entity_type for r in results]
-    counts = Counter(entities)
 
-    findings: List[DlpFinding] = [
-        DlpFinding(type=etype, count=cnt, severity=_severity_for_entity(etype))
-        for etype, cnt in counts.items()
-    ]
+def scan_many(
+    texts: List[str], mode: Optional[ScanMode] = None
+) -> List[Tuple[str, List[DlpFinding]]]:
+    """
+    Batched scan_text(): returns (redacted_text, findings) per input text.
+    """
+    return [(scan.redacted_text, scan.findings) for scan in analyze_many(texts, mode)]
 
-    anonymized = anonymizer.anonymize(text=text, analyzer_results=results)
-    return anonymized.text, findings
+
+_DECISION_RANK = {
+    PolicyDecision.ALLOW: 0,
+    PolicyDecision.REDACT: 1,
+    PolicyDecision.BLOCK: 2,
+}
+
+
+def more_severe(
+    current: Optional[DlpScanResult], candidate: DlpScanResult
+) -> DlpScanResult:
+    """The stricter of two scans: higher decision first, then risk score."""
+    if current is None:
+        return candidate
+
+    def rank(scan: DlpScanResult) -> Tuple[int, float]:
+        return _DECISION_RANK[scan.decision.decision], scan.decision.risk_score
+
+    return candidate if rank(candidate) > rank(current) else current
+
+
+def get_request_scan(request: Any, text: str) -> Optional[DlpScanResult]:
+    """
+    Return the scan the DLP middleware already produced for `text`, if any.
+
+    The middleware keys its results by the text it forwarded downstream
+    (the redacted value), which is exactly what a handler reads back out
+    of the parsed request body. Several fields can redact to the same
+    text (e.g. a field that already contains "<CREDIT_CARD>"); the most
+    severe of their scans is kept, so a clean look-alike field can never
+    downgrade the decision for the one that carried the data.
+    """
+    state = getattr(request, "state", None)
+    scans = getattr(state, "dlp_scan_results", None)
+    if not isinstance(scans, dict):
+        return None
+    return scans.get(text)
 
 
 def _compute_risk(findings: List[DlpFinding]) -> float:
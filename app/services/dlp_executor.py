@@ -0,0 +1,309 @@
+# app/services/dlp_executor.py
+"""
+DLP Executor
+------------
+Runs CPU-bound DLP work (Presidio / spaCy NER, regex passes) off the
+event loop so a single large scan cannot stall every other request on
+the same uvicorn worker.
+
+Modes (DLP_EXECUTOR_MODE):
+- "process" — ProcessPoolExecutor; each worker process loads the
+              AnalyzerEngine once in its initializer (default).
+- "thread"  — ThreadPoolExecutor sharing the in-process analyzer.
+- "inline"  — run on the calling thread (default under PYTEST=1).
+
+Readiness: warm_up() (called from the application lifespan) loads the
+Presidio engines wherever scans will run — in each worker process, or
+in-process for thread/inline mode. `ready` turns true once that is done
+and backs the /health/ready probe.
+
+Worker stats: in process mode the DLP result cache and the tier counters
+live in each worker process, so the copies in this process never move. Every job
+therefore returns a snapshot of its worker's counters alongside its
+result, and worker_stats() hands the latest snapshot per worker to the
+metrics endpoints. Counters only move while a job runs, so the snapshot
+taken at the end of a worker's last job is exact. Snapshots are dropped
+when the pool is replaced, matching the restarted workers' counters.
+
+Backpressure: at most `workers + max_queue` jobs may be in flight.
+Beyond that, run() raises DlpExecutorSaturated immediately so callers can
+shed load with HTTP 503 instead of queueing without bound. A job only
+frees its slot when it actually finishes, so timed-out jobs still count.
+
+Environment variables
+---------------------
+DLP_EXECUTOR_MODE         — "process" | "thread" | "inline"
+DLP_EXECUTOR_WORKERS      — pool size (default 2)
+DLP_EXECUTOR_MAX_QUEUE    — queued jobs allowed beyond pool size (default 32)
+DLP_SCAN_TIMEOUT_SECONDS  — per-job timeout (default 10)
+DLP_WARMUP                — run a throwaway analysis after loading (default true)
+"""
+
+import asyncio
+import logging
+import multiprocessing
+import os
+import threading
+from concurrent.futures import (
+    BrokenExecutor,
+    Executor,
+    ProcessPoolExecutor,
+    ThreadPoolExecutor,
+)
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+
+class DlpExecutorError(RuntimeError):
+    """Base class for DLP executor failures (mapped to HTTP 503)."""
+
+
+class DlpExecutorSaturated(DlpExecutorError):
+    """Raised when the pool and its queue are full."""
+
+
+class DlpScanTimeout(DlpExecutorError):
+    """Raised when a single DLP job exceeds its timeout."""
+
+
+logger = logging.getLogger("cyberoracle")
+
+
+def _init_worker() -> None:
+    """
+    Process-pool initializer: build the AnalyzerEngine (and load its spaCy
+    model) once per worker, before the worker accepts its first scan.
+    """
+    from app.middleware import dlp_presidio
+
+    dlp_presidio.load_engines()
+
+
+def _warm_engines(warm_up: bool) -> bool:
+    from app.middleware import dlp_presidio
+
+    dlp_presidio.load_engines(warm_up=warm_up)
+    return True
+
+
+def _worker_snapshot() -> Dict[str, Dict[str, Any]]:
+    """Counters of the per-process DLP state, keyed by worker_stats() name."""
+    from app.services import dlp_engine
+    from app.services.dlp_cache import dlp_cache
+
+    return {"dlp_cache": dlp_cache.stats(), "dlp_tiers": dlp_engine.tier_stats()}
+
+
+def _run_job(fn: Callable[..., Any], args: Tuple[Any, ...]) -> Tuple[Any, int, dict]:
+    """Process-pool job wrapper: result plus the worker's pid and counters."""
+    return fn(*args), os.getpid(), _worker_snapshot()
+
+
+class DlpExecutor:
+    """
+    Bounded executor for synchronous DLP callables.
+
+    Usage:
+        redacted, findings = await dlp_executor.run(dlp_engine.scan_text, text)
+
+    In process mode `fn` and its arguments must be picklable
+    (module-level functions, plain data).
+    """
+
+    def __init__(
+        self,
+        mode: str = "process",
+        workers: int = 2,
+        max_queue: int = 32,
+        timeout_s: float = 10.0,
+    ):
+        if mode not in ("process", "thread", "inline"):
+            raise ValueError(f"Unsupported DLP executor mode '{mode}'")
+
+        self.mode = mode
+        self.workers = max(1, workers)
+        self.max_queue = max(0, max_queue)
+        self.timeout_s = timeout_s
+        self._pool: Optional[Executor] = None
+        self._lock = threading.Lock()
+        self._inflight = 0
+        self.completed = 0
+        self.failed = 0
+        self.rejected = 0
+        self.timeouts = 0
+        self.ready = False
+        self.warmup_error: Optional[str] = None
+        # worker pid -> latest _worker_snapshot() (process mode only)
+        self._worker_stats: Dict[int, Dict[str, Dict[str, Any]]] = {}
+
+    @property
+    def capacity(self) -> int:
+        return self.workers + self.max_queue
+
+    def _get_pool(self) -> Executor:
+        if self._pool is None:
+            if self.mode == "process":
+                # spawn: never fork a process that already runs event-loop threads
+                self._pool = ProcessPoolExecutor(
+                    max_workers=self.workers,
+                    mp_context=multiprocessing.get_context("spawn"),
+                    initializer=_init_worker,
+                )
+            else:
+                self._pool = ThreadPoolExecutor(
+                    max_workers=self.workers, thread_name_prefix="dlp"
+                )
+        return self._pool
+
+    def _acquire(self) -> None:
+        with self._lock:
+            if self._inflight >= self.capacity:
+                self.rejected += 1
+                raise DlpExecutorSaturated(
+                    f"DLP executor saturated ({self._inflight} jobs in flight)"
+                )
+            self._inflight += 1
+
+    def _release(self, future: Optional["asyncio.Future"] = None) -> None:
+        with self._lock:
+            self._inflight -= 1
+            if future is None:
+                return
+            if not future.cancelled() and future.exception() is None:
+                self.completed += 1
+            else:
+                self.failed += 1
+
+    def _submit(self, fn: Callable[..., Any], *args: Any) -> "asyncio.Future":
+        loop = asyncio.get_running_loop()
+        if self.mode != "process":
+            return loop.run_in_executor(self._get_pool(), fn, *args)
+
+        future = loop.run_in_executor(self._get_pool(), _run_job, fn, args)
+        future.add_done_callback(self._record_worker_stats)
+        return future
+
+    def _record_worker_stats(self, future: "asyncio.Future") -> None:
+        if future.cancelled() or future.exception() is not None:
+            return
+        _, pid, snapshot = future.result()
+        with self._lock:
+            self._worker_stats[pid] = snapshot
+
+    def _reset_pool(self) -> None:
+        self._pool = None
+        with self._lock:
+            self._worker_stats.clear()
+
+    async def run(
+        self, fn: Callable[..., Any], *args: Any, timeout: Optional[float] = None
+    ) -> Any:
+        """
+        Run `fn(*args)` in the pool and await its result.
+
+        Raises DlpExecutorSaturated when no slot is free and DlpScanTimeout
+        when the job does not finish within `timeout` (or the default).
+        """
+        if self.mode == "inline":
+            return fn(*args)
+
+        self._acquire()
+        try:
+            future = self._submit(fn, *args)
+        except BrokenExecutor as exc:
+            # The pool broke before any awaited job noticed (submit raises)
+            self._release()
+            self._reset_pool()
+            raise DlpExecutorError(f"DLP worker pool failed: {exc}") from exc
+        except BaseException:
+            self._release()
+            raise
+        future.add_done_callback(self._release)
+
+        try:
+            result = await asyncio.wait_for(
+                asyncio.shield(future), timeout or self.timeout_s
+            )
+        except asyncio.TimeoutError:
+            with self._lock:
+                self.timeouts += 1
+            raise DlpScanTimeout(
+                f"DLP scan exceeded {timeout or self.timeout_s:.1f}s timeout"
+            )
+        except BrokenExecutor as exc:
+            # A worker died (e.g. OOM while loading the model); start a fresh
+            # pool on the next call instead of failing forever.
+            self._reset_pool()
+            raise DlpExecutorError(f"DLP worker pool failed: {exc}") from exc
+        return result[0] if self.mode == "process" else result
+
+    async def warm_up(self, analyze: bool = True) -> None:
+        """
+        Load (and optionally warm) the Presidio engines wherever scans run.
+        In process mode one job per worker is submitted so every worker
+        process is spawned and initialized before traffic arrives.
+        Failures are recorded in `warmup_error` and leave `ready` false.
+        """
+        try:
+            if self.mode == "inline":
+                await asyncio.to_thread(_warm_engines, analyze)
+            else:
+                jobs = self.workers if self.mode == "process" else 1
+                await asyncio.gather(
+                    *(self._submit(_warm_engines, analyze) for _ in range(jobs))
+                )
+        except Exception as exc:
+            self.warmup_error = f"{type(exc).__name__}: {exc}"
+            logger.error(f"DLP engine warm-up failed: {self.warmup_error}")
+            return
+
+        self.ready = True
+        self.warmup_error = None
+
+    def stats(self) -> Dict[str, object]:
+        with self._lock:
+            return {
+                "mode": self.mode,
+                "ready": self.ready,
+                "workers": self.workers,
+                "capacity": self.capacity,
+                "inflight": self._inflight,
+                "completed": self.completed,
+                "failed": self.failed,
+                "rejected": self.rejected,
+                "timeouts": self.timeouts,
+            }
+
+    def worker_stats(self, name: str) -> Optional[List[Dict[str, Any]]]:
+        """
+        Latest `name` counters from each worker process, or None when scans
+        run in this process (thread / inline mode) and its own counters
+        are the ones to report.
+        """
+        if self.mode != "process":
+            return None
+        with self._lock:
+            return [snap[name] for snap in self._worker_stats.values() if name in snap]
+
+    def shutdown(self) -> None:
+        """Stop the pool; called from the application lifespan."""
+        if self._pool is not None:
+            self._pool.shutdown(wait=False, cancel_futures=True)
+            self._reset_pool()
+
+
+# Run a throwaway analysis after loading so vectors are paged in
+WARMUP_ENABLED = os.getenv("DLP_WARMUP", "true").lower() == "true"
+
+
+def _from_env() -> DlpExecutor:
+    default_mode = "inline" if os.getenv("PYTEST") == "1" else "process"
+    return DlpExecutor(
+        mode=os.getenv("DLP_EXECUTOR_MODE", default_mode).lower(),
+        workers=int(os.getenv("DLP_EXECUTOR_WORKERS", "2")),
+        max_queue=int(os.getenv("DLP_EXECUTOR_MAX_QUEUE", "32")),
+        timeout_s=float(os.getenv("DLP_SCAN_TIMEOUT_SECONDS", "10")),
+    )
+
+
+# Process-wide executor shared by the DLP middleware and routes
+dlp_executor = _from_env()
@@ -0,0 +1,117 @@
+# app/services/dlp_profiles.py
+"""
+DLP Engine Profiles
+-------------------
+Picks the spaCy model, the pipeline components it loads and the entity
+(recognizer) set used by the Presidio analyzer for this deployment.
+
+Built-in profiles:
+- "fast"      — en_core_web_sm, NER only (tagger, parser, lemmatizer off),
+                drops the noisy low-severity NRP / DATE_TIME entities.
+                For throughput-sensitive gateways.
+- "balanced"  — en_core_web_md, parser off, full entity set.
+- "accurate"  — en_core_web_lg with every component and the full entity
+                set (Presidio's default; compliance-critical deployments).
+
+Resolution order:
+1. DLP_ENGINE_PROFILE environment variable
+2. dlp_rules.engine_profile in policy.yaml
+3. "accurate"
+
+policy.yaml may also define or override profiles under
+dlp_rules.engine_profiles, e.g.:
+
+    engine_profiles:
+      edge:
+        model: en_core_web_sm
+        disable: [parser, lemmatizer]
+        entities: [EMAIL_ADDRESS, CREDIT_CARD, GENERIC_SSN]
+
+DLP_SPACY_MODEL overrides the model name of whichever profile is active.
+"""
+
+import os
+from dataclasses import dataclass, replace
+from typing import Dict, Optional, Tuple
+
+import yaml
+
+from app.auth.policy_loader import get_policy
+
+DEFAULT_PROFILE = "accurate"
+
+
+@dataclass(frozen=True)
+class DlpEngineProfile:
+    name: str
+    model: str
+    # spaCy pipeline components not loaded at all
+    disable: Tuple[str, ...] = ()
+    # Entity types to analyze; empty means the full TARGET_ENTITIES list
+    entities: Tuple[str, ...] = ()
+    # Entity types removed from the full list (ignored when `entities` is set)
+    exclude: Tuple[str, ...] = ()
+
+
+BUILTIN_PROFILES: Dict[str, DlpEngineProfile] = {
+    "fast": DlpEngineProfile(
+        name="fast",
+        model="en_core_web_sm",
+        disable=("tagger", "parser", "attribute_ruler", "lemmatizer"),
+        exclude=("NRP", "DATE_TIME"),
+    ),
+    "balanced": DlpEngineProfile(
+        name="balanced",
+        model="en_core_web_md",
+        disable=("parser",),
+    ),
+    "accurate": DlpEngineProfile(name="accurate", model="en_core_web_lg"),
+}
+
+
+def _policy_dlp_rules() -> dict:
+    try:
+        return get_policy().dlp_rules
+    except (OSError, yaml.YAMLError):
+        return {}
+
+
+def available_profiles() -> Dict[str, DlpEngineProfile]:
+    """Built-in profiles merged with any defined in policy.yaml."""
+    profiles = dict(BUILTIN_PROFILES)
+    for name, cfg in (_policy_dlp_rules().get("engine_profiles") or {}).items():
+        base = profiles.get(name, DlpEngineProfile(name=name, model="en_core_web_lg"))
+        profiles[name] = replace(
+            base,
+            model=cfg.get("model", base.model),
+            disable=tuple(cfg.get("disable", base.disable)),
+            entities=tuple(cfg.get("entities", base.entities)),
+            exclude=tuple(cfg.get("exclude", base.exclude)),
+        )
+    return profiles
+
+
+def resolve_profile(name: Optional[str] = None) -> DlpEngineProfile:
+    """
+    Return the profile to use: `name` if given, else the env / policy
+    setting. Unknown names raise ValueError so a typo cannot silently
+    fall back to a different model.
+    """
+    name = (
+        name
+        or os.getenv("DLP_ENGINE_PROFILE")
+        or _policy_dlp_rules().get("engine_profile")
+        or DEFAULT_PROFILE
+    )
+    profiles = available_profiles()
+    if name not in profiles:
+        raise ValueError(
+            f"Unknown DLP engine profile '{name}' "
+            f"(available: {', '.join(sorted(profiles))})"
+        )
+
+    profile = profiles[name]
+    model_override = os.getenv("DLP_SPACY_MODEL")
+    if model_override:
+        profile = replace(profile, model=model_override)
+    return profile
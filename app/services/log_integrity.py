@@ -0,0 +1,318 @@
+# app/services/log_integrity.py
+"""
+Log Integrity Verification
+--------------------------
+Decrypts and re-hashes audit log entries to detect tampering
+(OWASP-ASVS 9.5) off the event loop.
+
+Every read path (/logs/list, /logs/export) and the full-table audit
+(/logs/verify, scripts/verify_log_integrity.py) goes through
+IntegrityVerifier.verify(): entries are split into batches of
+INTEGRITY_BATCH_SIZE and the batches run concurrently on a thread pool,
+so Fernet decryption and SHA-256 over large pages or exports never stall
+other requests on the same worker. hashlib releases the GIL for inputs
+over 2 KiB, so batches of long messages overlap on several cores; for
+short messages the gain is keeping the event loop free.
+
+verify_all() walks a whole time range through a server-side cursor,
+verifying one chunk while the next is fetched, and yields progress
+(checked / tampered / unhashed counts and the tampered IDs) per chunk.
+The last summary is kept for the ISCM status endpoint.
+
+Verified-status cache (full-table audits only): a bounded LRU maps row
+id to a fingerprint of the stored fields and the verdict. A row whose
+stored fields are unchanged since its last check is not decrypted again;
+any modification changes the fingerprint and forces a re-check. The
+fingerprint uses Python's per-process randomized string hash, so it
+cannot be forged from outside. Plaintext is never cached.
+
+Environment variables
+---------------------
+INTEGRITY_WORKERS      — verification threads (default 4)
+INTEGRITY_BATCH_SIZE   — entries per thread-pool job (default 100)
+INTEGRITY_INLINE_MAX   — verify up to this many entries inline (default 16)
+INTEGRITY_CACHE_SIZE   — rows in the verified-status cache, 0 = off
+                         (default 100000)
+INTEGRITY_VERIFY_CHUNK — rows per cursor fetch in verify_all (default 2000)
+"""
+
+import asyncio
+import os
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+from typing import Any, AsyncIterator, Dict, List, Optional, Sequence, Tuple
+
+from sqlalchemy import func, select
+
+from app.models import LogEntry
+from app.utils.db_encryption import decrypt_value
+from app.utils.logger import compute_log_hash
+
+# (id, endpoint, method, status_code, message, event_type, integrity_hash,
+#  key_id)
+EntryFields = Tuple[
+    int, str, str, int, Optional[str], Optional[str], Optional[str], Optional[str]
+]
+
+# (decrypted message, verdict); verdict None = pre-dates integrity hashing,
+# True = verified, False = TAMPERED
+Verdict = Tuple[Optional[str], Optional[bool]]
+
+FIELD_NAMES = (
+    "id",
+    "endpoint",
+    "method",
+    "status_code",
+    "message",
+    "event_type",
+    "integrity_hash",
+    "key_id",
+)
+
+
+def entry_fields(entry: Any) -> EntryFields:
+    """Pull the verified fields out of a LogEntry (or a row of its columns)."""
+    return tuple(getattr(entry, name) for name in FIELD_NAMES)
+
+
+def verify_fields(fields: EntryFields) -> Verdict:
+    _, endpoint, method, status_code, message, event_type, integrity_hash, key_id = (
+        fields
+    )
+    # Decrypt message at read time with the key version it was written with
+    decrypted = decrypt_value(message, key_id) if message else None
+    if not integrity_hash:
+        return decrypted, None
+    expected = compute_log_hash(
+        endpoint=endpoint,
+        method=method,
+        status_code=status_code,
+        message=decrypted,
+        event_type=event_type,
+    )
+    return decrypted, expected == integrity_hash
+
+
+def verify_batch(batch: Sequence[EntryFields]) -> List[Verdict]:
+    return [verify_fields(fields) for fields in batch]
+
+
+class IntegrityVerifier:
+    """
+    Thread-pool integrity checker.
+
+    Usage:
+        verdicts = await integrity_verifier.verify(entries)
+        async for progress in integrity_verifier.verify_all(session, since):
+            ...
+    """
+
+    def __init__(
+        self,
+        workers: int = 4,
+        batch_size: int = 100,
+        inline_max: int = 16,
+        cache_size: int = 100000,
+        verify_chunk: int = 2000,
+    ):
+        self.workers = max(1, workers)
+        self.batch_size = max(1, batch_size)
+        self.inline_max = max(0, inline_max)
+        self.cache_size = max(0, cache_size)
+        self.verify_chunk = max(1, verify_chunk)
+        self._pool: Optional[ThreadPoolExecutor] = None
+        self._cache: "OrderedDict[int, Tuple[int, Optional[bool]]]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.cache_hits = 0
+        self.last_run: Optional[Dict[str, Any]] = None
+
+    def _get_pool(self) -> ThreadPoolExecutor:
+        if self._pool is None:
+            self._pool = ThreadPoolExecutor(
+                max_workers=self.workers, thread_name_prefix="integrity"
+            )
+        return self._pool
+
+    def shutdown(self) -> None:
+        if self._pool is not None:
+            self._pool.shutdown(wait=False, cancel_futures=True)
+            self._pool = None
+
+    async def verify_fields(self, rows: Sequence[EntryFields]) -> List[Verdict]:
+        """Verdicts for `rows`, in order; large inputs run in parallel batches."""
+        if len(rows) <= self.inline_max:
+            return verify_batch(rows)
+
+        loop = asyncio.get_running_loop()
+        pool = self._get_pool()
+        jobs = [
+            loop.run_in_executor(pool, verify_batch, rows[i : i + self.batch_size])
+            for i in range(0, len(rows), self.batch_size)
+        ]
+        verdicts: List[Verdict] = []
+        for batch in await asyncio.gather(*jobs):
+            verdicts.extend(batch)
+        return verdicts
+
+    async def verify(self, entries: Sequence[Any]) -> List[Verdict]:
+        """Verdicts for LogEntry objects or rows of LogEntry columns."""
+        return await self.verify_fields([entry_fields(e) for e in entries])
+
+    # -- Verified-status cache ------------------------------------------------
+
+    def _cached(self, fields: EntryFields) -> Tuple[bool, Optional[bool]]:
+        if not self.cache_size:
+            return False, None
+        with self._lock:
+            hit = self._cache.get(fields[0])
+            if hit is None or hit[0] != hash(fields):
+                return False, None
+            self._cache.move_to_end(fields[0])
+            self.cache_hits += 1
+            return True, hit[1]
+
+    def _remember(self, fields: EntryFields, verdict: Optional[bool]) -> None:
+        if not self.cache_size:
+            return
+        with self._lock:
+            self._cache[fields[0]] = (hash(fields), verdict)
+            self._cache.move_to_end(fields[0])
+            while len(self._cache) > self.cache_size:
+                self._cache.popitem(last=False)
+
+    async def _check_chunk(self, rows: Sequence[EntryFields]) -> List[Optional[bool]]:
+        """Verdicts only (no plaintext), using and filling the cache."""
+        verdicts: List[Optional[bool]] = [None] * len(rows)
+        pending = []
+        for i, fields in enumerate(rows):
+            hit, verdict = self._cached(fields)
+            if hit:
+                verdicts[i] = verdict
+            else:
+                pending.append(i)
+
+        checked = await self.verify_fields([rows[i] for i in pending])
+        for i, (_, verdict) in zip(pending, checked):
+            verdicts[i] = verdict
+            self._remember(rows[i], verdict)
+        return verdicts
+
+    # -- Full-table audit -----------------------------------------------------
+
+    async def verify_all(
+        self,
+        session: Any,
+        since: Optional[datetime] = None,
+        until: Optional[datetime] = None,
+    ) -> AsyncIterator[Dict[str, Any]]:
+        """
+        Verify every entry with created_at in [since, until], oldest first.
+
+        Yields one progress dict per chunk ("type": "progress", with the
+        IDs tampered in that chunk) and a final "type": "summary" with the
+        totals and every tampered ID.
+        """
+        conditions = []
+        if since is not None:
+            conditions.append(LogEntry.created_at >= since)
+        if until is not None:
+            conditions.append(LogEntry.created_at <= until)
+
+        total = (
+            await session.execute(
+                select(func.count()).select_from(LogEntry).where(*conditions)
+            )
+        ).scalar() or 0
+
+        columns = [getattr(LogEntry, name) for name in FIELD_NAMES]
+        query = (
+            select(*columns)
+            .where(*conditions)
+            .order_by(LogEntry.created_at, LogEntry.id)
+            .execution_options(yield_per=self.verify_chunk)
+        )
+
+        started = time.perf_counter()
+        hits_before = self.cache_hits
+        checked = unhashed = 0
+        tampered_ids: List[int] = []
+        pending: Optional[asyncio.Task] = None
+        pending_rows: List[EntryFields] = []
+
+        async def report() -> Dict[str, Any]:
+            nonlocal checked, unhashed
+            verdicts = await pending
+            chunk_tampered = [
+                fields[0]
+                for fields, verdict in zip(pending_rows, verdicts)
+                if verdict is False
+            ]
+            checked += len(pending_rows)
+            unhashed += sum(1 for verdict in verdicts if verdict is None)
+            tampered_ids.extend(chunk_tampered)
+            return {
+                "type": "progress",
+                "checked": checked,
+                "total": total,
+                "tampered": len(tampered_ids),
+                "unhashed": unhashed,
+                "tampered_ids": chunk_tampered,
+            }
+
+        result = await session.stream(query)
+        try:
+            async for chunk in result.partitions():
+                rows = [tuple(row) for row in chunk]
+                # Verify this chunk in the pool while the cursor fetches the next
+                task = asyncio.ensure_future(self._check_chunk(rows))
+                if pending is not None:
+                    yield await report()
+                pending, pending_rows = task, rows
+            if pending is not None:
+                yield await report()
+        finally:
+            # Consumer went away mid-run (e.g. client disconnected)
+            if pending is not None and not pending.done():
+                pending.cancel()
+
+        summary = {
+            "type": "summary",
+            "since": since.isoformat() + "Z" if since else None,
+            "until": until.isoformat() + "Z" if until else None,
+            "checked": checked,
+            "tampered": len(tampered_ids),
+            "unhashed": unhashed,
+            "tampered_ids": tampered_ids,
+            "cache_hits": self.cache_hits - hits_before,
+            "duration_ms": round((time.perf_counter() - started) * 1000, 1),
+            "completed_at": datetime.utcnow().isoformat() + "Z",
+        }
+        self.last_run = {k: v for k, v in summary.items() if k != "tampered_ids"}
+        yield summary
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "workers": self.workers,
+            "batch_size": self.batch_size,
+            "cache_entries": len(self._cache),
+            "cache_size": self.cache_size,
+            "cache_hits": self.cache_hits,
+            "last_run": self.last_run,
+        }
+
+
+def _from_env() -> IntegrityVerifier:
+    return IntegrityVerifier(
+        workers=int(os.getenv("INTEGRITY_WORKERS", "4")),
+        batch_size=int(os.getenv("INTEGRITY_BATCH_SIZE", "100")),
+        inline_max=int(os.getenv("INTEGRITY_INLINE_MAX", "16")),
+        cache_size=int(os.getenv("INTEGRITY_CACHE_SIZE", "100000")),
+        verify_chunk=int(os.getenv("INTEGRITY_VERIFY_CHUNK", "2000")),
+    )
+
+
+# Process-wide verifier shared by the log routes and the audit endpoint
+integrity_verifier = _from_env()
@@ -0,0 +1,198 @@
+# app/services/log_key_rotation.py
+"""
+Log Key Rotation
+----------------
+Batched, resumable re-encryption of logs.message under the current
+encryption key (PSFR7). This is the engine behind scripts/key_rotation.py.
+
+- Keyset paging: rows are read in id order, `batch_size` at a time, via
+  `WHERE id > :last_id AND key_id IS DISTINCT FROM :target`. Each batch
+  is an index range scan, and memory is bounded by the batch size.
+- One short transaction per batch, so the table is never locked as a
+  whole and the gateway keeps writing.
+- Parallel crypto: a batch is split across a thread pool running
+  MultiFernet.rotate(). That decrypts with whichever configured key
+  matches and re-encrypts with the target key, the keyring's first.
+- Optimistic writes: `UPDATE ... WHERE id = :id AND created_at = :ts AND
+  message = :old`. A row changed concurrently is left untouched, and
+  created_at confines each update to a single partition.
+- Checkpoint: after each batch the target key, last id and counters go
+  to a JSON file, and an interrupted run resumes from it. Rows already
+  under the target key are excluded by the query, so resuming without
+  the checkpoint is still correct, only slower.
+- Throttle: `max_rows_per_second` keeps an online rotation from
+  competing with live traffic.
+
+Rows whose message no configured key can decrypt are plaintext from
+before encryption was enabled, or are under a key that is no longer
+configured. They are counted as skipped and left unchanged.
+"""
+
+import asyncio
+import json
+import os
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+from typing import Any, Callable, Dict, List, Optional, Sequence, Tuple
+
+from cryptography.fernet import InvalidToken, MultiFernet
+from sqlalchemy import and_, bindparam, func, or_, select, update
+
+from app.models import LogEntry
+
+# (id, created_at, message)
+RotationRow = Tuple[int, datetime, str]
+
+LOGS = LogEntry.__table__
+
+
+def rotate_rows(
+    keyring: MultiFernet, rows: Sequence[RotationRow]
+) -> List[Optional[str]]:
+    """New ciphertext per row under keyring's first key; None if undecryptable."""
+    rotated: List[Optional[str]] = []
+    for _, _, message in rows:
+        try:
+            rotated.append(keyring.rotate(message.encode("utf-8")).decode("utf-8"))
+        except (InvalidToken, ValueError, TypeError):
+            rotated.append(None)
+    return rotated
+
+
+def load_checkpoint(path: Optional[str], target_key_id: str) -> Dict[str, Any]:
+    """Saved progress for a rotation to `target_key_id`, else a fresh state."""
+    state = {"key_id": target_key_id, "last_id": 0, "rotated": 0, "skipped": 0}
+    if path and os.path.exists(path):
+        with open(path) as f:
+            saved = json.load(f)
+        if saved.get("key_id") == target_key_id:
+            state.update(saved)
+    return state
+
+
+def save_checkpoint(path: Optional[str], state: Dict[str, Any]) -> None:
+    if not path:
+        return
+    tmp = f"{path}.tmp"
+    with open(tmp, "w") as f:
+        json.dump(state, f)
+    os.replace(tmp, path)  # atomic: a crash never leaves a torn checkpoint
+
+
+def _pending(last_id: int, target_key_id: str, batch_size: int):
+    return (
+        select(LogEntry.id, LogEntry.created_at, LogEntry.message)
+        .where(
+            LogEntry.id > last_id,
+            LogEntry.message.isnot(None),
+            or_(LogEntry.key_id.is_(None), LogEntry.key_id != target_key_id),
+        )
+        .order_by(LogEntry.id)
+        .limit(batch_size)
+    )
+
+
+# Executed once per batch with a list of parameter sets (executemany)
+_REENCRYPT = (
+    update(LOGS)
+    .where(
+        and_(
+            LOGS.c.id == bindparam("row_id"),
+            LOGS.c.created_at == bindparam("row_created_at"),
+            LOGS.c.message == bindparam("old_message"),
+        )
+    )
+    .values(message=bindparam("new_message"), key_id=bindparam("new_key_id"))
+)
+
+
+async def reencrypt_logs(
+    session_factory: Callable[[], Any],
+    keyring: MultiFernet,
+    target_key_id: str,
+    batch_size: int = 1000,
+    workers: int = 4,
+    max_rows_per_second: float = 0,
+    checkpoint_path: Optional[str] = None,
+    dry_run: bool = False,
+    on_batch: Optional[Callable[[Dict[str, Any]], None]] = None,
+) -> Dict[str, Any]:
+    """
+    Re-encrypt every log message not yet under `target_key_id`, which
+    must be the first key of `keyring`. Returns the final counters.
+    """
+    state = load_checkpoint(None if dry_run else checkpoint_path, target_key_id)
+    pool = ThreadPoolExecutor(max_workers=max(1, workers), thread_name_prefix="rekey")
+    loop = asyncio.get_running_loop()
+    started = time.monotonic()
+    processed = 0
+    try:
+        while True:
+            async with session_factory() as session:
+                rows = [
+                    tuple(row)
+                    for row in (
+                        await session.execute(
+                            _pending(state["last_id"], target_key_id, batch_size)
+                        )
+                    ).all()
+                ]
+                if not rows:
+                    break
+
+                step = -(-len(rows) // max(1, workers))
+                chunks = [rows[i : i + step] for i in range(0, len(rows), step)]
+                rotated: List[Optional[str]] = []
+                for part in await asyncio.gather(
+                    *(
+                        loop.run_in_executor(pool, rotate_rows, keyring, chunk)
+                        for chunk in chunks
+                    )
+                ):
+                    rotated.extend(part)
+
+                params = [
+                    {
+                        "row_id": row_id,
+                        "row_created_at": created_at,
+                        "old_message": message,
+                        "new_message": new_message,
+                        "new_key_id": target_key_id,
+                    }
+                    for (row_id, created_at, message), new_message in zip(rows, rotated)
+                    if new_message is not None
+                ]
+                if params and not dry_run:
+                    await session.execute(_REENCRYPT, params)
+                    await session.commit()
+
+            state["last_id"] = rows[-1][0]
+            state["rotated"] += len(params)
+            state["skipped"] += len(rows) - len(params)
+            if not dry_run:
+                save_checkpoint(checkpoint_path, state)
+            if on_batch:
+                on_batch(state)
+
+            processed += len(rows)
+            if max_rows_per_second > 0:
+                ahead = processed / max_rows_per_second - (time.monotonic() - started)
+                if ahead > 0:
+                    await asyncio.sleep(ahead)
+    finally:
+        pool.shutdown(wait=False)
+
+    if checkpoint_path and not dry_run and os.path.exists(checkpoint_path):
+        os.remove(checkpoint_path)  # finished; the next rotation starts fresh
+    return state
+
+
+async def key_counts(session: Any) -> Dict[Optional[str], int]:
+    """Encrypted-message rows per key version (None = unknown / plaintext)."""
+    result = await session.execute(
+        select(LogEntry.key_id, func.count())
+        .where(LogEntry.message.isnot(None))
+        .group_by(LogEntry.key_id)
+    )
+    return dict(result.all())
@@ -0,0 +1,475 @@
+# app/services/log_merkle.py
+"""
+Log Merkle Roots
+----------------
+Hash-chained, per-hour Merkle trees over the audit log (OWASP-ASVS 9.5).
+
+A row's integrity_hash covers only that row's fields. So deleting a row,
+or inserting a forged row with a valid hash, goes unnoticed, and proving a
+range intact means decrypting and rehashing every row in it. Instead,
+every closed hour of entries is sealed into log_merkle_roots:
+
+- leaf  = sha256(0x00 || canonical JSON of the entry's LEAF_FIELDS)
+- node  = sha256(0x01 || left || right); an unpaired last node is
+          promoted to the next level unchanged
+- root  = Merkle root of the hour's leaves, ordered by (created_at, id)
+- chain = sha256(previous chain | bucket_start | leaf_count | root)
+
+Leaves cover integrity_hash, not the stored message. integrity_hash
+already binds the plaintext message. Key rotation re-encrypts messages,
+and with this choice it does not invalidate sealed roots.
+
+Sealing is incremental. seal_pending() adds to the chain each hour that
+ended at least LOG_MERKLE_SEAL_DELAY_SECONDS ago; the delay covers the
+audit-log writer's flush latency. It reads only that hour's rows. The
+app lifespan runs seal_loop(), and concurrent workers take turns
+through an advisory lock.
+
+verify_range() has two modes:
+- fast — recomputes the chain over the range's roots, which detects
+         edited or removed roots. It also compares each root's
+         leaf_count with a per-hour count(*) of live rows, which detects
+         deleted or inserted entries. Cost: one root row per hour plus
+         an index-only count; no rows are hashed.
+- deep — also recomputes each hour's root from its rows, which detects
+         modified entries. Only stored columns are hashed; nothing is
+         decrypted.
+
+inclusion_proof() returns the O(log n) path of sibling hashes from one
+entry's leaf up to its hour's root, plus the chain link. An auditor can
+check a single entry against a chain head published elsewhere (the
+chain_head returned by verify_range()).
+
+Hours whose rows were dropped by log retention (log_partitions) are
+reported as "expired", not as tampered.
+
+Environment variables
+---------------------
+LOG_MERKLE_ENABLED               — run the sealing task (default true)
+LOG_MERKLE_SEAL_DELAY_SECONDS    — seal an hour this long after it ends
+                                   (default 300)
+LOG_MERKLE_SEAL_INTERVAL_SECONDS — sealing task period (default 60)
+LOG_MERKLE_SEAL_BATCH            — most hours sealed per pass (default 24)
+LOG_MERKLE_CHUNK                 — rows per cursor fetch (default 5000)
+"""
+
+import asyncio
+import hashlib
+import json
+import logging
+import os
+import time
+from datetime import datetime, timedelta
+from typing import Any, AsyncIterator, Dict, List, Optional, Sequence, Tuple
+
+from sqlalchemy import func, select, text
+
+from app.db.db import AsyncSessionLocal
+from app.models import LogEntry, LogMerkleRoot
+from app.services.log_partitions import retention_days
+from app.services.log_rollups import truncate
+
+logger = logging.getLogger("cyberoracle")
+
+MERKLE_ENABLED = os.getenv("LOG_MERKLE_ENABLED", "true").lower() == "true"
+SEAL_DELAY = timedelta(seconds=int(os.getenv("LOG_MERKLE_SEAL_DELAY_SECONDS", "300")))
+SEAL_INTERVAL = int(os.getenv("LOG_MERKLE_SEAL_INTERVAL_SECONDS", "60"))
+SEAL_BATCH = int(os.getenv("LOG_MERKLE_SEAL_BATCH", "24"))
+MERKLE_CHUNK = int(os.getenv("LOG_MERKLE_CHUNK", "5000"))
+
+BUCKET = timedelta(hours=1)
+
+# chain value before the first sealed hour
+GENESIS = "0" * 64
+
+# pg_advisory_xact_lock key serializing seal_pending() across workers
+SEAL_LOCK_ID = 0x4C4F474D
+
+# Stored columns committed to by a leaf (everything except the message
+# ciphertext, which integrity_hash covers in plaintext form)
+LEAF_FIELDS = (
+    "id",
+    "created_at",
+    "endpoint",
+    "method",
+    "status_code",
+    "event_type",
+    "frameworks",
+    "decision",
+    "severity",
+    "risk_score",
+    "source",
+    "policy_decision",
+    "integrity_hash",
+)
+
+
+# -- Merkle primitives --------------------------------------------------------
+
+
+def leaf_hash(row: Sequence[Any]) -> bytes:
+    """Leaf for one row of LEAF_FIELDS values."""
+    values = [v.isoformat() if isinstance(v, datetime) else v for v in row]
+    data = json.dumps(values, separators=(",", ":"), ensure_ascii=False)
+    return hashlib.sha256(b"\x00" + data.encode("utf-8")).digest()
+
+
+def leaf_hashes(rows: Sequence[Sequence[Any]]) -> List[bytes]:
+    return [leaf_hash(row) for row in rows]
+
+
+def node_hash(left: bytes, right: bytes) -> bytes:
+    return hashlib.sha256(b"\x01" + left + right).digest()
+
+
+def _parent_level(level: List[bytes]) -> List[bytes]:
+    parents = [node_hash(level[i], level[i + 1]) for i in range(0, len(level) - 1, 2)]
+    if len(level) % 2:
+        parents.append(level[-1])
+    return parents
+
+
+def merkle_root(leaves: Sequence[bytes]) -> bytes:
+    """Root over `leaves`; sha256 of the empty string for no leaves."""
+    if not leaves:
+        return hashlib.sha256(b"").digest()
+    level = list(leaves)
+    while len(level) > 1:
+        level = _parent_level(level)
+    return level[0]
+
+
+def inclusion_proof(leaves: Sequence[bytes], index: int) -> List[Dict[str, str]]:
+    """Sibling hashes from leaf `index` up to the root, bottom first."""
+    proof = []
+    level = list(leaves)
+    while len(level) > 1:
+        sibling = index ^ 1
+        if sibling < len(level):
+            side = "left" if sibling < index else "right"
+            proof.append({"side": side, "hash": level[sibling].hex()})
+        level = _parent_level(level)
+        index //= 2
+    return proof
+
+
+def verify_inclusion(leaf: str, proof: Sequence[Dict[str, str]], root: str) -> bool:
+    """True if hex `leaf` hashes up to hex `root` along `proof`."""
+    node = bytes.fromhex(leaf)
+    for step in proof:
+        sibling = bytes.fromhex(step["hash"])
+        if step["side"] == "left":
+            node = node_hash(sibling, node)
+        else:
+            node = node_hash(node, sibling)
+    return node.hex() == root
+
+
+def chain_hash(prev: str, bucket_start: datetime, leaf_count: int, root: str) -> str:
+    raw = f"{prev}|{bucket_start.isoformat()}|{leaf_count}|{root}"
+    return hashlib.sha256(raw.encode("utf-8")).hexdigest()
+
+
+# -- Reading leaves -----------------------------------------------------------
+
+
+async def _hours(
+    session: Any, start: datetime, end: datetime
+) -> AsyncIterator[Tuple[datetime, List[bytes], List[int]]]:
+    """(hour, leaves, ids) for every hour with entries in [start, end)."""
+    columns = [getattr(LogEntry, name) for name in LEAF_FIELDS]
+    query = (
+        select(*columns)
+        .where(LogEntry.created_at >= start, LogEntry.created_at < end)
+        .order_by(LogEntry.created_at, LogEntry.id)
+        .execution_options(yield_per=MERKLE_CHUNK)
+    )
+    hour: Optional[datetime] = None
+    leaves: List[bytes] = []
+    ids: List[int] = []
+
+    result = await session.stream(query)
+    async for chunk in result.partitions():
+        rows = [tuple(row) for row in chunk]
+        for row, leaf in zip(rows, await asyncio.to_thread(leaf_hashes, rows)):
+            row_hour = truncate(row[1], "hour")
+            if row_hour != hour:
+                if hour is not None:
+                    yield hour, leaves, ids
+                hour, leaves, ids = row_hour, [], []
+            leaves.append(leaf)
+            ids.append(row[0])
+    if hour is not None:
+        yield hour, leaves, ids
+
+
+async def _bucket_leaves(
+    session: Any, bucket: datetime
+) -> Tuple[List[bytes], List[int]]:
+    leaves: List[bytes] = []
+    ids: List[int] = []
+    # One hour in range, so at most one item; drain to close the cursor
+    async for _, leaves, ids in _hours(session, bucket, bucket + BUCKET):
+        pass
+    return leaves, ids
+
+
+async def _chain_before(session: Any, bucket: datetime) -> str:
+    prev = (
+        await session.execute(
+            select(LogMerkleRoot.chain_hash)
+            .where(LogMerkleRoot.bucket_start < bucket)
+            .order_by(LogMerkleRoot.bucket_start.desc())
+            .limit(1)
+        )
+    ).scalar()
+    return prev or GENESIS
+
+
+# -- Sealing ------------------------------------------------------------------
+
+
+async def seal_pending(
+    session: Any,
+    now: Optional[datetime] = None,
+    max_buckets: int = SEAL_BATCH,
+) -> List[datetime]:
+    """
+    Seal up to `max_buckets` unsealed hours after the chain head, oldest
+    first. Returns the sealed bucket starts; empty if another worker holds
+    the seal lock. The caller commits.
+    """
+    locked = (
+        await session.execute(
+            text("SELECT pg_try_advisory_xact_lock(:id)"), {"id": SEAL_LOCK_ID}
+        )
+    ).scalar()
+    if not locked:
+        return []
+
+    now = now or datetime.utcnow()
+    cutoff = truncate(now - SEAL_DELAY, "hour")
+    head = (
+        (
+            await session.execute(
+                select(LogMerkleRoot)
+                .order_by(LogMerkleRoot.bucket_start.desc())
+                .limit(1)
+            )
+        )
+        .scalars()
+        .first()
+    )
+    prev = head.chain_hash if head else GENESIS
+    start = head.bucket_start + BUCKET if head else None
+
+    sealed: List[datetime] = []
+    while len(sealed) < max_buckets:
+        # Next hour with entries: one index probe, so idle hours cost nothing
+        query = select(func.min(LogEntry.created_at)).where(
+            LogEntry.created_at < cutoff
+        )
+        if start is not None:
+            query = query.where(LogEntry.created_at >= start)
+        first = (await session.execute(query)).scalar()
+        if first is None:
+            break
+
+        bucket = truncate(first, "hour")
+        leaves, _ = await _bucket_leaves(session, bucket)
+        root = (await asyncio.to_thread(merkle_root, leaves)).hex()
+        prev = chain_hash(prev, bucket, len(leaves), root)
+        session.add(
+            LogMerkleRoot(
+                bucket_start=bucket,
+                leaf_count=len(leaves),
+                root=root,
+                chain_hash=prev,
+                sealed_at=datetime.utcnow(),
+            )
+        )
+        sealed.append(bucket)
+        start = bucket + BUCKET
+    return sealed
+
+
+async def seal_loop(interval: int = SEAL_INTERVAL) -> None:
+    """Background task: seal closed hours every `interval` seconds."""
+    while True:
+        try:
+            async with AsyncSessionLocal() as session:
+                sealed = await seal_pending(session)
+                await session.commit()
+            if sealed:
+                logger.info(
+                    f"Sealed {len(sealed)} log hour(s) up to {sealed[-1]:%Y-%m-%d %H:%M}"
+                )
+        except Exception as exc:
+            logger.error(f"log Merkle sealing failed: {type(exc).__name__}: {exc}")
+        await asyncio.sleep(interval)
+
+
+# -- Verification -------------------------------------------------------------
+
+
+async def verify_range(
+    session: Any,
+    since: Optional[datetime] = None,
+    until: Optional[datetime] = None,
+    deep: bool = False,
+    now: Optional[datetime] = None,
+) -> Dict[str, Any]:
+    """
+    Check the sealed hours overlapping [since, until] (all by default).
+
+    "problems" lists, per hour: chain_broken (root row edited, or an
+    earlier one removed), count_mismatch (entries deleted or inserted
+    after sealing), unsealed_entries (entries in a sealed period without
+    a root) and, in deep mode, root_mismatch (entries modified).
+    """
+    started = time.perf_counter()
+    conditions = []
+    if since is not None:
+        conditions.append(LogMerkleRoot.bucket_start >= truncate(since, "hour"))
+    if until is not None:
+        conditions.append(LogMerkleRoot.bucket_start <= until)
+    roots = (
+        (
+            await session.execute(
+                select(LogMerkleRoot)
+                .where(*conditions)
+                .order_by(LogMerkleRoot.bucket_start)
+            )
+        )
+        .scalars()
+        .all()
+    )
+
+    problems: List[Dict[str, Any]] = []
+    expired = 0
+    chain_ok = True
+    prev = await _chain_before(session, roots[0].bucket_start) if roots else GENESIS
+
+    for sealed in roots:
+        if chain_hash(prev, sealed.bucket_start, sealed.leaf_count, sealed.root) != (
+            sealed.chain_hash
+        ):
+            chain_ok = False
+            problems.append(_problem(sealed.bucket_start, "chain_broken"))
+        prev = sealed.chain_hash
+
+    if roots:
+        low, high = roots[0].bucket_start, roots[-1].bucket_start + BUCKET
+        hour = func.date_trunc("hour", LogEntry.created_at)
+        live = dict(
+            (
+                await session.execute(
+                    select(hour, func.count())
+                    .where(LogEntry.created_at >= low, LogEntry.created_at < high)
+                    .group_by(hour)
+                )
+            ).all()
+        )
+        retained_from = (now or datetime.utcnow()) - timedelta(days=retention_days())
+        by_bucket = {sealed.bucket_start: sealed for sealed in roots}
+
+        for sealed in roots:
+            count = live.get(sealed.bucket_start, 0)
+            if count == sealed.leaf_count:
+                continue
+            if count == 0 and sealed.bucket_start + BUCKET <= retained_from:
+                expired += 1
+                continue
+            problems.append(
+                _problem(
+                    sealed.bucket_start,
+                    "count_mismatch",
+                    sealed_count=sealed.leaf_count,
+                    live_count=count,
+                )
+            )
+        for bucket, count in sorted(live.items()):
+            if bucket not in by_bucket:
+                problems.append(_problem(bucket, "unsealed_entries", live_count=count))
+
+        if deep:
+            async for bucket, leaves, _ in _hours(session, low, high):
+                sealed = by_bucket.get(bucket)
+                if sealed is None or len(leaves) != sealed.leaf_count:
+                    continue  # already reported above
+                root = (await asyncio.to_thread(merkle_root, leaves)).hex()
+                if root != sealed.root:
+                    problems.append(_problem(bucket, "root_mismatch"))
+
+    problems.sort(key=lambda p: p["bucket_start"])
+    return {
+        "since": since.isoformat() + "Z" if since else None,
+        "until": until.isoformat() + "Z" if until else None,
+        "deep": deep,
+        "buckets": len(roots),
+        "entries": sum(sealed.leaf_count for sealed in roots),
+        "expired_buckets": expired,
+        "first_bucket": _iso(roots[0].bucket_start) if roots else None,
+        "last_bucket": _iso(roots[-1].bucket_start) if roots else None,
+        "chain_ok": chain_ok,
+        "chain_head": roots[-1].chain_hash if roots else None,
+        "intact": not problems,
+        "problems": problems,
+        "duration_ms": round((time.perf_counter() - started) * 1000, 1),
+    }
+
+
+async def prove_entry(session: Any, entry_id: int) -> Optional[Dict[str, Any]]:
+    """
+    Inclusion proof for one entry: None if the entry does not exist;
+    "sealed": False if its hour has not been sealed yet.
+    """
+    created_at = (
+        await session.execute(
+            select(LogEntry.created_at).where(LogEntry.id == entry_id)
+        )
+    ).scalar()
+    if created_at is None:
+        return None
+
+    bucket = truncate(created_at, "hour")
+    sealed = (
+        (
+            await session.execute(
+                select(LogMerkleRoot).where(LogMerkleRoot.bucket_start == bucket)
+            )
+        )
+        .scalars()
+        .first()
+    )
+    if sealed is None:
+        return {"entry_id": entry_id, "bucket_start": _iso(bucket), "sealed": False}
+
+    leaves, ids = await _bucket_leaves(session, bucket)
+    index = ids.index(entry_id)
+    leaf = leaves[index].hex()
+    proof = inclusion_proof(leaves, index)
+    prev = await _chain_before(session, bucket)
+    return {
+        "entry_id": entry_id,
+        "bucket_start": _iso(bucket),
+        "sealed": True,
+        "leaf_index": index,
+        "leaf_count": sealed.leaf_count,
+        "leaf": leaf,
+        "proof": proof,
+        "root": sealed.root,
+        "prev_chain_hash": prev,
+        "chain_hash": sealed.chain_hash,
+        "verified": verify_inclusion(leaf, proof, sealed.root)
+        and chain_hash(prev, bucket, sealed.leaf_count, sealed.root)
+        == sealed.chain_hash,
+    }
+
+
+def _iso(ts: datetime) -> str:
+    return ts.isoformat() + "Z"
+
+
+def _problem(bucket: datetime, problem: str, **details: Any) -> Dict[str, Any]:
+    return {"bucket_start": _iso(bucket), "problem": problem, **details}
@@ -0,0 +1,234 @@
+# app/services/log_partitions.py
+"""
+Log Partitions
+--------------
+The `logs` table is range-partitioned on created_at (migration
+0003_partition_logs). This module keeps it that way at runtime:
+
+- ensure_partitions() creates the partitions for the next
+  LOG_PARTITION_PREMAKE periods, so inserts never hit a missing range.
+  Rows that landed in the `logs_default` catch-all partition while
+  maintenance was not running are moved into the new partition.
+- drop_expired_partitions() enforces compliance.log_retention_days from
+  policy.yaml (or LOG_RETENTION_DAYS) by dropping whole partitions whose
+  range ends before the cutoff — no DELETE scan, no table bloat, and
+  rollup counters (log_rollups) are unaffected.
+
+Time-window queries (`created_at >= since`) are pruned to the partitions
+overlapping the window, so the 24h dashboard queries touch one or two
+daily partitions.
+
+ensure_partitions() runs at startup after the migrations;
+scripts/log_retention.py runs both from cron.
+
+Environment variables
+---------------------
+LOG_PARTITION_INTERVAL  — "day" | "week" partition width (default day)
+LOG_PARTITION_PREMAKE   — future partitions kept ready (default 7)
+LOG_RETENTION_DAYS      — overrides compliance.log_retention_days
+"""
+
+import logging
+import os
+import re
+from dataclasses import dataclass
+from datetime import datetime, timedelta
+from typing import Any, List, Optional, Tuple
+
+from sqlalchemy import text
+
+from app.auth.policy_loader import load_policy
+
+logger = logging.getLogger("cyberoracle")
+
+PARENT_TABLE = "logs"
+DEFAULT_PARTITION = "logs_default"
+INTERVALS = ("day", "week")
+
+PARTITION_INTERVAL = os.getenv("LOG_PARTITION_INTERVAL", "day").lower()
+PARTITION_PREMAKE = int(os.getenv("LOG_PARTITION_PREMAKE", "7"))
+
+_BOUND_FORMAT = "%Y-%m-%d %H:%M:%S"
+_BOUND_VALUE_RE = re.compile(r"'([^']+)'|MINVALUE|MAXVALUE")
+
+
+@dataclass(frozen=True)
+class Partition:
+    name: str
+    # None for MINVALUE / MAXVALUE / the default partition
+    lower: Optional[datetime]
+    upper: Optional[datetime]
+
+
+def period_start(ts: datetime, interval: str = PARTITION_INTERVAL) -> datetime:
+    """Start of the day (or ISO week, Monday) containing `ts`."""
+    day = ts.replace(hour=0, minute=0, second=0, microsecond=0)
+    if interval == "day":
+        return day
+    if interval == "week":
+        return day - timedelta(days=day.weekday())
+    raise ValueError(f"Unsupported log partition interval '{interval}'")
+
+
+def period_end(start: datetime, interval: str = PARTITION_INTERVAL) -> datetime:
+    return start + timedelta(days=7 if interval == "week" else 1)
+
+
+def partition_name(start: datetime) -> str:
+    return f"{PARENT_TABLE}_p{start:%Y%m%d}"
+
+
+def parse_bound(
+    expr: str,
+) -> Tuple[Optional[datetime], Optional[datetime]]:
+    """
+    (lower, upper) from pg_get_expr(relpartbound) output, e.g.
+    "FOR VALUES FROM ('2026-10-18 00:00:00') TO ('2026-10-19 00:00:00')",
+    "FOR VALUES FROM (MINVALUE) TO ('...')" or "DEFAULT".
+    """
+    bounds = [
+        datetime.fromisoformat(match.group(1)) if match.group(1) else None
+        for match in _BOUND_VALUE_RE.finditer(expr)
+    ]
+    if len(bounds) != 2:
+        return None, None
+    return bounds[0], bounds[1]
+
+
+def retention_days() -> int:
+    """LOG_RETENTION_DAYS, else compliance.log_retention_days, else 90."""
+    override = os.getenv("LOG_RETENTION_DAYS")
+    if override:
+        return int(override)
+    policy = load_policy() or {}
+    return int(policy.get("compliance", {}).get("log_retention_days", 90))
+
+
+async def is_partitioned(session: Any) -> bool:
+    result = await session.execute(
+        text(
+            "SELECT 1 FROM pg_partitioned_table "
+            "WHERE partrelid = to_regclass(:table)"
+        ),
+        {"table": PARENT_TABLE},
+    )
+    return result.scalar() is not None
+
+
+async def list_partitions(session: Any) -> List[Partition]:
+    """Partitions of `logs` with their ranges, oldest first."""
+    result = await session.execute(
+        text(
+            "SELECT c.relname, pg_get_expr(c.relpartbound, c.oid) "
+            "FROM pg_inherits i JOIN pg_class c ON c.oid = i.inhrelid "
+            "WHERE i.inhparent = to_regclass(:table)"
+        ),
+        {"table": PARENT_TABLE},
+    )
+    partitions = []
+    for name, expr in result.all():
+        lower, upper = parse_bound(expr)
+        partitions.append(Partition(name=name, lower=lower, upper=upper))
+    return sorted(partitions, key=lambda p: (p.upper is None, p.upper or datetime.min))
+
+
+async def _create_partition(session: Any, start: datetime, end: datetime) -> str:
+    name = partition_name(start)
+    bounds = {
+        "start": start.strftime(_BOUND_FORMAT),
+        "end": end.strftime(_BOUND_FORMAT),
+    }
+    ddl = (
+        f"CREATE TABLE IF NOT EXISTS {name} PARTITION OF {PARENT_TABLE} "
+        f"FOR VALUES FROM ('{bounds['start']}') TO ('{bounds['end']}')"
+    )
+
+    stray = await session.execute(
+        text(
+            f"SELECT count(*) FROM {DEFAULT_PARTITION} "
+            "WHERE created_at >= :start AND created_at < :end"
+        ),
+        bounds,
+    )
+    if not stray.scalar():
+        await session.execute(text(ddl))
+        return name
+
+    # The default partition holds rows for this range; PostgreSQL refuses
+    # the new partition until they are moved out of it.
+    logger.warning(f"Moving rows for {name} out of {DEFAULT_PARTITION}")
+    await session.execute(
+        text(f"ALTER TABLE {PARENT_TABLE} DETACH PARTITION {DEFAULT_PARTITION}")
+    )
+    await session.execute(text(ddl))
+    await session.execute(
+        text(
+            f"WITH moved AS (DELETE FROM {DEFAULT_PARTITION} "
+            "WHERE created_at >= :start AND created_at < :end RETURNING *) "
+            f"INSERT INTO {PARENT_TABLE} SELECT * FROM moved"
+        ),
+        bounds,
+    )
+    await session.execute(
+        text(f"ALTER TABLE {PARENT_TABLE} ATTACH PARTITION {DEFAULT_PARTITION} DEFAULT")
+    )
+    return name
+
+
+async def ensure_partitions(
+    session: Any,
+    now: Optional[datetime] = None,
+    ahead: int = PARTITION_PREMAKE,
+    interval: str = PARTITION_INTERVAL,
+) -> List[str]:
+    """
+    Create partitions up to `ahead` periods past the current one,
+    continuing from the newest existing range. Returns the names created;
+    a no-op when `logs` is not partitioned.
+    """
+    if not await is_partitioned(session):
+        return []
+
+    now = now or datetime.utcnow()
+    horizon = period_end(period_start(now, interval), interval)
+    for _ in range(ahead):
+        horizon = period_end(horizon, interval)
+
+    ranged = [p.upper for p in await list_partitions(session) if p.upper is not None]
+    start = max(ranged) if ranged else period_start(now, interval)
+
+    created = []
+    while start < horizon:
+        # Re-align after a change of LOG_PARTITION_INTERVAL
+        end = period_end(period_start(start, interval), interval)
+        created.append(await _create_partition(session, start, end))
+        start = end
+    return created
+
+
+async def drop_expired_partitions(
+    session: Any,
+    now: Optional[datetime] = None,
+    days: Optional[int] = None,
+    dry_run: bool = False,
+) -> List[str]:
+    """
+    Drop partitions whose whole range is older than the retention period.
+    Returns the names dropped (or that would be, with `dry_run`).
+    """
+    if not await is_partitioned(session):
+        return []
+
+    days = retention_days() if days is None else days
+    cutoff = (now or datetime.utcnow()) - timedelta(days=days)
+
+    expired = [
+        p.name
+        for p in await list_partitions(session)
+        if p.upper is not None and p.upper <= cutoff
+    ]
+    if not dry_run:
+        for name in expired:
+            await session.execute(text(f"DROP TABLE IF EXISTS {name}"))
+            logger.info(f"Dropped expired log partition {name}")
+    return expired
@@ -0,0 +1,233 @@
+# app/services/log_rollups.py
+"""
+Log Rollups
+-----------
+Per-minute and per-hour counters over the logs table, keyed by
+(endpoint, event_type, policy_decision, severity, source), so dashboard
+and report queries read a few hundred rollup rows instead of scanning
+millions of audit rows.
+
+Maintenance:
+- Incremental — apply_rollups() is called in the same transaction that
+  inserts log entries (the batched audit-log writer and the inline
+  log_request() path). Each entry increments its minute AND its hour
+  bucket with an INSERT ... ON CONFLICT DO UPDATE, so both granularities
+  are always complete up to the latest write.
+- Compaction — prune_rollups() deletes minute buckets older than
+  LOG_ROLLUP_MINUTE_RETENTION_HOURS (hour buckets are kept), and
+  rebuild_rollups() recomputes a closed period from the raw logs table
+  (repair). Both are run by scripts/rollup_maintenance.py. History from
+  before the rollups were deployed is backfilled by migration
+  0007_backfill_log_rollups.
+
+Retention: drop_expired_partitions() (app/services/log_partitions.py)
+drops raw log partitions after LOG_RETENTION_DAYS, but hour buckets are
+never deleted. Once a partition is gone its counts live only in the
+rollups, so all-time totals (/api/compliance/status) keep covering it
+while the logs table does not, and a rebuild over that range would
+erase them. scripts/rollup_maintenance.py therefore never rebuilds
+before the retention cutoff.
+
+Reading: rollup_window(since, until) selects hour buckets for the whole
+hours inside the window and minute buckets for the partial hours at its
+edges, so windowed counts are exact to the minute.
+"""
+
+import os
+from collections import defaultdict
+from datetime import datetime, timedelta
+from typing import Any, Dict, Iterable, List, Optional
+
+from sqlalchemy import and_, delete, func, insert, literal, or_, select
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.sql import ColumnElement
+
+from app.models import LogEntry, LogRollup
+
+GRANULARITIES = ("minute", "hour")
+DIMENSIONS = ("endpoint", "event_type", "policy_decision", "severity", "source")
+
+# Same threshold as the raw-log "high risk" counts
+HIGH_RISK_THRESHOLD = 0.7
+
+MINUTE_RETENTION = timedelta(
+    hours=int(os.getenv("LOG_ROLLUP_MINUTE_RETENTION_HOURS", "48"))
+)
+
+
+def truncate(ts: datetime, granularity: str) -> datetime:
+    """Start of the minute or hour bucket containing `ts`."""
+    if granularity == "minute":
+        return ts.replace(second=0, microsecond=0)
+    if granularity == "hour":
+        return ts.replace(minute=0, second=0, microsecond=0)
+    raise ValueError(f"Unsupported rollup granularity '{granularity}'")
+
+
+def rollup_deltas(rows: Iterable[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    """
+    Aggregate LogEntry column dicts into rollup increments, one per
+    (granularity, bucket, dimensions). Sorted by key so concurrent
+    writers lock rollup rows in the same order.
+    """
+    totals: Dict[tuple, List[int]] = defaultdict(lambda: [0, 0])
+    for row in rows:
+        created_at = row.get("created_at") or datetime.utcnow()
+        dims = tuple(row.get(dim) or "" for dim in DIMENSIONS)
+        risk = row.get("risk_score")
+        high_risk = int(risk is not None and risk >= HIGH_RISK_THRESHOLD)
+        for granularity in GRANULARITIES:
+            counters = totals[(granularity, truncate(created_at, granularity), dims)]
+            counters[0] += 1
+            counters[1] += high_risk
+
+    return [
+        {
+            "granularity": granularity,
+            "bucket_start": bucket,
+            **dict(zip(DIMENSIONS, dims)),
+            "count": count,
+            "high_risk_count": high_risk,
+        }
+        for (granularity, bucket, dims), (count, high_risk) in sorted(totals.items())
+    ]
+
+
+async def apply_rollups(session: Any, rows: Iterable[Dict[str, Any]]) -> None:
+    """
+    Increment the rollup counters for `rows` on `session`. The caller
+    commits, so counters and log entries land in one transaction.
+    """
+    deltas = rollup_deltas(rows)
+    if not deltas:
+        return
+
+    stmt = pg_insert(LogRollup).values(deltas)
+    stmt = stmt.on_conflict_do_update(
+        constraint="uq_log_rollups_bucket_dims",
+        set_={
+            "count": LogRollup.count + stmt.excluded.count,
+            "high_risk_count": LogRollup.high_risk_count
+            + stmt.excluded.high_risk_count,
+        },
+    )
+    await session.execute(stmt)
+
+
+def _ceil_hour(ts: datetime) -> datetime:
+    floor = truncate(ts, "hour")
+    return floor if floor == ts else floor + timedelta(hours=1)
+
+
+def rollup_window(
+    since: datetime,
+    until: Optional[datetime] = None,
+    now: Optional[datetime] = None,
+) -> ColumnElement:
+    """
+    WHERE clause selecting the rollup buckets that cover [since, until].
+
+    Whole hours come from hour buckets and the partial hours at either
+    edge from minute buckets. An edge older than the minute retention is
+    widened to its full hour bucket instead, since its minute buckets may
+    already have been pruned.
+    """
+    now = now or datetime.utcnow()
+    until = until or now
+    minute_floor = now - MINUTE_RETENTION
+
+    start = truncate(since, "minute")
+    if start < minute_floor:
+        start = truncate(since, "hour")
+    first_hour = _ceil_hour(start)
+
+    end = until
+    last_hour = truncate(end, "hour")
+    if end < minute_floor:
+        last_hour = _ceil_hour(until)
+        end = last_hour - timedelta(microseconds=1)
+
+    is_minute = LogRollup.granularity == "minute"
+
+    if first_hour >= last_hour:
+        return and_(
+            is_minute,
+            LogRollup.bucket_start >= start,
+            LogRollup.bucket_start <= end,
+        )
+
+    return or_(
+        and_(
+            LogRollup.granularity == "hour",
+            LogRollup.bucket_start >= first_hour,
+            LogRollup.bucket_start < last_hour,
+        ),
+        and_(
+            is_minute,
+            LogRollup.bucket_start >= start,
+            LogRollup.bucket_start < first_hour,
+        ),
+        and_(
+            is_minute,
+            LogRollup.bucket_start >= last_hour,
+            LogRollup.bucket_start <= end,
+        ),
+    )
+
+
+async def rebuild_rollups(session: Any, since: datetime, until: datetime) -> int:
+    """
+    Recompute the rollups for [since, until) from the logs table, both
+    granularities. Bounds are widened to whole hours. Rebuild only closed
+    periods: entries written concurrently into the range would be counted
+    twice. Returns the number of rollup rows written.
+    """
+    since = truncate(since, "hour")
+    until = _ceil_hour(until)
+
+    await session.execute(
+        delete(LogRollup).where(
+            LogRollup.bucket_start >= since, LogRollup.bucket_start < until
+        )
+    )
+
+    written = 0
+    for granularity in GRANULARITIES:
+        bucket = func.date_trunc(granularity, LogEntry.created_at)
+        dims = [func.coalesce(getattr(LogEntry, dim), "") for dim in DIMENSIONS]
+        source = (
+            select(
+                literal(granularity),
+                bucket,
+                *dims,
+                func.count(),
+                func.count().filter(LogEntry.risk_score >= HIGH_RISK_THRESHOLD),
+            )
+            .where(LogEntry.created_at >= since, LogEntry.created_at < until)
+            .group_by(bucket, *dims)
+        )
+        result = await session.execute(
+            insert(LogRollup).from_select(
+                [
+                    "granularity",
+                    "bucket_start",
+                    *DIMENSIONS,
+                    "count",
+                    "high_risk_count",
+                ],
+                source,
+            )
+        )
+        written += result.rowcount or 0
+    return written
+
+
+async def prune_rollups(session: Any, now: Optional[datetime] = None) -> int:
+    """Delete minute buckets older than the minute retention."""
+    cutoff = (now or datetime.utcnow()) - MINUTE_RETENTION
+    result = await session.execute(
+        delete(LogRollup).where(
+            LogRollup.granularity == "minute", LogRollup.bucket_start < cutoff
+        )
+    )
+    return result.rowcount or 0
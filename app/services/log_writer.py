@@ -0,0 +1,259 @@
+# app/services/log_writer.py
+"""
+Audit Log Writer
+----------------
+Moves audit-log database writes off the request path. log_request()
+masks, hashes and encrypts the entry as before, then hands the finished
+row to this writer instead of opening a session and committing inline.
+
+A background task (started in the application lifespan) takes rows from
+a bounded asyncio.Queue and writes them as one multi-row INSERT per
+batch. A batch is flushed once LOG_WRITER_BATCH_SIZE rows are waiting or
+LOG_WRITER_FLUSH_MS has passed since its first row, whichever is first.
+On shutdown the queue is drained before the database engine is disposed.
+
+Overflow policy (LOG_WRITER_OVERFLOW), applied when the queue is full:
+- "inline"      — write this entry directly on the request path, like the
+                  pre-queue behaviour; nothing is lost (default).
+- "block"       — wait for queue space (backpressure on the request).
+- "drop_newest" — discard the incoming entry.
+- "drop_oldest" — discard the oldest queued entry to make room.
+Dropped entries are counted in stats() so a lossy policy is visible on
+/api/metrics/log-writer.
+
+When the writer is not running (scripts, tests, LOG_WRITER_ENABLED=false)
+log_request() writes inline.
+
+Environment variables
+---------------------
+LOG_WRITER_ENABLED        — queue audit writes (default true)
+LOG_WRITER_QUEUE_SIZE     — maximum queued rows (default 10000)
+LOG_WRITER_BATCH_SIZE     — rows per INSERT (default 200)
+LOG_WRITER_FLUSH_MS       — max time a row waits for its batch (default 200)
+LOG_WRITER_OVERFLOW       — "inline" | "block" | "drop_newest" | "drop_oldest"
+LOG_WRITER_MAX_RETRIES    — retries for a failed batch (default 3)
+LOG_WRITER_DRAIN_SECONDS  — shutdown drain timeout (default 10)
+"""
+
+import asyncio
+import logging
+import os
+import time
+from typing import Any, Dict, List, Optional
+
+from sqlalchemy import insert
+
+from app.db.db import AsyncSessionLocal
+from app.models import LogEntry
+from app.services.log_rollups import apply_rollups
+
+logger = logging.getLogger("cyberoracle")
+
+OVERFLOW_POLICIES = ("inline", "block", "drop_newest", "drop_oldest")
+
+
+class AuditLogWriter:
+    """
+    Batched, asynchronous writer for LogEntry rows.
+
+    Usage:
+        log_writer.start()                # lifespan startup
+        queued = await log_writer.enqueue(row)
+        await log_writer.stop()           # lifespan shutdown, drains the queue
+
+    `row` is a dict of LogEntry column values. enqueue() returns False when
+    the caller must write the row itself (writer stopped, or the queue is
+    full under the "inline" policy).
+    """
+
+    def __init__(
+        self,
+        queue_size: int = 10000,
+        batch_size: int = 200,
+        flush_interval_s: float = 0.2,
+        overflow: str = "inline",
+        max_retries: int = 3,
+        drain_timeout_s: float = 10.0,
+    ):
+        if overflow not in OVERFLOW_POLICIES:
+            raise ValueError(f"Unsupported log writer overflow policy '{overflow}'")
+
+        self.queue_size = max(1, queue_size)
+        self.batch_size = max(1, batch_size)
+        self.flush_interval_s = flush_interval_s
+        self.overflow = overflow
+        self.max_retries = max(0, max_retries)
+        self.drain_timeout_s = drain_timeout_s
+        self._queue: Optional[asyncio.Queue] = None
+        self._task: Optional[asyncio.Task] = None
+        self._stopping = False
+        self.enqueued = 0
+        self.written = 0
+        self.dropped = 0
+        self.inline_writes = 0
+        self.failed = 0
+        self.flushes = 0
+        self.high_watermark = 0
+        self.last_flush_rows = 0
+        self.last_flush_ms = 0.0
+
+    @property
+    def running(self) -> bool:
+        return self._task is not None and not self._stopping
+
+    @property
+    def depth(self) -> int:
+        return self._queue.qsize() if self._queue is not None else 0
+
+    def start(self) -> None:
+        """Start the background flush task on the running event loop."""
+        if self._task is not None:
+            return
+        self._queue = asyncio.Queue(maxsize=self.queue_size)
+        self._stopping = False
+        self._task = asyncio.create_task(self._run(), name="audit-log-writer")
+
+    async def stop(self) -> None:
+        """
+        Stop accepting rows and flush everything already queued. Rows
+        still queued after `drain_timeout_s` are counted as dropped.
+        """
+        if self._task is None:
+            return
+        self._stopping = True
+        try:
+            await asyncio.wait_for(self._task, self.drain_timeout_s)
+        except asyncio.TimeoutError:
+            self.dropped += self.depth
+            logger.error(
+                f"Audit log writer drain timed out; {self.depth} entries dropped"
+            )
+        finally:
+            self._task = None
+            self._queue = None
+
+    async def enqueue(self, row: Dict[str, Any]) -> bool:
+        """Queue one row for the next batch; see the class docstring."""
+        if not self.running:
+            return False
+
+        queue = self._queue
+        try:
+            queue.put_nowait(row)
+        except asyncio.QueueFull:
+            if self.overflow == "inline":
+                self.inline_writes += 1
+                return False
+            if self.overflow == "drop_newest":
+                self.dropped += 1
+                return True
+            if self.overflow == "drop_oldest":
+                queue.get_nowait()
+                self.dropped += 1
+                queue.put_nowait(row)
+            else:
+                await queue.put(row)
+
+        self.enqueued += 1
+        self.high_watermark = max(self.high_watermark, queue.qsize())
+        return True
+
+    async def _next_batch(self) -> List[Dict[str, Any]]:
+        """
+        Wait for the first row (re-checking for shutdown every flush
+        interval), then collect more until the batch is full or the
+        interval has passed.
+        """
+        loop = asyncio.get_running_loop()
+        try:
+            batch = [await asyncio.wait_for(self._queue.get(), self.flush_interval_s)]
+        except asyncio.TimeoutError:
+            return []
+
+        deadline = loop.time() + self.flush_interval_s
+        while len(batch) < self.batch_size:
+            if not self._queue.empty():
+                batch.append(self._queue.get_nowait())
+                continue
+            remaining = deadline - loop.time()
+            if remaining <= 0 or self._stopping:
+                break
+            try:
+                batch.append(await asyncio.wait_for(self._queue.get(), remaining))
+            except asyncio.TimeoutError:
+                break
+        return batch
+
+    async def _run(self) -> None:
+        while not (self._stopping and self._queue.empty()):
+            batch = await self._next_batch()
+            if batch:
+                await self._flush(batch)
+
+    async def _flush(self, batch: List[Dict[str, Any]]) -> None:
+        start = time.perf_counter()
+        for attempt in range(self.max_retries + 1):
+            try:
+                await write_batch(batch)
+                break
+            except Exception as exc:
+                if attempt == self.max_retries:
+                    self.failed += len(batch)
+                    logger.error(
+                        f"Audit log batch of {len(batch)} entries failed: "
+                        f"{type(exc).__name__}: {exc}"
+                    )
+                    return
+                await asyncio.sleep(min(0.1 * 2**attempt, 2.0))
+
+        self.written += len(batch)
+        self.flushes += 1
+        self.last_flush_rows = len(batch)
+        self.last_flush_ms = round((time.perf_counter() - start) * 1000, 2)
+
+    def stats(self) -> Dict[str, object]:
+        return {
+            "running": self.running,
+            "overflow": self.overflow,
+            "queue_depth": self.depth,
+            "queue_size": self.queue_size,
+            "high_watermark": self.high_watermark,
+            "batch_size": self.batch_size,
+            "enqueued": self.enqueued,
+            "written": self.written,
+            "flushes": self.flushes,
+            "dropped": self.dropped,
+            "inline_writes": self.inline_writes,
+            "failed": self.failed,
+            "last_flush_rows": self.last_flush_rows,
+            "last_flush_ms": self.last_flush_ms,
+        }
+
+
+async def write_batch(rows: List[Dict[str, Any]]) -> None:
+    """
+    Insert `rows` in one statement. SQLAlchemy's insertmanyvalues mode
+    renders a list of parameter sets as multi-row INSERT ... VALUES.
+    The dashboard rollup counters are updated in the same transaction.
+    """
+    async with AsyncSessionLocal() as session:
+        await session.execute(insert(LogEntry), rows)
+        await apply_rollups(session, rows)
+        await session.commit()
+
+
+def _from_env() -> AuditLogWriter:
+    return AuditLogWriter(
+        queue_size=int(os.getenv("LOG_WRITER_QUEUE_SIZE", "10000")),
+        batch_size=int(os.getenv("LOG_WRITER_BATCH_SIZE", "200")),
+        flush_interval_s=int(os.getenv("LOG_WRITER_FLUSH_MS", "200")) / 1000,
+        overflow=os.getenv("LOG_WRITER_OVERFLOW", "inline").lower(),
+        max_retries=int(os.getenv("LOG_WRITER_MAX_RETRIES", "3")),
+        drain_timeout_s=float(os.getenv("LOG_WRITER_DRAIN_SECONDS", "10")),
+    )
+
+
+LOG_WRITER_ENABLED = os.getenv("LOG_WRITER_ENABLED", "true").lower() == "true"
+
+# Process-wide writer shared by every log_request() caller
+log_writer = _from_env()
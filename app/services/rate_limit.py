@@ -0,0 +1,224 @@
+# app/services/rate_limit.py
+"""
+Rate Limit Stores
+-----------------
+Constant-memory, per-key rate limiting for RateLimitMiddleware
+(OWASP API4: Unrestricted Resource Consumption).
+
+Algorithm — GCRA (generic cell rate algorithm, a token bucket expressed as
+one timestamp per key). "limit requests per window seconds" becomes an
+emission interval T = window / limit. Each key stores only its
+theoretical arrival time (TAT). A request at `now` is allowed when
+max(TAT, now) + T - window <= now, and the TAT then advances by T. Up to
+`limit` requests can arrive back to back; after that, capacity refills
+at one request every T seconds. A decision is O(1) in time and memory,
+whereas the old design re-filtered a per-key list of timestamps on
+every request.
+
+Backends (RATE_LIMIT_BACKEND):
+- memory — in-process dict with TTL eviction. A key expires once its TAT
+           has passed, because an idle key is indistinguishable from a
+           fresh one. Expired keys are swept from the least-recently-used
+           end as new keys arrive, and RATE_LIMIT_MAX_KEYS hard-caps
+           memory under IP churn. Limits are per process.
+- redis  — shared Redis-compatible store (Redis, Valkey, KeyDB). GCRA
+           runs as one Lua script (atomic; uses the server clock, so
+           replica clock skew does not matter) on a key that expires
+           with its TAT. Limits hold across every worker and replica,
+           e.g. those started by scripts/scale_gateway.py. The `redis`
+           package is optional. If it is missing or the server is
+           unreachable, requests are limited by the in-process store,
+           per replica, instead of failing.
+
+Environment variables
+---------------------
+RATE_LIMIT_BACKEND     — memory | redis (default memory)
+RATE_LIMIT_REDIS_URL   — e.g. redis://redis:6379/0
+RATE_LIMIT_KEY_PREFIX  — Redis key prefix (default "cyberoracle:rl:")
+RATE_LIMIT_MAX_KEYS    — in-process store capacity (default 100000)
+"""
+
+import logging
+import math
+import os
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Dict, NamedTuple, Optional, Tuple
+
+logger = logging.getLogger("cyberoracle")
+
+
+class RateLimitResult(NamedTuple):
+    allowed: bool
+    # Requests still available right now after this one
+    remaining: int
+    # Seconds until the next request would be allowed (0 when allowed)
+    retry_after: float
+
+
+def gcra(
+    tat: Optional[float], now: float, limit: int, window: float
+) -> Tuple[RateLimitResult, Optional[float]]:
+    """
+    One GCRA decision. Returns (result, new TAT); the new TAT is None when
+    the request is rejected (stored state unchanged).
+    """
+    interval = window / limit
+    new_tat = max(tat or now, now) + interval
+    allow_at = new_tat - window
+    if allow_at > now:
+        return RateLimitResult(False, 0, allow_at - now), None
+    remaining = int((now - allow_at) / interval + 1e-9)
+    return RateLimitResult(True, remaining, 0.0), new_tat
+
+
+class MemoryRateLimitStore:
+    """In-process GCRA store: one float per active key, TTL + LRU eviction."""
+
+    def __init__(self, max_keys: int = 100000):
+        self.max_keys = max(1, max_keys)
+        self._tats: "OrderedDict[str, float]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.evicted = 0
+
+    async def hit(self, key: str, limit: int, window: float) -> RateLimitResult:
+        return self.hit_sync(key, limit, window)
+
+    def hit_sync(
+        self, key: str, limit: int, window: float, now: Optional[float] = None
+    ) -> RateLimitResult:
+        now = time.monotonic() if now is None else now
+        with self._lock:
+            result, new_tat = gcra(self._tats.get(key), now, limit, window)
+            if new_tat is not None:
+                self._tats[key] = new_tat
+                self._tats.move_to_end(key)
+                self._evict(now)
+            return result
+
+    def _evict(self, now: float) -> None:
+        # Least recently used first; stop at the first key still active
+        while self._tats:
+            key, tat = next(iter(self._tats.items()))
+            if tat > now and len(self._tats) <= self.max_keys:
+                break
+            self._tats.popitem(last=False)
+            self.evicted += 1
+
+    # dict-like helpers (tests reset or inspect the store)
+    def clear(self) -> None:
+        with self._lock:
+            self._tats.clear()
+
+    def __len__(self) -> int:
+        return len(self._tats)
+
+    def __contains__(self, key: str) -> bool:
+        return key in self._tats
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "backend": "memory",
+            "keys": len(self._tats),
+            "max_keys": self.max_keys,
+            "evicted": self.evicted,
+        }
+
+
+# KEYS[1] = bucket key; ARGV = interval_ms, window_ms
+# Returns {allowed, remaining, retry_after_ms}
+GCRA_LUA = """
+if redis.replicate_commands then redis.replicate_commands() end
+local interval = tonumber(ARGV[1])
+local window = tonumber(ARGV[2])
+local t = redis.call('TIME')
+local now = tonumber(t[1]) * 1000 + math.floor(tonumber(t[2]) / 1000)
+local tat = tonumber(redis.call('GET', KEYS[1]) or now)
+if tat < now then tat = now end
+local new_tat = tat + interval
+local allow_at = new_tat - window
+if allow_at > now then
+  return {0, 0, allow_at - now}
+end
+redis.call('SET', KEYS[1], new_tat, 'PX', math.max(1, new_tat - now))
+return {1, math.floor((now - allow_at) / interval), 0}
+"""
+
+
+class RedisRateLimitStore:
+    """Shared GCRA store: one Redis key per bucket, updated by a Lua script."""
+
+    def __init__(
+        self,
+        client: Any,
+        prefix: str = "cyberoracle:rl:",
+        fallback: Optional[MemoryRateLimitStore] = None,
+    ):
+        self._client = client
+        self._script = client.register_script(GCRA_LUA)
+        self.prefix = prefix
+        self.fallback = fallback or MemoryRateLimitStore()
+        self.errors = 0
+
+    @classmethod
+    def from_url(cls, url: str, **kwargs: Any) -> "RedisRateLimitStore":
+        import redis.asyncio as redis_asyncio  # optional dependency
+
+        return cls(redis_asyncio.from_url(url), **kwargs)
+
+    async def hit(self, key: str, limit: int, window: float) -> RateLimitResult:
+        interval_ms = max(1, math.ceil(window * 1000 / limit))
+        try:
+            allowed, remaining, retry_ms = await self._script(
+                keys=[self.prefix + key], args=[interval_ms, int(window * 1000)]
+            )
+        except Exception as exc:
+            # Degrade to per-replica limits rather than failing requests
+            self.errors += 1
+            if self.errors == 1 or self.errors % 1000 == 0:
+                logger.error(
+                    f"Redis rate limit store unavailable ({type(exc).__name__}); "
+                    f"using in-process limits"
+                )
+            return await self.fallback.hit(key, limit, window)
+        return RateLimitResult(bool(allowed), int(remaining), int(retry_ms) / 1000)
+
+    def clear(self) -> None:
+        self.fallback.clear()
+
+    def __len__(self) -> int:
+        return len(self.fallback)
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "backend": "redis",
+            "prefix": self.prefix,
+            "errors": self.errors,
+            "fallback": self.fallback.stats(),
+        }
+
+
+def _from_env() -> Any:
+    memory = MemoryRateLimitStore(
+        max_keys=int(os.getenv("RATE_LIMIT_MAX_KEYS", "100000"))
+    )
+    backend = os.getenv("RATE_LIMIT_BACKEND", "memory").lower()
+    if backend != "redis":
+        return memory
+    try:
+        return RedisRateLimitStore.from_url(
+            os.getenv("RATE_LIMIT_REDIS_URL", "redis://localhost:6379/0"),
+            prefix=os.getenv("RATE_LIMIT_KEY_PREFIX", "cyberoracle:rl:"),
+            fallback=memory,
+        )
+    except ImportError:
+        logger.error(
+            "RATE_LIMIT_BACKEND=redis but the `redis` package is not installed; "
+            "using in-process rate limits"
+        )
+        return memory
+
+
+# Process-wide store used by RateLimitMiddleware
+rate_limit_store = _from_env()
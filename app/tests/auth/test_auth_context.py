@@ -0,0 +1,75 @@
+"""
+Auth Context Tests
+------------------
+The bearer token is verified once per request and shared between
+RateLimitMiddleware and the RBAC dependencies; hot tokens are served
+from the verified-token cache until their own expiry.
+
+OWASP API2: Broken Authentication
+"""
+
+from fastapi.testclient import TestClient
+
+import app.auth.auth_context as auth_context
+import app.auth.rbac as rbac
+from app.auth.jwt_utils import (
+    VerifiedTokenCache,
+    create_access_token,
+    verified_tokens,
+    verify_token,
+)
+from app.main import app
+
+
+def test_token_verified_once_per_request(monkeypatch):
+    """Rate limiter and require_permission share one verification."""
+    calls = []
+
+    def counting_verify(token):
+        calls.append(token)
+        return {"sub": "test", "role": "admin"}
+
+    monkeypatch.setattr(auth_context, "verify_token", counting_verify)
+    monkeypatch.setattr(rbac, "verify_token", counting_verify)
+
+    token = create_access_token({"sub": "test", "role": "admin"})
+    response = TestClient(app).get(
+        "/logs/", headers={"Authorization": f"Bearer {token}"}
+    )
+
+    assert response.status_code != 401
+    assert calls == [token]
+
+
+def test_invalid_token_still_rejected_by_rbac():
+    response = TestClient(app).get(
+        "/logs/", headers={"Authorization": "Bearer abc.def.ghi"}
+    )
+    assert response.status_code == 401
+
+
+def test_verified_token_cache_hits_until_expiry():
+    cache = VerifiedTokenCache(max_entries=2)
+    cache.put("t1", {"sub": "a", "role": "admin", "exp": 100})
+
+    hit = cache.get("t1", now=50)
+    assert hit == {"sub": "a", "role": "admin", "exp": 100}
+    hit["role"] = "tampered"  # callers get a copy
+    assert cache.get("t1", now=99)["role"] == "admin"
+
+    assert cache.get("t1", now=100) is None
+    assert cache.stats()["entries"] == 0
+
+    for name in ("t2", "t3", "t4"):
+        cache.put(name, {"exp": 100})
+    assert cache.get("t2", now=0) is None and cache.get("t4", now=0)
+
+
+def test_verify_token_uses_cache():
+    verified_tokens.clear()
+    token = create_access_token({"sub": "svc", "role": "developer"})
+    hits = verified_tokens.hits
+
+    assert verify_token(token)["sub"] == "svc"
+    assert verify_token(token)["sub"] == "svc"
+    assert verified_tokens.hits == hits + 1
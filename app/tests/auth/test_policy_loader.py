@@ -0,0 +1,75 @@
+"""
+Policy Loader Tests
+-------------------
+policy.yaml is compiled into O(1) lookup structures and hot-reloaded
+when the file changes, keeping the last good policy on a bad edit.
+"""
+
+import os
+
+import pytest
+
+import app.auth.policy_loader as policy_loader
+
+POLICY = """
+roles:
+  admin:
+    permissions: [access_all_endpoints, view_all_logs]
+  auditor:
+    permissions: [view_all_logs]
+rate_limiting:
+  window_seconds: 30
+  requests_per_minute:
+    auditor: 50
+dlp_rules:
+  scan_tiers:
+    default: tiered
+    endpoints:
+      /api: pattern
+      /api/scan: full
+"""
+
+
+@pytest.fixture
+def policy_file(tmp_path, monkeypatch):
+    path = tmp_path / "policy.yaml"
+    path.write_text(POLICY)
+    monkeypatch.setattr(policy_loader, "POLICY_PATH", path)
+    monkeypatch.setattr(policy_loader, "POLICY_RELOAD_INTERVAL", 0)
+    monkeypatch.setattr(policy_loader, "_compiled", None)
+    monkeypatch.setattr(policy_loader, "_signature", None)
+    return path
+
+
+def test_compiled_lookups(policy_file):
+    policy = policy_loader.get_policy()
+
+    assert policy.permissions("auditor") == frozenset({"view_all_logs"})
+    assert policy.permissions("nobody") == frozenset()
+    assert policy.allows("admin", "manage_users")
+    assert not policy.allows("auditor", "manage_users")
+    assert (policy.rate_limits["auditor"], policy.rate_window) == (50, 30)
+    assert policy.scan_tier("/api/scan/file") == "full"
+    assert policy.scan_tier("/api/metrics") == "pattern"
+    assert policy.scan_tier("/ai/query") == "tiered"
+    assert policy_loader.load_policy()["rate_limiting"]["window_seconds"] == 30
+
+
+def test_reloads_on_change_and_keeps_last_good_policy(policy_file):
+    before = policy_loader.get_policy()
+    assert policy_loader.get_policy() is before  # unchanged file: same object
+
+    policy_file.write_text(POLICY.replace("[view_all_logs]", "[export_audit_trails]"))
+    os.utime(policy_file, (1, 1))
+    assert policy_loader.get_role_permissions("auditor") == {"export_audit_trails"}
+
+    current = policy_loader.get_policy()
+    policy_file.write_text("roles: [unclosed")
+    os.utime(policy_file, (2, 2))
+    assert policy_loader.get_policy() is current
+
+
+def test_first_load_failure_raises(policy_file):
+    policy_file.unlink()
+    with pytest.raises(OSError):
+        policy_loader.get_policy()
@@ -3,6 +3,7 @@ from fastapi import HTTPException
 from fastapi.security import HTTPAuthorizationCredentials
 
 import app.auth.rbac as rbac
+from app.auth.policy_loader import compile_policy
 
 # --------------------------------------------------
 # Helper for creating fake Authorization credentials
@@ -13,6 +14,12 @@ def make_credentials(token="fake_token"):
     return HTTPAuthorizationCredentials(scheme="Bearer", credentials=token)
 
 
+def grant(monkeypatch, role, permissions):
+    """Serve a compiled policy giving `role` exactly `permissions`."""
+    policy = compile_policy({"roles": {role: {"permissions": permissions}}})
+    monkeypatch.setattr(rbac, "get_policy", lambda: policy)
+
+
 # ==================================================
 # require_roles() tests
 # ==================================================
@@ -114,7 +121,7 @@ async def test_permission_missing_role(monkeypatch):
 
     monkeypatch.setattr(rbac, "verify_token", lambda token: {})
 
-    monkeypatch.setattr(rbac, "get_role_permissions", lambda role: [])
+    grant(monkeypatch, "auditor", ["logs.read"])
 
     dependency = rbac.require_permission("logs.read")
 
@@ -130,7 +137,7 @@ async def test_permission_denied(monkeypatch):
 
     monkeypatch.setattr(rbac, "verify_token", lambda token: {"role": "auditor"})
 
-    monkeypatch.setattr(rbac, "get_role_permissions", lambda role: ["logs.read"])
+    grant(monkeypatch, "auditor", ["logs.read"])
 
     dependency = rbac.require_permission("documents.scan")
 
@@ -146,7 +153,7 @@ async def test_permission_allowed(monkeypatch):
 
     monkeypatch.setattr(rbac, "verify_token", lambda token: {"role": "developer"})
 
-    monkeypatch.setattr(rbac, "get_role_permissions", lambda role: ["documents.scan"])
+    grant(monkeypatch, "developer", ["documents.scan"])
 
     dependency = rbac.require_permission("documents.scan")
 
@@ -161,12 +168,25 @@ async def test_admin_override(monkeypatch):
 
     monkeypatch.setattr(rbac, "verify_token", lambda token: {"role": "admin"})
 
-    monkeypatch.setattr(
-        rbac, "get_role_permissions", lambda role: ["access_all_endpoints"]
-    )
+    grant(monkeypatch, "admin", ["access_all_endpoints"])
 
     dependency = rbac.require_permission("any_permission")
 
     result = await dependency(credentials=make_credentials())
 
     assert result["role"] == "admin"
+
+
+@pytest.mark.asyncio
+async def test_permission_checked_against_policy_file(monkeypatch):
+    """Without a patched policy, docs/threat-modeling/policy.yaml decides"""
+
+    monkeypatch.setattr(rbac, "verify_token", lambda token: {"role": "auditor"})
+
+    allowed = rbac.require_permission("export_audit_trails")
+    assert (await allowed(credentials=make_credentials()))["role"] == "auditor"
+
+    denied = rbac.require_permission("modify_policies")
+    with pytest.raises(HTTPException) as exc:
+        await denied(credentials=make_credentials())
+    assert exc.value.status_code == 403
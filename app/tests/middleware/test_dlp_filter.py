@@ -4,7 +4,8 @@ DLP Filter Middleware Tests
 Tests for the DLP sanitization helper functions.
 """
 
-from app.middleware.dlp_filter import _sanitize_value
+from app.middleware.dlp_filter import _sanitize_body, _sanitize_value
+from app.services.dlp_engine import PolicyDecision
 
 
 def test_sanitize_string_with_ssn():
@@ -60,3 +61,94 @@ def test_sanitize_nested_dict():
     payload = {"user": {"email": "test@example.com"}}
     result = _sanitize_value(payload, detected)
     assert isinstance(result, dict)
+
+
+def test_lookalike_field_cannot_downgrade_a_blocked_scan():
+    """A field equal to another field's redacted text keeps the BLOCK scan."""
+    prompt = "card 4111 1111 1111 1111 and ssn 123-45-6789"
+    alone, _, alone_scans = _sanitize_body({"prompt": prompt})
+    redacted = alone["prompt"]
+    assert alone_scans[redacted].decision.decision == PolicyDecision.BLOCK
+
+    for body in (
+        {"prompt": prompt, "decoy": redacted},
+        {"decoy": redacted, "prompt": prompt},
+    ):
+        sanitized, _, scans = _sanitize_body(body)
+        assert sanitized["prompt"] == sanitized["decoy"] == redacted
+        scan = scans[redacted]
+        assert scan.decision.decision == PolicyDecision.BLOCK
+        assert {f.type for f in scan.findings} == {
+            f.type for f in alone_scans[redacted].findings
+        }
+
+
+# --------------------------------------------------
+# ASGI middleware
+# --------------------------------------------------
+
+
+def _run(body, content_type=b"application/json", max_body_bytes=None):
+    """Drive DLPFilterMiddleware; returns (forwarded body, state, sent, reads)."""
+    import asyncio
+
+    from app.middleware.dlp_filter import DLPFilterMiddleware
+
+    reads = []
+    sent = []
+    seen = {}
+
+    async def receive():
+        reads.append(1)
+        return {"type": "http.request", "body": body, "more_body": False}
+
+    async def send(message):
+        sent.append(message)
+
+    async def downstream(scope, receive, send):
+        seen["state"] = scope["state"]
+        seen["headers"] = dict(scope["headers"])
+        seen["body"] = (await receive())["body"]
+
+    headers = [(b"content-length", str(len(body)).encode())]
+    if content_type:
+        headers.append((b"content-type", content_type))
+    scope = {"type": "http", "method": "POST", "path": "/ai/query", "headers": headers}
+
+    middleware = DLPFilterMiddleware(downstream, max_body_bytes=max_body_bytes)
+    asyncio.run(middleware(scope, receive, send))
+    return seen, sent, reads
+
+
+def test_asgi_rewrites_only_changed_values():
+    body = b'{"ssn":  "123-45-6789",\n "note": "ok", "123-45-6789": 1}'
+    seen, _, _ = _run(body)
+
+    forwarded = seen["body"]
+    assert b"123-45-6789" not in forwarded.split(b",\n")[0]
+    # Formatting, keys and untouched values are preserved byte for byte
+    assert forwarded.startswith(b'{"ssn":  "')
+    assert forwarded.endswith(b',\n "note": "ok", "123-45-6789": 1}')
+    assert seen["headers"][b"content-length"] == str(len(forwarded)).encode()
+    assert seen["state"]["dlp_detected"]
+
+
+def test_asgi_clean_body_forwarded_unchanged():
+    body = b'{"prompt": "hello world"}'
+    seen, _, _ = _run(body)
+    assert seen["body"] == body
+    assert seen["state"]["dlp_policy_decision"] == "allow"
+
+
+def test_asgi_skips_non_json_without_buffering():
+    body = b"--boundary\r\n123-45-6789\r\n--boundary--"
+    seen, _, reads = _run(body, content_type=b"multipart/form-data; boundary=b")
+    assert reads == [1]  # only the downstream app read the body
+    assert seen["body"] == body
+    assert not seen["state"]["dlp_detected"]
+
+
+def test_asgi_rejects_oversized_body():
+    seen, sent, reads = _run(b'{"prompt": "' + b"x" * 100 + b'"}', max_body_bytes=50)
+    assert not seen and not reads
+    assert sent[0]["status"] == 413
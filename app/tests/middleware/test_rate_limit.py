@@ -59,6 +59,8 @@ def test_rate_limit_blocks_on_exceeded():
     response = client.get("/logs/", headers=headers)
     assert response.status_code == 429
     assert "Rate limit exceeded" in response.json()["detail"]
+    # 5 requests per 60s refill one every 12s
+    assert 1 <= int(response.headers["Retry-After"]) <= 12
 
 
 def test_rate_limit_response_contains_detail():
@@ -93,3 +95,28 @@ def test_rate_limit_tracks_per_ip():
         client.get("/logs/", headers=headers)
 
     assert len(requests_log) > 0
+
+
+def test_exempt_paths_and_preflight_bypass_the_store():
+    """
+    Exempt paths and OPTIONS are passed through on the raw ASGI scope
+    without creating a bucket.
+    """
+    for _ in range(10):
+        client.get("/health")
+        client.options("/logs/")
+
+    assert len(requests_log) == 0
+
+
+def test_role_limits_come_from_policy_file():
+    """
+    Outside test mode the per-role limits are policy.yaml's
+    rate_limiting.requests_per_minute, not the ROLE_LIMITS fallback.
+    """
+    from app.middleware.rate_limiter import DEFAULT_LIMIT, _limits_for
+
+    assert _limits_for("admin") == (1000, 60)
+    assert _limits_for("developer") == (100, 60)
+    assert _limits_for("auditor") == (50, 60)
+    assert _limits_for(None) == (DEFAULT_LIMIT, 60)
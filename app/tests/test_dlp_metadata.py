@@ -4,46 +4,57 @@ Test script to verify DLP metadata is correctly passed from middleware to routes
 """
 
 import asyncio
-from unittest.mock import AsyncMock, Mock
+import json
+
 from app.middleware.dlp_filter import DLPFilterMiddleware
-from app.main import app
 
 
 # Test the middleware behavior
 async def test_dlp_middleware_metadata():
     """Test that middleware correctly sets DLP metadata on request.state"""
 
-    # Create a mock request with sensitive data
-    request = Mock()
-    request.method = "POST"
-    request.json = Mock(return_value={"prompt": "My SSN is 123-45-6789"})
-    request._body = b'{"prompt": "My SSN is 123-45-6789"}'
+    # An HTTP scope carrying sensitive data
+    body = b'{"prompt": "My SSN is 123-45-6789"}'
+    scope = {
+        "type": "http",
+        "method": "POST",
+        "path": "/ai/query",
+        "headers": [(b"content-type", b"application/json")],
+    }
+
+    async def receive():
+        return {"type": "http.request", "body": body, "more_body": False}
 
-    # Mock the call_next function
-    call_next = AsyncMock()
-    call_next.return_value = Mock()
+    # Downstream app records what it was handed
+    seen = {}
+
+    async def downstream(scope, receive, send):
+        seen["state"] = scope["state"]
+        seen["body"] = (await receive())["body"]
 
     # Create middleware instance
-    middleware = DLPFilterMiddleware(app)
+    middleware = DLPFilterMiddleware(downstream)
 
     # Test that middleware sets the DLP metadata
-    await middleware.dispatch(request, call_next)
-
-    # Check that metadata was set
-    assert hasattr(request.state, "dlp_detected")
-    assert hasattr(request.state, "dlp_entities")
-    assert hasattr(request.state, "dlp_redacted")
-    assert hasattr(request.state, "dlp_policy_decision")
-    assert hasattr(request.state, "dlp_risk_score")
-    assert hasattr(request.state, "dlp_severity")
+    await middleware(scope, receive, None)
+
+    # Check that metadata was set (request.state is backed by scope["state"])
+    state = seen["state"]
+    for key in (
+        "dlp_detected",
+        "dlp_entities",
+        "dlp_redacted",
+        "dlp_policy_decision",
+        "dlp_risk_score",
+        "dlp_severity",
+    ):
+        assert key in state
+    assert state["dlp_detected"]
+    assert "123-45-6789" not in json.loads(seen["body"])["prompt"]
 
     print("✅ DLP middleware correctly sets metadata on request.state")
-    print(f"dlp_detected: {request.state.dlp_detected}")
-    print(f"dlp_entities: {request.state.dlp_entities}")
-    print(f"dlp_redacted: {request.state.dlp_redacted}")
-    print(f"dlp_policy_decision: {request.state.dlp_policy_decision}")
-    print(f"dlp_risk_score: {request.state.dlp_risk_score}")
-    print(f"dlp_severity: {request.state.dlp_severity}")
+    for key, value in state.items():
+        print(f"{key}: {value}")
 
 
 if __name__ == "__main__":
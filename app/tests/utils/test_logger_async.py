@@ -98,3 +98,27 @@ def test_mask_sensitive_integer():
 def test_secure_log_masks_before_logging():
     """secure_log should not raise with sensitive content."""
     secure_log("user password=mysecret123 logged in")
+
+
+@pytest.mark.asyncio
+async def test_log_request_queues_when_writer_running():
+    """With the background writer running, log_request must not open a session."""
+    enqueue = AsyncMock(return_value=True)
+    session_factory = MagicMock()
+
+    with patch.dict(os.environ, {"PYTEST": ""}), patch(
+        "app.utils.logger.log_writer.enqueue", enqueue
+    ), patch("app.utils.logger.AsyncSessionLocal", session_factory):
+        from app.utils.logger import log_request
+
+        await log_request(
+            endpoint="/test",
+            method="POST",
+            status_code=200,
+            message="password=secret123",
+        )
+
+    row = enqueue.call_args.args[0]
+    assert "secret123" not in row["message"]
+    assert row["integrity_hash"] and row["created_at"]
+    session_factory.assert_not_called()
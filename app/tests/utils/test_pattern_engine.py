@@ -0,0 +1,94 @@
+"""
+Pattern Engine Tests
+--------------------
+Tests for the single-pass multi-pattern regex engine shared by
+dlp_regex.scan_text, logger.mask_sensitive and the document sanitizer.
+OWASP-ASVS 9.1.1
+"""
+
+import random
+import re
+
+import pytest
+
+from app.utils.pattern_engine import MultiPatternEngine
+
+PATTERNS = {
+    "ssn": r"\b\d{3}-\d{2}-\d{4}\b",
+    "phone": r"\b\d{3}-\d{3}-\d{4}\b",
+    "digits": r"\d{4,}",
+    "email": r"[a-z]+@[a-z]+\.com",
+}
+
+
+def _alternation_spans(text):
+    """Reference semantics: one alternation with a named group per pattern."""
+    union = re.compile("|".join(f"(?P<{n}>{p})" for n, p in PATTERNS.items()))
+    return [(m.lastgroup, m.start(), m.end()) for m in union.finditer(text)]
+
+
+def test_scan_returns_spans_counts_and_redaction():
+    engine = MultiPatternEngine(PATTERNS, backend="re")
+    result = engine.scan("ssn 123-45-6789, mail bob@example.com, id 98765")
+
+    assert result.redacted_text == "ssn <SSN>, mail <EMAIL>, id <DIGITS>"
+    assert result.counts == {"ssn": 1, "digits": 1, "email": 1}
+    assert result.detected == ["ssn", "digits", "email"]
+    assert [s[0] for s in result.spans] == ["ssn", "email", "digits"]
+
+
+def test_declaration_order_breaks_ties_at_same_offset():
+    engine = MultiPatternEngine(PATTERNS, backend="re")
+    # "digits" could match 5551234567 inside the phone number, but phone
+    # starts at the same offset and is declared first.
+    assert engine.scan("call 555-123-4567").spans == [("phone", 5, 17)]
+
+
+def test_leftmost_match_wins_over_declaration_order():
+    engine = MultiPatternEngine(PATTERNS, backend="re")
+    # "digits" starts before "ssn" could, so it consumes the overlap
+    result = engine.scan("12345-67-8901")
+    assert result.spans[0] == ("digits", 0, 5)
+    assert "ssn" not in result.counts
+
+
+def test_matches_single_alternation_semantics():
+    engine = MultiPatternEngine(PATTERNS, backend="re")
+    rng = random.Random(7)
+    alphabet = "0123456789- abc@.com"
+    for _ in range(500):
+        text = "".join(rng.choice(alphabet) for _ in range(rng.randint(0, 60)))
+        assert engine.spans(text) == _alternation_spans(text)
+
+
+def test_placeholder_and_flags():
+    engine = MultiPatternEngine(
+        {"password": r"password=\S+"},
+        placeholder="***{}_MASKED***",
+        flags=re.IGNORECASE,
+        backend="re",
+    )
+    assert engine.redact("PASSWORD=hunter2 ok") == "***PASSWORD_MASKED*** ok"
+
+
+def test_empty_and_clean_text():
+    engine = MultiPatternEngine(PATTERNS, backend="re")
+    assert engine.scan("").redacted_text == ""
+    clean = engine.scan("nothing to see here")
+    assert clean.redacted_text == "nothing to see here"
+    assert clean.spans == [] and clean.counts == {}
+
+
+def test_invalid_backend_rejected():
+    with pytest.raises(ValueError):
+        MultiPatternEngine(PATTERNS, backend="pcre")
+
+
+def test_hyperscan_prefilter_gives_identical_results():
+    pytest.importorskip("hyperscan")
+    fast = MultiPatternEngine(PATTERNS, backend="hyperscan")
+    slow = MultiPatternEngine(PATTERNS, backend="re")
+    assert fast.backend == "hyperscan"
+
+    for text in ("clean text", "ssn 123-45-6789 bob@example.com", "é 98765"):
+        assert fast.scan(text) == slow.scan(text)
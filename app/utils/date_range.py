@@ -0,0 +1,55 @@
+"""
+Report Date Ranges
+------------------
+Shared parsing of the `start_date` / `end_date` query parameters used by
+the reports and log export endpoints, so both select the same rows for
+the same inputs.
+
+Input validation applied to date parameters to prevent injection.
+OWASP API3: Broken Object Property Level Authorization
+"""
+
+import re
+from datetime import datetime, timedelta
+from typing import Optional, Tuple
+
+# Strict date format: YYYY-MM-DD only
+# OWASP API3: Prevents injection via malformed date parameters
+DATE_PATTERN = re.compile(r"^\d{4}-\d{2}-\d{2}$")
+
+
+def parse_date(
+    date_str: Optional[str], default: Optional[datetime]
+) -> Optional[datetime]:
+    """
+    Parse and validate a date string in YYYY-MM-DD format.
+    Returns default if input is None, empty, or malformed.
+    Strict regex check applied before strptime to prevent injection.
+    """
+    if not date_str:
+        return default
+    if not DATE_PATTERN.match(date_str):
+        return default
+    try:
+        return datetime.strptime(date_str, "%Y-%m-%d")
+    except ValueError:
+        return default
+
+
+def date_range(
+    start_date: Optional[str],
+    end_date: Optional[str],
+    default_days: int = 7,
+) -> Tuple[datetime, datetime]:
+    """
+    (since, until) for a report: start_date defaults to `default_days`
+    ago, end_date to now, and an explicit end_date includes its full day.
+    """
+    now = datetime.utcnow()
+    since = parse_date(start_date, now - timedelta(days=default_days))
+    until = parse_date(end_date, now)
+
+    # Include the full end day
+    if end_date and DATE_PATTERN.match(end_date):
+        until = until.replace(hour=23, minute=59, second=59)
+    return since, until
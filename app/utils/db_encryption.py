@@ -12,12 +12,33 @@ Goals for CyberOracle:
 We use Fernet (symmetric AES-based encryption) from the `cryptography`
 package. Ciphertexts are base64-encoded strings that fit in normal TEXT
 columns in Postgres.
+
+Key rotation: new values are always encrypted with the current key
+(DB_ENCRYPTION_KEY, version DB_ENCRYPTION_KEY_ID, recorded in
+logs.key_id). Retired keys listed in DB_ENCRYPTION_PREVIOUS_KEYS stay
+usable for decryption, so old and new keys coexist while
+scripts/key_rotation.py re-encrypts rows in the background.
+
+Reads: decrypt_value(value, key_id) goes straight to the key version the
+row was written with. Only rows without a recorded version (written
+before logs.key_id existed) fall back to trying the ordered keyring
+(MultiFernet, current key first). Values that are not Fernet tokens at
+all (legacy plaintext) are recognised by their prefix and returned
+without any decryption attempt.
+
+Decrypted-message cache: dashboards re-read the same recent rows on
+every refresh, so decryptions are memoized in a bounded in-process LRU
+keyed by (ciphertext, key version) — DB_DECRYPT_CACHE_SIZE entries
+(default 10000, 0 disables). Values are the already-masked log
+messages; tokens longer than DB_DECRYPT_CACHE_MAX_CHARS are not cached.
+The cache lives and dies with the process (and its keys).
 """
 
+import functools
 import os
-from typing import Optional
+from typing import Any, Dict, List, Optional, Tuple
 
-from cryptography.fernet import Fernet, InvalidToken
+from cryptography.fernet import Fernet, InvalidToken, MultiFernet
 
 # -------------------------------------------------------------------------
 # Configuration (loaded from environment)
@@ -33,8 +54,41 @@ _ENCRYPTION_KEY = os.getenv("DB_ENCRYPTION_KEY")
 # Logical key identifier (for future key rotation, e.g. "v1", "v2").
 _ENCRYPTION_KEY_ID = os.getenv("DB_ENCRYPTION_KEY_ID", "v1")
 
+# Retired keys still needed to read rows that have not been re-encrypted
+# yet, newest first: "v2:<key>,v1:<key>".
+_PREVIOUS_KEYS = os.getenv("DB_ENCRYPTION_PREVIOUS_KEYS", "")
+
+# Decrypted-message LRU (entries; 0 disables) and largest token cached
+_DECRYPT_CACHE_SIZE = int(os.getenv("DB_DECRYPT_CACHE_SIZE", "10000"))
+_DECRYPT_CACHE_MAX_CHARS = int(os.getenv("DB_DECRYPT_CACHE_MAX_CHARS", "8192"))
+
+# Every Fernet token starts with this (version byte 0x80 + timestamp)
+_TOKEN_PREFIX = "gAAAAA"
+
 _fernet: Optional[Fernet] = None
 
+
+def parse_previous_keys(value: str) -> List[Tuple[str, Fernet]]:
+    """
+    Parse a DB_ENCRYPTION_PREVIOUS_KEYS string into (key_id, Fernet) pairs.
+    Raises ValueError on a malformed entry or key.
+    """
+    keys = []
+    for item in filter(None, (part.strip() for part in value.split(","))):
+        key_id, sep, key = item.partition(":")
+        if not sep or not key_id or not key:
+            raise ValueError("expected <key_id>:<key>")
+        keys.append((key_id, Fernet(key.encode("utf-8"))))
+    return keys
+
+
+try:
+    _previous_fernets = parse_previous_keys(_PREVIOUS_KEYS)
+except ValueError:
+    # Same policy as an invalid current key: do not crash the app; rows
+    # under retired keys are returned as stored until this is fixed.
+    _previous_fernets = []
+
 if _ENCRYPTION_ENABLED and _ENCRYPTION_KEY:
     try:
         # Expect a Fernet-compatible key (url-safe base64).
@@ -72,6 +126,23 @@ def get_key_id() -> str:
     return _ENCRYPTION_KEY_ID
 
 
+def previous_key_ids() -> List[str]:
+    """Versions of the retired keys still accepted for decryption."""
+    return [key_id for key_id, _ in _previous_fernets]
+
+
+def _keys() -> Dict[str, Fernet]:
+    """Key version → key: the current key and every retired key."""
+    assert _fernet is not None
+    return {**dict(_previous_fernets), _ENCRYPTION_KEY_ID: _fernet}
+
+
+def _keyring() -> MultiFernet:
+    # Current key first: MultiFernet tries keys in order
+    assert _fernet is not None
+    return MultiFernet([_fernet] + [fernet for _, fernet in _previous_fernets])
+
+
 def encrypt_value(value: Optional[str]) -> Optional[str]:
     """
     Encrypt a string value if encryption is enabled.
@@ -97,13 +168,40 @@ def encrypt_value(value: Optional[str]) -> Optional[str]:
     return token.decode("utf-8")
 
 
-def decrypt_value(value: Optional[str]) -> Optional[str]:
+def _decrypt(value: str, key_id: Optional[str]) -> str:
+    try:
+        if key_id is None:
+            # Version unknown (row predates logs.key_id): try the keyring
+            plain = _keyring().decrypt(value.encode("utf-8"))
+        else:
+            fernet = _keys().get(key_id)
+            if fernet is None:
+                # Key retired and no longer configured
+                return value
+            plain = fernet.decrypt(value.encode("utf-8"))
+        return plain.decode("utf-8")
+    except (InvalidToken, ValueError, TypeError):
+        # Either this was not encrypted with any configured key, or it is
+        # simply a legacy plaintext value. In both cases we safely
+        # return the original input.
+        return value
+
+
+_decrypt_cached = functools.lru_cache(maxsize=_DECRYPT_CACHE_SIZE)(_decrypt)
+
+
+def decrypt_value(value: Optional[str], key_id: Optional[str] = None) -> Optional[str]:
     """
     Attempt to decrypt a string value if encryption is enabled.
 
+    `key_id` is the key version recorded with the value (logs.key_id);
+    pass it so the matching key is used directly. Without it every
+    configured key is tried, current first.
+
     Behavior:
     - If encryption is disabled -> returns the input unchanged.
-    - If the value is valid ciphertext -> returns decrypted plaintext.
+    - If the value is valid ciphertext under the current key or a retired
+      key in DB_ENCRYPTION_PREVIOUS_KEYS -> returns decrypted plaintext.
     - If the value is not decryptable (e.g. old plaintext from before
       encryption was enabled, or encrypted with a different key) ->
       returns the input unchanged instead of raising an error.
@@ -117,12 +215,26 @@ def decrypt_value(value: Optional[str]) -> Optional[str]:
     if not is_encryption_enabled():
         return value
 
-    assert _fernet is not None
-    try:
-        plain = _fernet.decrypt(value.encode("utf-8"))
-        return plain.decode("utf-8")
-    except (InvalidToken, ValueError, TypeError):
-        # Either this was not encrypted with the current key, or it is
-        # simply a legacy plaintext value. In both cases we safely
-        # return the original input.
+    if not value.startswith(_TOKEN_PREFIX):
+        # Plaintext: no key could decrypt it, skip the failing attempts
         return value
+
+    if len(value) > _DECRYPT_CACHE_MAX_CHARS:
+        return _decrypt(value, key_id)
+    return _decrypt_cached(value, key_id)
+
+
+def decrypt_cache_info() -> Dict[str, Any]:
+    """Hit/miss counters of the decrypted-message cache (for ISCM status)."""
+    info = _decrypt_cached.cache_info()
+    return {
+        "hits": info.hits,
+        "misses": info.misses,
+        "entries": info.currsize,
+        "max_entries": info.maxsize,
+    }
+
+
+def clear_decrypt_cache() -> None:
+    """Drop cached plaintext, e.g. after the keyring changes."""
+    _decrypt_cached.cache_clear()
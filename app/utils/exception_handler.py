@@ -48,3 +48,21 @@ async def secure_exception_handler(request: Request, exc: Exception) -> JSONResp
         status_code=500,
         content={"detail": "Internal server error. Reference logged."},
     )
+
+
+async def dlp_unavailable_handler(request: Request, exc: Exception) -> JSONResponse:
+    """
+    Maps DLP executor saturation / timeouts to HTTP 503.
+
+    Requests are never forwarded unscanned — the gateway fails closed and
+    asks the client to retry once the DLP pool has capacity again.
+    """
+    logger.warning(
+        f"DLP unavailable on {request.method} {request.url.path} — "
+        f"{type(exc).__name__}: {exc}"
+    )
+    return JSONResponse(
+        status_code=503,
+        content={"detail": "DLP scanner is busy. Please retry shortly."},
+        headers={"Retry-After": "1"},
+    )
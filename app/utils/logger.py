@@ -15,11 +15,15 @@ import os
 import hashlib
 import logging
 import re
+from datetime import datetime
 from typing import Optional
 
 from app.db.db import AsyncSessionLocal
 from app.models import LogEntry
-from app.utils.db_encryption import encrypt_value
+from app.services.log_rollups import apply_rollups
+from app.services.log_writer import log_writer
+from app.utils.db_encryption import encrypt_value, get_key_id, is_encryption_enabled
+from app.utils.pattern_engine import build_engine
 
 # ------------------------------
 # Configure secure application logger
@@ -53,10 +57,18 @@ SENSITIVE_PATTERNS = {
     ),
     # Email addresses
     "email": r"[A-Za-z0-9._%+-]+@[A-Za-z0-9.-]+\.[A-Za-z]{2,}",
-    # Authorization headers
-    "authorization": r"(?i)authorization['\"]?\s*[:=]\s*['\"]?[^\s,'\"\}&]+",
+    # Authorization headers, including the credential after a scheme
+    "authorization": (
+        r"(?i)authorization['\"]?\s*[:=]\s*['\"]?"
+        r"(?:(?:bearer|basic|token)\s+)?[^\s,'\"\}&]+"
+    ),
 }
 
+# Single-pass engine over SENSITIVE_PATTERNS (runs on every log write)
+_MASK_ENGINE = build_engine(
+    SENSITIVE_PATTERNS, placeholder="***{}_MASKED***", flags=re.IGNORECASE
+)
+
 
 def mask_sensitive(text: str) -> str:
     """
@@ -85,15 +97,7 @@ def mask_sensitive(text: str) -> str:
     if not isinstance(text, str):
         return str(text) if text is not None else ""
 
-    masked = text
-    for label, pattern in SENSITIVE_PATTERNS.items():
-        masked = re.sub(
-            pattern,
-            f"***{label.upper()}_MASKED***",
-            masked,
-            flags=re.IGNORECASE,
-        )
-    return masked
+    return _MASK_ENGINE.redact(text)
 
 
 def secure_log(message: str) -> None:
@@ -163,6 +167,11 @@ async def log_request(
     """
     Store structured log entries asynchronously in the database.
 
+    The finished row is queued for the batched background writer
+    (app/services/log_writer.py) so the INSERT is off the request path;
+    it is written inline only when the writer is not running or its
+    queue is full under the "inline" overflow policy.
+
     Applies mask_sensitive() as a final safety net before storage,
     computes an integrity hash for tamper-evidence detection,
     and encrypts the message field with Fernet when
@@ -188,6 +197,8 @@ async def log_request(
 
     # Encrypt the masked message before DB storage
     stored_message = encrypt_value(safe_message) if safe_message else safe_message
+    # Record which key version encrypted it (NULL = stored as plaintext)
+    key_id = get_key_id() if safe_message and is_encryption_enabled() else None
 
     frameworks_str = ", ".join(frameworks) if frameworks else None
 
@@ -226,6 +237,29 @@ async def log_request(
         print("[log_request] PYTEST=1 detected, skipping DB log", flush=True)
         return
 
+    row = dict(
+        endpoint=endpoint,
+        method=method,
+        status_code=status_code,
+        message=stored_message,
+        event_type=event_type,
+        frameworks=frameworks_str,
+        decision=decision,
+        severity=severity,
+        risk_score=risk_score,
+        source=source,
+        policy_decision=policy_decision,
+        integrity_hash=integrity_hash,
+        key_id=key_id,
+        # Stamp at request time, not when the background writer flushes
+        created_at=datetime.utcnow(),
+    )
+
+    # Hand the row to the batched background writer when it is running;
+    # otherwise (scripts, queue full under the "inline" policy) write here.
+    if await log_writer.enqueue(row):
+        return
+
     try:
         print(
             f"[log_request] inserting endpoint={endpoint} "
@@ -235,21 +269,8 @@ async def log_request(
         )
 
         async with AsyncSessionLocal() as session:
-            entry = LogEntry(
-                endpoint=endpoint,
-                method=method,
-                status_code=status_code,
-                message=stored_message,
-                event_type=event_type,
-                frameworks=frameworks_str,
-                decision=decision,
-                severity=severity,
-                risk_score=risk_score,
-                source=source,
-                policy_decision=policy_decision,
-                integrity_hash=integrity_hash,
-            )
-            session.add(entry)
+            session.add(LogEntry(**row))
+            await apply_rollups(session, [row])
             await session.commit()
             print("[log_request] DB commit successful", flush=True)
 
@@ -0,0 +1,48 @@
+"""
+Keyset Pagination Cursors
+-------------------------
+Opaque cursors for lists ordered by (created_at DESC, id DESC).
+
+A cursor encodes the sort key of the last row of a page; the next page
+is the rows strictly after it in that order, which an index on
+(created_at, id) serves directly, so page 1000 costs the same as page 1
+(OFFSET would walk and discard every preceding row).
+
+The cursor is base64url text, not a signed token: it only positions a
+query the caller is already authorized to run. Malformed cursors raise
+ValueError, which routes turn into a 400 (OWASP API8: never trust
+client-supplied state). That includes values the query could not bind:
+a timezone-aware timestamp (logs.created_at is naive UTC) or an id
+outside the range of the INTEGER logs.id column.
+"""
+
+import base64
+import binascii
+from datetime import datetime
+from typing import Tuple
+
+# Comfortably above the encoding of an isoformat timestamp and a 64-bit id
+MAX_CURSOR_LENGTH = 96
+
+# logs.id is a 32-bit INTEGER; asyncpg rejects larger bound values
+MAX_ROW_ID = 2**31 - 1
+
+
+def encode_cursor(created_at: datetime, row_id: int) -> str:
+    raw = f"{created_at.isoformat()}|{row_id}".encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str) -> Tuple[datetime, int]:
+    """Return (created_at, id); ValueError if `cursor` is not one of ours."""
+    if not cursor or len(cursor) > MAX_CURSOR_LENGTH:
+        raise ValueError("invalid cursor")
+    try:
+        raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4)).decode()
+        created_at, row_id = raw.split("|")
+        created_at, row_id = datetime.fromisoformat(created_at), int(row_id)
+    except (binascii.Error, UnicodeDecodeError, ValueError):
+        raise ValueError("invalid cursor") from None
+    if created_at.tzinfo is not None or not 1 <= row_id <= MAX_ROW_ID:
+        raise ValueError("invalid cursor")
+    return created_at, row_id
@@ -0,0 +1,220 @@
+"""
+Multi-Pattern Regex Engine
+==========================
+Precompiled, single-pass matcher shared by every regex-based masking path:
+
+- app/middleware/dlp_regex.scan_text      (document / red-team DLP)
+- app/utils/logger.mask_sensitive         (every log write)
+- app/routes/documents._count_findings    (redaction breakdown)
+
+Every pattern is compiled once and the text is walked once, left to
+right, instead of once per pattern for findall(), again for sub(), and
+again after each substitution. One scan yields the spans, the
+per-pattern counts and the redacted text together.
+
+Match semantics are those of a single alternation of all patterns: the
+leftmost match wins; when several patterns match at the same offset, the
+one declared first wins. Matches never overlap, so each sensitive value
+is replaced by exactly one placeholder.
+
+CPython's `re` has no multi-pattern automaton: a literal "a|b|c" union
+tries every branch at every offset and loses each pattern's own prefix
+scan, which measured slower than the separate passes. The `re` backend
+therefore keeps one compiled cursor per pattern and merges them (k-way),
+only re-searching a pattern when the previous match jumped past it.
+
+Backends (DLP_REGEX_BACKEND):
+- "auto"      — add a Hyperscan prefilter when the `hyperscan` package is
+                installed and accepts every pattern (default).
+- "re"        — Python `re` alternation only.
+- "hyperscan" — same as "auto"; falls back to `re` if unavailable.
+
+Hyperscan is used as a SIMD "could anything match?" gate in prefilter
+mode: clean text (the common case for log lines) returns without entering
+the Python regex engine at all, and any hit is re-scanned with `re`, so
+spans and redactions are identical on both backends. Hyperscan works on
+bytes, so the gate is only applied to ASCII input.
+
+OWASP-ASVS 9.1.1: masking is applied as a final safety net before any
+value reaches log output or storage.
+"""
+
+import logging
+import os
+import re
+from dataclasses import dataclass, field
+from typing import Dict, List, Tuple
+
+try:  # Optional accelerator
+    import hyperscan  # type: ignore
+except ImportError:  # pragma: no cover - depends on the environment
+    hyperscan = None
+
+logger = logging.getLogger("cyberoracle")
+
+# (pattern_name, start, end)
+PatternSpan = Tuple[str, int, int]
+
+
+@dataclass
+class PatternScanResult:
+    """
+    Outcome of a single pass over one text.
+
+    counts follows the engine's pattern order, so `detected` keeps the
+    same ordering callers saw when patterns were applied one by one.
+    """
+
+    redacted_text: str
+    spans: List[PatternSpan] = field(default_factory=list)
+    counts: Dict[str, int] = field(default_factory=dict)
+
+    @property
+    def detected(self) -> List[str]:
+        return list(self.counts)
+
+
+class MultiPatternEngine:
+    """
+    Compiled union of named regex patterns.
+
+    Usage:
+        engine = MultiPatternEngine({"ssn": r"\\b\\d{3}-\\d{2}-\\d{4}\\b"})
+        result = engine.scan("SSN 123-45-6789")
+        result.redacted_text  # "SSN <SSN>"
+        result.counts         # {"ssn": 1}
+
+    `placeholder` is formatted with the upper-cased pattern name.
+    """
+
+    def __init__(
+        self,
+        patterns: Dict[str, str],
+        placeholder: str = "<{}>",
+        flags: int = 0,
+        backend: str = "auto",
+    ):
+        if backend not in ("auto", "re", "hyperscan"):
+            raise ValueError(f"Unsupported regex backend '{backend}'")
+
+        self.names: List[str] = list(patterns)
+        self._placeholders = {n: placeholder.format(n.upper()) for n in self.names}
+        self._compiled = [re.compile(p, flags) for p in patterns.values()]
+        self._hs_db = None
+        if backend != "re" and hyperscan is not None:
+            self._hs_db = self._compile_hyperscan(patterns, flags)
+        self.backend = "hyperscan" if self._hs_db is not None else "re"
+
+    # ------------------------------------------------------------------
+    # Backends
+    # ------------------------------------------------------------------
+    @staticmethod
+    def _compile_hyperscan(patterns: Dict[str, str], flags: int):
+        hs_flags = hyperscan.HS_FLAG_PREFILTER | hyperscan.HS_FLAG_SINGLEMATCH
+        if flags & re.IGNORECASE:
+            hs_flags |= hyperscan.HS_FLAG_CASELESS
+        try:
+            db = hyperscan.Database()
+            db.compile(
+                expressions=[p.encode("utf-8") for p in patterns.values()],
+                ids=list(range(len(patterns))),
+                elements=len(patterns),
+                flags=[hs_flags] * len(patterns),
+            )
+            return db
+        except Exception as exc:  # hyperscan.error on unsupported syntax
+            logger.warning(f"Hyperscan prefilter unavailable, using re: {exc}")
+            return None
+
+    def _may_match(self, text: str) -> bool:
+        """False only when Hyperscan proves no pattern can match `text`."""
+        if self._hs_db is None or not text.isascii():
+            return True
+
+        def on_match(*_args):
+            return True  # stop at the first candidate
+
+        try:
+            self._hs_db.scan(text.encode("ascii"), match_event_handler=on_match)
+        except hyperscan.ScanTerminated:
+            return True
+        return False
+
+    # ------------------------------------------------------------------
+    # Public API
+    # ------------------------------------------------------------------
+    def spans(self, text: str) -> List[PatternSpan]:
+        """Non-overlapping (name, start, end) matches in text order."""
+        if not text or not self._may_match(text):
+            return []
+
+        compiled = self._compiled
+        pending = [c.search(text) for c in compiled]
+        spans: List[PatternSpan] = []
+        cursor = 0
+
+        while True:
+            best = -1
+            best_start = len(text) + 1
+            for i, match in enumerate(pending):
+                if match is None:
+                    continue
+                if match.start() < cursor:
+                    # Overlaps the last accepted span; look again past it
+                    match = pending[i] = compiled[i].search(text, cursor)
+                    if match is None:
+                        continue
+                if match.start() < best_start:
+                    best, best_start = i, match.start()
+
+            if best < 0:
+                return spans
+
+            match = pending[best]
+            spans.append((self.names[best], match.start(), match.end()))
+            cursor = max(match.end(), match.start() + 1)
+            pending[best] = compiled[best].search(text, cursor)
+
+    def scan(self, text: str) -> PatternScanResult:
+        """Find, count and redact every match in one pass."""
+        if not text:
+            return PatternScanResult(redacted_text=text)
+
+        spans = self.spans(text)
+        if not spans:
+            return PatternScanResult(redacted_text=text)
+
+        parts: List[str] = []
+        tally: Dict[str, int] = {}
+        cursor = 0
+        for name, start, end in spans:
+            parts.append(text[cursor:start])
+            parts.append(self._placeholders[name])
+            tally[name] = tally.get(name, 0) + 1
+            cursor = end
+        parts.append(text[cursor:])
+
+        counts = {name: tally[name] for name in self.names if name in tally}
+        return PatternScanResult(
+            redacted_text="".join(parts), spans=spans, counts=counts
+        )
+
+    def redact(self, text: str) -> str:
+        return self.scan(text).redacted_text
+
+    def counts(self, text: str) -> Dict[str, int]:
+        return self.scan(text).counts
+
+
+def default_backend() -> str:
+    """Backend selected by DLP_REGEX_BACKEND (default "auto")."""
+    return os.getenv("DLP_REGEX_BACKEND", "auto").lower()
+
+
+def build_engine(
+    patterns: Dict[str, str], placeholder: str = "<{}>", flags: int = 0
+) -> MultiPatternEngine:
+    """Build an engine using the backend configured in the environment."""
+    return MultiPatternEngine(
+        patterns, placeholder=placeholder, flags=flags, backend=default_backend()
+    )
@@ -4,6 +4,10 @@
 -- Purpose: Ensure all required columns exist for Grafana compliance dashboards
 --
 -- This script is idempotent - safe to run multiple times.
+--
+-- Superseded by the Alembic migrations in migrations/ (`alembic upgrade
+-- head`), which also replace the idx_logs_* indexes below with composite
+-- indexes shaped for the dashboard queries. Kept for existing manual runbooks.
 
 -- Add missing columns if they don't exist (safe to run repeatedly)
 ALTER TABLE logs ADD COLUMN IF NOT EXISTS event_type VARCHAR;
@@ -0,0 +1,95 @@
+"""Baseline schema: users, logs and log_rollups
+
+Matches what Base.metadata.create_all produced before migrations were
+introduced. Tables that already exist (databases created by create_all,
+start.sh or infra/database/schema_migration.sql) are left untouched, so
+existing deployments can simply run `alembic upgrade head`.
+
+Revision ID: 0001
+Revises:
+Create Date: 2026-10-18
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+revision: str = "0001"
+down_revision: Union[str, Sequence[str], None] = None
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    if op.get_context().as_sql:
+        existing = set()  # offline (--sql) mode cannot inspect the database
+    else:
+        existing = set(sa.inspect(op.get_bind()).get_table_names())
+
+    if "users" not in existing:
+        op.create_table(
+            "users",
+            sa.Column("id", sa.Integer(), primary_key=True),
+            sa.Column("username", sa.String(100), nullable=False),
+            sa.Column("password_hash", sa.String(255), nullable=False),
+            sa.Column("role", sa.String(50), nullable=False),
+            sa.Column("created_at", sa.DateTime(), nullable=True),
+        )
+        op.create_index("ix_users_id", "users", ["id"])
+        op.create_index("ix_users_username", "users", ["username"], unique=True)
+
+    if "logs" not in existing:
+        op.create_table(
+            "logs",
+            sa.Column("id", sa.Integer(), primary_key=True),
+            sa.Column("endpoint", sa.String(100), nullable=False),
+            sa.Column("method", sa.String(10), nullable=False),
+            sa.Column("status_code", sa.Integer(), nullable=False),
+            sa.Column("message", sa.Text(), nullable=True),
+            sa.Column("created_at", sa.DateTime(), nullable=True),
+            sa.Column("event_type", sa.String(50), nullable=True),
+            sa.Column("frameworks", sa.String(), nullable=True),
+            sa.Column("decision", sa.String(), nullable=True),
+            sa.Column("severity", sa.String(20), nullable=True),
+            sa.Column("risk_score", sa.Float(), nullable=True),
+            sa.Column("source", sa.String(100), nullable=True),
+            sa.Column("policy_decision", sa.String(20), nullable=True),
+            sa.Column("integrity_hash", sa.String(64), nullable=True),
+        )
+        op.create_index("ix_logs_id", "logs", ["id"])
+        op.create_index("ix_logs_event_type", "logs", ["event_type"])
+        op.create_index("ix_logs_severity", "logs", ["severity"])
+        op.create_index("ix_logs_policy_decision", "logs", ["policy_decision"])
+
+    if "log_rollups" not in existing:
+        op.create_table(
+            "log_rollups",
+            sa.Column("id", sa.Integer(), primary_key=True),
+            sa.Column("granularity", sa.String(6), nullable=False),
+            sa.Column("bucket_start", sa.DateTime(), nullable=False),
+            sa.Column("endpoint", sa.String(100), nullable=False),
+            sa.Column("event_type", sa.String(50), nullable=False),
+            sa.Column("policy_decision", sa.String(20), nullable=False),
+            sa.Column("severity", sa.String(20), nullable=False),
+            sa.Column("source", sa.String(100), nullable=False),
+            sa.Column("count", sa.Integer(), nullable=False),
+            sa.Column("high_risk_count", sa.Integer(), nullable=False),
+            sa.UniqueConstraint(
+                "granularity",
+                "bucket_start",
+                "endpoint",
+                "event_type",
+                "policy_decision",
+                "severity",
+                "source",
+                name="uq_log_rollups_bucket_dims",
+            ),
+        )
+        op.create_index("ix_log_rollups_bucket_start", "log_rollups", ["bucket_start"])
+
+
+def downgrade() -> None:
+    op.drop_table("log_rollups")
+    op.drop_table("logs")
+    op.drop_table("users")
@@ -0,0 +1,102 @@
+"""Query-shaped indexes for the logs table
+
+Replaces the single-column event_type / severity / policy_decision
+indexes with (column, created_at) composites and adds:
+
+- btree and BRIN indexes on created_at
+- (endpoint, created_at) and (source, created_at) composites
+- partial indexes for high-risk entries (risk_score >= 0.7) and
+  authentication failures (status_code IN (401, 403))
+
+The equality column leads each composite so one index serves both
+"col = X AND created_at >= since" and "col = X ORDER BY created_at DESC".
+Indexes are built CONCURRENTLY so the audit table stays writable during
+the upgrade. Duplicate single-column indexes created by the hand-run
+infra/database/schema_migration.sql are dropped.
+
+Revision ID: 0002
+Revises: 0001
+Create Date: 2026-10-18
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+revision: str = "0002"
+down_revision: Union[str, Sequence[str], None] = "0001"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+# (name, columns, extra create_index kwargs)
+INDEXES = [
+    ("ix_logs_created_at", ["created_at"], {}),
+    ("ix_logs_created_at_brin", ["created_at"], {"postgresql_using": "brin"}),
+    ("ix_logs_endpoint_created_at", ["endpoint", "created_at"], {}),
+    ("ix_logs_source_created_at", ["source", "created_at"], {}),
+    ("ix_logs_event_type_created_at", ["event_type", "created_at"], {}),
+    ("ix_logs_severity_created_at", ["severity", "created_at"], {}),
+    ("ix_logs_policy_decision_created_at", ["policy_decision", "created_at"], {}),
+    (
+        "ix_logs_high_risk_created_at",
+        ["created_at"],
+        {"postgresql_where": sa.text("risk_score >= 0.7")},
+    ),
+    (
+        "ix_logs_auth_failures_created_at",
+        ["created_at", "source"],
+        {"postgresql_where": sa.text("status_code IN (401, 403)")},
+    ),
+]
+
+# Superseded by the composites above
+SINGLE_COLUMN_INDEXES = [
+    ("ix_logs_event_type", "event_type"),
+    ("ix_logs_severity", "severity"),
+    ("ix_logs_policy_decision", "policy_decision"),
+]
+
+# Created by infra/database/schema_migration.sql
+LEGACY_SQL_INDEXES = [
+    "idx_logs_created_at",
+    "idx_logs_policy_decision",
+    "idx_logs_severity",
+]
+
+
+def upgrade() -> None:
+    with op.get_context().autocommit_block():
+        for name, columns, kwargs in INDEXES:
+            op.create_index(
+                name,
+                "logs",
+                columns,
+                if_not_exists=True,
+                postgresql_concurrently=True,
+                **kwargs,
+            )
+        for name, _ in SINGLE_COLUMN_INDEXES:
+            op.drop_index(
+                name, table_name="logs", if_exists=True, postgresql_concurrently=True
+            )
+        for name in LEGACY_SQL_INDEXES:
+            op.drop_index(
+                name, table_name="logs", if_exists=True, postgresql_concurrently=True
+            )
+
+
+def downgrade() -> None:
+    with op.get_context().autocommit_block():
+        for name, column in SINGLE_COLUMN_INDEXES:
+            op.create_index(
+                name,
+                "logs",
+                [column],
+                if_not_exists=True,
+                postgresql_concurrently=True,
+            )
+        for name, _, _ in INDEXES:
+            op.drop_index(
+                name, table_name="logs", if_exists=True, postgresql_concurrently=True
+            )
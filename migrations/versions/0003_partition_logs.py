@@ -0,0 +1,162 @@
+"""Range-partition logs by created_at
+
+Turns `logs` into a table partitioned by RANGE (created_at) without
+copying the existing rows:
+
+- the current table is renamed to `logs_legacy` and attached as the
+  partition FROM (MINVALUE) TO the start of the next period, so its rows
+  stay where they are and the partition is dropped as a whole once its
+  newest row passes the retention period;
+- its indexes are renamed and adopted by the new partitioned indexes
+  instead of being rebuilt;
+- daily (LOG_PARTITION_INTERVAL=week: weekly) partitions are created for
+  the next LOG_PARTITION_PREMAKE periods, plus `logs_default` as a
+  catch-all so an insert never fails for want of a partition.
+
+The primary key becomes (id, created_at) because a partitioned table's
+unique constraints must include the partition key; created_at becomes
+NOT NULL with a server-side UTC default. Plain CREATE INDEX is used here
+(CONCURRENTLY is not supported on partitioned tables); the attach takes
+an ACCESS EXCLUSIVE lock on logs while the range check and the
+(id, created_at) key index are built on the legacy rows.
+
+Partitions are then maintained by app/services/log_partitions.py.
+
+Revision ID: 0003
+Revises: 0002
+Create Date: 2026-10-18
+"""
+
+import os
+from datetime import datetime, timedelta
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+revision: str = "0003"
+down_revision: Union[str, Sequence[str], None] = "0002"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+# Same index set as 0002 (and LogEntry.__table_args__)
+INDEXES = [
+    ("ix_logs_created_at", ["created_at"], {}),
+    ("ix_logs_created_at_brin", ["created_at"], {"postgresql_using": "brin"}),
+    ("ix_logs_endpoint_created_at", ["endpoint", "created_at"], {}),
+    ("ix_logs_source_created_at", ["source", "created_at"], {}),
+    ("ix_logs_event_type_created_at", ["event_type", "created_at"], {}),
+    ("ix_logs_severity_created_at", ["severity", "created_at"], {}),
+    ("ix_logs_policy_decision_created_at", ["policy_decision", "created_at"], {}),
+    (
+        "ix_logs_high_risk_created_at",
+        ["created_at"],
+        {"postgresql_where": sa.text("risk_score >= 0.7")},
+    ),
+    (
+        "ix_logs_auth_failures_created_at",
+        ["created_at", "source"],
+        {"postgresql_where": sa.text("status_code IN (401, 403)")},
+    ),
+]
+
+INTERVAL = os.getenv("LOG_PARTITION_INTERVAL", "day").lower()
+PREMAKE = int(os.getenv("LOG_PARTITION_PREMAKE", "7"))
+UTC_NOW = "timezone('utc', now())"
+BOUND_FORMAT = "%Y-%m-%d %H:%M:%S"
+PERIOD = timedelta(days=7 if INTERVAL == "week" else 1)
+
+
+def _period_start(ts: datetime) -> datetime:
+    day = ts.replace(hour=0, minute=0, second=0, microsecond=0)
+    return day - timedelta(days=day.weekday()) if INTERVAL == "week" else day
+
+
+def _legacy_name(index_name: str) -> str:
+    return index_name.replace("ix_logs_", "ix_logs_legacy_", 1)
+
+
+def _first_boundary() -> datetime:
+    """Start of the period after both now and the newest existing row."""
+    newest = datetime.utcnow()
+    if not op.get_context().as_sql:
+        latest = op.get_bind().execute(sa.text("SELECT max(created_at) FROM logs"))
+        newest = max(newest, latest.scalar() or newest)
+    start = _period_start(newest)
+    return start + PERIOD
+
+
+def upgrade() -> None:
+    boundary = _first_boundary()
+
+    op.execute(f"UPDATE logs SET created_at = {UTC_NOW} WHERE created_at IS NULL")
+    op.alter_column(
+        "logs",
+        "created_at",
+        nullable=False,
+        server_default=sa.text(UTC_NOW),
+    )
+
+    # Move the existing table (and its index names) out of the way
+    op.rename_table("logs", "logs_legacy")
+    op.execute(
+        "ALTER TABLE logs_legacy RENAME CONSTRAINT logs_pkey TO logs_legacy_pkey"
+    )
+    for name, _, _ in INDEXES + [("ix_logs_id", None, None)]:
+        op.execute(f"ALTER INDEX IF EXISTS {name} RENAME TO {_legacy_name(name)}")
+
+    op.execute(
+        "CREATE TABLE logs (LIKE logs_legacy INCLUDING DEFAULTS) "
+        "PARTITION BY RANGE (created_at)"
+    )
+    op.create_primary_key("logs_pkey", "logs", ["id", "created_at"])
+    op.execute("ALTER SEQUENCE IF EXISTS logs_id_seq OWNED BY logs.id")
+
+    # A partition may only carry the parent's primary key, (id, created_at)
+    op.execute(
+        "ALTER TABLE logs_legacy DROP CONSTRAINT logs_legacy_pkey, "
+        "ADD CONSTRAINT logs_legacy_pkey PRIMARY KEY (id, created_at)"
+    )
+
+    # A matching CHECK lets ATTACH skip its own validation scan
+    bound = boundary.strftime(BOUND_FORMAT)
+    op.execute(
+        "ALTER TABLE logs_legacy ADD CONSTRAINT logs_legacy_range "
+        f"CHECK (created_at < '{bound}')"
+    )
+    op.execute(
+        "ALTER TABLE logs ATTACH PARTITION logs_legacy "
+        f"FOR VALUES FROM (MINVALUE) TO ('{bound}')"
+    )
+    op.drop_constraint("logs_legacy_range", "logs_legacy", type_="check")
+
+    # Equivalent legacy indexes are attached, not rebuilt
+    for name, columns, kwargs in INDEXES:
+        op.create_index(name, "logs", columns, **kwargs)
+    op.create_index("ix_logs_id", "logs", ["id"])
+
+    start = boundary
+    for _ in range(PREMAKE + 1):
+        end = start + PERIOD
+        op.execute(
+            f"CREATE TABLE logs_p{start:%Y%m%d} PARTITION OF logs "
+            f"FOR VALUES FROM ('{start.strftime(BOUND_FORMAT)}') "
+            f"TO ('{end.strftime(BOUND_FORMAT)}')"
+        )
+        start = end
+    op.execute("CREATE TABLE logs_default PARTITION OF logs DEFAULT")
+
+
+def downgrade() -> None:
+    # Copies every row back into a plain table
+    op.execute("CREATE TABLE logs_unpartitioned (LIKE logs INCLUDING DEFAULTS)")
+    op.execute("INSERT INTO logs_unpartitioned SELECT * FROM logs")
+    op.execute("ALTER SEQUENCE IF EXISTS logs_id_seq OWNED BY NONE")
+    op.drop_table("logs")
+    op.rename_table("logs_unpartitioned", "logs")
+    op.execute("ALTER SEQUENCE IF EXISTS logs_id_seq OWNED BY logs.id")
+    op.alter_column("logs", "created_at", nullable=True, server_default=None)
+    op.create_primary_key("logs_pkey", "logs", ["id"])
+    op.create_index("ix_logs_id", "logs", ["id"])
+    for name, columns, kwargs in INDEXES:
+        op.create_index(name, "logs", columns, **kwargs)
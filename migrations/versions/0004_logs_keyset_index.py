@@ -0,0 +1,74 @@
+"""(created_at, id) index for keyset pagination of logs
+
+/logs/list pages with `WHERE (created_at, id) < (:t, :id) ORDER BY
+created_at DESC, id DESC`. An index on (created_at, id) answers that
+with one index range scan per page; it also serves everything the
+single-column ix_logs_created_at did, which it replaces.
+
+`logs` is partitioned (0003), and CREATE INDEX CONCURRENTLY is not
+supported on a partitioned table, so the index is declared ON ONLY the
+parent and built CONCURRENTLY on each partition, then attached. Writes
+keep flowing during the build; the parent index becomes valid once every
+partition's index is attached. Offline (--sql) output, which cannot list
+the partitions, uses a plain CREATE INDEX on the parent instead.
+
+Revision ID: 0004
+Revises: 0003
+Create Date: 2026-10-18
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+revision: str = "0004"
+down_revision: Union[str, Sequence[str], None] = "0003"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+INDEX_NAME = "ix_logs_created_at_id"
+COLUMNS = ["created_at", "id"]
+REPLACED = "ix_logs_created_at"
+
+
+def _partitions() -> list:
+    result = op.get_bind().execute(
+        sa.text(
+            "SELECT c.relname FROM pg_inherits i "
+            "JOIN pg_class c ON c.oid = i.inhrelid "
+            "WHERE i.inhparent = to_regclass('logs') ORDER BY c.relname"
+        )
+    )
+    return [row[0] for row in result]
+
+
+def upgrade() -> None:
+    if op.get_context().as_sql:
+        op.create_index(INDEX_NAME, "logs", COLUMNS, if_not_exists=True)
+    else:
+        op.execute(
+            f"CREATE INDEX IF NOT EXISTS {INDEX_NAME} ON ONLY logs "
+            f"({', '.join(COLUMNS)})"
+        )
+        partitions = _partitions()
+        with op.get_context().autocommit_block():
+            for partition in partitions:
+                op.create_index(
+                    f"{partition}_created_at_id_idx",
+                    partition,
+                    COLUMNS,
+                    if_not_exists=True,
+                    postgresql_concurrently=True,
+                )
+                op.execute(
+                    f"ALTER INDEX {INDEX_NAME} "
+                    f"ATTACH PARTITION {partition}_created_at_id_idx"
+                )
+
+    op.drop_index(REPLACED, table_name="logs", if_exists=True)
+
+
+def downgrade() -> None:
+    op.create_index(REPLACED, "logs", ["created_at"], if_not_exists=True)
+    op.drop_index(INDEX_NAME, table_name="logs", if_exists=True)
@@ -0,0 +1,36 @@
+"""log_merkle_roots: hash-chained hourly Merkle roots over logs
+
+One row per sealed hour of audit log entries (app/services/log_merkle.py).
+The table is append-only in normal operation and tiny (one row per hour
+with entries), so it needs no partitioning or secondary indexes.
+
+Revision ID: 0005
+Revises: 0004
+Create Date: 2026-10-18
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+revision: str = "0005"
+down_revision: Union[str, Sequence[str], None] = "0004"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        "log_merkle_roots",
+        sa.Column("bucket_start", sa.DateTime(), primary_key=True),
+        sa.Column("leaf_count", sa.Integer(), nullable=False),
+        sa.Column("root", sa.String(64), nullable=False),
+        sa.Column("chain_hash", sa.String(64), nullable=False),
+        sa.Column("sealed_at", sa.DateTime(), nullable=False),
+        if_not_exists=True,
+    )
+
+
+def downgrade() -> None:
+    op.drop_table("log_merkle_roots")
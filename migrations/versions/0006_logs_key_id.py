@@ -0,0 +1,35 @@
+"""logs.key_id: encryption key version per log entry
+
+Records which DB_ENCRYPTION_KEY_ID encrypted each row's message, so key
+rotation (scripts/key_rotation.py) can find and re-encrypt only the rows
+still under a retired key, and resume after an interruption. A nullable
+column without a default is a catalog-only change, also on the
+partitioned table. Existing rows stay NULL ("unknown"); rotation
+re-encrypts those it can decrypt and stamps them.
+
+Revision ID: 0006
+Revises: 0005
+Create Date: 2026-10-18
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+revision: str = "0006"
+down_revision: Union[str, Sequence[str], None] = "0005"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.add_column(
+        "logs",
+        sa.Column("key_id", sa.String(32), nullable=True),
+        if_not_exists=True,
+    )
+
+
+def downgrade() -> None:
+    op.drop_column("logs", "key_id")
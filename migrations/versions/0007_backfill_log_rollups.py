@@ -0,0 +1,89 @@
+"""Backfill log_rollups from the raw logs
+
+The rollups (app/services/log_rollups.py) are only maintained for entries
+written after they were deployed, so all-time counts read from them
+(/api/compliance/status) left out older history. This recomputes every
+closed hour whose raw entries outnumber its hour-rollup count: hours from
+before the rollups existed, and the partially counted hour of the
+deploy. Hours whose raw partitions were already dropped by retention
+have fewer raw entries than rollup counts and are left alone, so the
+migration never lowers a count and is safe to re-run.
+
+Minute buckets are only written for hours inside
+LOG_ROLLUP_MINUTE_RETENTION_HOURS; older ones would be pruned anyway.
+The current hour is not touched because live writes are still
+incrementing it.
+
+Revision ID: 0007
+Revises: 0006
+Create Date: 2026-10-18
+"""
+
+import os
+from typing import Sequence, Union
+
+from alembic import op
+
+revision: str = "0007"
+down_revision: Union[str, Sequence[str], None] = "0006"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+MINUTE_RETENTION_HOURS = int(os.getenv("LOG_ROLLUP_MINUTE_RETENTION_HOURS", "48"))
+UTC_HOUR = "date_trunc('hour', timezone('utc', now()))"
+DIMENSIONS = ("endpoint", "event_type", "policy_decision", "severity", "source")
+
+# Closed hours with more raw entries than their hour rollups count
+STALE_HOURS = f"""
+CREATE TEMPORARY TABLE rollup_backfill_hours AS
+SELECT raw.hour
+FROM (
+    SELECT date_trunc('hour', created_at) AS hour, count(*) AS n
+    FROM logs
+    WHERE created_at < {UTC_HOUR}
+    GROUP BY 1
+) raw
+LEFT JOIN (
+    SELECT bucket_start AS hour, sum(count) AS n
+    FROM log_rollups
+    WHERE granularity = 'hour' AND bucket_start < {UTC_HOUR}
+    GROUP BY 1
+) rolled ON rolled.hour = raw.hour
+WHERE raw.n > coalesce(rolled.n, 0)
+"""
+
+CLEAR_STALE = """
+DELETE FROM log_rollups
+WHERE date_trunc('hour', bucket_start) IN (SELECT hour FROM rollup_backfill_hours)
+"""
+
+_dims = ", ".join(DIMENSIONS)
+_coalesced = ", ".join(f"coalesce({dim}, '')" for dim in DIMENSIONS)
+
+# Same aggregation as log_rollups.rebuild_rollups(), both granularities
+INSERT_STALE = f"""
+INSERT INTO log_rollups
+    (granularity, bucket_start, {_dims}, count, high_risk_count)
+SELECT g.granularity, date_trunc(g.granularity, logs.created_at), {_coalesced},
+       count(*), count(*) FILTER (WHERE logs.risk_score >= 0.7)
+FROM logs
+CROSS JOIN (VALUES ('minute'), ('hour')) AS g (granularity)
+WHERE date_trunc('hour', logs.created_at) IN (SELECT hour FROM rollup_backfill_hours)
+  AND (
+    g.granularity = 'hour'
+    OR logs.created_at >= {UTC_HOUR} - interval '{MINUTE_RETENTION_HOURS} hours'
+  )
+GROUP BY 1, 2, {_coalesced}
+"""
+
+
+def upgrade() -> None:
+    op.execute(STALE_HOURS)
+    op.execute(CLEAR_STALE)
+    op.execute(INSERT_STALE)
+    op.execute("DROP TABLE rollup_backfill_hours")
+
+
+def downgrade() -> None:
+    # Data-only migration: the backfilled counts are correct either way
+    pass
@@ -13,6 +13,7 @@ Detects:
 Sends alerts to Discord via alert_manager.py when anomalies are detected.
 """
 
+import json
 import os
 import sys
 import requests
@@ -26,7 +27,9 @@ PROJECT_ROOT = os.path.dirname(CURRENT_DIR)
 if PROJECT_ROOT not in sys.path:
     sys.path.insert(0, PROJECT_ROOT)
 
+from app.db.db import engine  # noqa: E402
 from app.utils.alert_manager import send_alert  # noqa: E402
+from app.utils.logger import log_request  # noqa: E402
 
 # -------------------------------------------------------------------
 # Configuration
@@ -54,29 +57,33 @@ def get_token() -> str:
 def log_anomaly_to_ui(
     token: str, anomaly_type: str, message: str, severity: str = "high"
 ):
-    """Write anomaly directly to DB so it appears in the UI Alerts tab."""
-    try:
-        import asyncio
-        from app.db.db import AsyncSessionLocal
-        from app.models import LogEntry
-        from datetime import datetime, timezone
-
-        async def _insert():
-            async with AsyncSessionLocal() as session:
-                entry = LogEntry()
-                entry.endpoint = "/anomaly-detection"
-                entry.method = "SYSTEM"
-                entry.status_code = 200
-                entry.message = f"[ANOMALY:{anomaly_type}] {message}"
-                entry.event_type = "anomaly_detected"
-                entry.severity = severity
-                entry.risk_score = 1.0 if severity == "high" else 0.7
-                entry.source = "anomaly_alerting"
-                entry.policy_decision = "block"
-                entry.created_at = datetime.now(timezone.utc)
-                session.add(entry)
-                await session.commit()
+    """
+    Record the anomaly in the audit log so it appears in the UI Alerts tab.
+
+    Written through log_request() like every other entry, so the row is
+    masked, hashed and encrypted (with its key_id) and counted in the
+    dashboard rollups in the same transaction.
+    """
+    import asyncio
+
+    async def _insert():
+        try:
+            await log_request(
+                endpoint="/anomaly-detection",
+                method="SYSTEM",
+                status_code=200,
+                message=f"[ANOMALY:{anomaly_type}] {message}",
+                event_type="anomaly_detected",
+                severity=severity,
+                risk_score=1.0 if severity == "high" else 0.7,
+                source="anomaly_alerting",
+                policy_decision="block",
+            )
+        finally:
+            # Pooled connections are bound to this asyncio.run() loop
+            await engine.dispose()
 
+    try:
         asyncio.run(_insert())
         print("    [UI] Anomaly logged to dashboard.")
     except Exception as e:
@@ -84,13 +91,17 @@ def log_anomaly_to_ui(
 
 
 def fetch_logs(token: str) -> list:
-    resp = requests.get(
-        f"{BASE_URL}/logs/list?limit=100",
+    """Today's (UTC) log entries, streamed from the NDJSON bulk export."""
+    today = datetime.now(timezone.utc).strftime("%Y-%m-%d")
+    with requests.get(
+        f"{BASE_URL}/logs/export",
+        params={"start_date": today, "end_date": today, "format": "ndjson"},
         headers={"Authorization": f"Bearer {token}"},
-        timeout=10,
-    )
-    resp.raise_for_status()
-    return resp.json().get("logs", [])
+        stream=True,
+        timeout=30,
+    ) as resp:
+        resp.raise_for_status()
+        return [json.loads(line) for line in resp.iter_lines() if line]
 
 
 def check_rate_anomaly(logs: list) -> list:
@@ -179,7 +190,7 @@ def run():
     token = get_token()
     print("    Token obtained.")
 
-    print("\n[2] Fetching recent logs...")
+    print("\n[2] Fetching today's logs...")
     logs = fetch_logs(token)
     print(f"    {len(logs)} log entries loaded.")
 
@@ -0,0 +1,146 @@
+"""
+DLP Engine Profile Benchmark
+----------------------------
+Compares the DLP engine profiles (spaCy model size, enabled pipeline
+components, entity set) on throughput and recall.
+
+Usage:
+    python3 scripts/dlp_profile_benchmark.py [profile ...] [--rounds N]
+
+    With no profile names, every available profile is benchmarked.
+    Profiles whose spaCy model is not installed are reported and skipped.
+
+Outputs (per profile):
+    - Model load time
+    - Throughput in texts/second (single analyze() calls and batched)
+    - Recall per red-team section and on labelled NER samples
+"""
+
+import argparse
+import os
+import sys
+import time
+
+# Ensure app/ modules can be imported when running from root
+sys.path.append(
+    os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+)  # noqa: E402
+
+import spacy  # noqa: E402
+from presidio_analyzer import BatchAnalyzerEngine  # noqa: E402
+
+from app.middleware.dlp_presidio import (  # noqa: E402
+    SCORE_THRESHOLD,
+    build_analyzer,
+    profile_entities,
+)
+from app.services.dlp_profiles import available_profiles  # noqa: E402
+from app.utils.redteam_dataset import load_redteam_sections  # noqa: E402
+
+# Entity types that count as a hit for each red-team section
+SECTION_LABELS = {
+    "ssn": {"GENERIC_SSN", "US_SOCIAL_SECURITY_NUMBER"},
+    "credit_cards": {"CREDIT_CARD"},
+    "emails": {"EMAIL_ADDRESS"},
+    "api_keys": {"GENERIC_API_KEY"},
+}
+
+# Labelled samples for the NER-only entities, where model size matters
+NER_SAMPLES = [
+    ("Please forward the contract to Maria Gonzalez.", {"PERSON"}),
+    ("Dr. Alan Turner reviewed the chart yesterday.", {"PERSON"}),
+    ("Our new office is in Austin, Texas.", {"LOCATION"}),
+    ("The patient was transferred from Seattle on Friday.", {"LOCATION"}),
+    ("Ship it to Berlin before March 3rd.", {"LOCATION"}),
+    ("Kevin O'Brien called about the invoice.", {"PERSON"}),
+]
+
+
+def _labelled_samples():
+    samples = []
+    for section, prompts in load_redteam_sections().items():
+        labels = SECTION_LABELS.get(section)
+        if labels:
+            samples.extend((section, prompt, labels) for prompt in prompts)
+    samples.extend(("ner", text, labels) for text, labels in NER_SAMPLES)
+    return samples
+
+
+def benchmark(profile, samples, rounds: int) -> None:
+    print(f"\n=== Profile: {profile.name} (model={profile.model}) ===")
+    if not spacy.util.is_package(profile.model):
+        print(f"  skipped: spaCy model '{profile.model}' is not installed")
+        return
+
+    entities = profile_entities(profile)
+    start = time.perf_counter()
+    analyzer = build_analyzer(profile)
+    print(f"  load time:   {time.perf_counter() - start:.2f}s")
+    print(f"  disabled:    {', '.join(profile.disable) or '-'}")
+    print(f"  entities:    {len(entities)}")
+
+    def analyze(text):
+        return analyzer.analyze(
+            text=text,
+            entities=entities,
+            language="en",
+            score_threshold=SCORE_THRESHOLD,
+        )
+
+    texts = [text for _, text, _ in samples]
+    analyze(texts[0])  # page in the model before timing
+
+    start = time.perf_counter()
+    for _ in range(rounds):
+        for text in texts:
+            analyze(text)
+    single = len(texts) * rounds / (time.perf_counter() - start)
+
+    batch_analyzer = BatchAnalyzerEngine(analyzer_engine=analyzer)
+    start = time.perf_counter()
+    for _ in range(rounds):
+        batch_analyzer.analyze_iterator(
+            texts,
+            language="en",
+            batch_size=32,
+            entities=entities,
+            score_threshold=SCORE_THRESHOLD,
+        )
+    batched = len(texts) * rounds / (time.perf_counter() - start)
+
+    print(f"  throughput:  {single:.1f} texts/s single, {batched:.1f} texts/s batched")
+
+    hits = {}
+    totals = {}
+    for section, text, labels in samples:
+        found = {r.entity_type for r in analyze(text)}
+        totals[section] = totals.get(section, 0) + 1
+        hits[section] = hits.get(section, 0) + bool(found & labels)
+
+    for section in totals:
+        print(f"  recall {section:<13} {hits[section] / totals[section]:.3f}")
+    print(f"  recall overall       {sum(hits.values()) / sum(totals.values()):.3f}")
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.split("\n")[1])
+    parser.add_argument("profiles", nargs="*", help="profile names (default: all)")
+    parser.add_argument("--rounds", type=int, default=5)
+    args = parser.parse_args()
+
+    profiles = available_profiles()
+    names = args.profiles or list(profiles)
+    unknown = [n for n in names if n not in profiles]
+    if unknown:
+        print(f"Unknown profile(s): {', '.join(unknown)}")
+        return 2
+
+    samples = _labelled_samples()
+    print(f"Benchmarking {len(names)} profile(s) on {len(samples)} samples")
+    for name in names:
+        benchmark(profiles[name], samples, args.rounds)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
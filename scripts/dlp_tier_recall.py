@@ -0,0 +1,68 @@
+"""
+DLP Scan Tier Recall Check
+--------------------------
+Compares the "tiered" DLP scan mode (cheap pre-screen, NER only when
+needed) against the "full" mode on the red-team dataset.
+
+Usage:
+    python3 scripts/dlp_tier_recall.py
+
+Outputs:
+    - Per-section entity recall of tiered vs full
+    - Every prompt where tiered missed an entity full found
+    - Pre-screen skip rate and per-tier hit rates
+"""
+
+import os
+import sys
+
+# Ensure app/ modules can be imported when running from root
+sys.path.append(
+    os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+)  # noqa: E402
+
+from app.services import dlp_engine  # noqa: E402
+from app.services.dlp_engine import ScanMode  # noqa: E402
+from app.utils.redteam_dataset import load_redteam_sections  # noqa: E402
+
+
+def main() -> int:
+    sections = load_redteam_sections()
+    total_expected = 0
+    total_found = 0
+    misses = []
+
+    print("=== CyberOracle DLP Tier Recall (tiered vs full) ===\n")
+    for section, prompts in sections.items():
+        expected = 0
+        found = 0
+        for prompt in prompts:
+            full = set(dlp_engine.analyze(prompt, ScanMode.FULL).entities)
+            tiered = set(dlp_engine.analyze(prompt, ScanMode.TIERED).entities)
+            expected += len(full)
+            found += len(full & tiered)
+            if full - tiered:
+                misses.append((section, prompt, sorted(full - tiered)))
+
+        recall = found / expected if expected else 1.0
+        print(f"{section:<14} entities={expected:<4} recall={recall:.3f}")
+        total_expected += expected
+        total_found += found
+
+    overall = total_found / total_expected if total_expected else 1.0
+    print(f"\nOverall recall: {overall:.3f}")
+
+    if misses:
+        print("\nMissed by tiered mode:")
+        for section, prompt, entities in misses:
+            print(f"  [{section}] {prompt!r} -> {entities}")
+
+    stats = dlp_engine.tier_stats()
+    print(f"\nPre-screen: {stats['prescreen']}")
+    print(f"Pattern tier: {stats['pattern']}")
+    print(f"NER tier: {stats['ner']}")
+    return 0 if not misses else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -12,10 +12,23 @@ Two-layer encryption model:
                          Demonstrates native Postgres column encryption capability.
 
 Key rotation procedure (simulating HashiCorp Vault transit key rotation):
-  1. Generate new Fernet key  (new key version = old version + 1)
-  2. Decrypt every encrypted log row with the OLD key
-  3. Re-encrypt each row with the NEW key
-  4. Print the new key + version — operator pastes these into Vault / .env
+  1. Stage: generate a new Fernet key (new key version = old version + 1).
+     .env gets the new key as DB_ENCRYPTION_KEY; the old one moves to
+     DB_ENCRYPTION_PREVIOUS_KEYS so it can still decrypt existing rows.
+  2. Re-encrypt: every log row whose key_id is not the current version is
+     decrypted with whichever key matches and re-encrypted with the new
+     key — keyset-paged batches, one short transaction each, crypto on a
+     worker pool, checkpointed and throttled
+     (app/services/log_key_rotation.py).
+  3. Once `--status` shows no rows under a retired key, remove it from
+     DB_ENCRYPTION_PREVIOUS_KEYS.
+
+Online rotation (gateway keeps serving):
+  python scripts/key_rotation.py --stage      # then restart the gateway
+  python scripts/key_rotation.py --reencrypt [--max-rows-per-second 2000]
+
+Re-running --reencrypt after an interruption resumes from the checkpoint.
+Without --stage/--reencrypt both steps run back to back (gateway stopped).
 
 Usage:
     source venv/bin/activate
@@ -26,6 +39,7 @@ import os
 import sys
 import argparse
 from datetime import datetime, timezone
+from typing import Optional
 
 from dotenv import load_dotenv
 
@@ -36,7 +50,9 @@ PROJECT_ROOT = os.path.dirname(CURRENT_DIR)
 if PROJECT_ROOT not in sys.path:
     sys.path.insert(0, PROJECT_ROOT)
 
-from cryptography.fernet import Fernet, InvalidToken  # noqa: E402
+from cryptography.fernet import Fernet, InvalidToken, MultiFernet  # noqa: E402
+
+CHECKPOINT_PATH = os.path.join(PROJECT_ROOT, ".key_rotation_checkpoint.json")
 
 # ---------------------------------------------------------------------------
 # Helpers
@@ -54,6 +70,10 @@ def _current_key_id() -> str:
     return os.getenv("DB_ENCRYPTION_KEY_ID", "v1")
 
 
+def _previous_keys() -> str:
+    return os.getenv("DB_ENCRYPTION_PREVIOUS_KEYS", "")
+
+
 def _next_key_id(current: str) -> str:
     """Increment version: v1 -> v2 -> v3 ..."""
     try:
@@ -132,8 +152,11 @@ def run_pgcrypto_demo():
 # ---------------------------------------------------------------------------
 
 
-def _update_env(new_key: str, new_key_id: str):
-    """Replace DB_ENCRYPTION_KEY and DB_ENCRYPTION_KEY_ID in .env in-place."""
+def _update_env(new_key: str, new_key_id: str, previous_keys: Optional[str] = None):
+    """
+    Replace DB_ENCRYPTION_KEY and DB_ENCRYPTION_KEY_ID in .env in-place,
+    and DB_ENCRYPTION_PREVIOUS_KEYS when `previous_keys` is given.
+    """
     env_path = os.path.join(PROJECT_ROOT, ".env")
     if not os.path.exists(env_path):
         print(f"  [warn] .env not found at {env_path} — skipping auto-update.")
@@ -150,8 +173,18 @@ def _update_env(new_key: str, new_key_id: str):
             updated.append(f"DB_ENCRYPTION_KEY={new_key}\n")
         elif line.startswith("DB_ENCRYPTION_KEY_ID="):
             updated.append(f"DB_ENCRYPTION_KEY_ID={new_key_id}\n")
+        elif (
+            line.startswith("DB_ENCRYPTION_PREVIOUS_KEYS=")
+            and previous_keys is not None
+        ):
+            updated.append(f"DB_ENCRYPTION_PREVIOUS_KEYS={previous_keys}\n")
+            previous_keys = None
         else:
             updated.append(line)
+    if previous_keys is not None:
+        if updated and not updated[-1].endswith("\n"):
+            updated[-1] += "\n"
+        updated.append(f"DB_ENCRYPTION_PREVIOUS_KEYS={previous_keys}\n")
 
     with open(env_path, "w") as f:
         f.writelines(updated)
@@ -162,88 +195,111 @@ def _update_env(new_key: str, new_key_id: str):
 # ---------------------------------------------------------------------------
 
 
-def run_key_rotation(dry_run: bool = False):
+def stage_new_key(dry_run: bool = False):
+    """
+    Generate the next key version and make it current in .env, keeping
+    the old key in DB_ENCRYPTION_PREVIOUS_KEYS. Returns (key, key_id,
+    previous_keys) as now configured.
+    """
+    old_key = _current_key().decode("utf-8")
+    old_key_id = _current_key_id()
+    new_key = Fernet.generate_key().decode("utf-8")
+    new_key_id = _next_key_id(old_key_id)
+    previous = ",".join(filter(None, [f"{old_key_id}:{old_key}", _previous_keys()]))
+
+    print("\n" + "=" * 60)
+    print("  CyberOracle — Stage New Fernet Key")
+    print(f"  Time   : {datetime.now(timezone.utc).strftime('%Y-%m-%d %H:%M:%S UTC')}")
+    print(f"  Old ID : {old_key_id}")
+    print(f"  New ID : {new_key_id}")
+    print("=" * 60)
+    if dry_run:
+        print("  (Dry run: .env not modified.)")
+    else:
+        _update_env(new_key, new_key_id, previous)
+        print("  .env updated: new key is current, old key kept for decryption.")
+        print("  Restart the gateway so it encrypts with the new key.")
+    print(f"  DB_ENCRYPTION_KEY_ID        = {new_key_id}")
+    print(f"  DB_ENCRYPTION_PREVIOUS_KEYS = {old_key_id}:… (+ earlier)")
+    print("=" * 60)
+    return new_key, new_key_id, previous
+
+
+def run_reencrypt(
+    key: str,
+    key_id: str,
+    previous_keys: str,
+    dry_run: bool = False,
+    batch_size: int = 1000,
+    workers: int = 4,
+    max_rows_per_second: float = 0,
+    checkpoint_path: str = CHECKPOINT_PATH,
+):
+    """Re-encrypt every log row not yet under `key_id` (resumable)."""
     import asyncio
-    from sqlalchemy import text
-    from sqlalchemy.ext.asyncio import create_async_engine
+    from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+
+    from app.services.log_key_rotation import reencrypt_logs
+    from app.utils.db_encryption import parse_previous_keys
 
     db_url = os.getenv("DATABASE_URL", "")
     if not db_url:
         print("[rotation] DATABASE_URL not set — aborting.")
         return
 
-    old_key_bytes = _current_key()
-    old_key_id = _current_key_id()
-    new_key_bytes = Fernet.generate_key()
-    new_key_id = _next_key_id(old_key_id)
-
-    old_fernet = Fernet(old_key_bytes)
-    new_fernet = Fernet(new_key_bytes)
+    keyring = MultiFernet(
+        [Fernet(key.encode("utf-8"))]
+        + [fernet for _, fernet in parse_previous_keys(previous_keys)]
+    )
 
     print("\n" + "=" * 60)
-    print("  CyberOracle — Fernet Key Rotation")
-    print(f"  Time   : {datetime.now(timezone.utc).strftime('%Y-%m-%d %H:%M:%S UTC')}")
-    print(f"  Old ID : {old_key_id}")
-    print(f"  New ID : {new_key_id}")
+    print("  CyberOracle — Log Re-encryption")
+    print(f"  Target : {key_id}")
+    print(f"  Batch  : {batch_size} rows, {workers} workers")
+    if max_rows_per_second:
+        print(f"  Limit  : {max_rows_per_second:g} rows/s")
     print(f"  Mode   : {'DRY RUN (no writes)' if dry_run else 'LIVE'}")
     print("=" * 60)
 
+    def _progress(state):
+        print(
+            f"  … up to id {state['last_id']}: "
+            f"{state['rotated']} re-encrypted, {state['skipped']} skipped"
+        )
+
     async def _rotate():
         engine = create_async_engine(db_url, echo=False)
-        rotated = 0
-        skipped = 0
-
-        async with engine.begin() as conn:
-            rows = await conn.execute(
-                text("SELECT id, message FROM logs WHERE message IS NOT NULL")
+        try:
+            return await reencrypt_logs(
+                async_sessionmaker(engine, expire_on_commit=False),
+                keyring,
+                key_id,
+                batch_size=batch_size,
+                workers=workers,
+                max_rows_per_second=max_rows_per_second,
+                checkpoint_path=checkpoint_path,
+                dry_run=dry_run,
+                on_batch=_progress,
             )
-            entries = rows.fetchall()
-            print(f"\n  Rows to process: {len(entries)}")
+        finally:
+            await engine.dispose()
 
-            for row_id, message in entries:
-                plaintext = _decrypt_safe(old_fernet, message)
+    state = asyncio.run(_rotate())
 
-                if plaintext == message:
-                    # Could not decrypt — legacy plaintext or different key
-                    skipped += 1
-                    continue
+    print(f"\n  Rows re-encrypted : {state['rotated']}")
+    print(f"  Rows skipped      : {state['skipped']} (plaintext / no matching key)")
 
-                new_ciphertext = new_fernet.encrypt(plaintext.encode("utf-8")).decode(
-                    "utf-8"
-                )
 
-                if not dry_run:
-                    await conn.execute(
-                        text("UPDATE logs SET message = :msg WHERE id = :id"),
-                        {"msg": new_ciphertext, "id": row_id},
-                    )
-                rotated += 1
-
-        await engine.dispose()
-        return rotated, skipped
-
-    rotated, skipped = asyncio.run(_rotate())
-
-    print(f"\n  Rows re-encrypted : {rotated}")
-    print(f"  Rows skipped      : {skipped} (plaintext / unreadable with old key)")
-
-    new_key_str = new_key_bytes.decode("utf-8")
-
-    print("\n" + "=" * 60)
-    if dry_run:
-        print("  ACTION REQUIRED — Update your secret store:")
-        print("=" * 60)
-        print(f"  DB_ENCRYPTION_KEY    = {new_key_str}")
-        print(f"  DB_ENCRYPTION_KEY_ID = {new_key_id}")
-        print("\n  (Dry run: no changes written to DB. Remove --dry-run to apply.)")
-    else:
-        print("  Updating .env with new key...")
-        print("=" * 60)
-        _update_env(new_key_str, new_key_id)
-        print(f"  DB_ENCRYPTION_KEY    = {new_key_str}")
-        print(f"  DB_ENCRYPTION_KEY_ID = {new_key_id}")
-        print("\n  .env updated. Restart the app to load the new key.")
-    print("=" * 60)
+def run_key_rotation(dry_run: bool = False, **reencrypt_options):
+    """Stage a new key, then re-encrypt every row with it (gateway stopped)."""
+    key, key_id, previous = stage_new_key(dry_run=dry_run)
+    try:
+        run_reencrypt(key, key_id, previous, dry_run=dry_run, **reencrypt_options)
+    except BaseException:
+        if not dry_run:
+            print("\n  Interrupted — the new key is already in .env.")
+            print("  Resume with: python scripts/key_rotation.py --reencrypt")
+        raise
 
 
 # ---------------------------------------------------------------------------
@@ -262,8 +318,41 @@ def show_status():
     print(f"  App-level Fernet encryption : {'ENABLED' if enabled else 'DISABLED'}")
     print(f"  Current key version         : {key_id}")
     print(f"  Key present in env          : {'YES' if key else 'NO'}")
+    retired = [item.split(":", 1)[0] for item in _previous_keys().split(",") if item]
+    print(f"  Retired keys still accepted : {', '.join(retired) or 'none'}")
     print("  pgcrypto extension          : INSTALLED (v1.3)")
-    print("  Encrypted column            : logs.message")
+    print("  Encrypted column            : logs.message (version in logs.key_id)")
+    if os.path.exists(CHECKPOINT_PATH):
+        print(f"  Interrupted re-encryption   : {CHECKPOINT_PATH}")
+    print("=" * 60)
+
+
+def show_key_counts():
+    """Rows per key version — retire a key once none remain under it."""
+    import asyncio
+    from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+
+    from app.services.log_key_rotation import key_counts
+
+    db_url = os.getenv("DATABASE_URL", "")
+    if not db_url:
+        return
+
+    async def _counts():
+        engine = create_async_engine(db_url, echo=False)
+        try:
+            async with async_sessionmaker(engine)() as session:
+                return await key_counts(session)
+        finally:
+            await engine.dispose()
+
+    try:
+        counts = asyncio.run(_counts())
+    except Exception as exc:
+        print(f"  [warn] could not count rows per key: {type(exc).__name__}")
+        return
+    for key_id, count in sorted(counts.items(), key=lambda kv: str(kv[0])):
+        print(f"  Rows under {key_id or 'unknown/plaintext':<17}: {count}")
     print("=" * 60)
 
 
@@ -284,13 +373,51 @@ if __name__ == "__main__":
     parser.add_argument(
         "--status", action="store_true", help="Show current encryption status and exit"
     )
+    parser.add_argument(
+        "--stage",
+        action="store_true",
+        help="Generate the next key and make it current in .env (no DB writes)",
+    )
+    parser.add_argument(
+        "--reencrypt",
+        action="store_true",
+        help="Re-encrypt rows under retired keys with the current key (resumable)",
+    )
+    parser.add_argument("--batch-size", type=int, default=1000)
+    parser.add_argument("--workers", type=int, default=4)
+    parser.add_argument(
+        "--max-rows-per-second",
+        type=float,
+        default=0,
+        help="Throttle re-encryption (0 = unlimited)",
+    )
+    parser.add_argument("--checkpoint", default=CHECKPOINT_PATH)
     args = parser.parse_args()
+    reencrypt_options = dict(
+        batch_size=args.batch_size,
+        workers=args.workers,
+        max_rows_per_second=args.max_rows_per_second,
+        checkpoint_path=args.checkpoint,
+    )
 
     if args.status:
         show_status()
+        show_key_counts()
     elif args.pgcrypto_demo:
         show_status()
         run_pgcrypto_demo()
+    elif args.stage:
+        show_status()
+        stage_new_key(dry_run=args.dry_run)
+    elif args.reencrypt:
+        show_status()
+        run_reencrypt(
+            _current_key().decode("utf-8"),
+            _current_key_id(),
+            _previous_keys(),
+            dry_run=args.dry_run,
+            **reencrypt_options,
+        )
     else:
         show_status()
-        run_key_rotation(dry_run=args.dry_run)
+        run_key_rotation(dry_run=args.dry_run, **reencrypt_options)
@@ -0,0 +1,101 @@
+#!/usr/bin/env python3
+"""
+scripts/log_retention.py
+
+Partition maintenance and retention for the range-partitioned `logs`
+table (app/services/log_partitions.py). Run daily from cron, e.g.
+`ensure && drop-expired`.
+
+Commands:
+  ensure        — create the partitions for the next
+                  LOG_PARTITION_PREMAKE periods (default 7).
+  drop-expired  — drop partitions whose whole range is older than
+                  compliance.log_retention_days in policy.yaml
+                  (LOG_RETENTION_DAYS overrides). --dry-run lists them.
+  status        — list partitions and their ranges.
+
+Usage:
+    source venv/bin/activate
+    python scripts/log_retention.py ensure
+    python scripts/log_retention.py drop-expired [--days 90] [--dry-run]
+    python scripts/log_retention.py status
+"""
+
+import argparse
+import asyncio
+import os
+import sys
+
+from dotenv import load_dotenv
+
+load_dotenv()
+
+CURRENT_DIR = os.path.dirname(os.path.abspath(__file__))
+PROJECT_ROOT = os.path.dirname(CURRENT_DIR)
+if PROJECT_ROOT not in sys.path:
+    sys.path.insert(0, PROJECT_ROOT)
+
+from app.db.db import AsyncSessionLocal, engine  # noqa: E402
+from app.services.log_partitions import (  # noqa: E402
+    drop_expired_partitions,
+    ensure_partitions,
+    list_partitions,
+    retention_days,
+)
+
+
+async def _ensure() -> None:
+    async with AsyncSessionLocal() as session:
+        created = await ensure_partitions(session)
+        await session.commit()
+    print(f"[partitions] created: {', '.join(created) or 'none'}")
+
+
+async def _drop_expired(days, dry_run: bool) -> None:
+    days = retention_days() if days is None else days
+    async with AsyncSessionLocal() as session:
+        dropped = await drop_expired_partitions(session, days=days, dry_run=dry_run)
+        await session.commit()
+    verb = "would drop" if dry_run else "dropped"
+    print(f"[partitions] retention {days} days; {verb}: {', '.join(dropped) or 'none'}")
+
+
+async def _status() -> None:
+    async with AsyncSessionLocal() as session:
+        partitions = await list_partitions(session)
+    for p in partitions:
+        lower = f"{p.lower:%Y-%m-%d %H:%M}" if p.lower else "MINVALUE"
+        upper = f"{p.upper:%Y-%m-%d %H:%M}" if p.upper else "MAXVALUE"
+        span = (
+            "DEFAULT" if p.lower is None and p.upper is None else f"{lower} → {upper}"
+        )
+        print(f"{p.name:<24} {span}")
+
+
+async def _main(args) -> None:
+    try:
+        if args.command == "ensure":
+            await _ensure()
+        elif args.command == "drop-expired":
+            await _drop_expired(args.days, args.dry_run)
+        else:
+            await _status()
+    finally:
+        await engine.dispose()
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Maintain logs table partitions")
+    sub = parser.add_subparsers(dest="command", required=True)
+    sub.add_parser("ensure", help="create upcoming partitions")
+    drop = sub.add_parser("drop-expired", help="drop partitions past retention")
+    drop.add_argument("--days", type=int, default=None)
+    drop.add_argument("--dry-run", action="store_true")
+    sub.add_parser("status", help="list partitions")
+
+    asyncio.run(_main(parser.parse_args()))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,95 @@
+#!/usr/bin/env python3
+"""
+scripts/rollup_maintenance.py
+
+Compaction and backfill for the dashboard log rollups
+(app/services/log_rollups.py). Run from cron, e.g. hourly `prune`.
+
+Commands:
+  rebuild  — recompute both rollup granularities from the raw logs table
+             for the last --days days, up to the start of the current hour,
+             to repair counters after manual edits to `logs`. Never reaches
+             back past the log retention cutoff: the raw partitions there
+             may already be dropped, and their hour buckets are then the
+             only remaining counts. (Pre-rollup history is backfilled by
+             migration 0007.)
+  prune    — delete minute buckets older than
+             LOG_ROLLUP_MINUTE_RETENTION_HOURS (default 48); hour buckets
+             are kept.
+
+Usage:
+    source venv/bin/activate
+    python scripts/rollup_maintenance.py rebuild [--days 90]
+    python scripts/rollup_maintenance.py prune
+"""
+
+import argparse
+import asyncio
+import os
+import sys
+from datetime import datetime, timedelta
+
+from dotenv import load_dotenv
+
+load_dotenv()
+
+CURRENT_DIR = os.path.dirname(os.path.abspath(__file__))
+PROJECT_ROOT = os.path.dirname(CURRENT_DIR)
+if PROJECT_ROOT not in sys.path:
+    sys.path.insert(0, PROJECT_ROOT)
+
+from app.db.db import AsyncSessionLocal, engine  # noqa: E402
+from app.services.log_partitions import retention_days  # noqa: E402
+from app.services.log_rollups import (  # noqa: E402
+    prune_rollups,
+    rebuild_rollups,
+    truncate,
+)
+
+
+async def _rebuild(days: int) -> None:
+    until = truncate(datetime.utcnow(), "hour")
+    since = until - timedelta(days=days)
+    # Hours before the cutoff may have lost their raw partitions
+    cutoff = datetime.utcnow() - timedelta(days=retention_days())
+    retained = truncate(cutoff, "hour") + timedelta(hours=1)
+    if since < retained:
+        print(f"[rollups] clamped to the {retention_days()}-day log retention")
+        since = retained
+    async with AsyncSessionLocal() as session:
+        written = await rebuild_rollups(session, since, until)
+        await session.commit()
+    print(f"[rollups] rebuilt {since:%Y-%m-%d %H:%M} → {until:%Y-%m-%d %H:%M}")
+    print(f"[rollups] rollup rows written: {written}")
+
+
+async def _prune() -> None:
+    async with AsyncSessionLocal() as session:
+        deleted = await prune_rollups(session)
+        await session.commit()
+    print(f"[rollups] minute buckets pruned: {deleted}")
+
+
+async def _main(args) -> None:
+    try:
+        if args.command == "rebuild":
+            await _rebuild(args.days)
+        else:
+            await _prune()
+    finally:
+        await engine.dispose()
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Maintain dashboard log rollups")
+    sub = parser.add_subparsers(dest="command", required=True)
+    rebuild = sub.add_parser("rebuild", help="recompute rollups from raw logs")
+    rebuild.add_argument("--days", type=int, default=90)
+    sub.add_parser("prune", help="delete expired minute buckets")
+
+    asyncio.run(_main(parser.parse_args()))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,112 @@
+#!/usr/bin/env python3
+"""
+scripts/verify_log_integrity.py
+
+Full-table integrity audit of the audit logs (OWASP-ASVS 9.5): decrypts
+every entry and re-computes its integrity_hash
+(app/services/log_integrity.py). Same check as GET /logs/verify, for
+cron or incident response without going through the API.
+
+--merkle checks the hash-chained hourly Merkle roots instead
+(app/services/log_merkle.py, same as GET /logs/merkle/verify): the chain
+and per-hour entry counts, plus a rehash of every sealed hour with --deep.
+
+Exits 1 if any entry is tampered (or the Merkle check finds a problem),
+so cron / CI can alert on it.
+
+Usage:
+    source venv/bin/activate
+    python scripts/verify_log_integrity.py
+    python scripts/verify_log_integrity.py --since 2026-10-01 --until 2026-10-18
+    python scripts/verify_log_integrity.py --merkle [--deep]
+"""
+
+import argparse
+import asyncio
+import os
+import sys
+from datetime import datetime
+
+from dotenv import load_dotenv
+
+load_dotenv()
+
+CURRENT_DIR = os.path.dirname(os.path.abspath(__file__))
+PROJECT_ROOT = os.path.dirname(CURRENT_DIR)
+if PROJECT_ROOT not in sys.path:
+    sys.path.insert(0, PROJECT_ROOT)
+
+from app.db.db import AsyncSessionLocal, engine  # noqa: E402
+from app.services.log_integrity import integrity_verifier  # noqa: E402
+from app.services.log_merkle import verify_range  # noqa: E402
+
+
+def _date(value: str) -> datetime:
+    return datetime.strptime(value, "%Y-%m-%d")
+
+
+async def _verify(since, until) -> int:
+    tampered = 0
+    try:
+        async with AsyncSessionLocal() as session:
+            async for event in integrity_verifier.verify_all(session, since, until):
+                if event["type"] == "progress":
+                    print(
+                        f"[integrity] {event['checked']}/{event['total']} checked, "
+                        f"{event['tampered']} tampered"
+                    )
+                    for row_id in event["tampered_ids"]:
+                        print(f"[integrity] TAMPERED log id={row_id}")
+                else:
+                    tampered = event["tampered"]
+                    print(
+                        f"[integrity] done: {event['checked']} checked, "
+                        f"{tampered} tampered, {event['unhashed']} without hash "
+                        f"({event['duration_ms']} ms)"
+                    )
+    finally:
+        integrity_verifier.shutdown()
+        await engine.dispose()
+    return tampered
+
+
+async def _verify_merkle(since, until, deep: bool) -> int:
+    try:
+        async with AsyncSessionLocal() as session:
+            result = await verify_range(session, since, until, deep=deep)
+    finally:
+        await engine.dispose()
+
+    for problem in result["problems"]:
+        print(f"[merkle] {problem['bucket_start']}: {problem['problem']}")
+    print(
+        f"[merkle] {result['buckets']} sealed hours, {result['entries']} entries, "
+        f"{result['expired_buckets']} expired, chain_ok={result['chain_ok']} "
+        f"({result['duration_ms']} ms)"
+    )
+    print(f"[merkle] chain head: {result['chain_head']}")
+    return len(result["problems"])
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Verify audit log integrity")
+    parser.add_argument("--since", type=_date, help="YYYY-MM-DD (default: oldest)")
+    parser.add_argument("--until", type=_date, help="YYYY-MM-DD, inclusive")
+    parser.add_argument(
+        "--merkle", action="store_true", help="check the sealed Merkle roots"
+    )
+    parser.add_argument(
+        "--deep", action="store_true", help="with --merkle, rehash every sealed hour"
+    )
+    args = parser.parse_args()
+
+    until = args.until.replace(hour=23, minute=59, second=59) if args.until else None
+    if args.merkle:
+        problems = asyncio.run(_verify_merkle(args.since, until, args.deep))
+        return 1 if problems else 0
+    tampered = asyncio.run(_verify(args.since, until))
+    return 1 if tampered else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -6,19 +6,8 @@ set -e
 cd "$(dirname "$0")"
 source venv/bin/activate
 
-echo "[1/3] Creating DB tables if they don't exist..."
-python3 -c "
-import asyncio, os
-from dotenv import load_dotenv
-load_dotenv()
-from app.db.db import engine, Base
-from app.models import LogEntry  # registers LogEntry with Base
-async def init():
-    async with engine.begin() as conn:
-        await conn.run_sync(Base.metadata.create_all)
-    print('  Tables ready.')
-asyncio.run(init())
-"
+echo "[1/3] Applying database migrations..."
+alembic upgrade head
 
 echo "[2/3] Freeing port 8000 if already in use..."
 fuser -k 8000/tcp 2>/dev/null && sleep 1 || true
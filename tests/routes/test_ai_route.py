@@ -82,7 +82,7 @@ def test_ai_query_blocks_on_input_dlp(client, auth_headers, monkeypatch):
         def __init__(self, type_: str):
             self.type = type_
 
-    def fake_scan_text(text: str):
+    def fake_scan_text(text: str, mode=None):
         return text, [FakeFinding("test_sensitive")]
 
     class FakeDecision:
@@ -150,7 +150,7 @@ def test_ai_query_blocks_on_output_dlp(client, auth_headers, monkeypatch):
         def __init__(self, type_: str):
             self.type = type_
 
-    def fake_scan_text(text: str):
+    def fake_scan_text(text: str, mode=None):
         if "trigger-output-block" in text:
             return text, [FakeFinding("output_sensitive")]
         return text, []
@@ -200,7 +200,7 @@ def test_ai_query_redacts_output_dlp(client, auth_headers, monkeypatch):
         def __init__(self, type_: str):
             self.type = type_
 
-    def fake_scan_text(text: str):
+    def fake_scan_text(text: str, mode=None):
         if "trigger-output-redact" in text:
             return text, [FakeFinding("output_sensitive")]
         return text, []
@@ -241,3 +241,86 @@ def test_ai_query_redacts_output_dlp(client, auth_headers, monkeypatch):
     assert data["output"]["text"] == "REDACTED_TEXT"
     assert data["security"]["policy_decision"] == "redact"
     assert data["security"]["redactions"] != []
+
+
+def test_ai_query_reuses_middleware_scan(client, auth_headers, monkeypatch):
+    """
+    When the DLP middleware already analyzed the prompt, the route must
+    reuse that result instead of running the analyzer again.
+    """
+    from app.services.dlp_engine import DlpDecision, DlpScanResult
+
+    scan = DlpScanResult(
+        redacted_text="Safe input",
+        findings=[],
+        decision=DlpDecision(
+            decision=PolicyDecision.ALLOW, risk_score=0.0, findings=[]
+        ),
+    )
+    scanned = []
+
+    def fake_get_request_scan(request, text):
+        return scan if text == "Safe input" else None
+
+    def fake_scan_text(text: str, mode=None):
+        scanned.append(text)
+        return text, []
+
+    monkeypatch.setattr(ai_module.dlp_engine, "get_request_scan", fake_get_request_scan)
+    monkeypatch.setattr(ai_module.dlp_engine, "scan_text", fake_scan_text)
+
+    async def fake_route_one(prompt, model, user):
+        return {"answer": "model output", "model_used": "ollama:test"}
+
+    monkeypatch.setattr(ai_module.model_router, "route_one", fake_route_one)
+
+    response = client.post(
+        "/ai/query", json={"prompt": "Safe input"}, headers=auth_headers
+    )
+    assert response.status_code == 200
+    # Only the model output is scanned; the prompt scan was reused
+    assert scanned == ["model output"]
+
+
+def test_ai_query_redacts_lowercase_name_with_default_full_tier(
+    client, auth_headers, monkeypatch
+):
+    """
+    A lower-case name gives the pre-screen nothing to go on, so /ai/query
+    must run the NER tier (policy default "full") on the prompt and on
+    the model output.
+    """
+    from presidio_analyzer import RecognizerResult
+
+    from app.services import dlp_engine
+
+    name = "maria gonzalez"
+    prompt = f"please forward the meeting notes to {name}"
+    assert dlp_engine.prescreen(prompt) == ""  # tiered would skip NER
+    assert dlp_engine.scan_mode_for("/ai/query") == dlp_engine.ScanMode.FULL
+
+    # Stand-in for the spaCy NER tier (the test model has no NER)
+    def fake_ner(text):
+        start = text.find(name)
+        if start < 0:
+            return []
+        return [RecognizerResult("PERSON", start, start + len(name), 0.85)]
+
+    monkeypatch.setattr(dlp_engine, "analyze_text", fake_ner)
+    monkeypatch.setattr(
+        dlp_engine, "analyze_texts", lambda texts: [fake_ner(t) for t in texts]
+    )
+
+    seen = {}
+
+    async def fake_route_one(prompt, model, user):
+        seen["prompt"] = prompt
+        return {"answer": f"Sure, I sent them to {name}.", "model_used": "test"}
+
+    monkeypatch.setattr(ai_module.model_router, "route_one", fake_route_one)
+
+    response = client.post("/ai/query", json={"prompt": prompt}, headers=auth_headers)
+
+    assert response.status_code == 200
+    assert name not in seen["prompt"]
+    assert name not in response.json()["output"]["text"]
@@ -239,3 +239,59 @@ def test_pdf_extraction_failure_returns_422(client, auth_headers, monkeypatch):
     # NCFR6: Safe message — internal ValueError detail not exposed
     assert "Could not extract text" in response.json()["detail"]
     assert "parse failed" not in response.json()["detail"]
+
+
+def _cross_line_analyzer(monkeypatch):
+    """
+    Fake analyzer tier: flags a badge id only when its "Badge:" label on
+    the previous line is in the same analyzed text (a context-dependent,
+    cross-line entity).
+    """
+    import re
+
+    from presidio_analyzer import RecognizerResult
+
+    from app.services import dlp_engine
+
+    pattern = re.compile(r"Badge:\s+(badge-[a-z]+)")
+
+    def fake_tiered(texts, mode):
+        return [
+            [
+                RecognizerResult("BADGE_ID", m.start(1), m.end(1), 0.9)
+                for m in pattern.finditer(text)
+            ]
+            for text in texts
+        ]
+
+    monkeypatch.setattr(dlp_engine, "_tiered_results", fake_tiered)
+
+
+def test_scan_document_detects_entity_spanning_lines(monkeypatch):
+    _cross_line_analyzer(monkeypatch)
+    text = "Visitor log\nBadge:\nbadge-heron\nescorted by security"
+
+    redacted, findings = doc_module._scan_document(text)
+
+    assert "badge-heron" not in redacted
+    assert redacted.startswith("Visitor log\nBadge:\n")
+    assert "BADGE_ID" in {f.type for f in findings}
+
+
+def test_scan_document_windows_overlap_long_documents(monkeypatch):
+    _cross_line_analyzer(monkeypatch)
+    monkeypatch.setattr(doc_module, "DOC_SCAN_CHUNK_CHARS", 60)
+    # The label ends one paragraph and the value starts the next, so the
+    # paragraph cut between windows falls right between them
+    text = "intro " + "x" * 40 + " Badge:\n\nbadge-kestrel " + "y" * 40 + "\n\nend"
+
+    monkeypatch.setattr(doc_module, "DOC_SCAN_CHUNK_OVERLAP", 0)
+    windows = doc_module._scan_windows(text, 60, 0)
+    assert len(windows) > 1
+    assert "badge-kestrel" in doc_module._scan_document(text)[0]  # no overlap: missed
+
+    monkeypatch.setattr(doc_module, "DOC_SCAN_CHUNK_OVERLAP", 30)
+    redacted, findings = doc_module._scan_document(text)
+    assert "badge-kestrel" not in redacted
+    assert redacted.endswith("y" * 40 + "\n\nend")
+    assert "BADGE_ID" in {f.type for f in findings}
@@ -0,0 +1,291 @@
+import base64
+import csv
+import gzip
+import io
+import json
+from datetime import datetime, timedelta
+from types import SimpleNamespace
+
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+from sqlalchemy.dialects import postgresql
+
+from app.auth.jwt_utils import create_access_token
+from app.services.log_integrity import entry_fields
+from app.utils.pagination import MAX_ROW_ID, decode_cursor, encode_cursor
+import app.routes.logs as logs_module
+
+
+class FakeScalarsResult:
+    def __init__(self, rows):
+        self._rows = rows
+
+    def scalars(self):
+        return self
+
+    def all(self):
+        return self._rows
+
+
+class FakeStreamResult:
+    def __init__(self, rows, chunk_size):
+        self._rows = rows
+        self._chunk_size = chunk_size
+
+    async def partitions(self):
+        for i in range(0, len(self._rows), self._chunk_size):
+            yield self._rows[i : i + self._chunk_size]
+
+
+class FakeSession:
+    def __init__(self, rows):
+        self._rows = rows
+        self.queries = []
+
+    async def execute(self, query):
+        self.queries.append(query)
+        return FakeScalarsResult(self._rows)
+
+    async def stream(self, query):
+        self.queries.append(query)
+        chunk_size = query.get_execution_options()["yield_per"]
+        return FakeStreamResult(self._rows, chunk_size)
+
+
+class FakeSessionContext:
+    def __init__(self, session):
+        self._session = session
+
+    async def __aenter__(self):
+        return self._session
+
+    async def __aexit__(self, exc_type, exc, tb):
+        return False
+
+
+def _auth_headers(username="admin", role="admin"):
+    token = create_access_token({"sub": username, "role": role})
+    return {"Authorization": f"Bearer {token}"}
+
+
+def _entry(row_id, created_at):
+    return SimpleNamespace(
+        id=row_id,
+        endpoint="/ai/query",
+        method="POST",
+        status_code=200,
+        event_type="ai_query",
+        severity="low",
+        risk_score=0.1,
+        source="ai_route",
+        policy_decision="allow",
+        message=None,
+        created_at=created_at,
+        integrity_hash=None,
+        key_id=None,
+    )
+
+
+def _client(monkeypatch, rows):
+    session = FakeSession(rows)
+    monkeypatch.setattr(
+        logs_module, "AsyncSessionLocal", lambda: FakeSessionContext(session)
+    )
+    app = FastAPI()
+    app.include_router(logs_module.router, prefix="/logs")
+    return TestClient(app), session
+
+
+def _sql(query) -> str:
+    return str(query.compile(dialect=postgresql.dialect()))
+
+
+def test_cursor_round_trip_and_rejects_garbage():
+    at = datetime(2026, 10, 18, 12, 30, 45, 123456)
+    assert decode_cursor(encode_cursor(at, 42)) == (at, 42)
+
+    for bad in ["", "not-base64!", encode_cursor(at, 1)[:-6], "A" * 200]:
+        try:
+            decode_cursor(bad)
+        except ValueError:
+            continue
+        raise AssertionError(f"accepted cursor {bad!r}")
+
+
+def test_cursor_rejects_tz_aware_timestamp():
+    aware = base64.urlsafe_b64encode(b"2026-10-18T10:00:00+05:00|5").decode()
+    with pytest.raises(ValueError):
+        decode_cursor(aware)
+
+
+def test_cursor_rejects_out_of_range_id():
+    at = datetime(2026, 10, 18, 12)
+    assert decode_cursor(encode_cursor(at, MAX_ROW_ID)) == (at, MAX_ROW_ID)
+    for row_id in [0, -1, MAX_ROW_ID + 1, 2**63]:
+        with pytest.raises(ValueError):
+            decode_cursor(encode_cursor(at, row_id))
+
+
+def test_list_returns_next_cursor_when_more_rows_exist(monkeypatch):
+    now = datetime(2026, 10, 18, 12)
+    rows = [_entry(10 - i, now - timedelta(seconds=i)) for i in range(3)]
+    client, session = _client(monkeypatch, rows)
+
+    response = client.get("/logs/list?limit=2", headers=_auth_headers())
+
+    assert response.status_code == 200
+    data = response.json()
+    assert [log["id"] for log in data["logs"]] == [10, 9]
+    assert decode_cursor(data["next_cursor"]) == (rows[1].created_at, 9)
+
+    sql = _sql(session.queries[0])
+    assert "ORDER BY logs.created_at DESC, logs.id DESC" in sql
+    assert "LIMIT" in sql and "(logs.created_at, logs.id) <" not in sql
+
+
+def test_list_with_cursor_seeks_past_it(monkeypatch):
+    now = datetime(2026, 10, 18, 12)
+    client, session = _client(monkeypatch, [_entry(5, now)])
+
+    cursor = encode_cursor(now + timedelta(seconds=1), 6)
+    response = client.get(
+        f"/logs/list?limit=2&cursor={cursor}", headers=_auth_headers()
+    )
+
+    assert response.status_code == 200
+    assert response.json()["next_cursor"] is None
+    sql = _sql(session.queries[0])
+    assert "(logs.created_at, logs.id) < (%(param_1)s, %(param_2)s)" in sql
+    assert "OFFSET" not in sql
+
+
+def test_list_rejects_bad_cursor_and_deep_offset(monkeypatch):
+    client, _ = _client(monkeypatch, [])
+    headers = _auth_headers()
+
+    assert client.get("/logs/list?cursor=%%%", headers=headers).status_code == 400
+
+    aware = base64.urlsafe_b64encode(b"2026-10-18T10:00:00+05:00|5").decode()
+    big = encode_cursor(datetime(2026, 10, 18), 2**40)
+    for bad in [aware, big]:
+        response = client.get(f"/logs/list?cursor={bad}", headers=headers)
+        assert response.status_code == 400
+
+    cursor = encode_cursor(datetime(2026, 10, 18), 1)
+    response = client.get(f"/logs/list?cursor={cursor}&offset=50", headers=headers)
+    assert response.status_code == 400
+
+    deep = logs_module.LOG_LIST_MAX_OFFSET + 1
+    assert client.get(f"/logs/list?offset={deep}", headers=headers).status_code == 422
+
+
+def _export_rows(count):
+    start = datetime(2026, 10, 1, 8)
+    return [_entry(i, start + timedelta(minutes=i)) for i in range(1, count + 1)]
+
+
+def test_export_streams_ndjson_in_chunks(monkeypatch):
+    monkeypatch.setattr(logs_module, "LOG_EXPORT_CHUNK_SIZE", 2)
+    client, session = _client(monkeypatch, _export_rows(5))
+
+    response = client.get(
+        "/logs/export?start_date=2026-10-01&end_date=2026-10-02&severity=low",
+        headers=_auth_headers(),
+    )
+
+    assert response.status_code == 200
+    assert response.headers["content-type"] == "application/x-ndjson"
+    assert "cyberoracle-logs-20261001-20261002.ndjson" in (
+        response.headers["content-disposition"]
+    )
+    lines = [json.loads(line) for line in response.text.splitlines()]
+    assert [line["id"] for line in lines] == [1, 2, 3, 4, 5]
+    assert lines[0]["created_at"] == "2026-10-01T08:01:00Z"
+
+    sql = str(session.queries[0].compile(compile_kwargs={"literal_binds": True}))
+    assert "logs.created_at >= '2026-10-01 00:00:00'" in sql
+    assert "logs.created_at <= '2026-10-02 23:59:59'" in sql
+    assert "logs.severity = 'low'" in sql
+    assert "ORDER BY logs.created_at, logs.id" in sql
+
+
+def test_export_csv_gzip(monkeypatch):
+    client, _ = _client(monkeypatch, _export_rows(3))
+
+    response = client.get("/logs/export?format=csv&gzip=true", headers=_auth_headers())
+
+    assert response.status_code == 200
+    assert response.headers["content-type"] == "application/gzip"
+    assert response.headers["content-disposition"].endswith('.csv.gz"')
+    text = gzip.decompress(response.content).decode()
+    rows = list(csv.DictReader(io.StringIO(text)))
+    assert [row["id"] for row in rows] == ["1", "2", "3"]
+    assert tuple(rows[0]) == logs_module.EXPORT_FIELDS
+
+
+def test_export_requires_log_permission(monkeypatch):
+    client, _ = _client(monkeypatch, [])
+    response = client.get("/logs/export", headers=_auth_headers("dev", "developer"))
+    assert response.status_code == 403
+
+
+def test_verify_streams_progress_and_alerts_on_tampering(monkeypatch):
+    rows = _export_rows(3)
+    rows[1].integrity_hash = "0" * 64
+    client, _ = _client(monkeypatch, [])
+    alerts = []
+    monkeypatch.setattr(logs_module, "send_alert", lambda **kw: alerts.append(kw))
+    verifier = logs_module.integrity_verifier
+    monkeypatch.setattr(verifier, "cache_size", 0)
+
+    async def execute(query):
+        return SimpleNamespace(scalar=lambda: len(rows))
+
+    # verify_all selects the verified columns, so the cursor yields tuples
+    session = FakeSession([entry_fields(row) for row in rows])
+    session.execute = execute
+    monkeypatch.setattr(
+        logs_module, "AsyncSessionLocal", lambda: FakeSessionContext(session)
+    )
+
+    response = client.get("/logs/verify", headers=_auth_headers())
+
+    assert response.status_code == 200
+    events = [json.loads(line) for line in response.text.splitlines()]
+    summary = events[-1]
+    assert summary["type"] == "summary"
+    assert (summary["checked"], summary["tampered_ids"]) == (3, [2])
+    assert alerts and alerts[0]["severity"] == "critical"
+
+    response = client.get("/logs/verify", headers=_auth_headers("dev", "developer"))
+    assert response.status_code == 403
+
+
+def test_merkle_routes(monkeypatch):
+    client, _ = _client(monkeypatch, [])
+    alerts = []
+    monkeypatch.setattr(logs_module, "send_alert", lambda **kw: alerts.append(kw))
+
+    async def verify_range(session, since, until, deep=False):
+        assert until == datetime(2026, 10, 18, 23, 59, 59) and deep
+        return {"intact": False, "buckets": 5, "problems": [{"problem": "x"}]}
+
+    proofs = {1: None, 2: {"sealed": False}, 3: {"sealed": True, "verified": True}}
+
+    async def prove_entry(session, entry_id):
+        return proofs[entry_id]
+
+    monkeypatch.setattr(logs_module, "verify_range", verify_range)
+    monkeypatch.setattr(logs_module, "prove_entry", prove_entry)
+    headers = _auth_headers("auditor", "auditor")
+
+    response = client.get(
+        "/logs/merkle/verify?end_date=2026-10-18&deep=true", headers=headers
+    )
+    assert response.status_code == 200 and not response.json()["intact"]
+    assert alerts[0]["severity"] == "critical"
+
+    assert client.get("/logs/merkle/proof/1", headers=headers).status_code == 404
+    assert client.get("/logs/merkle/proof/2", headers=headers).status_code == 409
+    assert client.get("/logs/merkle/proof/3", headers=headers).json()["verified"]
@@ -1,7 +1,19 @@
+import asyncio
+import threading
+import time
+from types import SimpleNamespace
+from unittest.mock import AsyncMock, MagicMock
+
+import pytest
 from fastapi.testclient import TestClient
 
 from app.auth.jwt_utils import create_access_token
+from app.db.pool import InstrumentedAsyncPool
 from app.main import app
+from app.services import log_writer as log_writer_module
+from app.services.dlp_executor import dlp_executor
+from app.services.log_writer import AuditLogWriter
+import app.routes.dlp as dlp_module
 import app.routes.metrics as metrics_module
 
 
@@ -13,12 +25,17 @@ def _auth_headers(username="admin", role="admin"):
 client = TestClient(app)
 
 
-class FakeScalarResult:
-    def __init__(self, value):
-        self._value = value
+class FakeCountsResult:
+    """Single-row result of a ConditionalCounts query."""
+
+    def __init__(self, counts):
+        self._counts = counts
+
+    def mappings(self):
+        return self
 
-    def scalar(self):
-        return self._value
+    def one(self):
+        return self._counts
 
 
 class FakeSession:
@@ -46,10 +63,9 @@ class FakeSessionContext:
 def test_metrics_summary_authorized(monkeypatch):
     fake_session = FakeSession(
         [
-            FakeScalarResult(12),  # total_prompts_24h
-            FakeScalarResult(3),  # blocked_prompts
-            FakeScalarResult(2),  # redacted_outputs
-            FakeScalarResult(1),  # high_risk_events
+            FakeCountsResult(
+                {"total_prompts": 12, "blocked": 3, "redacted": 2, "high_risk": 1}
+            )
         ]
     )
 
@@ -107,3 +123,221 @@ def test_compliance_status_requires_auth():
 def test_alerts_recent_requires_auth():
     response = client.get("/api/alerts/recent")
     assert response.status_code in (401, 403)
+
+
+@pytest.fixture
+def scan_route(monkeypatch):
+    """POST /api/scan with the audit log write stubbed out."""
+    monkeypatch.setattr(dlp_module, "log_request", AsyncMock())
+
+    def scan(text):
+        response = client.post(
+            "/api/scan", json={"text": text}, headers=_auth_headers()
+        )
+        assert response.status_code == 200
+        return response
+
+    return scan
+
+
+@pytest.fixture
+def process_executor(monkeypatch):
+    """Run DLP jobs in a real worker process, as in production."""
+    monkeypatch.setattr(dlp_executor, "mode", "process")
+    monkeypatch.setattr(dlp_executor, "workers", 1)
+    monkeypatch.setattr(dlp_executor, "timeout_s", 120)
+    yield dlp_executor
+    dlp_executor.shutdown()
+
+
+def _metrics(name):
+    response = client.get(f"/api/metrics/{name}", headers=_auth_headers())
+    assert response.status_code == 200
+    return response.json()
+
+
+def test_dlp_cache_metrics_count_repeated_scan(scan_route):
+    text = "cache metrics probe one"
+    before = _metrics("dlp-cache")
+    scan_route(text)
+    scan_route(text)
+    after = _metrics("dlp-cache")
+
+    assert after["scope"] == "process"
+    assert after["misses"] > before["misses"]
+    assert after["hits"] > before["hits"]
+    assert after["entries"] > before["entries"]
+
+
+def test_dlp_cache_metrics_include_worker_processes(scan_route, process_executor):
+    text = "cache metrics probe two"
+    scan_route(text)
+    first = _metrics("dlp-cache")
+    scan_route(text)
+    second = _metrics("dlp-cache")
+
+    assert second["scope"] == "workers"
+    assert second["processes"] == 2  # this process + one worker
+    assert first["misses"] > 0
+    assert second["hits"] > first["hits"]
+    assert second["misses"] == first["misses"]
+
+
+def test_dlp_cache_metrics_requires_auth():
+    response = client.get("/api/metrics/dlp-cache")
+    assert response.status_code in (401, 403)
+
+
+def test_dlp_executor_metrics_count_completed_jobs(scan_route, process_executor):
+    before = _metrics("dlp-executor")
+    scan_route("executor metrics probe")
+    after = _metrics("dlp-executor")
+
+    assert after["mode"] == "process"
+    # DLPFilterMiddleware body scan + the route's own scan
+    assert after["completed"] == before["completed"] + 2
+    assert after["inflight"] == 0
+    assert after["rejected"] == before["rejected"]
+
+
+def test_dlp_executor_metrics_count_rejections(monkeypatch, scan_route):
+    release = threading.Event()
+    monkeypatch.setattr(dlp_executor, "mode", "thread")
+    monkeypatch.setattr(dlp_executor, "workers", 1)
+    monkeypatch.setattr(dlp_executor, "max_queue", 0)
+    try:
+        blocker = threading.Thread(
+            target=asyncio.run, args=(dlp_executor.run(release.wait, 5),)
+        )
+        blocker.start()
+        while _metrics("dlp-executor")["inflight"] == 0:
+            time.sleep(0.01)
+
+        before = _metrics("dlp-executor")
+        response = client.post(
+            "/api/scan", json={"text": "rejected probe"}, headers=_auth_headers()
+        )
+        after = _metrics("dlp-executor")
+    finally:
+        release.set()
+        blocker.join()
+        dlp_executor.shutdown()
+
+    assert response.status_code == 503
+    assert after["rejected"] == before["rejected"] + 1
+
+
+def test_dlp_tier_metrics_count_scans(scan_route):
+    before = _metrics("dlp-tiers")
+    scan_route("tier metrics probe")
+    after = _metrics("dlp-tiers")
+
+    assert after["scope"] == "process"
+    # /api/scan runs the full tier: the request body goes through NER
+    assert after["ner"]["runs"] == before["ner"]["runs"] + 1
+    assert after["pattern"]["runs"] == before["pattern"]["runs"]
+
+
+def test_dlp_tier_metrics_include_worker_processes(scan_route, process_executor):
+    before = _metrics("dlp-tiers")
+    scan_route("tier metrics worker probe")
+    after = _metrics("dlp-tiers")
+
+    assert after["scope"] == "workers"
+    # /api/scan runs the full tier: the request body goes through NER
+    assert after["ner"]["runs"] == before["ner"]["runs"] + 1
+    assert after["pattern"]["runs"] == before["pattern"]["runs"]
+
+
+def test_log_writer_metrics_count_written_rows(monkeypatch):
+    writer = AuditLogWriter(batch_size=2, flush_interval_s=0.01)
+    monkeypatch.setattr(metrics_module, "log_writer", writer)
+    monkeypatch.setattr(log_writer_module, "write_batch", AsyncMock())
+
+    async def write_rows():
+        writer.start()
+        for i in range(3):
+            assert await writer.enqueue({"endpoint": f"/e/{i}", "method": "GET"})
+        await writer.stop()
+
+    asyncio.run(write_rows())
+    data = _metrics("log-writer")
+
+    assert (data["enqueued"], data["written"], data["dropped"]) == (3, 3, 0)
+    assert data["flushes"] == 2
+    assert data["high_watermark"] >= 1
+    assert data["queue_depth"] == 0
+
+
+def test_db_pool_metrics_track_checkouts(monkeypatch):
+    pool = InstrumentedAsyncPool(creator=MagicMock, pool_size=2, max_overflow=0)
+    monkeypatch.setattr(metrics_module, "engine", SimpleNamespace(pool=pool))
+
+    conn = pool.connect()
+    busy = _metrics("db-pool")
+    conn.close()
+    idle = _metrics("db-pool")
+
+    assert busy["pool_class"] == "InstrumentedAsyncPool"
+    assert (busy["checked_out"], busy["saturation"]) == (1, 0.5)
+    assert (idle["checked_out"], idle["checked_in"]) == (0, 1)
+    assert idle["checkouts"] == 1
+
+
+class FakeBucketsResult:
+    def __init__(self, rows):
+        self._rows = rows
+
+    def mappings(self):
+        return self
+
+    def all(self):
+        return self._rows
+
+
+def test_metrics_timeline_zero_fills_buckets(monkeypatch):
+    from datetime import datetime
+
+    from app.services.log_rollups import truncate
+
+    current = truncate(datetime.utcnow(), "hour")
+    fake_session = FakeSession(
+        [
+            FakeBucketsResult(
+                [
+                    {
+                        "bucket_start": current,
+                        "total": 5,
+                        "blocked": 1,
+                        "redacted": 2,
+                        "high_risk": 1,
+                    }
+                ]
+            )
+        ]
+    )
+    monkeypatch.setattr(
+        metrics_module,
+        "AsyncSessionLocal",
+        lambda: FakeSessionContext(fake_session),
+    )
+
+    response = client.get(
+        "/api/metrics/timeline?window_hours=24", headers=_auth_headers()
+    )
+    assert response.status_code == 200
+
+    data = response.json()
+    assert data["granularity"] == "hour"
+    assert len(data["buckets"]) == 24
+    assert data["buckets"][-1]["total"] == 5
+    assert data["buckets"][-1]["blocked"] == 1
+    assert data["buckets"][0]["total"] == 0
+
+
+def test_metrics_timeline_rejects_long_minute_windows():
+    response = client.get(
+        "/api/metrics/timeline?window_hours=48&granularity=minute",
+        headers=_auth_headers(),
+    )
+    assert response.status_code == 422
@@ -5,12 +5,17 @@ from app.auth.jwt_utils import create_access_token
 import app.routes.reports as reports_module
 
 
-class FakeScalarResult:
-    def __init__(self, value):
-        self._value = value
+class FakeCountsResult:
+    """Single-row result of a ConditionalCounts query."""
 
-    def scalar(self):
-        return self._value
+    def __init__(self, counts):
+        self._counts = counts
+
+    def mappings(self):
+        return self
+
+    def one(self):
+        return self._counts
 
 
 class FakeRowsResult:
@@ -57,13 +62,17 @@ def build_client():
 def test_reports_summary_defaults(monkeypatch):
     fake_session = FakeSession(
         [
-            FakeScalarResult(20),
-            FakeScalarResult(5),
-            FakeScalarResult(7),
-            FakeScalarResult(8),
-            FakeScalarResult(3),
-            FakeScalarResult(9),
-            FakeScalarResult(8),
+            FakeCountsResult(
+                {
+                    "total": 20,
+                    "blocked": 5,
+                    "redacted": 7,
+                    "allowed": 8,
+                    "high": 3,
+                    "medium": 9,
+                    "low": 8,
+                }
+            ),
             FakeRowsResult([("ai_query", 10), ("document_sanitize", 4)]),
             FakeRowsResult([("allow", 8), ("redact", 7), ("block", 5)]),
             FakeRowsResult([("/ai/query", 12), ("/api/documents/sanitize", 8)]),
@@ -108,13 +117,17 @@ def test_reports_summary_defaults(monkeypatch):
 def test_reports_summary_with_explicit_dates(monkeypatch):
     fake_session = FakeSession(
         [
-            FakeScalarResult(1),
-            FakeScalarResult(0),
-            FakeScalarResult(0),
-            FakeScalarResult(1),
-            FakeScalarResult(0),
-            FakeScalarResult(0),
-            FakeScalarResult(1),
+            FakeCountsResult(
+                {
+                    "total": 1,
+                    "blocked": 0,
+                    "redacted": 0,
+                    "allowed": 1,
+                    "high": 0,
+                    "medium": 0,
+                    "low": 1,
+                }
+            ),
             FakeRowsResult([]),
             FakeRowsResult([]),
             FakeRowsResult([]),
@@ -143,13 +156,17 @@ def test_reports_summary_with_explicit_dates(monkeypatch):
 def test_reports_summary_invalid_dates_fall_back(monkeypatch):
     fake_session = FakeSession(
         [
-            FakeScalarResult(0),
-            FakeScalarResult(0),
-            FakeScalarResult(0),
-            FakeScalarResult(0),
-            FakeScalarResult(0),
-            FakeScalarResult(0),
-            FakeScalarResult(0),
+            FakeCountsResult(
+                {
+                    "total": 0,
+                    "blocked": 0,
+                    "redacted": 0,
+                    "allowed": 0,
+                    "high": 0,
+                    "medium": 0,
+                    "low": 0,
+                }
+            ),
             FakeRowsResult([]),
             FakeRowsResult([]),
             FakeRowsResult([]),
@@ -0,0 +1,93 @@
+import time
+
+from app.services.dlp_cache import DlpResultCache, merge_stats
+
+SPANS = (("EMAIL_ADDRESS", 8, 24, 1.0),)
+
+
+def test_miss_then_hit():
+    cache = DlpResultCache()
+    assert cache.get("contact a@example.com", "v1") is None
+
+    cache.put("contact a@example.com", "v1", SPANS)
+    assert cache.get("contact a@example.com", "v1") == SPANS
+
+    stats = cache.stats()
+    assert stats["hits"] == 1
+    assert stats["misses"] == 1
+    assert stats["entries"] == 1
+
+
+def test_version_change_is_a_miss():
+    cache = DlpResultCache()
+    cache.put("same text", "v1", SPANS)
+    assert cache.get("same text", "v2") is None
+
+
+def test_raw_text_is_never_stored():
+    cache = DlpResultCache()
+    cache.put("My SSN is 123-45-6789", "v1", SPANS)
+
+    stored = repr(cache._entries)
+    assert "123-45-6789" not in stored
+    assert "My SSN" not in stored
+
+
+def test_digest_is_keyed():
+    a = DlpResultCache(hmac_key=b"key-a")
+    b = DlpResultCache(hmac_key=b"key-b")
+    assert a.digest("text", "v1") != b.digest("text", "v1")
+    assert a.digest("text", "v1") == a.digest("text", "v1")
+
+
+def test_lru_eviction_respects_byte_budget():
+    one_entry = DlpResultCache()
+    one_entry.put("x", "v1", SPANS)
+    entry_size = one_entry.stats()["bytes"]
+
+    cache = DlpResultCache(max_bytes=entry_size * 2)
+    cache.put("first", "v1", SPANS)
+    cache.put("second", "v1", SPANS)
+    # Touch "first" so "second" becomes least recently used
+    assert cache.get("first", "v1") == SPANS
+    cache.put("third", "v1", SPANS)
+
+    assert cache.get("second", "v1") is None
+    assert cache.get("first", "v1") == SPANS
+    assert cache.get("third", "v1") == SPANS
+    assert cache.stats()["evictions"] == 1
+    assert cache.stats()["bytes"] <= entry_size * 2
+
+
+def test_ttl_expiry():
+    cache = DlpResultCache(ttl_s=0.01)
+    cache.put("short lived", "v1", SPANS)
+    time.sleep(0.02)
+
+    assert cache.get("short lived", "v1") is None
+    stats = cache.stats()
+    assert stats["expirations"] == 1
+    assert stats["entries"] == 0
+    assert stats["bytes"] == 0
+
+
+def test_disabled_cache_is_a_noop():
+    cache = DlpResultCache(enabled=False)
+    cache.put("text", "v1", SPANS)
+    assert cache.get("text", "v1") is None
+    assert cache.stats()["entries"] == 0
+
+
+def test_merge_stats_sums_processes():
+    a, b = DlpResultCache(max_bytes=1000), DlpResultCache(max_bytes=1000)
+    a.put("text", "v1", SPANS)
+    a.get("text", "v1")
+    b.get("text", "v1")
+    b.get("other", "v1")
+
+    merged = merge_stats([a.stats(), b.stats()])
+
+    assert (merged["hits"], merged["misses"], merged["entries"]) == (1, 2, 1)
+    assert merged["max_bytes"] == 2000
+    assert merged["hit_rate"] == round(1 / 3, 4)
+    assert merged["processes"] == 2
@@ -1,4 +1,5 @@
 from app.services import dlp_engine
+from app.auth.policy_loader import compile_policy
 from app.services.dlp_engine import DlpFinding, PolicyDecision
 
 
@@ -109,3 +110,177 @@ def test_redact_text_filters_zero_count_findings():
 
     assert out_text == "masked text"
     assert meta == [{"type": "EMAIL_ADDRESS", "count": 2}]
+
+
+def test_get_request_scan_returns_middleware_result():
+    from types import SimpleNamespace
+
+    findings = [DlpFinding(type="EMAIL_ADDRESS", count=1, severity=2)]
+    scan = dlp_engine.DlpScanResult(
+        redacted_text="contact <EMAIL_ADDRESS>",
+        findings=findings,
+        decision=dlp_engine.decide(findings),
+    )
+    request = SimpleNamespace(
+        state=SimpleNamespace(dlp_scan_results={scan.redacted_text: scan})
+    )
+
+    assert dlp_engine.get_request_scan(request, "contact <EMAIL_ADDRESS>") is scan
+    assert dlp_engine.get_request_scan(request, "something else") is None
+
+
+def test_get_request_scan_without_middleware_state():
+    from types import SimpleNamespace
+
+    request = SimpleNamespace(state=SimpleNamespace())
+    assert dlp_engine.get_request_scan(request, "hello") is None
+
+
+def test_scan_many_matches_scan_text_in_order():
+    texts = ["hello world", "email me at test@example.com", "", "hello world"]
+    batched = dlp_engine.scan_many(texts)
+
+    assert len(batched) == len(texts)
+    for text, (redacted, findings) in zip(texts, batched):
+        assert (redacted, findings) == dlp_engine.scan_text(text)
+    assert batched[2] == ("", [])
+
+
+def test_sanitize_value_runs_one_batch_for_all_leaves(monkeypatch):
+    from app.middleware import dlp_filter
+
+    calls = []
+    real_analyze_many = dlp_engine.analyze_many
+
+    def counting_analyze_many(texts, mode=None):
+        calls.append(list(texts))
+        return real_analyze_many(texts, mode)
+
+    monkeypatch.setattr(dlp_engine, "analyze_many", counting_analyze_many)
+
+    detected = set()
+    body = {"a": "mail test@example.com", "b": ["hello", {"c": "hello"}], "n": 3}
+    out = dlp_filter._sanitize_value(body, detected)
+
+    assert len(calls) == 1
+    assert calls[0] == ["mail test@example.com", "hello"]
+    assert "example.com" not in out["a"]
+    assert out["b"] == ["hello", {"c": "hello"}]
+    assert out["n"] == 3
+
+
+def test_prescreen_flags_every_sensitive_redteam_prompt():
+    from app.utils.redteam_dataset import load_redteam_sections
+
+    sections = load_redteam_sections()
+    for section, prompts in sections.items():
+        if section == "control":
+            continue
+        for prompt in prompts:
+            assert dlp_engine.prescreen(prompt), f"{section}: {prompt!r}"
+
+
+def test_prescreen_signals():
+    assert dlp_engine.prescreen("explain how transformers work") == ""
+    assert dlp_engine.prescreen("Write a poem about the sea.") == ""
+    assert dlp_engine.prescreen("John called me") == "proper_noun"
+    assert dlp_engine.prescreen("What is the capital of France?") == "proper_noun"
+    assert dlp_engine.prescreen("see you tomorrow") == "keyword"
+    assert dlp_engine.prescreen("meet at 3") == "digit"
+    assert dlp_engine.prescreen("a@b") == "at_sign"
+
+
+def test_tiered_mode_skips_ner_for_clean_text(monkeypatch):
+    from app.services.dlp_engine import ScanMode
+
+    def no_ner(*_args, **_kwargs):
+        raise AssertionError("NER tier should not run for clean text")
+
+    monkeypatch.setattr(dlp_engine, "analyze_text", no_ner)
+    monkeypatch.setattr(dlp_engine, "analyze_texts", no_ner)
+
+    before = dlp_engine.tier_stats()
+    scan = dlp_engine.analyze("please summarize this article", ScanMode.TIERED)
+    after = dlp_engine.tier_stats()
+
+    assert scan.redacted_text == "please summarize this article"
+    assert after["prescreen"]["clean"] == before["prescreen"]["clean"] + 1
+    assert after["pattern"]["runs"] == before["pattern"]["runs"] + 1
+
+
+def test_tiered_mode_runs_ner_when_flagged(monkeypatch):
+    from app.services.dlp_engine import ScanMode
+
+    calls = []
+    monkeypatch.setattr(dlp_engine, "analyze_text", lambda t: calls.append(t) or [])
+
+    dlp_engine.analyze("John lives here", ScanMode.TIERED)
+    assert calls == ["John lives here"]
+
+
+def test_tiered_matches_full_on_redteam_dataset():
+    from app.services.dlp_engine import ScanMode
+    from app.utils.redteam_dataset import load_redteam_sections
+
+    for prompts in load_redteam_sections().values():
+        for prompt in prompts:
+            full = set(dlp_engine.analyze(prompt, ScanMode.FULL).entities)
+            tiered = set(dlp_engine.analyze(prompt, ScanMode.TIERED).entities)
+            assert full <= tiered, prompt
+
+
+def test_scan_mode_for_uses_longest_endpoint_prefix(monkeypatch):
+    from app.services.dlp_engine import ScanMode
+
+    policy = {
+        "dlp_rules": {
+            "scan_tiers": {
+                "default": "tiered",
+                "endpoints": {"/api": "pattern", "/api/scan": "full"},
+            }
+        }
+    }
+    compiled = compile_policy(policy)
+    monkeypatch.setattr(dlp_engine, "get_policy", lambda: compiled)
+
+    assert dlp_engine.scan_mode_for("/ai/query") == ScanMode.TIERED
+    assert dlp_engine.scan_mode_for("/api/metrics/summary") == ScanMode.PATTERN
+    assert dlp_engine.scan_mode_for("/api/scan") == ScanMode.FULL
+    assert dlp_engine.scan_mode_for("/api/scanner") == ScanMode.PATTERN
+
+
+def test_scan_mode_for_fails_safe_to_full(monkeypatch):
+    from app.services.dlp_engine import ScanMode
+
+    def missing_policy():
+        raise FileNotFoundError("policy.yaml")
+
+    monkeypatch.setattr(dlp_engine, "get_policy", missing_policy)
+    assert dlp_engine.scan_mode_for("/ai/query") == ScanMode.FULL
+
+    bad = {"dlp_rules": {"scan_tiers": {"default": "turbo"}}}
+    compiled = compile_policy(bad)
+    monkeypatch.setattr(dlp_engine, "get_policy", lambda: compiled)
+    assert dlp_engine.scan_mode_for("/ai/query") == ScanMode.FULL
+
+
+def test_merge_tier_stats_recomputes_rates():
+    def snap(checked, clean, runs, hits):
+        return {
+            "prescreen": {
+                "checked": checked,
+                "clean": clean,
+                "skip_rate": 0.0,
+                "reasons": {"clean": clean, "digit": checked - clean},
+            },
+            "pattern": {"runs": runs, "hits": hits, "hit_rate": 0.0},
+            "ner": {"runs": checked - clean, "hits": 0, "hit_rate": 0.0},
+        }
+
+    merged = dlp_engine.merge_tier_stats([snap(4, 3, 4, 1), snap(4, 1, 4, 3)])
+
+    assert merged["prescreen"]["checked"] == 8
+    assert merged["prescreen"]["skip_rate"] == 0.5
+    assert merged["prescreen"]["reasons"] == {"clean": 4, "digit": 4}
+    assert merged["pattern"] == {"runs": 8, "hits": 4, "hit_rate": 0.5}
+    assert merged["processes"] == 2
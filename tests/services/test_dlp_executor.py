@@ -0,0 +1,203 @@
+import asyncio
+import threading
+import time
+
+import pytest
+
+from concurrent.futures import BrokenExecutor, Executor
+
+from app.services.dlp_executor import (
+    DlpExecutor,
+    DlpExecutorError,
+    DlpExecutorSaturated,
+    DlpScanTimeout,
+)
+
+
+def _upper(text: str) -> str:
+    return text.upper()
+
+
+@pytest.mark.asyncio
+async def test_inline_mode_runs_on_caller():
+    executor = DlpExecutor(mode="inline")
+    assert await executor.run(_upper, "abc") == "ABC"
+
+
+@pytest.mark.asyncio
+async def test_thread_mode_returns_result():
+    executor = DlpExecutor(mode="thread", workers=2)
+    try:
+        assert await executor.run(_upper, "abc") == "ABC"
+        stats = executor.stats()
+        assert stats["completed"] == 1
+        assert stats["inflight"] == 0
+    finally:
+        executor.shutdown()
+
+
+@pytest.mark.asyncio
+async def test_rejects_when_saturated():
+    executor = DlpExecutor(mode="thread", workers=1, max_queue=0)
+    release = threading.Event()
+    try:
+        first = asyncio.ensure_future(executor.run(release.wait, 5))
+        await asyncio.sleep(0.05)
+
+        with pytest.raises(DlpExecutorSaturated):
+            await executor.run(_upper, "blocked")
+        assert executor.stats()["rejected"] == 1
+
+        release.set()
+        assert await first is True
+    finally:
+        release.set()
+        executor.shutdown()
+
+
+@pytest.mark.asyncio
+async def test_job_timeout_raises_and_keeps_slot_until_done():
+    executor = DlpExecutor(mode="thread", workers=1, max_queue=0)
+    try:
+        with pytest.raises(DlpScanTimeout):
+            await executor.run(time.sleep, 0.3, timeout=0.05)
+        assert executor.stats()["timeouts"] == 1
+
+        # The timed-out job is still running, so the slot stays taken
+        with pytest.raises(DlpExecutorSaturated):
+            await executor.run(_upper, "x")
+
+        await asyncio.sleep(0.4)
+        assert await executor.run(_upper, "x") == "X"
+    finally:
+        executor.shutdown()
+
+
+def _fail(message: str) -> None:
+    raise ValueError(message)
+
+
+@pytest.mark.asyncio
+async def test_failed_jobs_not_counted_as_completed():
+    executor = DlpExecutor(mode="thread", workers=1)
+    try:
+        with pytest.raises(ValueError):
+            await executor.run(_fail, "bad input")
+        assert await executor.run(_upper, "ok") == "OK"
+
+        stats = executor.stats()
+        assert (stats["completed"], stats["failed"]) == (1, 1)
+        assert stats["inflight"] == 0
+    finally:
+        executor.shutdown()
+
+
+class _BrokenPool(Executor):
+    def submit(self, fn, /, *args, **kwargs):
+        raise BrokenExecutor("worker died")
+
+
+@pytest.mark.asyncio
+async def test_broken_pool_on_submit_is_reset():
+    executor = DlpExecutor(mode="thread", workers=1)
+    executor._pool = _BrokenPool()
+    try:
+        with pytest.raises(DlpExecutorError, match="worker died"):
+            await executor.run(_upper, "x")
+        assert executor.stats()["inflight"] == 0
+
+        # A fresh pool is started on the next call
+        assert await executor.run(_upper, "x") == "X"
+    finally:
+        executor.shutdown()
+
+
+def test_invalid_mode_rejected():
+    with pytest.raises(ValueError):
+        DlpExecutor(mode="gpu")
+
+
+@pytest.mark.asyncio
+async def test_warm_up_marks_ready(monkeypatch):
+    from app.services import dlp_executor as executor_module
+
+    calls = []
+    monkeypatch.setattr(
+        executor_module, "_warm_engines", lambda analyze: calls.append(analyze)
+    )
+    executor = DlpExecutor(mode="thread", workers=2)
+    try:
+        assert executor.ready is False
+        await executor.warm_up(analyze=False)
+        assert executor.ready is True
+        assert calls == [False]
+        assert executor.stats()["ready"] is True
+    finally:
+        executor.shutdown()
+
+
+@pytest.mark.asyncio
+async def test_warm_up_failure_keeps_not_ready(monkeypatch):
+    from app.services import dlp_executor as executor_module
+
+    def broken(_analyze):
+        raise OSError("model not found")
+
+    monkeypatch.setattr(executor_module, "_warm_engines", broken)
+    executor = DlpExecutor(mode="inline")
+    await executor.warm_up()
+
+    assert executor.ready is False
+    assert "model not found" in executor.warmup_error
+
+
+def test_presidio_engines_are_not_built_at_import():
+    import subprocess
+    import sys
+
+    code = (
+        "import app.main\n"
+        "from app.middleware import dlp_presidio\n"
+        "assert not dlp_presidio.engines_loaded()\n"
+    )
+    result = subprocess.run([sys.executable, "-c", code], capture_output=True)
+    assert result.returncode == 0, result.stderr.decode()
+
+
+@pytest.mark.asyncio
+async def test_process_mode_collects_worker_cache_stats():
+    """The cache lives in the worker, so its counters come back per job."""
+    from app.middleware.dlp_presidio import analyze_text
+
+    executor = DlpExecutor(mode="process", workers=1, timeout_s=120)
+    try:
+        assert executor.worker_stats("dlp_cache") == []
+        await executor.run(analyze_text, "worker cache probe")
+        await executor.run(analyze_text, "worker cache probe")
+
+        (worker,) = executor.worker_stats("dlp_cache")
+        assert (worker["hits"], worker["misses"]) == (1, 1)
+    finally:
+        executor.shutdown()
+    assert executor.worker_stats("dlp_cache") == []
+
+
+@pytest.mark.asyncio
+async def test_process_mode_collects_worker_tier_stats():
+    from app.services.dlp_engine import ScanMode, scan_text
+
+    executor = DlpExecutor(mode="process", workers=1, timeout_s=120)
+    try:
+        await executor.run(scan_text, "please summarize this article", ScanMode.TIERED)
+
+        (worker,) = executor.worker_stats("dlp_tiers")
+        assert worker["prescreen"]["clean"] == 1
+        assert worker["pattern"]["runs"] == 1
+        assert worker["ner"]["runs"] == 0
+    finally:
+        executor.shutdown()
+
+
+def test_worker_stats_only_in_process_mode():
+    assert DlpExecutor(mode="thread").worker_stats("dlp_cache") is None
+    assert DlpExecutor(mode="inline").worker_stats("dlp_cache") is None
@@ -0,0 +1,119 @@
+import pytest
+
+from app.auth.policy_loader import compile_policy
+from app.services import dlp_profiles
+from app.services.dlp_profiles import DlpEngineProfile, resolve_profile
+
+
+@pytest.fixture(autouse=True)
+def _clean_env(monkeypatch):
+    monkeypatch.delenv("DLP_ENGINE_PROFILE", raising=False)
+    monkeypatch.delenv("DLP_SPACY_MODEL", raising=False)
+
+
+def _policy(monkeypatch, dlp_rules):
+    policy = compile_policy({"dlp_rules": dlp_rules})
+    monkeypatch.setattr(dlp_profiles, "get_policy", lambda: policy)
+
+
+def test_default_profile_is_accurate(monkeypatch):
+    _policy(monkeypatch, {})
+    profile = resolve_profile()
+    assert profile.name == "accurate"
+    assert profile.model == "en_core_web_lg"
+    assert profile.disable == ()
+
+
+def test_policy_selects_profile(monkeypatch):
+    _policy(monkeypatch, {"engine_profile": "fast"})
+    profile = resolve_profile()
+    assert profile.model == "en_core_web_sm"
+    assert "parser" in profile.disable
+    assert "NRP" in profile.exclude
+
+
+def test_env_overrides_policy(monkeypatch):
+    _policy(monkeypatch, {"engine_profile": "fast"})
+    monkeypatch.setenv("DLP_ENGINE_PROFILE", "balanced")
+    monkeypatch.setenv("DLP_SPACY_MODEL", "en_core_web_trf")
+
+    profile = resolve_profile()
+    assert profile.name == "balanced"
+    assert profile.model == "en_core_web_trf"
+
+
+def test_policy_defines_custom_profile(monkeypatch):
+    _policy(
+        monkeypatch,
+        {
+            "engine_profile": "edge",
+            "engine_profiles": {
+                "edge": {
+                    "model": "en_core_web_sm",
+                    "disable": ["parser"],
+                    "entities": ["EMAIL_ADDRESS", "CREDIT_CARD"],
+                }
+            },
+        },
+    )
+    profile = resolve_profile()
+    assert profile == DlpEngineProfile(
+        name="edge",
+        model="en_core_web_sm",
+        disable=("parser",),
+        entities=("EMAIL_ADDRESS", "CREDIT_CARD"),
+    )
+
+
+def test_unknown_profile_rejected(monkeypatch):
+    _policy(monkeypatch, {})
+    with pytest.raises(ValueError):
+        resolve_profile("turbo")
+
+
+def test_profile_entities():
+    from app.middleware.dlp_presidio import ALL_ENTITIES, profile_entities
+
+    fast = dlp_profiles.BUILTIN_PROFILES["fast"]
+    assert "NRP" not in profile_entities(fast)
+    assert "PERSON" in profile_entities(fast)
+
+    accurate = dlp_profiles.BUILTIN_PROFILES["accurate"]
+    assert profile_entities(accurate) == ALL_ENTITIES
+
+    narrow = DlpEngineProfile(name="n", model="m", entities=("CREDIT_CARD",))
+    assert profile_entities(narrow) == ["CREDIT_CARD"]
+
+
+def test_nlp_engine_disables_profile_components(tmp_path):
+    import spacy
+
+    from app.middleware.dlp_presidio import ProfileSpacyNlpEngine
+
+    nlp = spacy.blank("en")
+    nlp.add_pipe("sentencizer")
+    nlp.to_disk(tmp_path / "model")
+
+    profile = DlpEngineProfile(
+        name="n", model=str(tmp_path / "model"), disable=("sentencizer", "parser")
+    )
+    engine = ProfileSpacyNlpEngine(profile)
+    engine.load()
+
+    assert engine.nlp["en"].pipe_names == []
+    assert engine.nlp["en"].disabled == ["sentencizer"]
+
+
+def test_nlp_engine_missing_model_fails_without_download(monkeypatch):
+    import spacy.cli
+
+    from app.middleware.dlp_presidio import ProfileSpacyNlpEngine
+
+    def no_download(*_args, **_kwargs):
+        raise AssertionError("models must not be downloaded at runtime")
+
+    monkeypatch.setattr(spacy.cli, "download", no_download)
+    engine = ProfileSpacyNlpEngine(DlpEngineProfile(name="n", model="en_missing_sm"))
+
+    with pytest.raises(OSError, match="en_missing_sm' is not installed"):
+        engine.load()
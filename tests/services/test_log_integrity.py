@@ -0,0 +1,109 @@
+from types import SimpleNamespace
+
+import pytest
+
+from app.services.log_integrity import IntegrityVerifier, entry_fields, verify_fields
+from app.utils.logger import compute_log_hash
+
+
+def _entry(row_id, message="prompt", integrity_hash="auto", status_code=200):
+    if integrity_hash == "auto":
+        integrity_hash = compute_log_hash("/ai/query", "POST", 200, message, "ai")
+    return SimpleNamespace(
+        id=row_id,
+        endpoint="/ai/query",
+        method="POST",
+        status_code=status_code,
+        message=message,
+        event_type="ai",
+        integrity_hash=integrity_hash,
+        key_id=None,
+    )
+
+
+class _Count:
+    def __init__(self, value):
+        self._value = value
+
+    def scalar(self):
+        return self._value
+
+
+class _Stream:
+    def __init__(self, rows, chunk_size):
+        self._rows = rows
+        self._chunk_size = chunk_size
+
+    async def partitions(self):
+        for i in range(0, len(self._rows), self._chunk_size):
+            yield self._rows[i : i + self._chunk_size]
+
+
+class _Session:
+    def __init__(self, entries):
+        self.rows = [entry_fields(e) for e in entries]
+
+    async def execute(self, query):
+        return _Count(len(self.rows))
+
+    async def stream(self, query):
+        return _Stream(self.rows, query.get_execution_options()["yield_per"])
+
+
+def test_verify_fields_verdicts():
+    assert verify_fields(entry_fields(_entry(1))) == ("prompt", True)
+    assert verify_fields(entry_fields(_entry(2, status_code=500)))[1] is False
+    assert verify_fields(entry_fields(_entry(3, integrity_hash=None))) == (
+        "prompt",
+        None,
+    )
+
+
+@pytest.mark.asyncio
+async def test_parallel_batches_keep_order():
+    verifier = IntegrityVerifier(workers=3, batch_size=2, inline_max=0)
+    entries = [_entry(i, message=f"m{i}") for i in range(7)]
+    entries[4].status_code = 404
+    try:
+        verdicts = await verifier.verify(entries)
+    finally:
+        verifier.shutdown()
+
+    assert [message for message, _ in verdicts] == [f"m{i}" for i in range(7)]
+    assert [ok for _, ok in verdicts] == [True] * 4 + [False] + [True] * 2
+
+
+@pytest.mark.asyncio
+async def test_verify_all_reports_progress_and_tampered_ids():
+    verifier = IntegrityVerifier(batch_size=2, inline_max=0, verify_chunk=3)
+    entries = [_entry(i) for i in range(1, 8)]
+    entries[1].status_code = 500
+    entries[5].integrity_hash = None
+    try:
+        events = [e async for e in verifier.verify_all(_Session(entries))]
+    finally:
+        verifier.shutdown()
+
+    progress, summary = events[:-1], events[-1]
+    assert [e["checked"] for e in progress] == [3, 6, 7]
+    assert progress[0]["tampered_ids"] == [2]
+    assert all(e["total"] == 7 for e in progress)
+    assert summary["type"] == "summary"
+    assert (summary["checked"], summary["tampered"], summary["unhashed"]) == (7, 1, 1)
+    assert summary["tampered_ids"] == [2]
+    assert verifier.last_run["tampered"] == 1
+    assert "tampered_ids" not in verifier.last_run
+
+
+@pytest.mark.asyncio
+async def test_verified_cache_skips_unchanged_rows_and_rechecks_changed_ones():
+    verifier = IntegrityVerifier(inline_max=100)
+    entries = [_entry(i) for i in range(1, 4)]
+
+    first = [e async for e in verifier.verify_all(_Session(entries))][-1]
+    assert (first["cache_hits"], first["tampered"]) == (0, 0)
+
+    entries[0].message = "edited after the fact"
+    second = [e async for e in verifier.verify_all(_Session(entries))][-1]
+    assert second["cache_hits"] == 2
+    assert second["tampered_ids"] == [1]
@@ -0,0 +1,143 @@
+import json
+from datetime import datetime
+
+import pytest
+from cryptography.fernet import Fernet, MultiFernet
+from sqlalchemy import Update
+
+from app.services.log_key_rotation import (
+    key_counts,
+    load_checkpoint,
+    reencrypt_logs,
+)
+
+OLD = Fernet(Fernet.generate_key())
+NEW = Fernet(Fernet.generate_key())
+KEYRING = MultiFernet([NEW, OLD])
+
+
+class _Result:
+    def __init__(self, rows):
+        self._rows = rows
+
+    def all(self):
+        return self._rows
+
+
+class _Session:
+    """In-memory logs table answering the rotation's page query and UPDATE."""
+
+    def __init__(self, table, log):
+        self.table = table
+        self.log = log
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc):
+        return False
+
+    async def execute(self, stmt, params=None):
+        if isinstance(stmt, Update):
+            self.log.append(len(params))
+            for p in params:
+                row = self.table[p["row_id"]]
+                if row["message"] == p["old_message"]:
+                    row.update(message=p["new_message"], key_id=p["new_key_id"])
+            return _Result([])
+        values = stmt.compile().params
+        if "GROUP BY" in str(stmt):
+            counts = {}
+            for row in self.table.values():
+                counts[row["key_id"]] = counts.get(row["key_id"], 0) + 1
+            return _Result(list(counts.items()))
+        rows = [
+            (row_id, row["created_at"], row["message"])
+            for row_id, row in sorted(self.table.items())
+            if row_id > values["id_1"]
+            and row["message"] is not None
+            and row["key_id"] != values["key_id_1"]
+        ]
+        return _Result(rows[: values["param_1"]])
+
+    async def commit(self):
+        pass
+
+
+def _table():
+    at = datetime(2026, 10, 18, 9)
+    table = {}
+    for i in range(1, 8):
+        table[i] = {
+            "created_at": at,
+            "message": OLD.encrypt(f"msg {i}".encode()).decode(),
+            "key_id": "v1",
+        }
+    table[3].update(message="legacy plaintext", key_id=None)
+    table[5].update(message=NEW.encrypt(b"msg 5").decode(), key_id="v2")
+    return table
+
+
+@pytest.mark.asyncio
+async def test_reencrypts_in_batches_and_skips_plaintext(tmp_path):
+    table, log = _table(), []
+    checkpoint = tmp_path / "rotation.json"
+    seen = []
+
+    state = await reencrypt_logs(
+        lambda: _Session(table, log),
+        KEYRING,
+        "v2",
+        batch_size=2,
+        workers=2,
+        checkpoint_path=str(checkpoint),
+        on_batch=lambda s: seen.append(json.loads(checkpoint.read_text())),
+    )
+
+    assert (state["rotated"], state["skipped"]) == (5, 1)
+    assert log == [2, 1, 2]  # batches of 2 ids, minus the plaintext row
+    assert [s["last_id"] for s in seen] == [2, 4, 7]
+    assert not checkpoint.exists()  # removed once finished
+    for row_id, row in table.items():
+        if row_id == 3:
+            assert row == {**row, "message": "legacy plaintext", "key_id": None}
+        else:
+            assert row["key_id"] == "v2"
+            assert NEW.decrypt(row["message"].encode()) == f"msg {row_id}".encode()
+
+
+@pytest.mark.asyncio
+async def test_resumes_from_checkpoint_and_dry_run_writes_nothing(tmp_path):
+    table, log = _table(), []
+    checkpoint = tmp_path / "rotation.json"
+    checkpoint.write_text(
+        json.dumps({"key_id": "v2", "last_id": 4, "rotated": 3, "skipped": 1})
+    )
+
+    dry = await reencrypt_logs(
+        lambda: _Session(table, log), KEYRING, "v2", dry_run=True
+    )
+    assert (dry["rotated"], dry["skipped"], log) == (5, 1, [])
+
+    state = await reencrypt_logs(
+        lambda: _Session(table, log),
+        KEYRING,
+        "v2",
+        checkpoint_path=str(checkpoint),
+    )
+    assert (state["rotated"], state["skipped"]) == (5, 1)
+    assert table[1]["key_id"] == "v1"  # before the checkpoint: left for a rerun
+    assert table[6]["key_id"] == "v2"
+
+
+def test_checkpoint_for_another_key_is_ignored(tmp_path):
+    checkpoint = tmp_path / "rotation.json"
+    checkpoint.write_text(json.dumps({"key_id": "v2", "last_id": 99}))
+    assert load_checkpoint(str(checkpoint), "v3")["last_id"] == 0
+    assert load_checkpoint(str(checkpoint), "v2")["last_id"] == 99
+
+
+@pytest.mark.asyncio
+async def test_key_counts():
+    counts = await key_counts(_Session(_table(), []))
+    assert counts == {"v1": 5, None: 1, "v2": 1}
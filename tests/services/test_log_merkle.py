@@ -0,0 +1,208 @@
+from datetime import datetime, timedelta
+
+import pytest
+
+from app.services import log_merkle
+from app.services.log_merkle import (
+    GENESIS,
+    LEAF_FIELDS,
+    chain_hash,
+    inclusion_proof,
+    leaf_hash,
+    merkle_root,
+    prove_entry,
+    seal_pending,
+    verify_inclusion,
+    verify_range,
+)
+
+
+class _Result:
+    def __init__(self, scalar=None, rows=()):
+        self._scalar = scalar
+        self._rows = list(rows)
+
+    def scalar(self):
+        return self._scalar
+
+    def scalars(self):
+        return self
+
+    def first(self):
+        return self._rows[0] if self._rows else None
+
+    def all(self):
+        return self._rows
+
+
+class _Stream:
+    def __init__(self, rows, chunk_size):
+        self._rows = rows
+        self._chunk_size = chunk_size
+
+    async def partitions(self):
+        for i in range(0, len(self._rows), self._chunk_size):
+            yield self._rows[i : i + self._chunk_size]
+
+
+class _Session:
+    """In-memory logs and log_merkle_roots answering log_merkle's queries."""
+
+    def __init__(self, rows):
+        self.rows = rows  # lists of LEAF_FIELDS values
+        self.roots = []
+
+    def add(self, root):
+        self.roots.append(root)
+
+    def _in_range(self, start, end):
+        rows = [r for r in self.rows if start <= r[1] < end]
+        return sorted(rows, key=lambda r: (r[1], r[0]))
+
+    async def stream(self, query):
+        params = query.compile().params
+        rows = self._in_range(params["created_at_1"], params["created_at_2"])
+        chunk_size = query.get_execution_options()["yield_per"]
+        return _Stream([tuple(r) for r in rows], chunk_size)
+
+    async def execute(self, stmt, params=None):
+        sql = str(stmt)
+        values = stmt.compile().params
+        roots = sorted(self.roots, key=lambda r: r.bucket_start)
+        if "pg_try_advisory_xact_lock" in sql:
+            return _Result(scalar=True)
+        if "min(logs.created_at)" in sql:
+            end = values["created_at_1"]
+            start = values.get("created_at_2", datetime.min)
+            found = [r[1] for r in self._in_range(start, end)]
+            return _Result(scalar=found[0] if found else None)
+        if "date_trunc" in sql:
+            counts = {}
+            for r in self._in_range(values["created_at_1"], values["created_at_2"]):
+                hour = r[1].replace(minute=0, second=0, microsecond=0)
+                counts[hour] = counts.get(hour, 0) + 1
+            return _Result(rows=counts.items())
+        if "logs.id = " in sql:
+            found = [r[1] for r in self.rows if r[0] == values["id_1"]]
+            return _Result(scalar=found[0] if found else None)
+        if sql.startswith("SELECT log_merkle_roots.chain_hash"):
+            before = [r for r in roots if r.bucket_start < values["bucket_start_1"]]
+            return _Result(scalar=before[-1].chain_hash if before else None)
+        if "DESC" in sql:
+            return _Result(rows=roots[::-1])
+        if "log_merkle_roots.bucket_start = " in sql:
+            bucket = values["bucket_start_1"]
+            return _Result(rows=[r for r in roots if r.bucket_start == bucket])
+        return _Result(rows=roots)
+
+
+def _row(row_id, created_at, severity="low"):
+    values = dict.fromkeys(LEAF_FIELDS)
+    values.update(
+        id=row_id,
+        created_at=created_at,
+        endpoint="/ai/query",
+        method="POST",
+        status_code=200,
+        severity=severity,
+        integrity_hash=f"{row_id:064x}",
+    )
+    return [values[name] for name in LEAF_FIELDS]
+
+
+def _rows():
+    day = datetime(2026, 10, 18)
+    return [
+        _row(1, day.replace(hour=8, minute=10)),
+        _row(2, day.replace(hour=8, minute=40)),
+        _row(3, day.replace(hour=8, minute=40)),
+        _row(4, day.replace(hour=10, minute=5)),
+    ]
+
+
+NOW = datetime(2026, 10, 18, 11, 6)
+
+
+def test_every_inclusion_proof_verifies_and_tampering_fails():
+    for count in range(1, 10):
+        leaves = [leaf_hash([i]) for i in range(count)]
+        root = merkle_root(leaves).hex()
+        for index, leaf in enumerate(leaves):
+            proof = inclusion_proof(leaves, index)
+            assert len(proof) <= count.bit_length()
+            assert verify_inclusion(leaf.hex(), proof, root)
+            assert not verify_inclusion(leaf_hash(["forged"]).hex(), proof, root)
+
+
+@pytest.mark.asyncio
+async def test_seal_pending_chains_closed_hours_only():
+    session = _Session(_rows())
+
+    # 10:00 has not been closed for LOG_MERKLE_SEAL_DELAY_SECONDS yet
+    sealed = await seal_pending(session, now=datetime(2026, 10, 18, 11, 3))
+    assert sealed == [datetime(2026, 10, 18, 8)]
+    first = session.roots[0]
+    assert first.leaf_count == 3
+    assert first.chain_hash == chain_hash(GENESIS, first.bucket_start, 3, first.root)
+
+    # Empty 09:00 is skipped; 10:00 links to 08:00
+    sealed = await seal_pending(session, now=NOW)
+    assert sealed == [datetime(2026, 10, 18, 10)]
+    second = session.roots[1]
+    assert second.chain_hash == chain_hash(
+        first.chain_hash, second.bucket_start, 1, second.root
+    )
+    assert await seal_pending(session, now=NOW) == []
+
+
+@pytest.mark.asyncio
+async def test_verify_range_detects_deleted_modified_and_unchained():
+    session = _Session(_rows())
+    await seal_pending(session, now=NOW)
+    result = await verify_range(session, now=NOW)
+    assert result["intact"] and result["buckets"] == 2 and result["entries"] == 4
+    assert result["chain_head"] == session.roots[-1].chain_hash
+
+    # Modified entry: counts still match, only a deep check sees it
+    session.rows[0] = _row(1, session.rows[0][1], severity="high")
+    assert (await verify_range(session, now=NOW))["intact"]
+    deep = await verify_range(session, deep=True, now=NOW)
+    assert [p["problem"] for p in deep["problems"]] == ["root_mismatch"]
+
+    # Deleted entry
+    del session.rows[1]
+    problems = (await verify_range(session, now=NOW))["problems"]
+    assert problems[0]["problem"] == "count_mismatch"
+    assert (problems[0]["sealed_count"], problems[0]["live_count"]) == (3, 2)
+
+    # Rewritten root
+    session.roots[0].root = "f" * 64
+    result = await verify_range(session, now=NOW)
+    assert not result["chain_ok"]
+    assert "chain_broken" in [p["problem"] for p in result["problems"]]
+
+
+@pytest.mark.asyncio
+async def test_hours_dropped_by_retention_are_expired(monkeypatch):
+    session = _Session(_rows())
+    await seal_pending(session, now=NOW)
+    session.rows = session.rows[3:]
+    monkeypatch.setattr(log_merkle, "retention_days", lambda: 1)
+
+    result = await verify_range(session, now=NOW + timedelta(days=1, hours=1))
+    assert result["intact"] and result["expired_buckets"] == 1
+
+
+@pytest.mark.asyncio
+async def test_prove_entry():
+    session = _Session(_rows())
+    await seal_pending(session, now=NOW)
+
+    proof = await prove_entry(session, 3)
+    assert proof["verified"] and proof["leaf_index"] == 2
+    assert proof["prev_chain_hash"] == GENESIS
+    assert verify_inclusion(proof["leaf"], proof["proof"], proof["root"])
+
+    assert await prove_entry(session, 99) is None
+    session.rows.append(_row(5, NOW))
+    assert (await prove_entry(session, 5))["sealed"] is False
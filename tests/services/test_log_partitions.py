@@ -0,0 +1,142 @@
+from datetime import datetime
+
+import pytest
+
+from app.services import log_partitions
+from app.services.log_partitions import (
+    drop_expired_partitions,
+    ensure_partitions,
+    parse_bound,
+    partition_name,
+    period_start,
+    retention_days,
+)
+
+
+class _Result:
+    def __init__(self, scalar=None, rows=()):
+        self._scalar = scalar
+        self._rows = list(rows)
+
+    def scalar(self):
+        return self._scalar
+
+    def all(self):
+        return self._rows
+
+
+class _Session:
+    """Answers the catalog queries; records every other statement."""
+
+    def __init__(self, partitions, partitioned=True, stray=0):
+        self.partitions = partitions
+        self.partitioned = partitioned
+        self.stray = stray
+        self.statements = []
+
+    async def execute(self, stmt, params=None):
+        sql = str(stmt)
+        if "pg_partitioned_table" in sql:
+            return _Result(scalar=1 if self.partitioned else None)
+        if "pg_inherits" in sql:
+            return _Result(rows=self.partitions)
+        if sql.startswith("SELECT count(*)"):
+            return _Result(scalar=self.stray)
+        self.statements.append(sql)
+        return _Result()
+
+
+def _range(start: str, end: str) -> str:
+    return f"FOR VALUES FROM ('{start} 00:00:00') TO ('{end} 00:00:00')"
+
+
+PARTITIONS = [
+    ("logs_legacy", "FOR VALUES FROM (MINVALUE) TO ('2026-05-01 00:00:00')"),
+    ("logs_p20260501", _range("2026-05-01", "2026-05-02")),
+    ("logs_p20260502", _range("2026-05-02", "2026-05-03")),
+    ("logs_default", "DEFAULT"),
+]
+
+
+def test_period_start_and_names():
+    ts = datetime(2026, 5, 7, 15, 42)  # a Thursday
+    assert period_start(ts, "day") == datetime(2026, 5, 7)
+    assert period_start(ts, "week") == datetime(2026, 5, 4)
+    assert partition_name(datetime(2026, 5, 4)) == "logs_p20260504"
+    with pytest.raises(ValueError):
+        period_start(ts, "month")
+
+
+def test_parse_bound():
+    assert parse_bound(PARTITIONS[1][1]) == (datetime(2026, 5, 1), datetime(2026, 5, 2))
+    assert parse_bound(PARTITIONS[0][1]) == (None, datetime(2026, 5, 1))
+    assert parse_bound("DEFAULT") == (None, None)
+
+
+def test_retention_days_prefers_env(monkeypatch):
+    monkeypatch.setattr(
+        log_partitions,
+        "load_policy",
+        lambda: {"compliance": {"log_retention_days": 30}},
+    )
+    monkeypatch.delenv("LOG_RETENTION_DAYS", raising=False)
+    assert retention_days() == 30
+
+    monkeypatch.setenv("LOG_RETENTION_DAYS", "7")
+    assert retention_days() == 7
+
+
+@pytest.mark.asyncio
+async def test_ensure_continues_from_newest_partition():
+    session = _Session(PARTITIONS)
+    created = await ensure_partitions(
+        session, now=datetime(2026, 5, 2, 12), ahead=2, interval="day"
+    )
+
+    # Current period ends 05-03; two more periods ahead → up to 05-05
+    assert created == ["logs_p20260503", "logs_p20260504"]
+    assert all("PARTITION OF logs" in sql for sql in session.statements)
+    assert "FROM ('2026-05-04 00:00:00') TO ('2026-05-05 00:00:00')" in (
+        session.statements[-1]
+    )
+
+
+@pytest.mark.asyncio
+async def test_ensure_moves_stray_rows_out_of_default():
+    session = _Session(PARTITIONS, stray=3)
+    created = await ensure_partitions(
+        session, now=datetime(2026, 5, 3, 12), ahead=0, interval="day"
+    )
+    assert created == ["logs_p20260503"]
+    assert session.statements[0].endswith("DETACH PARTITION logs_default")
+    assert "INSERT INTO logs SELECT * FROM moved" in session.statements[2]
+    assert session.statements[-1].endswith("ATTACH PARTITION logs_default DEFAULT")
+
+
+@pytest.mark.asyncio
+async def test_drop_expired_drops_only_whole_expired_ranges():
+    session = _Session(PARTITIONS)
+    dropped = await drop_expired_partitions(
+        session, now=datetime(2026, 5, 12, 6), days=10
+    )
+
+    # Cutoff 05-02 06:00: legacy and 05-01 have ended, 05-02 has not
+    assert dropped == ["logs_legacy", "logs_p20260501"]
+    assert session.statements == [
+        "DROP TABLE IF EXISTS logs_legacy",
+        "DROP TABLE IF EXISTS logs_p20260501",
+    ]
+
+
+@pytest.mark.asyncio
+async def test_dry_run_and_unpartitioned_table_drop_nothing():
+    session = _Session(PARTITIONS)
+    dropped = await drop_expired_partitions(
+        session, now=datetime(2026, 6, 1), days=1, dry_run=True
+    )
+    assert dropped == ["logs_legacy", "logs_p20260501", "logs_p20260502"]
+    assert session.statements == []
+
+    session = _Session(PARTITIONS, partitioned=False)
+    assert await drop_expired_partitions(session, days=0) == []
+    assert await ensure_partitions(session) == []
@@ -0,0 +1,99 @@
+from datetime import datetime, timedelta
+
+import pytest
+from sqlalchemy.dialects import postgresql
+
+from app.services import log_rollups
+from app.services.log_rollups import apply_rollups, rollup_deltas, rollup_window
+
+
+def _sql(clause) -> str:
+    return str(
+        clause.compile(
+            dialect=postgresql.dialect(), compile_kwargs={"literal_binds": True}
+        )
+    )
+
+
+def test_deltas_increment_minute_and_hour_buckets():
+    at = datetime(2026, 5, 1, 10, 15, 30)
+    rows = [
+        {"endpoint": "/ai/query", "policy_decision": "block", "created_at": at},
+        {
+            "endpoint": "/ai/query",
+            "policy_decision": "block",
+            "risk_score": 0.9,
+            "created_at": at + timedelta(seconds=20),
+        },
+        {"endpoint": "/ai/query", "created_at": at + timedelta(minutes=5)},
+    ]
+
+    deltas = rollup_deltas(rows)
+    by_key = {
+        (d["granularity"], d["bucket_start"], d["policy_decision"]): d for d in deltas
+    }
+
+    blocked_minute = by_key[("minute", datetime(2026, 5, 1, 10, 15), "block")]
+    assert blocked_minute["count"] == 2
+    assert blocked_minute["high_risk_count"] == 1
+    assert blocked_minute["event_type"] == ""
+
+    assert by_key[("hour", datetime(2026, 5, 1, 10), "block")]["count"] == 2
+    assert by_key[("hour", datetime(2026, 5, 1, 10), "")]["count"] == 1
+    assert len(deltas) == 4
+
+
+@pytest.mark.asyncio
+async def test_apply_rollups_upserts_in_one_statement():
+    class _Session:
+        statements = []
+
+        async def execute(self, stmt):
+            self.statements.append(stmt)
+
+    session = _Session()
+    await apply_rollups(session, [{"endpoint": "/x", "created_at": datetime.utcnow()}])
+    await apply_rollups(session, [])
+
+    assert len(session.statements) == 1
+    sql = str(session.statements[0].compile(dialect=postgresql.dialect()))
+    assert "ON CONFLICT ON CONSTRAINT uq_log_rollups_bucket_dims DO UPDATE" in sql
+    assert "log_rollups.count + excluded.count" in sql
+
+
+def test_window_inside_one_hour_uses_minute_buckets_only():
+    now = datetime(2026, 5, 1, 10, 50)
+    sql = _sql(rollup_window(now - timedelta(minutes=30), now=now))
+    assert "'hour'" not in sql
+    assert "'2026-05-01 10:20:00'" in sql
+
+
+def test_window_uses_hours_in_the_middle_and_minutes_at_edges():
+    now = datetime(2026, 5, 1, 10, 50)
+    sql = _sql(rollup_window(now - timedelta(hours=24), now=now))
+
+    # Whole hours 2026-04-30 11:00 .. 2026-05-01 10:00 come from hour buckets
+    assert "log_rollups.granularity = 'hour'" in sql
+    assert "log_rollups.bucket_start >= '2026-04-30 11:00:00'" in sql
+    assert "log_rollups.bucket_start < '2026-05-01 10:00:00'" in sql
+    # Partial hours at both edges come from minute buckets
+    assert "log_rollups.bucket_start >= '2026-04-30 10:50:00'" in sql
+    assert "log_rollups.bucket_start <= '2026-05-01 10:50:00'" in sql
+
+
+def test_window_edges_older_than_minute_retention_widen_to_hours(monkeypatch):
+    monkeypatch.setattr(log_rollups, "MINUTE_RETENTION", timedelta(hours=2))
+    now = datetime(2026, 5, 10, 12, 0)
+    sql = _sql(
+        rollup_window(
+            datetime(2026, 5, 1, 9, 30), datetime(2026, 5, 3, 23, 59, 59), now=now
+        )
+    )
+
+    assert "log_rollups.bucket_start >= '2026-05-01 09:00:00'" in sql
+    assert "log_rollups.bucket_start < '2026-05-04 00:00:00'" in sql
+
+
+def test_truncate_rejects_unknown_granularity():
+    with pytest.raises(ValueError):
+        log_rollups.truncate(datetime.utcnow(), "day")
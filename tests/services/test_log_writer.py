@@ -0,0 +1,123 @@
+import asyncio
+
+import pytest
+
+from app.services import log_writer as log_writer_module
+from app.services.log_writer import AuditLogWriter
+
+
+@pytest.fixture
+def batches(monkeypatch):
+    """Capture flushed batches instead of writing to PostgreSQL."""
+    written = []
+
+    async def fake_write_batch(rows):
+        written.append(list(rows))
+
+    monkeypatch.setattr(log_writer_module, "write_batch", fake_write_batch)
+    return written
+
+
+def _row(i):
+    return {"endpoint": f"/e/{i}", "method": "GET", "status_code": 200}
+
+
+@pytest.mark.asyncio
+async def test_enqueue_returns_false_when_not_running(batches):
+    writer = AuditLogWriter()
+    assert await writer.enqueue(_row(0)) is False
+
+
+@pytest.mark.asyncio
+async def test_flushes_by_batch_size(batches):
+    writer = AuditLogWriter(batch_size=3, flush_interval_s=5)
+    writer.start()
+    for i in range(3):
+        assert await writer.enqueue(_row(i))
+    for _ in range(50):
+        if batches:
+            break
+        await asyncio.sleep(0.01)
+    await writer.stop()
+
+    assert [len(b) for b in batches] == [3]
+    assert writer.stats()["written"] == 3
+
+
+@pytest.mark.asyncio
+async def test_flushes_by_interval(batches):
+    writer = AuditLogWriter(batch_size=100, flush_interval_s=0.02)
+    writer.start()
+    await writer.enqueue(_row(0))
+    await asyncio.sleep(0.2)
+
+    assert batches == [[_row(0)]]
+    await writer.stop()
+
+
+@pytest.mark.asyncio
+async def test_stop_drains_queue(batches):
+    writer = AuditLogWriter(batch_size=10, flush_interval_s=0.05)
+    writer.start()
+    for i in range(25):
+        await writer.enqueue(_row(i))
+    await writer.stop()
+
+    assert sum(len(b) for b in batches) == 25
+    assert not writer.running
+    assert await writer.enqueue(_row(99)) is False
+
+
+@pytest.mark.asyncio
+async def test_overflow_inline_hands_row_back(batches):
+    writer = AuditLogWriter(queue_size=1, overflow="inline")
+    writer.start()
+    assert await writer.enqueue(_row(0))
+    assert await writer.enqueue(_row(1)) is False
+    assert writer.stats()["inline_writes"] == 1
+    await writer.stop()
+
+
+@pytest.mark.asyncio
+async def test_overflow_drop_newest_and_oldest(batches):
+    newest = AuditLogWriter(queue_size=1, overflow="drop_newest", flush_interval_s=0.01)
+    newest.start()
+    await newest.enqueue(_row(0))
+    assert await newest.enqueue(_row(1))
+    await newest.stop()
+    assert newest.stats()["dropped"] == 1
+    assert batches == [[_row(0)]]
+
+    batches.clear()
+    oldest = AuditLogWriter(queue_size=1, overflow="drop_oldest", flush_interval_s=0.01)
+    oldest.start()
+    await oldest.enqueue(_row(0))
+    await oldest.enqueue(_row(1))
+    await oldest.stop()
+    assert oldest.stats()["dropped"] == 1
+    assert batches == [[_row(1)]]
+
+
+@pytest.mark.asyncio
+async def test_failed_batch_is_retried_then_counted(monkeypatch):
+    calls = []
+
+    async def flaky(rows):
+        calls.append(rows)
+        if len(calls) < 2:
+            raise ConnectionError("db down")
+
+    monkeypatch.setattr(log_writer_module, "write_batch", flaky)
+    writer = AuditLogWriter(max_retries=1, flush_interval_s=0.01)
+    writer.start()
+    await writer.enqueue(_row(0))
+    await writer.stop()
+
+    assert len(calls) == 2
+    assert writer.stats()["written"] == 1
+    assert writer.stats()["failed"] == 0
+
+
+def test_invalid_overflow_policy_rejected():
+    with pytest.raises(ValueError):
+        AuditLogWriter(overflow="spill")
@@ -0,0 +1,82 @@
+import pytest
+
+from app.services.rate_limit import (
+    MemoryRateLimitStore,
+    RateLimitResult,
+    RedisRateLimitStore,
+    gcra,
+)
+
+
+def test_gcra_allows_burst_then_refills_one_interval_at_a_time():
+    store = MemoryRateLimitStore()
+    results = [store.hit_sync("ip:admin", 5, 60, now=100.0) for _ in range(6)]
+    assert [r.allowed for r in results] == [True] * 5 + [False]
+    assert [r.remaining for r in results[:5]] == [4, 3, 2, 1, 0]
+    assert results[5].retry_after == pytest.approx(12.0)
+
+    # One emission interval (60 / 5 s) later exactly one more request fits
+    assert store.hit_sync("ip:admin", 5, 60, now=112.0).allowed
+    assert not store.hit_sync("ip:admin", 5, 60, now=112.0).allowed
+    # A rejected request does not consume capacity
+    assert store.hit_sync("ip:admin", 5, 60, now=124.0).allowed
+
+
+def test_keys_are_independent_and_state_is_one_float():
+    result, tat = gcra(None, 0.0, 10, 60)
+    assert result == RateLimitResult(True, 9, 0.0) and tat == 6.0
+
+    store = MemoryRateLimitStore()
+    for _ in range(5):
+        store.hit_sync("a", 5, 60, now=0.0)
+    assert not store.hit_sync("a", 5, 60, now=0.0).allowed
+    assert store.hit_sync("b", 5, 60, now=0.0).allowed
+
+
+def test_idle_keys_expire_and_capacity_is_bounded():
+    store = MemoryRateLimitStore(max_keys=3)
+    store.hit_sync("idle", 5, 60, now=0.0)  # TAT 12
+    store.hit_sync("new", 5, 60, now=20.0)
+    assert "idle" not in store and len(store) == 1
+
+    for i in range(5):
+        store.hit_sync(f"ip{i}", 5, 60, now=30.0)
+    assert len(store) == 3
+    assert "ip4" in store and "ip1" not in store
+    assert store.stats()["evicted"] == 4
+
+
+class _Script:
+    def __init__(self, reply=None, error=None):
+        self.reply = reply
+        self.error = error
+        self.calls = []
+
+    async def __call__(self, keys, args):
+        self.calls.append((keys, args))
+        if self.error:
+            raise self.error
+        return self.reply
+
+
+class _Client:
+    def __init__(self, script):
+        self.script = script
+
+    def register_script(self, source):
+        assert "redis.call('TIME')" in source
+        return self.script
+
+
+@pytest.mark.asyncio
+async def test_redis_store_runs_script_and_falls_back_when_unreachable():
+    script = _Script(reply=[0, 0, 4500])
+    store = RedisRateLimitStore(_Client(script), prefix="t:")
+
+    result = await store.hit("1.2.3.4:anon", 30, 60)
+    assert result == RateLimitResult(False, 0, 4.5)
+    assert script.calls == [(["t:1.2.3.4:anon"], [2000, 60000])]
+
+    script.error = ConnectionError("down")
+    assert (await store.hit("1.2.3.4:anon", 30, 60)).allowed
+    assert store.stats()["errors"] == 1 and len(store.fallback) == 1
@@ -195,3 +195,27 @@ def test_repeated_blocks_empty_logs():
 def test_repeated_blocks_ignores_logs_without_ip():
     logs = [_make_log(message="no ip", policy_decision="block") for _ in range(10)]
     assert check_repeated_blocks(logs) == []
+
+
+# ---------------------------------------------------------------------------
+# log_anomaly_to_ui
+# ---------------------------------------------------------------------------
+
+
+def test_log_anomaly_writes_through_log_request(monkeypatch):
+    """Anomalies go through log_request so they reach the rollups."""
+    from unittest.mock import AsyncMock
+
+    import scripts.anomaly_alerting as anomaly_alerting
+
+    log_request = AsyncMock()
+    monkeypatch.setattr(anomaly_alerting, "log_request", log_request)
+
+    anomaly_alerting.log_anomaly_to_ui("token", "RATE", "10.0.0.1 made 9 requests")
+
+    log_request.assert_awaited_once()
+    kwargs = log_request.await_args.kwargs
+    assert kwargs["message"] == "[ANOMALY:RATE] 10.0.0.1 made 9 requests"
+    assert kwargs["policy_decision"] == "block"
+    assert kwargs["risk_score"] == 1.0
+    assert kwargs["source"] == "anomaly_alerting"
@@ -62,3 +62,51 @@ def test_dlp_allows_normal_data():
     )
     assert response.status_code in [200, 201, 404]
     assert "***" not in str(response.text)
+
+
+def test_liveness_endpoint():
+    """Liveness must answer even while DLP models are still loading."""
+    response = client.get("/health/live")
+    assert response.status_code == 200
+    assert response.json()["status"] == "OK"
+
+
+def test_readiness_reports_loading_until_warm(monkeypatch):
+    """Readiness must return 503 until the DLP engines are loaded."""
+    from app.services.dlp_executor import dlp_executor
+
+    monkeypatch.setattr(dlp_executor, "ready", False)
+    monkeypatch.setattr(dlp_executor, "warmup_error", None)
+    response = client.get("/health/ready")
+    assert response.status_code == 503
+    assert response.json()["status"] == "loading"
+
+    monkeypatch.setattr(dlp_executor, "ready", True)
+    response = client.get("/health/ready")
+    assert response.status_code == 200
+    assert response.json()["status"] == "ready"
+
+
+def test_readiness_reports_missing_model(monkeypatch):
+    """A spaCy model missing from the image fails readiness with its name."""
+    import asyncio
+
+    from app.middleware import dlp_presidio
+    from app.services.dlp_executor import dlp_executor
+    from app.services.dlp_profiles import DlpEngineProfile
+
+    monkeypatch.setattr(
+        dlp_presidio,
+        "ENGINE_PROFILE",
+        DlpEngineProfile(name="broken", model="en_missing_sm"),
+    )
+    monkeypatch.setattr(dlp_presidio, "_engines", {})
+    monkeypatch.setattr(dlp_executor, "ready", False)
+    monkeypatch.setattr(dlp_executor, "warmup_error", None)
+
+    asyncio.run(dlp_executor.warm_up())
+    response = client.get("/health/ready")
+
+    assert response.status_code == 503
+    assert response.json()["status"] == "failed"
+    assert "en_missing_sm' is not installed" in response.json()["error"]
@@ -122,3 +122,74 @@ def test_decrypt_non_ciphertext_returns_original(monkeypatch):
 
     result = db_enc_module.decrypt_value(not_ciphertext)
     assert result == not_ciphertext
+
+
+def test_previous_keys_still_decrypt(monkeypatch):
+    """
+    During a rotation, rows encrypted under a retired key listed in
+    DB_ENCRYPTION_PREVIOUS_KEYS must stay readable, while new values are
+    encrypted with the current key only.
+    """
+    old_key = Fernet.generate_key().decode("utf-8")
+    new_key = Fernet.generate_key().decode("utf-8")
+    old_ciphertext = Fernet(old_key.encode("utf-8")).encrypt(b"old row").decode()
+
+    monkeypatch.setenv("DB_ENCRYPTION_PREVIOUS_KEYS", f"v1:{old_key}")
+    db_enc_module = _reload_module(
+        monkeypatch, enabled="true", key=new_key, key_id="v2"
+    )
+    try:
+        assert db_enc_module.previous_key_ids() == ["v1"]
+        assert db_enc_module.decrypt_value(old_ciphertext) == "old row"
+
+        encrypted = db_enc_module.encrypt_value("new row")
+        assert Fernet(new_key.encode("utf-8")).decrypt(encrypted.encode()) == b"new row"
+    finally:
+        monkeypatch.delenv("DB_ENCRYPTION_PREVIOUS_KEYS")
+        _reload_module(monkeypatch, enabled="false", key=None)
+
+
+def test_malformed_previous_keys_are_ignored(monkeypatch):
+    monkeypatch.setenv("DB_ENCRYPTION_PREVIOUS_KEYS", "no-separator")
+    key = Fernet.generate_key().decode("utf-8")
+    db_enc_module = _reload_module(monkeypatch, enabled="true", key=key)
+    try:
+        assert db_enc_module.is_encryption_enabled() is True
+        assert db_enc_module.previous_key_ids() == []
+    finally:
+        monkeypatch.delenv("DB_ENCRYPTION_PREVIOUS_KEYS")
+        _reload_module(monkeypatch, enabled="false", key=None)
+
+
+def test_decrypt_uses_recorded_key_version_and_caches(monkeypatch):
+    """
+    With the row's key version, decrypt_value() uses that key directly;
+    repeated reads of a hot row are served from the decrypted-message LRU.
+    """
+    old_key = Fernet.generate_key().decode("utf-8")
+    new_key = Fernet.generate_key().decode("utf-8")
+    old_ciphertext = Fernet(old_key.encode("utf-8")).encrypt(b"old row").decode()
+
+    monkeypatch.setenv("DB_ENCRYPTION_PREVIOUS_KEYS", f"v1:{old_key}")
+    db_enc_module = _reload_module(
+        monkeypatch, enabled="true", key=new_key, key_id="v2"
+    )
+    try:
+        assert db_enc_module.decrypt_value(old_ciphertext, "v1") == "old row"
+        # Wrong or unconfigured version: returned as stored, no other key tried
+        assert db_enc_module.decrypt_value(old_ciphertext, "v2") == old_ciphertext
+        assert db_enc_module.decrypt_value(old_ciphertext, "v0") == old_ciphertext
+
+        before = db_enc_module.decrypt_cache_info()
+        for _ in range(3):
+            assert db_enc_module.decrypt_value(old_ciphertext, "v1") == "old row"
+        after = db_enc_module.decrypt_cache_info()
+        assert after["hits"] - before["hits"] == 3
+        assert after["misses"] == before["misses"]
+
+        # Plaintext never reaches the cache or a key
+        assert db_enc_module.decrypt_value("legacy plaintext") == "legacy plaintext"
+        assert db_enc_module.decrypt_cache_info()["misses"] == after["misses"]
+    finally:
+        monkeypatch.delenv("DB_ENCRYPTION_PREVIOUS_KEYS")
+        _reload_module(monkeypatch, enabled="false", key=None)
@@ -0,0 +1,71 @@
+from unittest.mock import MagicMock
+
+import pytest
+from sqlalchemy.pool import NullPool
+
+from app.db import db
+from app.db.pool import InstrumentedAsyncPool, pool_stats
+
+
+def test_pytest_uses_null_pool_and_no_echo(monkeypatch):
+    monkeypatch.setenv("PYTEST", "1")
+    monkeypatch.delenv("DB_ECHO", raising=False)
+
+    options = db.engine_options()
+    assert options["poolclass"] is NullPool
+    assert options["echo"] is False
+    assert "pool_size" not in options
+
+
+def test_pool_options_from_env(monkeypatch):
+    monkeypatch.setenv("PYTEST", "0")
+    monkeypatch.setenv("DB_POOL_SIZE", "5")
+    monkeypatch.setenv("DB_MAX_OVERFLOW", "2")
+    monkeypatch.setenv("DB_POOL_PRE_PING", "false")
+    monkeypatch.setenv("DB_STATEMENT_TIMEOUT_MS", "1500")
+    monkeypatch.setenv("DB_STATEMENT_CACHE_SIZE", "0")
+    monkeypatch.setattr(db, "DATABASE_URL", "postgresql+asyncpg://u:p@h:5432/d")
+
+    options = db.engine_options()
+    assert options["poolclass"] is InstrumentedAsyncPool
+    assert options["pool_size"] == 5
+    assert options["max_overflow"] == 2
+    assert options["pool_pre_ping"] is False
+    assert options["connect_args"] == {
+        "statement_cache_size": 0,
+        "server_settings": {"statement_timeout": "1500"},
+    }
+
+
+def test_statement_timeout_can_be_disabled(monkeypatch):
+    monkeypatch.setenv("DB_STATEMENT_TIMEOUT_MS", "0")
+    monkeypatch.setattr(db, "DATABASE_URL", "postgresql+asyncpg://u:p@h:5432/d")
+    assert "server_settings" not in db.engine_options()["connect_args"]
+
+
+def test_null_pool_stats_only_report_class():
+    assert pool_stats(NullPool(creator=MagicMock)) == {"pool_class": "NullPool"}
+
+
+def test_instrumented_pool_tracks_checkouts_and_saturation():
+    pool = InstrumentedAsyncPool(creator=MagicMock, pool_size=2, max_overflow=2)
+    first = pool.connect()
+    second = pool.connect()
+
+    stats = pool_stats(pool)
+    assert stats["checked_out"] == 2
+    assert stats["saturation"] == 0.5
+    assert stats["checkouts"] == 2
+    assert stats["checkout_timeouts"] == 0
+
+    first.close()
+    second.close()
+    stats = pool_stats(pool)
+    assert stats["checked_out"] == 0
+    assert stats["checked_in"] == 2
+
+
+@pytest.mark.parametrize("url", ["postgresql://u:p@h/d", "sqlite+aiosqlite:///x.db"])
+def test_connect_args_only_for_asyncpg(monkeypatch, url):
+    monkeypatch.setattr(db, "DATABASE_URL", url)
+    assert "connect_args" not in db.engine_options()
@@ -0,0 +1,146 @@
+"""
+Query Plan Tests
+----------------
+The dashboard and threat-detection queries must be served by the logs
+indexes added in migrations/versions/0002_logs_indexes.py (attached to
+every partition since 0003_partition_logs.py), not by
+sequential scans. Plans are checked with EXPLAIN against a real
+PostgreSQL (skipped when DATABASE_URL is unreachable) on sample rows that
+are inserted, ANALYZEd and rolled back.
+"""
+
+import importlib.util
+import json
+import os
+
+import pytest
+import pytest_asyncio
+from sqlalchemy import text
+from sqlalchemy.exc import SQLAlchemyError
+from sqlalchemy.ext.asyncio import create_async_engine
+from sqlalchemy.pool import NullPool
+
+from app.db.db import DATABASE_URL
+from app.db.migrations import PROJECT_ROOT, run_migrations
+from app.models import LogEntry
+
+
+def _load_migration(filename: str):
+    path = os.path.join(PROJECT_ROOT, "migrations", "versions", filename)
+    spec = importlib.util.spec_from_file_location(filename[:-3], path)
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+
+def test_model_indexes_match_migration():
+    """create_all (tests, scripts) and Alembic must build the same indexes."""
+    query_indexes = _load_migration("0002_logs_indexes.py")
+    keyset_index = _load_migration("0004_logs_keyset_index.py")
+    expected = {name for name, _, _ in query_indexes.INDEXES}
+    expected = expected - {keyset_index.REPLACED} | {keyset_index.INDEX_NAME}
+
+    model_indexes = {index.name for index in LogEntry.__table__.indexes}
+    model_indexes.discard("ix_logs_id")  # created by the baseline revision
+    assert model_indexes == expected
+
+
+SAMPLE_ROWS = """
+INSERT INTO logs (endpoint, method, status_code, message, event_type,
+                  severity, risk_score, source, policy_decision, created_at)
+SELECT '/api/' || (i % 40),
+       'POST',
+       CASE WHEN i % 100 = 0 THEN 401 ELSE 200 END,
+       'sample',
+       'event_' || (i % 10),
+       CASE WHEN i % 500 = 0 THEN 'critical'
+            ELSE (ARRAY['low', 'medium', 'high'])[1 + i % 3] END,
+       CASE WHEN i % 50 = 0 THEN 0.9 ELSE 0.1 END,
+       'source_' || (i % 200),
+       CASE WHEN i % 20 = 0 THEN 'block' ELSE 'allow' END,
+       now() - (i || ' minutes')::interval
+FROM generate_series(1, 20000) AS i
+"""
+
+PLANS = [
+    (
+        "ix_logs_auth_failures_created_at",
+        "SELECT source, count(*) FROM logs "
+        "WHERE status_code IN (401, 403) AND created_at >= now() - interval '1 hour' "
+        "GROUP BY source",
+    ),
+    (
+        "ix_logs_high_risk_created_at",
+        "SELECT count(*) FROM logs "
+        "WHERE risk_score >= 0.7 AND created_at >= now() - interval '1 hour'",
+    ),
+    (
+        "ix_logs_severity_created_at",
+        "SELECT * FROM logs WHERE severity = 'critical' "
+        "ORDER BY created_at DESC LIMIT 50",
+    ),
+    (
+        "ix_logs_created_at_id",
+        "SELECT * FROM logs WHERE (created_at, id) < (now(), 2147483647) "
+        "ORDER BY created_at DESC, id DESC LIMIT 50",
+    ),
+    (
+        "ix_logs_endpoint_created_at",
+        "SELECT count(*) FROM logs "
+        "WHERE endpoint = '/api/7' AND created_at >= now() - interval '1 hour'",
+    ),
+]
+
+
+# Partition indexes resolve to the partitioned index they are attached to
+PARENT_INDEX = text(
+    "SELECT coalesce(parent.relname, idx.relname) FROM pg_class idx "
+    "LEFT JOIN pg_inherits i ON i.inhrelid = idx.oid "
+    "LEFT JOIN pg_class parent ON parent.oid = i.inhparent "
+    "WHERE idx.relname = ANY(:names)"
+)
+
+
+def _index_names(plan: dict) -> set:
+    names = {plan["Index Name"]} if "Index Name" in plan else set()
+    for child in plan.get("Plans", []):
+        names |= _index_names(child)
+    return names
+
+
+@pytest_asyncio.fixture(scope="module")
+async def pg_engine():
+    engine = create_async_engine(DATABASE_URL, poolclass=NullPool)
+    try:
+        async with engine.connect() as conn:
+            if conn.dialect.name != "postgresql":
+                pytest.skip("query plans are PostgreSQL-specific")
+    except (OSError, SQLAlchemyError) as exc:
+        await engine.dispose()
+        pytest.skip(f"PostgreSQL not reachable: {exc}")
+
+    await run_migrations()
+    yield engine
+    await engine.dispose()
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("expected_index, query", PLANS)
+async def test_query_uses_index(pg_engine, expected_index, query):
+    async with pg_engine.connect() as conn:
+        trans = await conn.begin()
+        try:
+            await conn.execute(text(SAMPLE_ROWS))
+            await conn.execute(text("ANALYZE logs"))
+            await conn.execute(text("SET LOCAL enable_seqscan = off"))
+            result = await conn.execute(text(f"EXPLAIN (FORMAT JSON) {query}"))
+            plan = result.scalar()
+            if isinstance(plan, str):
+                plan = json.loads(plan)
+            names = list(_index_names(plan[0]["Plan"]))
+            parents = await conn.execute(PARENT_INDEX, {"names": names})
+            used = set(parents.scalars().all())
+        finally:
+            await trans.rollback()
+
+    assert expected_index in used
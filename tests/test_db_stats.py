@@ -0,0 +1,78 @@
+import pytest
+from sqlalchemy.dialects import postgresql
+
+from app.db.stats import ConditionalCounts
+from app.models import LogEntry
+
+
+def _sql(query: ConditionalCounts) -> str:
+    return str(query.statement().compile(dialect=postgresql.dialect()))
+
+
+def test_counts_render_as_one_filtered_aggregate():
+    sql = _sql(
+        ConditionalCounts(LogEntry, LogEntry.severity == "high")
+        .count("total")
+        .count("blocked", LogEntry.policy_decision == "block")
+        .count("risky", LogEntry.risk_score >= 0.7, LogEntry.source == "ai_route")
+    )
+
+    assert sql.count("SELECT") == 1
+    assert "count(*) AS total" in sql
+    assert "count(*) FILTER (WHERE logs.policy_decision" in sql
+    assert "AS blocked" in sql
+    assert "logs.risk_score >=" in sql and "AND logs.source =" in sql
+    assert "WHERE logs.severity =" in sql.split("FROM logs")[1]
+
+
+def test_no_where_scans_whole_table():
+    sql = _sql(ConditionalCounts(LogEntry).count("total"))
+    assert "WHERE" not in sql
+
+
+class _Result:
+    def __init__(self, row):
+        self._row = row
+
+    def mappings(self):
+        return self
+
+    def one(self):
+        return self._row
+
+
+class _Session:
+    def __init__(self, row):
+        self.row = row
+        self.statements = []
+
+    async def execute(self, stmt):
+        self.statements.append(stmt)
+        return _Result(self.row)
+
+
+@pytest.mark.asyncio
+async def test_fetch_runs_one_query_and_maps_nulls_to_zero():
+    session = _Session({"total": 7, "blocked": None})
+    counts = await (
+        ConditionalCounts(LogEntry)
+        .count("total")
+        .count("blocked", LogEntry.policy_decision == "block")
+        .fetch(session)
+    )
+
+    assert counts == {"total": 7, "blocked": 0}
+    assert len(session.statements) == 1
+
+
+def test_measure_sums_a_counter_column():
+    from app.models import LogRollup
+
+    sql = _sql(
+        ConditionalCounts(LogRollup, measure=LogRollup.count)
+        .count("blocked", LogRollup.policy_decision == "block")
+        .count("high_risk", measure=LogRollup.high_risk_count)
+    )
+
+    assert "coalesce(sum(log_rollups.count) FILTER (WHERE" in sql
+    assert "coalesce(sum(log_rollups.high_risk_count), " in sql
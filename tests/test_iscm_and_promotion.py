@@ -26,12 +26,17 @@ def _auth_headers(role: str = "admin") -> dict:
 # ── Fake DB session helpers (shared pattern from other test files) ─────────────
 
 
-class _ScalarResult:
-    def __init__(self, value):
-        self._value = value
+class _CountsResult:
+    """Single-row result of a ConditionalCounts query."""
 
-    def scalar(self):
-        return self._value
+    def __init__(self, counts):
+        self._counts = counts
+
+    def mappings(self):
+        return self
+
+    def one(self):
+        return self._counts
 
 
 class _ScalarsResult:
@@ -78,13 +83,17 @@ def _build_client() -> TestClient:
 def test_iscm_status_returns_200(monkeypatch):
     """ISCM status endpoint returns 200 with all expected top-level keys."""
     fake_results = [
-        _ScalarResult(100),  # total_all
-        _ScalarResult(80),  # total_allowed
-        _ScalarResult(0),  # high_risk_1h
-        _ScalarResult(0),  # blocked_1h
-        _ScalarResult(90),  # total_with_hash
-        _ScalarResult(10),  # total_24h
-        _ScalarResult(2),  # promotions_24h
+        _CountsResult(
+            {
+                "total_all": 100,
+                "total_allowed": 80,
+                "high_risk_1h": 0,
+                "blocked_1h": 0,
+                "total_with_hash": 90,
+                "total_24h": 10,
+                "promotions_24h": 2,
+            }
+        )
     ]
     monkeypatch.setattr(
         metrics_module,
@@ -109,13 +118,17 @@ def test_iscm_status_returns_200(monkeypatch):
 def test_iscm_status_healthy(monkeypatch):
     """Reports 'healthy' when compliance is high and no threats."""
     fake_results = [
-        _ScalarResult(100),  # total
-        _ScalarResult(95),  # allowed (95% = high compliance)
-        _ScalarResult(0),  # high_risk_1h
-        _ScalarResult(0),  # blocked_1h
-        _ScalarResult(100),  # integrity_hashed
-        _ScalarResult(50),  # 24h requests
-        _ScalarResult(1),  # promotions
+        _CountsResult(
+            {
+                "total_all": 100,
+                "total_allowed": 95,  # allowed (95% = high compliance)
+                "high_risk_1h": 0,
+                "blocked_1h": 0,
+                "total_with_hash": 100,
+                "total_24h": 50,
+                "promotions_24h": 1,
+            }
+        )
     ]
     monkeypatch.setattr(
         metrics_module,
@@ -135,13 +148,17 @@ def test_iscm_status_healthy(monkeypatch):
 def test_iscm_status_degraded_on_high_threats(monkeypatch):
     """Reports 'degraded' when high-risk events exceed threshold."""
     fake_results = [
-        _ScalarResult(100),
-        _ScalarResult(30),  # low compliance
-        _ScalarResult(15),  # high_risk_1h >= 10 → threat level high
-        _ScalarResult(1),
-        _ScalarResult(50),
-        _ScalarResult(20),
-        _ScalarResult(0),
+        _CountsResult(
+            {
+                "total_all": 100,
+                "total_allowed": 30,  # low compliance
+                "high_risk_1h": 15,  # high_risk_1h >= 10 → threat level high
+                "blocked_1h": 1,
+                "total_with_hash": 50,
+                "total_24h": 20,
+                "promotions_24h": 0,
+            }
+        )
     ]
     monkeypatch.setattr(
         metrics_module,
@@ -160,13 +177,17 @@ def test_iscm_status_degraded_on_high_threats(monkeypatch):
 def test_iscm_status_warning_medium_threats(monkeypatch):
     """Reports 'warning' when threat level is medium."""
     fake_results = [
-        _ScalarResult(100),
-        _ScalarResult(82),  # 82% compliance (>= 0.8)
-        _ScalarResult(4),  # high_risk_1h in [3,9] → medium
-        _ScalarResult(1),
-        _ScalarResult(80),
-        _ScalarResult(10),
-        _ScalarResult(0),
+        _CountsResult(
+            {
+                "total_all": 100,
+                "total_allowed": 82,  # 82% compliance (>= 0.8)
+                "high_risk_1h": 4,  # high_risk_1h in [3,9] → medium
+                "blocked_1h": 1,
+                "total_with_hash": 80,
+                "total_24h": 10,
+                "promotions_24h": 0,
+            }
+        )
     ]
     monkeypatch.setattr(
         metrics_module,
@@ -185,13 +206,17 @@ def test_iscm_status_warning_medium_threats(monkeypatch):
 def test_iscm_status_no_data(monkeypatch):
     """Returns healthy defaults when the database has no entries yet."""
     fake_results = [
-        _ScalarResult(0),  # total_all
-        _ScalarResult(0),
-        _ScalarResult(0),
-        _ScalarResult(0),
-        _ScalarResult(0),
-        _ScalarResult(0),
-        _ScalarResult(0),
+        _CountsResult(
+            {
+                "total_all": 0,
+                "total_allowed": 0,
+                "high_risk_1h": 0,
+                "blocked_1h": 0,
+                "total_with_hash": 0,
+                "total_24h": 0,
+                "promotions_24h": 0,
+            }
+        )
     ]
     monkeypatch.setattr(
         metrics_module,
@@ -103,6 +103,21 @@ def test_update_env_replaces_key_and_version(tmp_path):
     assert "JWT_SECRET_KEY=somesecret" in content
 
 
+def test_update_env_sets_previous_keys(tmp_path):
+    env_file = tmp_path / ".env"
+    env_file.write_text("DB_ENCRYPTION_KEY=oldkey\nDB_ENCRYPTION_KEY_ID=v1")
+
+    with patch("scripts.key_rotation.PROJECT_ROOT", str(tmp_path)):
+        _update_env("newkey", "v2", "v1:oldkey")
+        _update_env("newerkey", "v3", "v2:newkey,v1:oldkey")
+
+    lines = env_file.read_text().splitlines()
+    assert "DB_ENCRYPTION_KEY=newerkey" in lines
+    assert "DB_ENCRYPTION_KEY_ID=v3" in lines
+    assert "DB_ENCRYPTION_PREVIOUS_KEYS=v2:newkey,v1:oldkey" in lines
+    assert len(lines) == 3
+
+
 def test_update_env_missing_file_does_not_crash(tmp_path):
     with patch("scripts.key_rotation.PROJECT_ROOT", str(tmp_path)):
         # No .env file in tmp_path — should print warning and return gracefully
@@ -7,12 +7,17 @@ from app.auth.jwt_utils import create_access_token
 import app.routes.metrics as metrics_module
 
 
-class FakeScalarResult:
-    def __init__(self, value):
-        self._value = value
+class FakeCountsResult:
+    """Single-row result of a ConditionalCounts query."""
 
-    def scalar(self):
-        return self._value
+    def __init__(self, counts):
+        self._counts = counts
+
+    def mappings(self):
+        return self
+
+    def one(self):
+        return self._counts
 
 
 class FakeEntriesResult:
@@ -62,10 +67,9 @@ def build_client():
 def test_metrics_summary_endpoint(monkeypatch):
     fake_session = FakeSession(
         [
-            FakeScalarResult(12),  # total_prompts_24h
-            FakeScalarResult(3),  # blocked_prompts
-            FakeScalarResult(2),  # redacted_outputs
-            FakeScalarResult(1),  # high_risk_events
+            FakeCountsResult(
+                {"total_prompts": 12, "blocked": 3, "redacted": 2, "high_risk": 1}
+            )
         ]
     )
 
@@ -117,6 +121,7 @@ def test_recent_alerts_endpoint_with_entries(monkeypatch):
             "event_type": "ai_query_blocked",
             "severity": "high",
             "message": "Sensitive data detected in request",
+            "key_id": None,
             "created_at": datetime(2026, 3, 12, 10, 0, 0),
         },
     )()
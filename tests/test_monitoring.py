@@ -40,6 +40,19 @@ class _ScalarResult:
         return self._value
 
 
+class _CountsResult:
+    """Single-row result of a ConditionalCounts query."""
+
+    def __init__(self, counts):
+        self._counts = counts
+
+    def mappings(self):
+        return self
+
+    def one(self):
+        return self._counts
+
+
 class _RowsResult:
     def __init__(self, rows):
         self._rows = rows
@@ -299,14 +312,18 @@ def test_db_audit_returns_200():
     client = _build_client()
 
     fake_results = [
-        _ScalarResult(50),  # total
-        _ScalarResult(10),  # low severity
-        _ScalarResult(5),  # medium severity
-        _ScalarResult(15),  # high severity
-        _ScalarResult(3),  # allow 24h
-        _ScalarResult(2),  # redact 24h
-        _ScalarResult(1),  # block 24h
-        _ScalarResult(4),  # high_risk 24h
+        _CountsResult(
+            {
+                "total": 50,
+                "severity_low": 10,
+                "severity_medium": 5,
+                "severity_high": 15,
+                "decision_allow": 3,
+                "decision_redact": 2,
+                "decision_block": 1,
+                "high_risk_24h": 4,
+            }
+        )
     ]
 
     with patch.object(
@@ -332,14 +349,18 @@ def test_db_audit_encryption_disabled():
     client = _build_client()
 
     fake_results = [
-        _ScalarResult(0),  # total
-        _ScalarResult(0),
-        _ScalarResult(0),
-        _ScalarResult(0),
-        _ScalarResult(0),
-        _ScalarResult(0),
-        _ScalarResult(0),
-        _ScalarResult(0),
+        _CountsResult(
+            {
+                "total": 0,
+                "severity_low": 0,
+                "severity_medium": 0,
+                "severity_high": 0,
+                "decision_allow": 0,
+                "decision_redact": 0,
+                "decision_block": 0,
+                "high_risk_24h": 0,
+            }
+        )
     ]
 
     with patch.object(
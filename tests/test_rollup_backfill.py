@@ -0,0 +1,113 @@
+"""
+Rollup Backfill Tests
+---------------------
+Migration 0007_backfill_log_rollups recomputes the hour rollups that
+under-count their raw log entries (history from before the rollups were
+deployed) and leaves alone hours whose raw partitions were dropped by
+retention. Runs against a real PostgreSQL (skipped when DATABASE_URL is
+unreachable) inside a transaction that is rolled back.
+"""
+
+import importlib.util
+import os
+
+import pytest
+import pytest_asyncio
+from sqlalchemy import text
+from sqlalchemy.exc import SQLAlchemyError
+from sqlalchemy.ext.asyncio import create_async_engine
+from sqlalchemy.pool import NullPool
+
+from app.db.db import DATABASE_URL
+from app.db.migrations import PROJECT_ROOT, run_migrations
+
+
+def _load_migration(filename: str):
+    path = os.path.join(PROJECT_ROOT, "migrations", "versions", filename)
+    spec = importlib.util.spec_from_file_location(filename[:-3], path)
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+
+backfill = _load_migration("0007_backfill_log_rollups.py")
+
+HOUR = "date_trunc('hour', timezone('utc', now()))"
+
+# 3 entries 3 days ago (never rolled up), 2 entries 2 hours ago (only
+# one rolled up) and 1 in the current hour
+SAMPLE_LOGS = f"""
+INSERT INTO logs (endpoint, method, status_code, policy_decision, risk_score,
+                  created_at)
+VALUES ('/ai/query', 'POST', 200, 'allow', 0.1, {HOUR} - interval '72 hours'),
+       ('/ai/query', 'POST', 200, 'allow', 0.1, {HOUR} - interval '72 hours'),
+       ('/ai/query', 'POST', 200, 'block', 0.9, {HOUR} - interval '72 hours'),
+       ('/ai/query', 'POST', 200, 'allow', 0.1, {HOUR} - interval '2 hours'),
+       ('/ai/query', 'POST', 200, 'allow', 0.1, {HOUR} - interval '2 hours'),
+       ('/ai/query', 'POST', 200, 'allow', 0.1, {HOUR})
+"""
+
+# The partially counted deploy hour, plus an hour whose raw partition
+# has been dropped
+SAMPLE_ROLLUPS = f"""
+INSERT INTO log_rollups (granularity, bucket_start, endpoint, event_type,
+                         policy_decision, severity, source, count,
+                         high_risk_count)
+VALUES ('hour', {HOUR} - interval '2 hours', '/ai/query', '', 'allow', '', '',
+        1, 0),
+       ('hour', {HOUR} - interval '200 hours', '/ai/query', '', 'allow', '', '',
+        5, 0)
+"""
+
+HOUR_COUNTS = text(
+    f"SELECT extract(epoch FROM {HOUR} - bucket_start) / 3600 AS age, "
+    "sum(count), sum(high_risk_count) FROM log_rollups "
+    "WHERE granularity = :granularity GROUP BY bucket_start ORDER BY age"
+)
+
+
+@pytest_asyncio.fixture(scope="module")
+async def pg_engine():
+    engine = create_async_engine(DATABASE_URL, poolclass=NullPool)
+    try:
+        async with engine.connect() as conn:
+            if conn.dialect.name != "postgresql":
+                pytest.skip("the backfill migration is PostgreSQL-specific")
+    except (OSError, SQLAlchemyError) as exc:
+        await engine.dispose()
+        pytest.skip(f"PostgreSQL not reachable: {exc}")
+
+    await run_migrations()
+    yield engine
+    await engine.dispose()
+
+
+@pytest.mark.asyncio
+async def test_backfill_fills_under_counted_hours_only(pg_engine):
+    async with pg_engine.connect() as conn:
+        trans = await conn.begin()
+        try:
+            await conn.execute(text("DELETE FROM logs"))
+            await conn.execute(text("DELETE FROM log_rollups"))
+            await conn.execute(text(SAMPLE_LOGS))
+            await conn.execute(text(SAMPLE_ROLLUPS))
+            for statement in (
+                backfill.STALE_HOURS,
+                backfill.CLEAR_STALE,
+                backfill.INSERT_STALE,
+                "DROP TABLE rollup_backfill_hours",
+            ):
+                await conn.execute(text(statement))
+
+            hours = await conn.execute(HOUR_COUNTS, {"granularity": "hour"})
+            hours = [tuple(map(int, row)) for row in hours]
+            minutes = await conn.execute(HOUR_COUNTS, {"granularity": "minute"})
+            minutes = [tuple(map(int, row)) for row in minutes]
+        finally:
+            await trans.rollback()
+
+    # (age in hours, count, high risk); the current hour is left to the
+    # live writes
+    assert hours == [(2, 2, 0), (72, 3, 1), (200, 5, 0)]
+    # Minute buckets only inside the minute retention
+    assert minutes == [(2, 2, 0)]
@@ -1,6 +1,6 @@
 'use client';
 
-import React, { useState, useEffect, useCallback } from 'react';
+import React, { useState, useEffect, useCallback, useRef } from 'react';
 import { apiFetch } from '../lib/auth';
 import {
   ArrowPathIcon,
@@ -153,16 +153,17 @@ const AuditLogPanel: React.FC = () => {
     policy_decision: '',
   });
   const [selectedEntry, setSelectedEntry] = useState<LogEntry | null>(null);
+  // Keyset cursor for each visited page (page 0 starts from the newest entry)
+  const cursors = useRef<(string | null)[]>([null]);
 
   const fetchLogs = useCallback(
     async (currentPage: number, currentFilters: Filters) => {
       setLoading(true);
       setFetchError(false);
       try {
-        const params = new URLSearchParams({
-          limit: String(PAGE_SIZE),
-          offset: String(currentPage * PAGE_SIZE),
-        });
+        const params = new URLSearchParams({ limit: String(PAGE_SIZE) });
+        const cursor = cursors.current[currentPage];
+        if (cursor) params.set('cursor', cursor);
         if (currentFilters.severity) params.set('severity', currentFilters.severity);
         if (currentFilters.event_type) params.set('event_type', currentFilters.event_type);
         if (currentFilters.policy_decision) params.set('policy_decision', currentFilters.policy_decision);
@@ -171,7 +172,8 @@ const AuditLogPanel: React.FC = () => {
         if (!res.ok) throw new Error('Response not OK');
         const data = await res.json();
         setLogs(data.logs ?? []);
-        setHasMore((data.count ?? 0) === PAGE_SIZE);
+        cursors.current[currentPage + 1] = data.next_cursor ?? null;
+        setHasMore(Boolean(data.next_cursor));
       } catch {
         setFetchError(true);
         setLogs([]);
@@ -187,11 +189,13 @@ const AuditLogPanel: React.FC = () => {
   }, [page, filters, fetchLogs]);
 
   function applyFilter(key: keyof Filters, value: string) {
+    cursors.current = [null];
     setPage(0);
     setFilters((prev) => ({ ...prev, [key]: value }));
   }
 
   function clearFilters() {
+    cursors.current = [null];
     setPage(0);
     setFilters({ severity: '', event_type: '', policy_decision: '' });
   }
@@ -125,6 +125,24 @@ function exportCSV(data: ReportData) {
   URL.revokeObjectURL(url);
 }
 
+// Raw audit log entries for the period, streamed by the backend as gzipped CSV
+async function exportLogsCSV(period: ReportData['period']) {
+  const params = new URLSearchParams({
+    start_date: period.start,
+    end_date: period.end,
+    format: 'csv',
+    gzip: 'true',
+  });
+  const res = await apiFetch(`${API_BASE}/logs/export?${params}`);
+  if (!res.ok) throw new Error('Response not OK');
+  const url = URL.createObjectURL(await res.blob());
+  const a = document.createElement('a');
+  a.href = url;
+  a.download = `cyberoracle-logs-${period.start}-to-${period.end}.csv.gz`;
+  a.click();
+  URL.revokeObjectURL(url);
+}
+
 // ── Shared sub-components ─────────────────────────────────────────────────────
 
 function StatCard({ label, value, sub, color }: { label: string; value: number; sub?: string; color?: string }) {
@@ -226,6 +244,19 @@ function SummaryTab() {
               Export CSV
             </button>
           )}
+          {report && (
+            <button
+              onClick={() =>
+                exportLogsCSV(report.period).catch(() =>
+                  setFetchError('Log export failed — check the backend connection.'),
+                )
+              }
+              className="flex items-center gap-1.5 rounded-lg border border-slate-700 bg-slate-800 px-3 py-2 text-xs font-medium text-slate-200 hover:bg-slate-700 transition"
+            >
+              <ArrowDownTrayIcon className="w-3.5 h-3.5" />
+              Export raw logs
+            </button>
+          )}
         </div>
       </div>
 